@@ -4,6 +4,7 @@
 """
 
 import asyncio
+import json
 import sys
 from pathlib import Path
 from typing import Optional
@@ -78,6 +79,59 @@ def generate(ctx, lang: str, title: str, input_file: Optional[str], resume: Opti
     asyncio.run(run_workflow())
 
 
+@cli.command()
+@click.option('--lang', required=True, help='言語コード (例: ja, en)')
+@click.option('--title', required=True, help='書籍タイトル')
+@click.option('--input-file', type=click.Path(exists=True), help='入力ファイルのパス')
+@click.option('--concurrency', type=int, help='見積もりに使う同時実行数（未指定時は設定値）')
+@click.option('--json', 'as_json', is_flag=True, help='JSON形式で出力')
+@click.pass_context
+def estimate(ctx, lang: str, title: str, input_file: Optional[str], concurrency: Optional[int], as_json: bool):
+    """ワークフローを実行せずにリクエスト数・トークン・コスト・所要時間を見積もる"""
+    config = ctx.obj['config']
+    
+    async def run_estimate():
+        orchestrator = WorkflowOrchestrator(config)
+        
+        try:
+            plan = await orchestrator.plan(lang, title, input_file, concurrency=concurrency)
+        except Exception as e:
+            logger.error(f"見積もりエラー: {e}")
+            click.echo(f"❌ エラー: {e}", err=True)
+            sys.exit(1)
+        
+        if as_json:
+            click.echo(json.dumps(plan.to_dict(), ensure_ascii=False, indent=2))
+            return
+        
+        click.echo(f"📐 見積もり: {plan.title} ({plan.lang})")
+        click.echo(f"   構成: {plan.chapters} チャプター / {plan.sections} セクション / {plan.paragraphs} パラグラフ")
+        click.echo(
+            f"   削減: パック {plan.packed_paragraphs} パラグラフ / "
+            f"重複再利用 {plan.reused_paragraphs} パラグラフ / 導出 {plan.derived_outputs} 件"
+        )
+        for output_format, estimate_ in plan.formats.items():
+            click.echo(
+                f"   - {output_format}: {estimate_.requests} リクエスト, "
+                f"入力 {estimate_.input_tokens:,} / 出力上限 {estimate_.output_tokens:,} トークン, "
+                f"${estimate_.cost_usd:.4f}"
+            )
+        click.echo(f"   リクエスト数: {plan.requests}")
+        click.echo(
+            f"   トークン数: {plan.total_tokens:,} "
+            f"(入力 {plan.input_tokens:,} / 出力上限 {plan.output_tokens:,})"
+        )
+        click.echo(f"   コスト上限: ${plan.cost_usd:.4f} ({plan.provider})")
+        if plan.unpriced_models:
+            click.echo(f"   ⚠️  料金未登録のモデル: {', '.join(plan.unpriced_models)}")
+        click.echo(
+            f"   所要時間: 約 {plan.wall_clock_seconds / 60:.1f} 分 "
+            f"(同時実行数 {plan.concurrency}, 律速: {plan.bottleneck})"
+        )
+    
+    asyncio.run(run_estimate())
+
+
 @cli.command()
 @click.pass_context
 def orchestrate(ctx):
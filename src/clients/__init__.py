@@ -7,16 +7,34 @@ from .base import BaseClient
 from .claude import ClaudeClient
 from .openai import OpenAIClient
 from .s3 import S3Client
+from .object_store import (
+    LocalObjectStore,
+    MemoryObjectStore,
+    ObjectStore,
+    S3ObjectStore,
+    create_object_store,
+)
+from .upload_queue import UploadQueue
 from .github import GitHubClient
 from .slack import SlackClient
 from .redis import RedisClient
+from .router import ProviderRouter
+from .http_pool import HTTPClientRegistry
 
 __all__ = [
     "BaseClient",
     "ClaudeClient", 
     "OpenAIClient",
     "S3Client",
+    "ObjectStore",
+    "S3ObjectStore",
+    "LocalObjectStore",
+    "MemoryObjectStore",
+    "create_object_store",
+    "UploadQueue",
     "GitHubClient",
     "SlackClient",
-    "RedisClient"
+    "RedisClient",
+    "ProviderRouter",
+    "HTTPClientRegistry"
 ] 
\ No newline at end of file
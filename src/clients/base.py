@@ -1,16 +1,35 @@
 """外部サービスクライアントの基底クラス."""
 
 import asyncio
+import json
+import re
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, TypeVar
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Any, Deque, Dict, Optional, TypeVar, Union
+from urllib.parse import urlparse
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from ..config.settings import Config
 from ..utils.logger import get_logger
-from ..utils.rate_limiter import RateLimiter
+from ..utils.rate_limiter import (
+    DistributedRateLimiter,
+    GlobalRateLimiter,
+    ModelRateLimiter,
+    RateLimiter,
+)
+from .http_pool import HTTPClientRegistry
 
 logger = get_logger(__name__)
 
@@ -24,7 +43,10 @@ class ClientError(Exception):
 
 class RateLimitError(ClientError):
     """レート制限エラー."""
-    pass
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class AuthenticationError(ClientError):
@@ -41,39 +63,611 @@ class APIError(ClientError):
         self.response_data = response_data
 
 
+class CircuitOpenError(ClientError):
+    """サーキットオープン（呼び出しを即時失敗させた）エラー."""
+    
+    def __init__(self, message: str, circuit_name: str, retry_after: float = 0.0, breaker=None):
+        super().__init__(message)
+        self.circuit_name = circuit_name
+        self.retry_after = retry_after
+        self.breaker = breaker
+
+
+class CircuitState(Enum):
+    """サーキットブレーカーの状態."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """失敗率・スローコール率に基づくサーキットブレーカー.
+    
+    直近 window_size 件の呼び出しのうち失敗率またはスローコール率が閾値を超えると
+    OPEN になり、open_duration 秒間は呼び出しを即時失敗させる。その後 HALF_OPEN で
+    half_open_max_calls 件までの試行を許可し、全て成功すれば CLOSED に戻る。
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_rate_threshold: float = 0.8,
+        slow_call_duration: float = 30.0,
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        open_duration: float = 30.0,
+        half_open_max_calls: int = 2
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.minimum_calls = minimum_calls
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        
+        self._state = CircuitState.CLOSED
+        self._calls: Deque[tuple[bool, bool]] = deque(maxlen=window_size)  # (失敗, スロー)
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        self._listeners: list = []
+        
+        self.stats = {
+            "rejected": 0,
+            "opened": 0,
+        }
+        
+    @property
+    def state(self) -> CircuitState:
+        """現在の状態（オープン期間経過後は HALF_OPEN）."""
+        if self._state == CircuitState.OPEN and self.remaining_open_time() <= 0:
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+        
+    def remaining_open_time(self) -> float:
+        """OPEN 状態の残り秒数."""
+        if self._state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_duration - time.monotonic())
+        
+    def add_listener(self, listener) -> None:
+        """状態遷移リスナーを登録（listener(breaker, old_state, new_state)）."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+            
+    def remove_listener(self, listener) -> None:
+        """状態遷移リスナーを解除."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+            
+    def allow(self) -> None:
+        """呼び出し可否を判定（不可の場合は CircuitOpenError）."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return
+        if state == CircuitState.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+            self._half_open_in_flight += 1
+            return
+            
+        self.stats["rejected"] += 1
+        retry_after = self.remaining_open_time() or self.open_duration
+        raise CircuitOpenError(
+            f"Circuit {self.name} is {state.value}",
+            circuit_name=self.name,
+            retry_after=retry_after,
+            breaker=self
+        )
+        
+    def record_success(self, duration: float) -> None:
+        """成功を記録."""
+        slow = duration >= self.slow_call_duration
+        if self._state == CircuitState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            if slow:
+                self._open()
+                return
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.half_open_max_calls:
+                self._transition(CircuitState.CLOSED)
+            return
+            
+        self._calls.append((False, slow))
+        self._evaluate()
+        
+    def record_failure(self, duration: float = 0.0) -> None:
+        """失敗を記録."""
+        if self._state == CircuitState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            self._open()
+            return
+            
+        self._calls.append((True, duration >= self.slow_call_duration))
+        self._evaluate()
+        
+    def record_ignored(self) -> None:
+        """判定に含めない結果（認証エラー・レート制限など）を記録."""
+        if self._state == CircuitState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            
+    def _evaluate(self) -> None:
+        """失敗率・スローコール率を評価."""
+        if self._state != CircuitState.CLOSED or len(self._calls) < self.minimum_calls:
+            return
+        total = len(self._calls)
+        failure_rate = sum(1 for failed, _ in self._calls if failed) / total
+        slow_rate = sum(1 for _, slow in self._calls if slow) / total
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            self._open()
+            
+    def _open(self) -> None:
+        """OPEN に遷移."""
+        self._opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        self._transition(CircuitState.OPEN)
+        
+    def _transition(self, new_state: CircuitState) -> None:
+        """状態遷移とリスナー通知."""
+        old_state = self._state
+        self._state = new_state
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        if new_state == CircuitState.CLOSED:
+            self._calls.clear()
+            
+        if old_state != new_state:
+            logger.info(f"Circuit {self.name}: {old_state.value} -> {new_state.value}")
+            for listener in list(self._listeners):
+                try:
+                    listener(self, old_state, new_state)
+                except Exception as e:
+                    logger.warning(f"Circuit listener failed: {e}")
+                    
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得."""
+        total = len(self._calls)
+        stats = self.stats.copy()
+        stats.update({
+            "state": self.state.value,
+            "calls_in_window": total,
+            "failure_rate": sum(1 for failed, _ in self._calls if failed) / total if total else 0.0,
+            "slow_call_rate": sum(1 for _, slow in self._calls if slow) / total if total else 0.0,
+            "remaining_open_time": self.remaining_open_time(),
+        })
+        return stats
+
+
+def _parse_seconds(value: Any) -> Optional[float]:
+    """ヘッダー値を秒数として解釈（数値・HTTP日付・ISO8601・"1m30s"形式）."""
+    if not isinstance(value, (str, bytes, int, float)):
+        return None
+    if isinstance(value, bytes):
+        value = value.decode(errors="ignore")
+    if isinstance(value, (int, float)):
+        return max(0.0, float(value))
+        
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+        
+    # OpenAI形式の期間表記（例: "6m0s", "120ms"）
+    match = re.fullmatch(r'(?:(\d+)h)?(?:(\d+)m(?!s))?(?:([\d.]+)s)?(?:([\d.]+)ms)?', value)
+    if match and any(match.groups()):
+        hours, minutes, seconds, millis = match.groups()
+        return (
+            int(hours or 0) * 3600
+            + int(minutes or 0) * 60
+            + float(seconds or 0)
+            + float(millis or 0) / 1000
+        )
+        
+    # 絶対時刻（HTTP日付 / RFC3339）
+    for parser in (parsedate_to_datetime, lambda v: datetime.fromisoformat(v.replace("Z", "+00:00"))):
+        try:
+            reset_at = parser(value)
+        except (TypeError, ValueError, IndexError):
+            continue
+        if reset_at.tzinfo is None:
+            reset_at = reset_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+        
+    return None
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD方式の適応的同時実行数制御.
+    
+    成功時は同時実行上限を加算的に増やし、429・5xx・レイテンシ急増時は
+    乗算的に減らす。Retry-After やレート制限ヘッダーを受け取った場合は
+    指定時刻まで新規リクエストの送出を止める。
+    """
+    
+    # 残りリクエスト数・リセット時刻を示すヘッダー（Anthropic / OpenAI）
+    REMAINING_HEADERS = (
+        "anthropic-ratelimit-requests-remaining",
+        "x-ratelimit-remaining-requests",
+    )
+    RESET_HEADERS = (
+        "anthropic-ratelimit-requests-reset",
+        "x-ratelimit-reset-requests",
+    )
+    
+    def __init__(
+        self,
+        service_name: str = "default",
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_spike_factor: float = 2.0,
+        latency_alpha: float = 0.2,
+        warmup_samples: int = 5,
+        metrics=None
+    ):
+        if min_limit <= 0 or max_limit < min_limit:
+            raise ValueError("Invalid concurrency bounds")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+            
+        self.service_name = service_name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.latency_alpha = latency_alpha
+        self.warmup_samples = warmup_samples
+        self.metrics = metrics
+        
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._blocked_until = 0.0
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+        self._latency_ewma: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = 0.0
+        
+        self.stats = {
+            "successes": 0,
+            "throttled": 0,
+            "overloaded": 0,
+            "latency_spikes": 0,
+            "decreases": 0,
+        }
+        
+    @property
+    def limit(self) -> int:
+        """現在の同時実行上限."""
+        return max(self.min_limit, int(self._limit))
+        
+    @property
+    def in_flight(self) -> int:
+        """実行中のリクエスト数."""
+        return self._in_flight
+        
+    async def acquire(self) -> None:
+        """実行枠を取得（上限到達時・ブロック中は待機）."""
+        while True:
+            delay = self._blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+                
+            if self._in_flight < self.limit and not self._waiters:
+                self._in_flight += 1
+                return
+                
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+                return
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # 枠が割り当て済みだった場合は返却
+                    self.release()
+                else:
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+                raise
+                
+    def release(self) -> None:
+        """実行枠を返却."""
+        self._in_flight = max(0, self._in_flight - 1)
+        self._wake_waiters()
+        
+    def _wake_waiters(self) -> None:
+        """空き枠の分だけ待機者に枠を引き渡す（FIFO）."""
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            self._schedule_wake(delay)
+            return
+            
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+                
+    def _schedule_wake(self, delay: float) -> None:
+        """ブロック解除時に待機者を起こす."""
+        if self._wake_handle is not None:
+            self._wake_handle.cancel()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wake_handle = loop.call_later(delay, self._wake_waiters)
+        
+    def on_success(self, latency: float) -> None:
+        """成功レスポンスを記録."""
+        self.stats["successes"] += 1
+        self._samples += 1
+        
+        # レイテンシ急増の検出（ウォームアップ後）
+        if (
+            self._latency_ewma is not None
+            and self._samples > self.warmup_samples
+            and latency > self._latency_ewma * self.latency_spike_factor
+        ):
+            self.stats["latency_spikes"] += 1
+            self._decrease()
+        else:
+            # 加算的増加: 上限分の成功でおよそ +increase_step
+            self._limit = min(float(self.max_limit), self._limit + self.increase_step / self._limit)
+            
+        if self._latency_ewma is None:
+            self._latency_ewma = latency
+        else:
+            self._latency_ewma += self.latency_alpha * (latency - self._latency_ewma)
+            
+        self._wake_waiters()
+        self._publish_metrics()
+        
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """429（レート制限）を記録."""
+        self.stats["throttled"] += 1
+        self._decrease(force=True)
+        if retry_after:
+            self.block_for(retry_after)
+        self._publish_metrics()
+        
+    def on_overload(self) -> None:
+        """5xx（サーバー過負荷）を記録."""
+        self.stats["overloaded"] += 1
+        self._decrease()
+        self._publish_metrics()
+        
+    def block_for(self, seconds: float) -> None:
+        """指定秒数、新規リクエストの送出を止める."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._schedule_wake(seconds)
+        
+    def observe_headers(self, headers: Any) -> Optional[float]:
+        """レスポンスヘッダーからレート制限情報を反映.
+        
+        Returns:
+            Retry-After（秒）。指定がない場合は None
+        """
+        if headers is None or not hasattr(headers, "get"):
+            return None
+            
+        retry_after = _parse_seconds(headers.get("retry-after"))
+        
+        remaining = None
+        for name in self.REMAINING_HEADERS:
+            value = headers.get(name)
+            if isinstance(value, (str, int)):
+                try:
+                    remaining = int(value)
+                    break
+                except ValueError:
+                    continue
+                    
+        if remaining is not None:
+            if remaining <= 0:
+                reset_after = None
+                for name in self.RESET_HEADERS:
+                    reset_after = _parse_seconds(headers.get(name))
+                    if reset_after is not None:
+                        break
+                if reset_after:
+                    self.block_for(reset_after)
+            elif remaining < self._limit:
+                # 残量以上に並列送出しない
+                self._limit = float(max(self.min_limit, remaining))
+                self._publish_metrics()
+                
+        return retry_after
+        
+    def _decrease(self, force: bool = False) -> None:
+        """乗算的減少（1RTTにつき1回まで）."""
+        now = time.monotonic()
+        rtt = self._latency_ewma or 0.0
+        if not force and now - self._last_decrease < rtt:
+            return
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        self._last_decrease = now
+        self.stats["decreases"] += 1
+        
+    def _publish_metrics(self) -> None:
+        """状態をメトリクスとして公開."""
+        if not self.metrics:
+            return
+        labels = {"service": self.service_name}
+        try:
+            self.metrics.set_gauge("client.concurrency.limit", self.limit, labels)
+            self.metrics.set_gauge("client.concurrency.in_flight", self._in_flight, labels)
+            self.metrics.set_gauge("client.concurrency.waiting", len(self._waiters), labels)
+        except Exception as e:
+            logger.debug(f"Failed to publish concurrency metrics: {e}")
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得."""
+        stats = self.stats.copy()
+        stats.update({
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "latency_ewma": self._latency_ewma,
+            "blocked_for": max(0.0, self._blocked_until - time.monotonic()),
+        })
+        return stats
+
+
+def _wait_retry_after_or_exponential(retry_state) -> float:
+    """Retry-After が指定されていればそれに従い、なければ指数バックオフ."""
+    exception = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(exception, RateLimitError) and exception.retry_after:
+        return exception.retry_after
+    return wait_exponential(multiplier=1, min=4, max=60)(retry_state)
+
+
 class BaseClient(ABC):
     """外部サービスクライアントの基底クラス."""
     
-    def __init__(self, config: Config, service_name: str):
+    def __init__(self, config: Config, service_name: str, base_url: Optional[str] = None):
         self.config = config
         self.service_name = service_name
         self.logger = get_logger(f"{__name__}.{service_name}")
         
-        # HTTPクライアントの初期化
-        self.client = httpx.AsyncClient(
-            timeout=config.api_timeout,
-            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
-        )
+        # HTTPクライアントの初期化（同一オリジンのクライアント間でコネクションプールを共有）
+        pool_key = base_url if isinstance(base_url, str) and base_url else service_name
+        self.client = HTTPClientRegistry.acquire(pool_key, config.api_timeout, config)
         
         # レート制限器
-        self.rate_limiter = RateLimiter(
-            requests_per_minute=self._get_rate_limit(),
-            service_name=service_name
-        )
+        self.rate_limiter = self._create_rate_limiter()
+        
+        # 適応的同時実行数制御（AIMD）
+        self.metrics = None
+        self.concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+        if self._api_setting("adaptive_concurrency_enabled", True):
+            self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+                service_name=service_name,
+                initial_limit=self._api_setting("concurrency_initial", 4),
+                min_limit=self._api_setting("concurrency_min", 1),
+                max_limit=self._api_setting("concurrency_max", 32),
+                latency_spike_factor=self._api_setting("concurrency_latency_spike_factor", 2.0)
+            )
+        
+        # エンドポイント毎のサーキットブレーカー
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
         
         # メトリクス用の統計
         self.stats = {
             "requests_made": 0,
             "requests_failed": 0,
             "total_time": 0.0,
-            "last_request_time": None
+            "last_request_time": None,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0
         }
         
+    def _api_setting(self, name: str, default: Any) -> Any:
+        """API設定値を取得（未設定時はデフォルト値）."""
+        value = getattr(getattr(self.config, 'api', None), name, None)
+        return default if value is None else value
+        
+    def attach_metrics(self, metrics) -> None:
+        """メトリクスコレクターを接続."""
+        self.metrics = metrics
+        if self.concurrency_limiter:
+            self.concurrency_limiter.metrics = metrics
+            
+    def is_available(self) -> bool:
+        """リクエストを受け付け可能か（ルーターのフェイルオーバー判定に使用）."""
+        return not any(
+            breaker.state == CircuitState.OPEN for breaker in self.circuit_breakers.values()
+        )
+        
+    def get_circuit_breaker(self, url: str) -> CircuitBreaker:
+        """エンドポイント用のサーキットブレーカーを取得または作成."""
+        endpoint = urlparse(url).path or "/"
+        if endpoint not in self.circuit_breakers:
+            self.circuit_breakers[endpoint] = CircuitBreaker(
+                name=f"{self.service_name}:{endpoint}",
+                failure_rate_threshold=self._api_setting("circuit_failure_rate_threshold", 0.5),
+                slow_call_rate_threshold=self._api_setting("circuit_slow_call_rate_threshold", 0.8),
+                slow_call_duration=self._api_setting("circuit_slow_call_duration", 30.0),
+                window_size=self._api_setting("circuit_window_size", 20),
+                minimum_calls=self._api_setting("circuit_minimum_calls", 10),
+                open_duration=self._api_setting("circuit_open_duration", 30.0),
+                half_open_max_calls=self._api_setting("circuit_half_open_max_calls", 2)
+            )
+        return self.circuit_breakers[endpoint]
+        
     @abstractmethod
     def _get_rate_limit(self) -> int:
         """サービス固有のレート制限を取得."""
         pass
         
+    def _create_rate_limiter(self) -> Union[RateLimiter, DistributedRateLimiter]:
+        """レート制限器を作成（Redis共有が有効な場合はプロセス間で共有）."""
+        redis_config = getattr(self.config, 'redis', None)
+        if getattr(redis_config, 'rate_limit_enabled', False) is True:
+            return GlobalRateLimiter.get_distributed_limiter(
+                redis_config.url,
+                self.service_name,
+                self._get_rate_limit(),
+                lease_size=redis_config.rate_limit_lease_size,
+                lease_ttl=redis_config.rate_limit_lease_ttl,
+                fallback_share=redis_config.rate_limit_fallback_share
+            )
+        return RateLimiter(
+            requests_per_minute=self._get_rate_limit(),
+            service_name=self.service_name
+        )
+        
+    def _get_token_rate_limit(self) -> Optional[int]:
+        """サービス固有のトークンレート制限（TPM）を取得（未設定時は None）."""
+        return None
+        
+    def _get_model_rate_limiter(self, request_kwargs: Dict[str, Any]) -> Optional[ModelRateLimiter]:
+        """リクエスト対象モデルのRPM/TPMレート制限器を取得."""
+        tokens_per_minute = self._get_token_rate_limit()
+        body = request_kwargs.get("json")
+        if not tokens_per_minute or not isinstance(body, dict) or not body.get("model"):
+            return None
+        # Redis共有時はサービス単位のRPMバケットとモデル単位のTPMバケットを共有する
+        options = {}
+        if isinstance(self.rate_limiter, DistributedRateLimiter):
+            redis_config = self.config.redis
+            # TPMバケットのリースはリクエスト数ではなくトークン数で前借りする
+            options = dict(
+                redis_url=redis_config.url,
+                lease_size=redis_config.rate_limit_lease_size,
+                token_lease_size=redis_config.rate_limit_lease_size * int(body.get("max_tokens") or 0) or None,
+                lease_ttl=redis_config.rate_limit_lease_ttl,
+                fallback_share=redis_config.rate_limit_fallback_share
+            )
+        return GlobalRateLimiter.get_model_limiter(
+            self.service_name,
+            body["model"],
+            requests_per_minute=self._get_rate_limit(),
+            tokens_per_minute=tokens_per_minute,
+            **options
+        )
+        
+    @staticmethod
+    def _estimate_request_tokens(request_kwargs: Dict[str, Any]) -> int:
+        """リクエストの消費トークン数を概算（プロンプト＋最大出力トークン）."""
+        body = request_kwargs.get("json")
+        if not isinstance(body, dict):
+            return 0
+        prompt_parts = [body.get("system"), body.get("messages")]
+        prompt_chars = len(json.dumps([p for p in prompt_parts if p], ensure_ascii=False))
+        # 日本語・英語混在を想定し、3文字≒1トークンで概算
+        return prompt_chars // 3 + int(body.get("max_tokens") or 0)
+        
     @abstractmethod
     def _get_headers(self) -> Dict[str, str]:
         """リクエストヘッダーを取得."""
@@ -93,8 +687,8 @@ class BaseClient(ABC):
         await self.close()
         
     async def close(self):
-        """クライアントを閉じる."""
-        await self.client.aclose()
+        """クライアントを閉じる（共有プールの参照を解放）."""
+        await HTTPClientRegistry.release(self.client)
         
     def _record_stats(self, duration: float, success: bool = True):
         """統計を記録."""
@@ -105,6 +699,22 @@ class BaseClient(ABC):
         if not success:
             self.stats["requests_failed"] += 1
             
+    def _record_usage(
+        self,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_creation_tokens: int = 0
+    ):
+        """トークン使用量を記録.
+        
+        input_tokens はキャッシュを経由しなかった入力トークン数とする。
+        """
+        self.stats["input_tokens"] += input_tokens
+        self.stats["output_tokens"] += output_tokens
+        self.stats["cache_read_input_tokens"] += cache_read_tokens
+        self.stats["cache_creation_input_tokens"] += cache_creation_tokens
+        
     def get_stats(self) -> Dict[str, Any]:
         """統計情報を取得."""
         stats = self.stats.copy()
@@ -114,11 +724,27 @@ class BaseClient(ABC):
         else:
             stats["average_time"] = 0.0
             stats["failure_rate"] = 0.0
+            
+        total_input = (
+            stats["input_tokens"]
+            + stats["cache_read_input_tokens"]
+            + stats["cache_creation_input_tokens"]
+        )
+        stats["cache_hit_rate"] = (
+            stats["cache_read_input_tokens"] / total_input if total_input > 0 else 0.0
+        )
+        if self.concurrency_limiter:
+            stats["concurrency"] = self.concurrency_limiter.get_stats()
+        if self.circuit_breakers:
+            stats["circuits"] = {
+                endpoint: breaker.get_stats() for endpoint, breaker in self.circuit_breakers.items()
+            }
         return stats
         
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=60),
+        wait=_wait_retry_after_or_exponential,
+        retry=retry_if_exception_type(Exception) & retry_if_not_exception_type(CircuitOpenError),
         reraise=True
     )
     async def _make_request(
@@ -128,12 +754,32 @@ class BaseClient(ABC):
         **kwargs
     ) -> Dict[str, Any]:
         """HTTPリクエストを実行（リトライ付き）."""
-        # レート制限
-        await self.rate_limiter.acquire()
+        # サーキットオープン中は即時失敗（リトライしない）
+        breaker = self.get_circuit_breaker(url)
+        breaker.allow()
         
+        limiter = self.concurrency_limiter
+        limiter_acquired = False
+        rate_acquired = False
+        outcome_recorded = False
         start_time = time.time()
         
         try:
+            # 同時実行数制御（取得済みの枠だけを finally で返却する）
+            if limiter:
+                await limiter.acquire()
+                limiter_acquired = True
+            
+            # レート制限（TPM設定時はモデル単位のRPM/TPM、それ以外はサービス単位のRPM）
+            model_rate_limiter = self._get_model_rate_limiter(kwargs)
+            if model_rate_limiter:
+                await model_rate_limiter.acquire(self._estimate_request_tokens(kwargs))
+            else:
+                await self.rate_limiter.acquire()
+                rate_acquired = True
+            
+            start_time = time.time()
+            
             # ヘッダーの設定
             headers = kwargs.get('headers', {})
             headers.update(self._get_headers())
@@ -144,11 +790,19 @@ class BaseClient(ABC):
             # リクエスト実行
             response = await self.client.request(method, url, **kwargs)
             
+            # レート制限ヘッダーの反映
+            retry_after = limiter.observe_headers(getattr(response, "headers", None)) if limiter else None
+            
             # ステータスコードチェック
             if response.status_code == 429:
                 self.logger.warning("Rate limit exceeded")
-                raise RateLimitError("Rate limit exceeded")
-            elif response.status_code == 401:
+                if limiter:
+                    limiter.on_throttle(retry_after)
+                raise RateLimitError("Rate limit exceeded", retry_after=retry_after)
+            elif response.status_code >= 500 and limiter:
+                limiter.on_overload()
+                
+            if response.status_code == 401:
                 self.logger.error("Authentication failed")
                 raise AuthenticationError("Authentication failed")
             elif response.status_code >= 400:
@@ -169,6 +823,10 @@ class BaseClient(ABC):
             # 統計記録
             duration = time.time() - start_time
             self._record_stats(duration, success=True)
+            breaker.record_success(duration)
+            outcome_recorded = True
+            if limiter:
+                limiter.on_success(duration)
             
             self.logger.debug(f"Request completed in {duration:.2f}s")
             return result
@@ -178,10 +836,25 @@ class BaseClient(ABC):
             duration = time.time() - start_time
             self._record_stats(duration, success=False)
             
+            # サーバーエラー・通信エラーのみをサーキットの失敗として扱う
+            if isinstance(e, (httpx.RequestError, asyncio.TimeoutError)) or (
+                isinstance(e, APIError) and (e.status_code or 0) >= 500
+            ):
+                breaker.record_failure(duration)
+            else:
+                breaker.record_ignored()
+            outcome_recorded = True
+            
             self.logger.error(f"Request failed: {e}")
             raise
         finally:
-            self.rate_limiter.release()
+            # キャンセル時も HALF_OPEN の試行枠を返却する
+            if not outcome_recorded:
+                breaker.record_ignored()
+            if rate_acquired:
+                self.rate_limiter.release()
+            if limiter_acquired:
+                limiter.release()
             
     async def health_check(self) -> bool:
         """サービスの健全性チェック."""
@@ -20,7 +20,7 @@ class ClaudeClient(BaseClient):
     """Claude API クライアント."""
     
     def __init__(self, config: Config):
-        super().__init__(config, "claude")
+        super().__init__(config, "claude", base_url=config.claude.base_url)
         
         if not config.claude.api_key:
             raise ValueError("Claude API key is required")
@@ -37,10 +37,22 @@ class ClaudeClient(BaseClient):
             ttl=config.cache.ttl
         )
         
+        # プロンプトキャッシュ（共有プレフィックスへのキャッシュマーカー付与）
+        self.prompt_caching_enabled = getattr(
+            getattr(config, 'api', None), 'prompt_caching_enabled', True
+        )
+        
     def _get_rate_limit(self) -> int:
         """Claude API のレート制限を取得."""
         return self.config.claude.rate_limit
         
+    def _get_token_rate_limit(self) -> Optional[int]:
+        """Claude API のトークンレート制限（TPM）を取得."""
+        return (
+            getattr(self.config.claude, 'tokens_per_minute', None)
+            or self._api_setting('claude_tokens_per_minute', None)
+        )
+        
     def _get_headers(self) -> Dict[str, str]:
         """リクエストヘッダーを取得."""
         return {
@@ -89,6 +101,7 @@ class ClaudeClient(BaseClient):
             "max_tokens": kwargs.get("max_tokens", self.max_tokens),
             "temperature": kwargs.get("temperature", self.temperature),
             "system_prompt": kwargs.get("system_prompt"),
+            "context": kwargs.get("context"),
         }
         
         # 画像データがある場合はハッシュ化
@@ -109,9 +122,14 @@ class ClaudeClient(BaseClient):
         model: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
-        use_cache: bool = True
+        use_cache: bool = True,
+        context: Optional[str] = None
     ) -> Dict[str, Any]:
-        """テキスト生成."""
+        """テキスト生成.
+        
+        context には章・セクションのコンテキストなど、複数リクエストで共通の
+        テキストを渡す。system_prompt と共にキャッシュ可能なプレフィックスとして送信される。
+        """
         # キャッシュチェック
         if use_cache:
             cache_key = self._generate_cache_key(
@@ -120,7 +138,8 @@ class ClaudeClient(BaseClient):
                 images=images,
                 model=model,
                 max_tokens=max_tokens,
-                temperature=temperature
+                temperature=temperature,
+                context=context
             )
             
             cached_result = await self.cache.get(cache_key)
@@ -135,7 +154,8 @@ class ClaudeClient(BaseClient):
             images=images,
             model=model or self.model,
             max_tokens=max_tokens or self.max_tokens,
-            temperature=temperature or self.temperature
+            temperature=temperature or self.temperature,
+            context=context
         )
         
         # API呼び出し
@@ -145,6 +165,16 @@ class ClaudeClient(BaseClient):
             json=request_data
         )
         
+        # トークン使用量（キャッシュ読み書きを含む）を記録
+        usage = result.get("usage") if isinstance(result, dict) else None
+        if usage:
+            self._record_usage(
+                input_tokens=usage.get("input_tokens", 0),
+                output_tokens=usage.get("output_tokens", 0),
+                cache_read_tokens=usage.get("cache_read_input_tokens", 0),
+                cache_creation_tokens=usage.get("cache_creation_input_tokens", 0)
+            )
+        
         # キャッシュに保存
         if use_cache:
             await self.cache.set(cache_key, result)
@@ -158,23 +188,46 @@ class ClaudeClient(BaseClient):
         images: Optional[List[bytes]] = None,
         model: str = None,
         max_tokens: int = None,
-        temperature: float = None
+        temperature: float = None,
+        context: Optional[str] = None,
+        cache_prefix: Optional[bool] = None
     ) -> Dict[str, Any]:
-        """リクエストデータを構築."""
+        """リクエストデータを構築.
+        
+        プロンプトキャッシュ有効時は、システムプロンプトとコンテキストを安定した
+        プレフィックスとして先頭に配置し、各ブロックにキャッシュマーカーを付与する。
+        """
+        if cache_prefix is None:
+            cache_prefix = self.prompt_caching_enabled
+            
         # メッセージの構築
         messages = []
+        system_blocks = None
         
         # システムプロンプトがある場合
         if system_prompt:
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
+            if cache_prefix:
+                system_blocks = [self._cacheable_text_block(system_prompt)]
+            else:
+                messages.append({
+                    "role": "system",
+                    "content": system_prompt
+                })
             
         # ユーザーメッセージの構築
         user_content = []
         
-        # テキストプロンプト
+        # 共有コンテキスト（プレフィックス）
+        if context:
+            if cache_prefix:
+                user_content.append(self._cacheable_text_block(context))
+            else:
+                user_content.append({
+                    "type": "text",
+                    "text": context
+                })
+        
+        # テキストプロンプト（可変サフィックス）
         user_content.append({
             "type": "text",
             "text": prompt
@@ -205,15 +258,28 @@ class ClaudeClient(BaseClient):
             "temperature": temperature,
             "messages": messages
         }
+        if system_blocks:
+            request_data["system"] = system_blocks
         
         return request_data
         
+    def _cacheable_text_block(self, text: str) -> Dict[str, Any]:
+        """キャッシュマーカー付きのテキストブロックを作成."""
+        return {
+            "type": "text",
+            "text": text,
+            "cache_control": {"type": "ephemeral"}
+        }
+        
     async def generate_structured_content(
         self,
         prompt: str,
         content_type: str,
         system_prompt: Optional[str] = None,
-        use_cache: bool = True
+        use_cache: bool = True,
+        context: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None
     ) -> Dict[str, Any]:
         """構造化コンテンツの生成."""
         # コンテンツタイプ別のシステムプロンプト
@@ -256,7 +322,10 @@ class ClaudeClient(BaseClient):
         return await self.generate_text(
             prompt=prompt,
             system_prompt=full_system_prompt,
-            use_cache=use_cache
+            model=model,
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            context=context
         )
         
     async def batch_generate(
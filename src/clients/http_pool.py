@@ -0,0 +1,183 @@
+"""共有HTTPコネクションプール.
+
+プロセス全体でベースURL（オリジン）毎に httpx.AsyncClient を共有し、
+コネクション・TLSハンドシェイクを再利用する。
+"""
+
+import asyncio
+import importlib.util
+from typing import Any, Dict, Iterable
+from urllib.parse import urlparse
+
+import httpx
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# HTTP/2 には h2 パッケージ（httpx[http2]）が必要
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _origin(base_url: str) -> str:
+    """ベースURLからオリジン（scheme://host:port）を取得."""
+    parsed = urlparse(base_url)
+    if not parsed.scheme or not parsed.netloc:
+        return base_url
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class _PoolEntry:
+    """オリジン毎の共有クライアントと利用状況."""
+    
+    def __init__(self, client: httpx.AsyncClient, http2: bool):
+        self.client = client
+        self.http2 = http2
+        self.ref_count = 0
+        self.requests = 0
+
+
+class HTTPClientRegistry:
+    """プロセス全体の httpx.AsyncClient レジストリ."""
+    
+    _entries: Dict[str, _PoolEntry] = {}
+    
+    # デフォルトのプール設定（config.api.http_* で上書き）
+    DEFAULT_MAX_CONNECTIONS = 100
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+    DEFAULT_KEEPALIVE_EXPIRY = 30.0
+    
+    @classmethod
+    def acquire(cls, base_url: str, timeout: float = 30.0, config=None) -> httpx.AsyncClient:
+        """ベースURL用の共有クライアントを取得（参照カウントを加算）."""
+        key = _origin(base_url)
+        entry = cls._entries.get(key)
+        if entry is None or entry.client.is_closed:
+            client, http2 = cls._create_client(timeout, config, cls._count_request(key))
+            entry = _PoolEntry(client, http2)
+            cls._entries[key] = entry
+            logger.debug(f"Created pooled HTTP client for {key}")
+        entry.ref_count += 1
+        return entry.client
+    
+    @classmethod
+    async def release(cls, client: httpx.AsyncClient) -> None:
+        """共有クライアントの参照を解放（参照がなくなったら閉じる）."""
+        for key, entry in list(cls._entries.items()):
+            if entry.client is client:
+                entry.ref_count -= 1
+                if entry.ref_count <= 0:
+                    del cls._entries[key]
+                    await client.aclose()
+                return
+        # レジストリ外のクライアント
+        await client.aclose()
+    
+    @classmethod
+    def _create_client(cls, timeout: float, config=None, request_hook=None) -> tuple[httpx.AsyncClient, bool]:
+        """チューニング済みのクライアントを作成."""
+        api = getattr(config, 'api', None)
+        
+        def setting(name: str, default: Any) -> Any:
+            value = getattr(api, name, None)
+            return default if value is None else value
+        
+        http2 = setting('http2_enabled', True) is True and HTTP2_AVAILABLE
+        limits = httpx.Limits(
+            max_connections=setting('http_max_connections', cls.DEFAULT_MAX_CONNECTIONS),
+            max_keepalive_connections=setting(
+                'http_max_keepalive_connections', cls.DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            keepalive_expiry=setting('http_keepalive_expiry', cls.DEFAULT_KEEPALIVE_EXPIRY)
+        )
+        client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+            event_hooks={"request": [request_hook]} if request_hook else None
+        )
+        return client, http2
+    
+    @classmethod
+    def _count_request(cls, key: str):
+        """リクエスト数を数えるイベントフック."""
+        async def hook(request: httpx.Request) -> None:
+            entry = cls._entries.get(key)
+            if entry:
+                entry.requests += 1
+        return hook
+    
+    @classmethod
+    async def warm_up(cls, base_urls: Iterable[str], timeout: float = 5.0, config=None) -> Dict[str, bool]:
+        """コネクションを事前に確立（TLSハンドシェイクをワークフロー開始前に済ませる）.
+        
+        Returns:
+            オリジン毎の成否
+        """
+        async def warm(url: str) -> bool:
+            client = cls.acquire(url, config=config)
+            try:
+                # ステータスは問わない（接続確立が目的）
+                await client.head(_origin(url), timeout=timeout)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"HTTP warm-up failed for {url}: {e}")
+                return False
+            finally:
+                # warm-up 用の参照は保持しない（コネクションはプールに残る）
+                entry = cls._entries.get(_origin(url))
+                if entry:
+                    entry.ref_count = max(0, entry.ref_count - 1)
+        
+        urls = list(dict.fromkeys(_origin(url) for url in base_urls if url))
+        results = await asyncio.gather(*(warm(url) for url in urls))
+        return dict(zip(urls, results))
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """プール利用状況を取得."""
+        stats = {}
+        for key, entry in cls._entries.items():
+            connections = cls._pool_connections(entry.client)
+            idle = sum(1 for conn in connections if cls._is_idle(conn))
+            stats[key] = {
+                "ref_count": entry.ref_count,
+                "requests": entry.requests,
+                "connections": len(connections),
+                "idle_connections": idle,
+                "active_connections": len(connections) - idle,
+                "http2": entry.http2,
+            }
+        return stats
+    
+    @classmethod
+    def publish_metrics(cls, metrics) -> None:
+        """プール利用状況をメトリクスとして公開."""
+        if not metrics:
+            return
+        for key, stats in cls.get_stats().items():
+            labels = {"origin": key}
+            metrics.set_gauge("http.pool.connections", stats["connections"], labels)
+            metrics.set_gauge("http.pool.active_connections", stats["active_connections"], labels)
+            metrics.set_gauge("http.pool.idle_connections", stats["idle_connections"], labels)
+            metrics.set_gauge("http.pool.requests", stats["requests"], labels)
+    
+    @staticmethod
+    def _pool_connections(client: httpx.AsyncClient) -> list:
+        """httpcore のコネクションプールからコネクション一覧を取得."""
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        return list(getattr(pool, "connections", []) or [])
+    
+    @staticmethod
+    def _is_idle(connection) -> bool:
+        """コネクションがアイドルか."""
+        is_idle = getattr(connection, "is_idle", None)
+        return bool(is_idle()) if callable(is_idle) else False
+    
+    @classmethod
+    async def close_all(cls) -> None:
+        """全ての共有クライアントを閉じる."""
+        entries = list(cls._entries.values())
+        cls._entries.clear()
+        for entry in entries:
+            await entry.client.aclose()
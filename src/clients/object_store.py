@@ -0,0 +1,400 @@
+"""オブジェクトストレージのバックエンド
+
+メディア・レポートなどの出力は ObjectStore を通して書き込む。バックエンドは
+StorageConfig.backend で選択する（S3 / ローカルディスク / メモリ）。
+ローカルディスクはネットワークを使わないため、オンプレミスや CI でも
+メディアパイプライン全体をそのまま実行・計測できる。
+"""
+
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import socket
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .s3 import ObjectNotFoundError, S3Client, S3Error
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ObjectStore(ABC):
+    """オブジェクトストレージの基底クラス
+    
+    head は {'etag', 'size', 'content_type', 'metadata'} の辞書を返す（存在しない場合は None）。
+    """
+    
+    backend = "abstract"
+    
+    def __init__(self):
+        self.stats = {"puts": 0, "gets": 0, "deletes": 0, "bytes_written": 0}
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+    
+    @abstractmethod
+    async def put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
+        """データを書き込み、オブジェクトの URL を返す"""
+    
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """データを取得
+        
+        Raises:
+            ObjectNotFoundError: オブジェクトが存在しない場合
+        """
+    
+    @abstractmethod
+    async def head(self, key: str) -> Optional[Dict]:
+        """ETag・サイズ・メタデータを取得（存在しない場合は None）"""
+    
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """オブジェクトを削除"""
+    
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """オブジェクトの URL"""
+    
+    async def put_text(self, key: str, text: str, content_type: Optional[str] = None) -> str:
+        """テキストを UTF-8 で書き込み"""
+        return await self.put(key, text.encode('utf-8'), content_type or self._guess_type(key, 'text/plain'))
+    
+    async def exists(self, key: str) -> bool:
+        """オブジェクトの存在確認"""
+        return await self.head(key) is not None
+    
+    async def close(self) -> None:
+        """接続などを解放"""
+    
+    @staticmethod
+    def _guess_type(key: str, default: str = 'application/octet-stream') -> str:
+        """キーの拡張子からコンテンツタイプを推定"""
+        return mimetypes.guess_type(key)[0] or default
+    
+    def _record_put(self, size: int) -> None:
+        """書き込みの統計を記録"""
+        self.stats["puts"] += 1
+        self.stats["bytes_written"] += size
+    
+    def get_stats(self) -> Dict:
+        """統計情報を取得"""
+        stats = self.stats.copy()
+        stats["backend"] = self.backend
+        return stats
+
+
+class S3ObjectStore(ObjectStore):
+    """S3（および MinIO など S3 互換ストレージ）のオブジェクトストレージ"""
+    
+    backend = "s3"
+    
+    def __init__(self, client: S3Client):
+        super().__init__()
+        self.client = client
+        self._entered = False
+        self._lock = asyncio.Lock()
+    
+    async def _client(self) -> S3Client:
+        """接続済みのクライアントを取得"""
+        async with self._lock:
+            if not self._entered:
+                await self.client.__aenter__()
+                self._entered = True
+        return self.client
+    
+    async def put(self, key, data, content_type=None, metadata=None) -> str:
+        client = await self._client()
+        url = await client.upload_bytes(
+            data, key, content_type=content_type or self._guess_type(key), metadata=metadata
+        )
+        self._record_put(len(data))
+        return url
+    
+    async def get(self, key: str) -> bytes:
+        data = await (await self._client()).download_bytes(key)
+        self.stats["gets"] += 1
+        return data
+    
+    async def head(self, key: str) -> Optional[Dict]:
+        return await (await self._client()).head_object(key)
+    
+    async def delete(self, key: str) -> bool:
+        deleted = await (await self._client()).delete_object(key)
+        self.stats["deletes"] += 1
+        return deleted
+    
+    def url(self, key: str) -> str:
+        return self.client.object_url(key)
+    
+    async def close(self) -> None:
+        if self._entered:
+            self._entered = False
+            await self.client.__aexit__(None, None, None)
+
+
+class LocalObjectStore(ObjectStore):
+    """ローカルディスクのオブジェクトストレージ
+    
+    - 書き込みは一時ファイルからのリネームで原子的に行う
+    - 同じ内容は {root}/.objects/ の実体へのハードリンクにして重複を保存しない
+      （ハードリンクできないファイルシステムではコピーする）。どのキーからも
+      参照されなくなった実体は上書き・削除時に消す
+    - 独自のメタデータ・コンテンツタイプは {root}/.meta/ に保存する（ないオブジェクトは実体から HEAD を作る）
+    - sendfile で読み込みをユーザー空間に通さずにソケットへ送信できる
+    """
+    
+    backend = "local"
+    
+    OBJECTS_DIR = ".objects"
+    META_DIR = ".meta"
+    
+    def __init__(self, root_dir: str, hardlink_dedup: bool = False, base_url: Optional[str] = None):
+        """初期化
+        
+        Args:
+            root_dir: 保存先ディレクトリ（キーはこのディレクトリからの相対パス）
+            hardlink_dedup: 同じ内容をハードリンクで共有するか
+            base_url: オブジェクト URL の接頭辞（未指定時は file:// URL）
+        """
+        super().__init__()
+        self.root_dir = Path(root_dir).resolve()
+        self.hardlink_dedup = hardlink_dedup
+        self.base_url = base_url
+        self.stats.update({"deduplicated": 0, "bytes_deduplicated": 0})
+    
+    def path(self, key: str) -> Path:
+        """オブジェクトのパス（保存先の外や内部ディレクトリを指すキーは拒否）"""
+        path = (self.root_dir / key).resolve()
+        if self.root_dir not in path.parents:
+            raise S3Error(f"不正なオブジェクトキーです: {key}")
+        if path.relative_to(self.root_dir).parts[0] in (self.OBJECTS_DIR, self.META_DIR):
+            raise S3Error(f"予約されたオブジェクトキーです: {key}")
+        return path
+    
+    def _meta_path(self, key: str) -> Path:
+        return self.root_dir / self.META_DIR / (self.path(key).relative_to(self.root_dir).as_posix() + ".json")
+    
+    def _blob_path(self, digest: str) -> Path:
+        return self.root_dir / self.OBJECTS_DIR / digest[:2] / digest
+    
+    def url(self, key: str) -> str:
+        if self.base_url:
+            return f"{self.base_url.rstrip('/')}/{key}"
+        return self.path(key).as_uri()
+    
+    async def put(self, key, data, content_type=None, metadata=None) -> str:
+        path = self.path(key)
+        head = {
+            'etag': hashlib.md5(data).hexdigest(),
+            'size': len(data),
+            'content_type': content_type or self._guess_type(key),
+            'metadata': metadata or {}
+        }
+        deduplicated = await asyncio.to_thread(self._write, path, data, head, self._meta_path(key))
+        self._record_put(len(data))
+        if deduplicated:
+            self.stats["deduplicated"] += 1
+            self.stats["bytes_deduplicated"] += len(data)
+        return self.url(key)
+    
+    def _write(self, path: Path, data: bytes, head: Dict, meta_path: Path) -> bool:
+        """データとメタデータを書き込み（既存の実体を共有した場合は True）"""
+        deduplicated = False
+        if self.hardlink_dedup:
+            blob = self._blob_path(hashlib.sha256(data).hexdigest())
+            deduplicated = blob.exists()
+            if not deduplicated:
+                self._write_atomic(blob, data)
+            if not (deduplicated and path.exists() and os.path.samefile(blob, path)):
+                self._release_blob(path)
+            if not self._link_atomic(blob, path):
+                self._write_atomic(path, data)
+        else:
+            self._write_atomic(path, data)
+        if head['metadata'] or head['content_type'] != self._guess_type(str(path)):
+            self._write_atomic(meta_path, json.dumps(head, ensure_ascii=False).encode('utf-8'))
+        else:
+            self._unlink(meta_path)
+        return deduplicated
+    
+    def _release_blob(self, path: Path) -> None:
+        """path だけが参照している .objects の実体を削除（上書き・削除の前に呼ぶ）"""
+        try:
+            if path.stat().st_nlink != 2:
+                return
+            blob = self._blob_path(hashlib.sha256(path.read_bytes()).hexdigest())
+            if blob.exists() and os.path.samefile(blob, path):
+                blob.unlink()
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """同じディレクトリの一時ファイルに書いてからリネーム"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    @staticmethod
+    def _link_atomic(source: Path, path: Path) -> bool:
+        """一時名でハードリンクを作ってからリネーム（ハードリンクできない場合は False）"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".tmp-{uuid.uuid4().hex}-{path.name}")
+        try:
+            os.link(source, temp_path)
+            os.replace(temp_path, path)
+            return True
+        except OSError:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            return False
+    
+    async def get(self, key: str) -> bytes:
+        try:
+            data = await asyncio.to_thread(self.path(key).read_bytes)
+        except FileNotFoundError:
+            raise ObjectNotFoundError(f"オブジェクトが見つかりません: {key}")
+        self.stats["gets"] += 1
+        return data
+    
+    async def head(self, key: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self._read_head, key)
+    
+    def _read_head(self, key: str) -> Optional[Dict]:
+        """メタデータを読み込み（ない場合は実体から作る）"""
+        try:
+            return json.loads(self._meta_path(key).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            pass
+        # 独自のメタデータがない、または ObjectStore を通さずに置かれたファイル
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+        return {
+            'etag': hashlib.md5(data).hexdigest(),
+            'size': len(data),
+            'content_type': self._guess_type(key),
+            'metadata': {}
+        }
+    
+    async def delete(self, key: str) -> bool:
+        await asyncio.to_thread(self._delete, key)
+        self.stats["deletes"] += 1
+        return True
+    
+    def _delete(self, key: str) -> None:
+        """オブジェクトとメタデータを削除（他のキーと共有していない実体も消す）"""
+        path = self.path(key)
+        if self.hardlink_dedup:
+            self._release_blob(path)
+        self._unlink(path)
+        self._unlink(self._meta_path(key))
+    
+    async def sendfile(self, key: str, sock: socket.socket, offset: int = 0, count: Optional[int] = None) -> int:
+        """オブジェクトをソケットに送信（利用可能なら os.sendfile でカーネル内コピー）
+        
+        Returns:
+            送信したバイト数
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            with open(self.path(key), 'rb') as f:
+                return await loop.sock_sendfile(sock, f, offset, count)
+        except FileNotFoundError:
+            raise ObjectNotFoundError(f"オブジェクトが見つかりません: {key}")
+
+
+class MemoryObjectStore(ObjectStore):
+    """メモリ上のオブジェクトストレージ（テスト・計測用）"""
+    
+    backend = "memory"
+    
+    def __init__(self):
+        super().__init__()
+        self.objects: Dict[str, Tuple[bytes, Dict]] = {}
+    
+    async def put(self, key, data, content_type=None, metadata=None) -> str:
+        self.objects[key] = (bytes(data), {
+            'etag': hashlib.md5(data).hexdigest(),
+            'size': len(data),
+            'content_type': content_type or self._guess_type(key),
+            'metadata': dict(metadata or {})
+        })
+        self._record_put(len(data))
+        return self.url(key)
+    
+    async def get(self, key: str) -> bytes:
+        if key not in self.objects:
+            raise ObjectNotFoundError(f"オブジェクトが見つかりません: {key}")
+        self.stats["gets"] += 1
+        return self.objects[key][0]
+    
+    async def head(self, key: str) -> Optional[Dict]:
+        entry = self.objects.get(key)
+        return dict(entry[1]) if entry else None
+    
+    async def delete(self, key: str) -> bool:
+        self.stats["deletes"] += 1
+        return self.objects.pop(key, None) is not None
+    
+    def url(self, key: str) -> str:
+        return f"memory://{key}"
+
+
+def create_object_store(config) -> ObjectStore:
+    """StorageConfig.backend に応じたオブジェクトストレージを作成
+    
+    auto はバケットが設定されていれば S3、なければローカルディスク。
+    """
+    storage = config.storage
+    backend = storage.backend.lower() if isinstance(storage.backend, str) else "auto"
+    if backend == "auto":
+        backend = "s3" if isinstance(storage.s3_bucket, str) and storage.s3_bucket else "local"
+    
+    if backend == "s3":
+        return S3ObjectStore(S3Client.from_config(config))
+    if backend == "local":
+        root_dir = storage.local_store_dir if isinstance(storage.local_store_dir, str) else None
+        return LocalObjectStore(
+            root_dir or storage.output_dir,
+            hardlink_dedup=storage.local_store_hardlink_dedup is True
+        )
+    if backend == "memory":
+        return MemoryObjectStore()
+    raise ValueError(f"Unknown storage backend: {storage.backend}")
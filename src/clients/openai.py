@@ -20,7 +20,7 @@ class OpenAIClient(BaseClient):
     """OpenAI API クライアント."""
     
     def __init__(self, config: Config):
-        super().__init__(config, "openai")
+        super().__init__(config, "openai", base_url=config.openai.base_url)
         
         if not config.openai.api_key:
             raise ValueError("OpenAI API key is required")
@@ -42,6 +42,13 @@ class OpenAIClient(BaseClient):
         # OpenAIのレート制限は設定で指定されていない場合のデフォルト値
         return getattr(self.config.openai, 'rate_limit', 60)
         
+    def _get_token_rate_limit(self) -> Optional[int]:
+        """OpenAI API のトークンレート制限（TPM）を取得."""
+        return (
+            getattr(self.config.openai, 'tokens_per_minute', None)
+            or self._api_setting('openai_tokens_per_minute', None)
+        )
+        
     def _get_headers(self) -> Dict[str, str]:
         """リクエストヘッダーを取得."""
         return {
@@ -93,6 +100,7 @@ class OpenAIClient(BaseClient):
             "max_tokens": kwargs.get("max_tokens", self.max_tokens),
             "temperature": kwargs.get("temperature", self.temperature),
             "system_prompt": kwargs.get("system_prompt"),
+            "context": kwargs.get("context"),
         }
         
         # 画像データがある場合はハッシュ化
@@ -113,9 +121,15 @@ class OpenAIClient(BaseClient):
         model: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
-        use_cache: bool = True
+        use_cache: bool = True,
+        context: Optional[str] = None
     ) -> Dict[str, Any]:
-        """テキスト生成."""
+        """テキスト生成.
+        
+        context には章・セクションのコンテキストなど、複数リクエストで共通の
+        テキストを渡す。OpenAI は先頭一致でプレフィックスを自動キャッシュするため、
+        可変部分より前に配置する。
+        """
         # キャッシュチェック
         if use_cache:
             cache_key = self._generate_cache_key(
@@ -124,7 +138,8 @@ class OpenAIClient(BaseClient):
                 images=images,
                 model=model,
                 max_tokens=max_tokens,
-                temperature=temperature
+                temperature=temperature,
+                context=context
             )
             
             cached_result = await self.cache.get(cache_key)
@@ -139,7 +154,8 @@ class OpenAIClient(BaseClient):
             images=images,
             model=model or self.model,
             max_tokens=max_tokens or self.max_tokens,
-            temperature=temperature or self.temperature
+            temperature=temperature or self.temperature,
+            context=context
         )
         
         # API呼び出し
@@ -149,6 +165,16 @@ class OpenAIClient(BaseClient):
             json=request_data
         )
         
+        # トークン使用量を記録（prompt_tokens はキャッシュ済みトークンを含む）
+        usage = result.get("usage") if isinstance(result, dict) else None
+        if usage:
+            cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+            self._record_usage(
+                input_tokens=usage.get("prompt_tokens", 0) - cached_tokens,
+                output_tokens=usage.get("completion_tokens", 0),
+                cache_read_tokens=cached_tokens
+            )
+        
         # キャッシュに保存
         if use_cache:
             await self.cache.set(cache_key, result)
@@ -162,9 +188,18 @@ class OpenAIClient(BaseClient):
         images: Optional[List[bytes]] = None,
         model: str = None,
         max_tokens: int = None,
-        temperature: float = None
+        temperature: float = None,
+        context: Optional[str] = None
     ) -> Dict[str, Any]:
-        """リクエストデータを構築."""
+        """リクエストデータを構築.
+        
+        システムプロンプト → コンテキスト → プロンプトの順に並べ、
+        共通部分がリクエスト間で同一のプレフィックスになるようにする。
+        """
+        # 共有コンテキストを可変部分の前に配置
+        if context:
+            prompt = f"{context}\n\n{prompt}"
+            
         # メッセージの構築
         messages = []
         
@@ -221,7 +256,10 @@ class OpenAIClient(BaseClient):
         prompt: str,
         content_type: str,
         system_prompt: Optional[str] = None,
-        use_cache: bool = True
+        use_cache: bool = True,
+        context: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None
     ) -> Dict[str, Any]:
         """構造化コンテンツの生成."""
         # コンテンツタイプ別のシステムプロンプト
@@ -264,7 +302,10 @@ class OpenAIClient(BaseClient):
         return await self.generate_text(
             prompt=prompt,
             system_prompt=full_system_prompt,
-            use_cache=use_cache
+            model=model,
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            context=context
         )
         
     async def batch_generate(
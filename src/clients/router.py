@@ -0,0 +1,268 @@
+"""プロバイダールーター.
+
+Claude / OpenAI クライアントを束ね、ヘッジリクエストとフェイルオーバーを行う。
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from ..config.settings import Config
+from ..utils.logger import get_logger
+from .base import BaseClient, ClientError
+
+logger = get_logger(__name__)
+
+
+class HedgeBudget:
+    """ワークフロー単位のヘッジ予算.
+    
+    ヘッジ（重複送信）数をリクエスト数の一定割合までに抑え、追加コストに上限を設ける。
+    使用状況は直近 max_workflows 件のワークフロー分だけ保持する（LRU）。
+    """
+    
+    def __init__(self, ratio: float = 0.1, min_hedges: int = 1, max_workflows: int = 1024):
+        self.ratio = ratio
+        self.min_hedges = min_hedges
+        self.max_workflows = max_workflows
+        self._usage: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+    
+    def _get(self, workflow_id: str) -> Dict[str, int]:
+        """ワークフローの使用状況を取得（最近使用したものとして扱う）."""
+        usage = self._usage.get(workflow_id)
+        if usage is None:
+            usage = self._usage[workflow_id] = {"requests": 0, "hedges": 0}
+            while len(self._usage) > self.max_workflows:
+                self._usage.popitem(last=False)
+        else:
+            self._usage.move_to_end(workflow_id)
+        return usage
+    
+    def record_request(self, workflow_id: str) -> None:
+        """リクエストを記録."""
+        self._get(workflow_id)["requests"] += 1
+    
+    def try_spend(self, workflow_id: str) -> bool:
+        """ヘッジ1回分の予算を消費（予算超過時は False）."""
+        usage = self._get(workflow_id)
+        allowed = max(self.min_hedges, int(usage["requests"] * self.ratio))
+        if usage["hedges"] >= allowed:
+            return False
+        usage["hedges"] += 1
+        return True
+    
+    def get_usage(self, workflow_id: str) -> Dict[str, int]:
+        """使用状況を取得."""
+        return dict(self._usage.get(workflow_id, {"requests": 0, "hedges": 0}))
+    
+    def reset(self, workflow_id: Optional[str] = None) -> None:
+        """予算をリセット."""
+        if workflow_id is None:
+            self._usage.clear()
+        else:
+            self._usage.pop(workflow_id, None)
+
+
+class ProviderRouter:
+    """ヘッジリクエスト・フェイルオーバー付きのプロバイダールーター.
+    
+    優先プロバイダーの応答がレイテンシのパーセンタイル閾値を超えた場合、
+    代替プロバイダーに同じリクエストを送り、先に返った方を採用して他方をキャンセルする。
+    優先プロバイダーが利用不可（サーキットオープン等）またはエラーの場合は
+    代替プロバイダーへフェイルオーバーする。
+    """
+    
+    def __init__(
+        self,
+        clients: Dict[str, BaseClient],
+        config: Optional[Config] = None,
+        order: Optional[List[str]] = None,
+        hedge_enabled: bool = True,
+        hedge_percentile: float = 0.95,
+        hedge_min_delay: float = 2.0,
+        hedge_budget_ratio: float = 0.1,
+        min_samples: int = 20,
+        window_size: int = 200
+    ):
+        """初期化.
+        
+        Args:
+            clients: プロバイダー名 → クライアント
+            config: 設定（指定時は api.hedge_* を優先）
+            order: プロバイダーの優先順（デフォルトは clients の順）
+            hedge_enabled: ヘッジリクエストを有効にするか
+            hedge_percentile: ヘッジを送るレイテンシのパーセンタイル
+            hedge_min_delay: 統計が揃うまでのヘッジ送信までの待機秒数（下限）
+            hedge_budget_ratio: ワークフロー内でヘッジを許容するリクエストの割合
+            min_samples: パーセンタイルを使い始めるサンプル数
+            window_size: レイテンシ履歴の保持数
+        """
+        if not clients:
+            raise ValueError("At least one client is required")
+        
+        api = getattr(config, 'api', None)
+        self.clients = clients
+        self.order = order or list(clients.keys())
+        self.hedge_enabled = getattr(api, 'hedge_enabled', hedge_enabled)
+        self.hedge_percentile = getattr(api, 'hedge_percentile', hedge_percentile)
+        self.hedge_min_delay = getattr(api, 'hedge_min_delay', hedge_min_delay)
+        self.min_samples = min_samples
+        self.budget = HedgeBudget(getattr(api, 'hedge_budget_ratio', hedge_budget_ratio))
+        
+        self._latencies: Dict[str, Deque[float]] = {
+            name: deque(maxlen=window_size) for name in clients
+        }
+        self.stats = {
+            "requests": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "failovers": 0,
+            "budget_exhausted": 0,
+        }
+    
+    def _is_available(self, name: str) -> bool:
+        """プロバイダーが利用可能か."""
+        client = self.clients[name]
+        is_available = getattr(client, 'is_available', None)
+        return is_available() if callable(is_available) else True
+    
+    def _candidates(self) -> List[str]:
+        """利用可能なプロバイダーを優先順に返す."""
+        available = [name for name in self.order if self._is_available(name)]
+        if not available:
+            # 全て利用不可の場合は優先順で試行する
+            logger.warning("No provider available, trying all providers in order")
+            return list(self.order)
+        return available
+    
+    def hedge_delay(self, name: str) -> float:
+        """ヘッジ送信までの待機秒数（レイテンシのパーセンタイル）."""
+        samples = self._latencies[name]
+        if len(samples) < self.min_samples:
+            return self.hedge_min_delay
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile))
+        return ordered[index]
+    
+    async def generate_text(
+        self,
+        prompt: str,
+        workflow_id: str = "default",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """テキスト生成（ヘッジ・フェイルオーバー付き）.
+        
+        モデルはプロバイダー固有のため models（プロバイダー名 → モデル名）で指定する。
+        models なしで model を渡した場合は最優先のプロバイダーにのみ適用する。
+        未指定のプロバイダーはクライアントのデフォルトモデルを使用する。
+        max_tokens などその他の引数は全プロバイダーにそのまま渡す。
+        
+        Returns:
+            生成結果（"provider" に採用したプロバイダー名を付与）
+        """
+        self._resolve_models(kwargs)
+        return await self._call("generate_text", prompt, workflow_id, **kwargs)
+    
+    async def generate_structured_content(
+        self,
+        prompt: str,
+        workflow_id: str = "default",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """構造化コンテンツ生成（ヘッジ・フェイルオーバー付き）."""
+        self._resolve_models(kwargs)
+        return await self._call("generate_structured_content", prompt, workflow_id, **kwargs)
+    
+    def _resolve_models(self, kwargs: Dict[str, Any]) -> None:
+        """model 指定をプロバイダー毎の models に変換."""
+        model = kwargs.pop("model", None)
+        if model and not kwargs.get("models"):
+            kwargs["models"] = {self.order[0]: model}
+    
+    async def _call(self, method: str, prompt: str, workflow_id: str, **kwargs) -> Dict[str, Any]:
+        """プロバイダーを呼び出し、最初に成功した結果を返す."""
+        self.stats["requests"] += 1
+        self.budget.record_request(workflow_id)
+        
+        candidates = self._candidates()
+        pending: Dict[asyncio.Task, str] = {}
+        next_index = 0
+        hedge_allowed = self.hedge_enabled
+        hedged = False
+        last_error: Optional[BaseException] = None
+        
+        def launch() -> None:
+            nonlocal next_index
+            name = candidates[next_index]
+            next_index += 1
+            task = asyncio.create_task(self._timed_call(name, method, prompt, **kwargs))
+            pending[task] = name
+        
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if hedge_allowed and len(pending) == 1 and next_index < len(candidates):
+                    timeout = self.hedge_delay(next(iter(pending.values())))
+                
+                done, _ = await asyncio.wait(
+                    pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    # 閾値超過: 予算内なら代替プロバイダーへヘッジ
+                    if self.budget.try_spend(workflow_id):
+                        self.stats["hedges"] += 1
+                        hedged = True
+                        logger.info(
+                            f"Hedging {method} to {candidates[next_index]} "
+                            f"after {timeout:.2f}s"
+                        )
+                        launch()
+                    else:
+                        # 予算切れの場合はヘッジせずに待つ
+                        self.stats["budget_exhausted"] += 1
+                        hedge_allowed = False
+                    continue
+                
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        if hedged and name != candidates[0]:
+                            self.stats["hedge_wins"] += 1
+                        result = dict(task.result())
+                        result["provider"] = name
+                        return result
+                    
+                    last_error = task.exception()
+                    logger.warning(f"Provider {name} failed: {last_error}")
+                
+                if not pending and next_index < len(candidates):
+                    # フェイルオーバー
+                    self.stats["failovers"] += 1
+                    launch()
+        finally:
+            # 敗者をキャンセル
+            for task in pending:
+                task.cancel()
+        
+        if isinstance(last_error, ClientError):
+            raise last_error
+        raise ClientError(f"All providers failed: {last_error}")
+    
+    async def _timed_call(self, name: str, method: str, prompt: str, **kwargs) -> Dict[str, Any]:
+        """プロバイダー呼び出しとレイテンシ記録."""
+        start_time = time.time()
+        models = kwargs.pop("models", None) or {}
+        if models.get(name):
+            kwargs["model"] = models[name]
+        result = await getattr(self.clients[name], method)(prompt, **kwargs)
+        self._latencies[name].append(time.time() - start_time)
+        return result
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得."""
+        stats = self.stats.copy()
+        stats["hedge_delay"] = {name: self.hedge_delay(name) for name in self.clients}
+        return stats
@@ -8,13 +8,17 @@ from typing import Dict, List, Optional, Union, BinaryIO
 from urllib.parse import urlparse
 
 import aioboto3
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, NoCredentialsError
 
-from .base import BaseClient
+from ..config.settings import Config
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# HEAD で存在しない場合のエラーコード（GetObject は NoSuchKey、HeadObject は 404）
+_NOT_FOUND_CODES = {'NoSuchKey', '404', 'NotFound'}
+
 
 class S3Error(Exception):
     """S3操作エラー"""
@@ -31,8 +35,12 @@ class ObjectNotFoundError(S3Error):
     pass
 
 
-class S3Client(BaseClient):
-    """AWS S3クライアント"""
+class S3Client:
+    """AWS S3クライアント（endpoint_url を指定すると MinIO など S3 互換ストレージも利用可能）
+    
+    HTTP は aioboto3 が自前のコネクションプールと署名で行うため、BaseClient
+    （共有 HTTP クライアント・レート制限）は継承しない。
+    """
     
     def __init__(
         self,
@@ -40,31 +48,67 @@ class S3Client(BaseClient):
         aws_secret_access_key: str,
         region_name: str = "us-east-1",
         bucket_name: Optional[str] = None,
-        **kwargs
+        endpoint_url: Optional[str] = None,
+        max_pool_connections: int = 10,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunk_size: int = 8 * 1024 * 1024,
+        config: Optional[Config] = None
     ):
-        super().__init__(**kwargs)
+        self.config = config or Config()
+        self.stats = {}
         self.aws_access_key_id = aws_access_key_id
         self.aws_secret_access_key = aws_secret_access_key
         self.region_name = region_name
         self.bucket_name = bucket_name
+        self.endpoint_url = endpoint_url
+        self.max_pool_connections = max_pool_connections
+        self.multipart_threshold = multipart_threshold
+        # S3 のパートは最後以外 5MB 以上である必要がある
+        self.multipart_chunk_size = max(multipart_chunk_size, 5 * 1024 * 1024)
         self.session = None
         self.s3_client = None
         
+    @classmethod
+    def from_config(cls, config: Config) -> "S3Client":
+        """ストレージ設定からクライアントを作成"""
+        storage = config.storage
+        return cls(
+            aws_access_key_id=storage.aws_access_key_id,
+            aws_secret_access_key=storage.aws_secret_access_key,
+            region_name=storage.aws_region,
+            bucket_name=storage.s3_bucket,
+            endpoint_url=storage.s3_endpoint_url,
+            max_pool_connections=storage.upload_concurrency,
+            multipart_threshold=storage.multipart_threshold,
+            multipart_chunk_size=storage.multipart_chunk_size,
+            config=config
+        )
+        
     async def __aenter__(self):
-        await super().__aenter__()
         self.session = aioboto3.Session(
             aws_access_key_id=self.aws_access_key_id,
             aws_secret_access_key=self.aws_secret_access_key,
             region_name=self.region_name
         )
-        self.s3_client = self.session.client('s3')
+        # 同時アップロード数分のコネクションを保持して再利用する
+        self.s3_client = self.session.client(
+            's3',
+            endpoint_url=self.endpoint_url,
+            config=BotoConfig(max_pool_connections=self.max_pool_connections)
+        )
         await self.s3_client.__aenter__()
         return self
         
+    def object_url(self, key: str, bucket: Optional[str] = None) -> str:
+        """オブジェクトのURL"""
+        bucket = bucket or self.bucket_name
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{bucket}/{key}"
+        return f"https://{bucket}.s3.{self.region_name}.amazonaws.com/{key}"
+        
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.s3_client:
             await self.s3_client.__aexit__(exc_type, exc_val, exc_tb)
-        await super().__aexit__(exc_type, exc_val, exc_tb)
         
     async def upload_file(
         self,
@@ -119,7 +163,7 @@ class S3Client(BaseClient):
             )
             
             # URLの生成
-            url = f"https://{bucket}.s3.{self.region_name}.amazonaws.com/{key}"
+            url = self.object_url(key, bucket)
             
             logger.info(f"ファイルをアップロードしました: {file_path} -> {url}")
             self.stats['uploads'] = self.stats.get('uploads', 0) + 1
@@ -143,7 +187,7 @@ class S3Client(BaseClient):
         metadata: Optional[Dict[str, str]] = None,
         public_read: bool = False
     ) -> str:
-        """バイトデータをS3にアップロード"""
+        """バイトデータをS3にアップロード（multipart_threshold 以上はマルチパート）"""
         bucket = bucket or self.bucket_name
         if not bucket:
             raise S3Error("バケット名が指定されていません")
@@ -157,14 +201,17 @@ class S3Client(BaseClient):
             extra_args['ACL'] = 'public-read'
             
         try:
-            await self.s3_client.put_object(
-                Bucket=bucket,
-                Key=key,
-                Body=data,
-                **extra_args
-            )
+            if len(data) >= self.multipart_threshold:
+                await self._upload_multipart(data, key, bucket, extra_args)
+            else:
+                await self.s3_client.put_object(
+                    Bucket=bucket,
+                    Key=key,
+                    Body=data,
+                    **extra_args
+                )
             
-            url = f"https://{bucket}.s3.{self.region_name}.amazonaws.com/{key}"
+            url = self.object_url(key, bucket)
             
             logger.info(f"バイトデータをアップロードしました: {key} ({len(data)} bytes)")
             self.stats['uploads'] = self.stats.get('uploads', 0) + 1
@@ -177,6 +224,68 @@ class S3Client(BaseClient):
                 raise BucketNotFoundError(f"バケットが見つかりません: {bucket}")
             raise S3Error(f"アップロードに失敗しました: {e}")
             
+    async def _upload_multipart(self, data: bytes, key: str, bucket: str, extra_args: Dict) -> None:
+        """マルチパートアップロード（パートは同時に送信し、失敗時は中断する）"""
+        response = await self.s3_client.create_multipart_upload(Bucket=bucket, Key=key, **extra_args)
+        upload_id = response['UploadId']
+        view = memoryview(data)
+        semaphore = asyncio.Semaphore(self.max_pool_connections)
+        
+        async def upload_part(part_number: int, offset: int) -> Dict:
+            async with semaphore:
+                part = await self.s3_client.upload_part(
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=bytes(view[offset:offset + self.multipart_chunk_size])
+                )
+                return {'PartNumber': part_number, 'ETag': part['ETag']}
+                
+        try:
+            parts = await asyncio.gather(*(
+                upload_part(number, offset)
+                for number, offset in enumerate(range(0, len(data), self.multipart_chunk_size), start=1)
+            ))
+            await self.s3_client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': list(parts)}
+            )
+        except BaseException:
+            await self.s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+            
+        self.stats['multipart_uploads'] = self.stats.get('multipart_uploads', 0) + 1
+        
+    async def head_object(
+        self,
+        key: str,
+        bucket: Optional[str] = None
+    ) -> Optional[Dict]:
+        """オブジェクトの ETag・サイズ・メタデータを取得（存在しない場合は None）"""
+        bucket = bucket or self.bucket_name
+        if not bucket:
+            raise S3Error("バケット名が指定されていません")
+            
+        try:
+            response = await self.s3_client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            if error_code in _NOT_FOUND_CODES:
+                return None
+            elif error_code == 'NoSuchBucket':
+                raise BucketNotFoundError(f"バケットが見つかりません: {bucket}")
+            raise S3Error(f"オブジェクト情報の取得に失敗しました: {e}")
+            
+        return {
+            'etag': response.get('ETag', '').strip('"'),
+            'size': response.get('ContentLength'),
+            'content_type': response.get('ContentType'),
+            'metadata': response.get('Metadata', {})
+        }
+        
     async def download_file(
         self,
         key: str,
@@ -303,7 +412,7 @@ class S3Client(BaseClient):
             return True
         except ClientError as e:
             error_code = e.response['Error']['Code']
-            if error_code == 'NoSuchKey':
+            if error_code in _NOT_FOUND_CODES:
                 return False
             elif error_code == 'NoSuchBucket':
                 raise BucketNotFoundError(f"バケットが見つかりません: {bucket}")
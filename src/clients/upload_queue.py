@@ -0,0 +1,98 @@
+"""コンテンツアドレス型のアップロードキュー
+
+オブジェクトキーを内容の SHA-256 から作るため、同じ画像は何度出現しても1回だけ
+アップロードされる。同時に投入された同じ内容は1つのアップロードを共有し、
+既にストレージにあるものは HEAD で ETag / ハッシュを確認して送信を省略する。
+同時アップロード数はセマフォで制限する。
+"""
+
+import asyncio
+import hashlib
+import mimetypes
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .object_store import ObjectStore
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class UploadQueue:
+    """重複排除と同時実行数制限付きのアップロードキュー"""
+    
+    def __init__(self, store: ObjectStore, concurrency: int = 8, prefix: str = "media"):
+        """初期化
+        
+        Args:
+            store: 書き込み先のオブジェクトストレージ
+            concurrency: 同時アップロード数の上限
+            prefix: オブジェクトキーの接頭辞
+        """
+        self.store = store
+        self.prefix = prefix.strip('/')
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._uploads: Dict[str, asyncio.Task] = {}  # キー → アップロード（同一内容で共有）
+        self.stats = {
+            "uploaded": 0,
+            "skipped_existing": 0,
+            "deduplicated": 0,
+            "failed": 0,
+            "bytes_uploaded": 0,
+            "bytes_skipped": 0,
+        }
+    
+    def object_key(self, digest: str, extension: str) -> str:
+        """内容のハッシュからオブジェクトキーを作成"""
+        name = f"{digest[:2]}/{digest}.{extension.lstrip('.')}"
+        return f"{self.prefix}/{name}" if self.prefix else name
+    
+    async def upload(self, data: bytes, extension: str = "png", content_type: Optional[str] = None) -> str:
+        """アップロードして URL を返す（同じ内容はアップロード済みの URL を返す）"""
+        digest = hashlib.sha256(data).hexdigest()
+        key = self.object_key(digest, extension)
+        
+        task = self._uploads.get(key)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            content_type = content_type or mimetypes.guess_type(key)[0] or 'application/octet-stream'
+            task = self._uploads[key] = asyncio.ensure_future(self._upload(key, data, digest, content_type))
+        else:
+            self.stats["deduplicated"] += 1
+        return await asyncio.shield(task)
+    
+    async def upload_many(self, items: Iterable[Tuple[bytes, str]]) -> List[str]:
+        """(データ, 拡張子) をまとめてアップロード"""
+        return list(await asyncio.gather(*(self.upload(data, extension) for data, extension in items)))
+    
+    async def _upload(self, key: str, data: bytes, digest: str, content_type: str) -> str:
+        """未アップロードの場合のみ送信"""
+        async with self.semaphore:
+            try:
+                head = await self.store.head(key)
+                if head is not None and self._matches(head, data, digest):
+                    self.stats["skipped_existing"] += 1
+                    self.stats["bytes_skipped"] += len(data)
+                    return self.store.url(key)
+                
+                url = await self.store.put(key, data, content_type=content_type, metadata={'sha256': digest})
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+        
+        self.stats["uploaded"] += 1
+        self.stats["bytes_uploaded"] += len(data)
+        return url
+    
+    @staticmethod
+    def _matches(head: Dict, data: bytes, digest: str) -> bool:
+        """既存オブジェクトが同じ内容か（マルチパートの ETag は MD5 でないためハッシュのメタデータで比較）"""
+        metadata = head.get('metadata') or {}
+        if metadata.get('sha256'):
+            return metadata['sha256'] == digest
+        etag = (head.get('etag') or '').strip('"')
+        return '-' not in etag and etag == hashlib.md5(data).hexdigest()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """統計情報を取得"""
+        stats = self.stats.copy()
+        stats["keys"] = len(self._uploads)
+        return stats
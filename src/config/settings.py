@@ -26,28 +26,97 @@ class APIConfig:
     claude_base_url: str = "https://api.anthropic.com/v1"
     claude_model: str = "claude-3-sonnet-20240229"
     claude_rate_limit: int = 60  # requests per minute
+    claude_tokens_per_minute: Optional[int] = None  # tokens per minute（未設定時はRPMのみ）
     
     openai_api_key: Optional[str] = None
     openai_base_url: str = "https://api.openai.com/v1"
     openai_model: str = "gpt-4"
+    openai_tokens_per_minute: Optional[int] = None
+    
+    # 複雑さ・フォーマットに応じたモデルルーティング（短文・単純な内容は小型モデル）
+    model_routing_enabled: bool = True
+    claude_small_model: str = "claude-3-haiku-20240307"
+    openai_small_model: str = "gpt-4o-mini"
     
     timeout: float = 30.0
     max_retries: int = 3
+    
+    # 隣接する小さなパラグラフを1リクエストにまとめる（パッキング）
+    packing_enabled: bool = True
+    packing_target_tokens: int = 600  # 1パックあたりの入力トークン上限
+    packing_small_paragraph_tokens: int = 150  # これ以下のパラグラフをパッキング対象とする
+    packing_max_paragraphs: int = 8
+    packing_max_wait: float = 5.0  # 揃わないパックを揃った分だけで生成するまでの秒数
+    
+    # ツイート・説明文を生成済みの記事から導出（個別の生成リクエストを省略）
+    derive_short_forms: bool = True
+    
+    # 近似重複パラグラフの生成結果の再利用（MinHash/LSH）
+    dedup_enabled: bool = True
+    dedup_threshold: float = 0.9  # 推定Jaccard類似度がこれ以上なら再利用
+    
+    # プロンプトキャッシュ（システムプロンプト・コンテキストを共有プレフィックスとして送信）
+    prompt_caching_enabled: bool = True
+    
+    # 適応的同時実行数制御（AIMD）
+    adaptive_concurrency_enabled: bool = True
+    concurrency_initial: int = 4
+    concurrency_min: int = 1
+    concurrency_max: int = 32
+    concurrency_latency_spike_factor: float = 2.0
+    
+    # プロバイダー間のヘッジリクエスト
+    hedge_enabled: bool = True
+    hedge_percentile: float = 0.95  # このパーセンタイルを超えたら代替プロバイダーへ送信
+    hedge_min_delay: float = 2.0  # レイテンシ統計が揃うまでの待機秒数
+    hedge_budget_ratio: float = 0.1  # ワークフロー内でヘッジを許容するリクエストの割合
+    
+    # エンドポイント毎のサーキットブレーカー
+    circuit_failure_rate_threshold: float = 0.5
+    circuit_slow_call_rate_threshold: float = 0.8
+    circuit_slow_call_duration: float = 30.0  # この秒数以上かかった呼び出しをスローコールとみなす
+    circuit_window_size: int = 20
+    circuit_minimum_calls: int = 10
+    circuit_open_duration: float = 30.0
+    circuit_half_open_max_calls: int = 2
+
+    # 共有HTTPコネクションプール（オリジン毎に1クライアント）
+    http2_enabled: bool = True  # h2 パッケージがない場合は HTTP/1.1
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_warmup_enabled: bool = True  # 起動時にコネクションを事前確立
 
 
 @dataclass
 class StorageConfig:
     """ストレージ設定."""
+    # オブジェクトストレージのバックエンド（auto: バケット設定時は s3、それ以外は local / s3 / local / memory）
+    backend: str = "auto"
+    local_store_dir: Optional[str] = None  # local の保存先（未指定時は output_dir）
+    local_store_hardlink_dedup: bool = False  # 同じ内容を .objects の実体へのハードリンクで共有する
+    
     aws_access_key_id: Optional[str] = None
     aws_secret_access_key: Optional[str] = None
     aws_region: str = "us-east-1"
     s3_bucket: Optional[str] = None
+    s3_endpoint_url: Optional[str] = None  # MinIO など S3 互換ストレージのエンドポイント
+    
+    # メディアのアップロード
+    media_prefix: str = "media"  # オブジェクトキーは {media_prefix}/{sha256[:2]}/{sha256}.{拡張子}
+    upload_concurrency: int = 8
+    multipart_threshold: int = 8 * 1024 * 1024
+    multipart_chunk_size: int = 8 * 1024 * 1024
     
     # ローカルストレージ
     data_dir: str = "./data"
     output_dir: str = "./output"
     cache_dir: str = "./cache"
     log_dir: str = "./logs"
+    
+    # 入力ファイルの解析結果のキャッシュ（{cache_dir}/parsed、キーは入力ファイルの SHA-256）
+    parse_cache_enabled: bool = True
+    parse_cache_max_bytes: int = 1024 * 1024 * 1024
 
 
 @dataclass
@@ -57,6 +126,49 @@ class RedisConfig:
     state_ttl: int = 86400  # 24時間
     checkpoint_ttl: int = 604800  # 7日間
     task_ttl: int = 604800  # 7日間
+    
+    # ワーカープロセス間で共有するレート制限
+    rate_limit_enabled: bool = False
+    rate_limit_lease_size: int = 5  # 1回のRedis呼び出しで前借りするリクエスト数
+    rate_limit_lease_ttl: float = 1.0  # 前借り分の有効期間（秒）
+    rate_limit_fallback_share: float = 1.0  # Redis停止時にローカルで使うクォータの割合
+
+
+@dataclass
+class ImageConfig:
+    """画像変換設定."""
+    width: int = 1200
+    height: int = 800
+    format: str = "png"
+    conversion_timeout: float = 30.0
+    mermaid_cli_path: str = "mmdc"
+    drawio_path: Optional[str] = None
+    
+    # 常駐ヘッドレスブラウザによる Mermaid / draw.io のレンダリング
+    render_pool_enabled: bool = True
+    render_pool_node_path: str = "node"
+    render_pool_pages: int = 4  # 図表の種類毎に保持するページ数
+    render_pool_max_renders_per_page: int = 100  # この回数レンダリングしたらページを作り直す
+    render_pool_render_timeout: float = 15.0  # 1図表あたりのレンダリング時間の上限（秒）
+    
+    # 変換結果のコンテンツアドレス型キャッシュ（storage.cache_dir/renders に保存）
+    render_cache_enabled: bool = True
+    render_cache_max_bytes: int = 512 * 1024 * 1024
+    
+    # SVG のラスタライズ・画像エンコードを実行するプロセスプール
+    process_pool_enabled: bool = True
+    process_pool_workers: int = 0  # 0 は CPU コア数
+    
+    # 変換後の画像の最適化（PNG の再圧縮・減色、追加形式、レスポンシブ幅）
+    optimize_enabled: bool = True
+    optimize_png_quantize: bool = False  # パレットに減色する（非可逆のため既定は無効）
+    optimize_png_colors: int = 256
+    optimize_formats: List[str] = field(default_factory=list)  # 追加で出力する形式（"webp", "avif"）
+    optimize_quality: int = 80  # WebP / AVIF の品質
+    responsive_widths: List[int] = field(default_factory=list)  # 追加で出力する幅（例: [400, 800]）
+    
+    # サムネイルのテンプレート（解像度・セーフゾーン・文字スタイル・背景）
+    thumbnail_template_path: str = "templates/thumbnail_template.yaml"
 
 
 @dataclass
@@ -78,6 +190,9 @@ class Config:
     # Redis設定
     redis: RedisConfig = field(default_factory=RedisConfig)
     
+    # 画像変換設定
+    image: ImageConfig = field(default_factory=ImageConfig)
+    
     # メトリクス設定
     metrics_enabled: bool = True
     prometheus_port: int = 8000
@@ -109,13 +224,17 @@ class Config:
         config.api.openai_api_key = os.getenv("OPENAI_API_KEY")
         
         # ストレージ設定
+        config.storage.backend = os.getenv("STORAGE_BACKEND", "auto")
+        config.storage.local_store_dir = os.getenv("LOCAL_STORE_DIR")
         config.storage.aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
         config.storage.aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
         config.storage.aws_region = os.getenv("AWS_REGION", "us-east-1")
         config.storage.s3_bucket = os.getenv("S3_BUCKET")
+        config.storage.s3_endpoint_url = os.getenv("S3_ENDPOINT_URL")
         
         # Redis設定
         config.redis.url = os.getenv("REDIS_URL", "redis://localhost:6379")
+        config.redis.rate_limit_enabled = os.getenv("REDIS_RATE_LIMIT", "false").lower() == "true"
         
         # パス設定
         config.storage.data_dir = os.getenv("DATA_DIR", "./data")
@@ -185,6 +304,13 @@ class Config:
                 if hasattr(config.redis, key):
                     setattr(config.redis, key, value)
                     
+        # 画像変換設定
+        if "image" in data:
+            image_data = data["image"]
+            for key, value in image_data.items():
+                if hasattr(config.image, key):
+                    setattr(config.image, key, value)
+        
         return config
         
     def to_dict(self) -> Dict[str, Any]:
@@ -202,27 +328,100 @@ class Config:
                 "claude_base_url": self.api.claude_base_url,
                 "claude_model": self.api.claude_model,
                 "claude_rate_limit": self.api.claude_rate_limit,
+                "claude_tokens_per_minute": self.api.claude_tokens_per_minute,
                 "openai_api_key": "***" if self.api.openai_api_key else None,
                 "openai_base_url": self.api.openai_base_url,
                 "openai_model": self.api.openai_model,
+                "openai_tokens_per_minute": self.api.openai_tokens_per_minute,
+                "model_routing_enabled": self.api.model_routing_enabled,
+                "claude_small_model": self.api.claude_small_model,
+                "openai_small_model": self.api.openai_small_model,
                 "timeout": self.api.timeout,
-                "max_retries": self.api.max_retries
+                "max_retries": self.api.max_retries,
+                "packing_enabled": self.api.packing_enabled,
+                "packing_target_tokens": self.api.packing_target_tokens,
+                "packing_small_paragraph_tokens": self.api.packing_small_paragraph_tokens,
+                "packing_max_paragraphs": self.api.packing_max_paragraphs,
+                "packing_max_wait": self.api.packing_max_wait,
+                "derive_short_forms": self.api.derive_short_forms,
+                "dedup_enabled": self.api.dedup_enabled,
+                "dedup_threshold": self.api.dedup_threshold,
+                "prompt_caching_enabled": self.api.prompt_caching_enabled,
+                "adaptive_concurrency_enabled": self.api.adaptive_concurrency_enabled,
+                "concurrency_initial": self.api.concurrency_initial,
+                "concurrency_min": self.api.concurrency_min,
+                "concurrency_max": self.api.concurrency_max,
+                "concurrency_latency_spike_factor": self.api.concurrency_latency_spike_factor,
+                "hedge_enabled": self.api.hedge_enabled,
+                "hedge_percentile": self.api.hedge_percentile,
+                "hedge_min_delay": self.api.hedge_min_delay,
+                "hedge_budget_ratio": self.api.hedge_budget_ratio,
+                "circuit_failure_rate_threshold": self.api.circuit_failure_rate_threshold,
+                "circuit_slow_call_rate_threshold": self.api.circuit_slow_call_rate_threshold,
+                "circuit_slow_call_duration": self.api.circuit_slow_call_duration,
+                "circuit_window_size": self.api.circuit_window_size,
+                "circuit_minimum_calls": self.api.circuit_minimum_calls,
+                "circuit_open_duration": self.api.circuit_open_duration,
+                "circuit_half_open_max_calls": self.api.circuit_half_open_max_calls,
+                "http2_enabled": self.api.http2_enabled,
+                "http_max_connections": self.api.http_max_connections,
+                "http_max_keepalive_connections": self.api.http_max_keepalive_connections,
+                "http_keepalive_expiry": self.api.http_keepalive_expiry,
+                "http_warmup_enabled": self.api.http_warmup_enabled
             },
             "storage": {
+                "backend": self.storage.backend,
+                "local_store_dir": self.storage.local_store_dir,
+                "local_store_hardlink_dedup": self.storage.local_store_hardlink_dedup,
                 "aws_access_key_id": "***" if self.storage.aws_access_key_id else None,
                 "aws_secret_access_key": "***" if self.storage.aws_secret_access_key else None,
                 "aws_region": self.storage.aws_region,
                 "s3_bucket": self.storage.s3_bucket,
+                "s3_endpoint_url": self.storage.s3_endpoint_url,
+                "media_prefix": self.storage.media_prefix,
+                "upload_concurrency": self.storage.upload_concurrency,
+                "multipart_threshold": self.storage.multipart_threshold,
+                "multipart_chunk_size": self.storage.multipart_chunk_size,
                 "data_dir": self.storage.data_dir,
                 "output_dir": self.storage.output_dir,
                 "cache_dir": self.storage.cache_dir,
-                "log_dir": self.storage.log_dir
+                "log_dir": self.storage.log_dir,
+                "parse_cache_enabled": self.storage.parse_cache_enabled,
+                "parse_cache_max_bytes": self.storage.parse_cache_max_bytes
             },
             "redis": {
                 "url": self.redis.url,
                 "state_ttl": self.redis.state_ttl,
                 "checkpoint_ttl": self.redis.checkpoint_ttl,
-                "task_ttl": self.redis.task_ttl
+                "task_ttl": self.redis.task_ttl,
+                "rate_limit_enabled": self.redis.rate_limit_enabled,
+                "rate_limit_lease_size": self.redis.rate_limit_lease_size,
+                "rate_limit_lease_ttl": self.redis.rate_limit_lease_ttl,
+                "rate_limit_fallback_share": self.redis.rate_limit_fallback_share
+            },
+            "image": {
+                "width": self.image.width,
+                "height": self.image.height,
+                "format": self.image.format,
+                "conversion_timeout": self.image.conversion_timeout,
+                "mermaid_cli_path": self.image.mermaid_cli_path,
+                "drawio_path": self.image.drawio_path,
+                "render_pool_enabled": self.image.render_pool_enabled,
+                "render_pool_node_path": self.image.render_pool_node_path,
+                "render_pool_pages": self.image.render_pool_pages,
+                "render_pool_max_renders_per_page": self.image.render_pool_max_renders_per_page,
+                "render_pool_render_timeout": self.image.render_pool_render_timeout,
+                "render_cache_enabled": self.image.render_cache_enabled,
+                "render_cache_max_bytes": self.image.render_cache_max_bytes,
+                "process_pool_enabled": self.image.process_pool_enabled,
+                "process_pool_workers": self.image.process_pool_workers,
+                "optimize_enabled": self.image.optimize_enabled,
+                "optimize_png_quantize": self.image.optimize_png_quantize,
+                "optimize_png_colors": self.image.optimize_png_colors,
+                "optimize_formats": self.image.optimize_formats,
+                "optimize_quality": self.image.optimize_quality,
+                "responsive_widths": self.image.responsive_widths,
+                "thumbnail_template_path": self.image.thumbnail_template_path
             },
             "metrics_enabled": self.metrics_enabled,
             "prometheus_port": self.prometheus_port
@@ -4,11 +4,24 @@ from .base import BaseConverter, ImageType
 from .svg import SVGConverter
 from .drawio import DrawIOConverter
 from .mermaid import MermaidConverter
+from .render_pool import HeadlessRenderPool, RenderError, RenderPoolUnavailable
+from .process_pool import ConversionProcessPool
+from .optimizer import ImageOptimizer, OptimizedImage, ImageVariant
+from .thumbnail import ThumbnailRenderer, ThumbnailTemplate
 
 __all__ = [
     "BaseConverter",
     "ImageType",
     "SVGConverter",
     "DrawIOConverter",
-    "MermaidConverter"
+    "MermaidConverter",
+    "HeadlessRenderPool",
+    "RenderError",
+    "RenderPoolUnavailable",
+    "ConversionProcessPool",
+    "ImageOptimizer",
+    "OptimizedImage",
+    "ImageVariant",
+    "ThumbnailRenderer",
+    "ThumbnailTemplate"
 ] 
\ No newline at end of file
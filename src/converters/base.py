@@ -2,11 +2,17 @@
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import asyncio
+import functools
 import logging
+import os
+import tempfile
+import time
 
 from ..config import Config
+from ..utils.disk_cache import DiskCache, content_key
+from .process_pool import ConversionProcessPool, get_process_pool
 
 logger = logging.getLogger(__name__)
 
@@ -20,17 +26,71 @@ class ImageType(Enum):
     JPG = "jpg"
 
 
+def get_render_cache(config: Config) -> Optional[DiskCache]:
+    """設定に応じた共有レンダーキャッシュを取得（無効時は None）."""
+    image = getattr(config, 'image', None)
+    if getattr(image, 'render_cache_enabled', False) is not True:
+        return None
+    
+    cache_dir = getattr(getattr(config, 'storage', None), 'cache_dir', None)
+    max_bytes = getattr(image, 'render_cache_max_bytes', None)
+    return DiskCache.shared(
+        os.path.join(cache_dir if isinstance(cache_dir, str) else "./cache", "renders"),
+        max_bytes if isinstance(max_bytes, int) and max_bytes > 0 else 512 * 1024 * 1024
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def scratch_root() -> Optional[str]:
+    """一時ファイルの作成先（/dev/shm が使えればメモリ上、なければシステムの既定）."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return None
+
+
+def scratch_directory(prefix: str = "render-") -> tempfile.TemporaryDirectory:
+    """変換の入出力ファイル用の一時作業ディレクトリ."""
+    return tempfile.TemporaryDirectory(prefix=prefix, dir=scratch_root())
+
+
 class BaseConverter(ABC):
     """画像変換器の基底クラス."""
     
+    # 変換処理の出力が変わる変更をしたら上げる（古いキャッシュを無効化）
+    RENDER_CACHE_VERSION = 1
+    
     def __init__(self, config: Config):
         """初期化."""
         self.config = config
         self.semaphore = asyncio.Semaphore(config.workers.max_concurrent_tasks)
+        self.render_cache: Optional[DiskCache] = get_render_cache(config)
+        self.process_pool: Optional[ConversionProcessPool] = get_process_pool(config)
         
-    @abstractmethod
     async def convert(self, source: str, **kwargs) -> bytes:
-        """単一画像の変換.
+        """単一画像の変換（レンダーキャッシュにあれば変換しない）.
+        
+        Args:
+            source: 変換元の画像データ（文字列形式）
+            **kwargs: 追加のオプション
+            
+        Returns:
+            変換後の画像データ（バイナリ）
+        """
+        if self.render_cache is None or not isinstance(source, str):
+            return await self._convert(source, **kwargs)
+            
+        cached = await self._get_cached_render(source, **kwargs)
+        if cached is not None:
+            return cached
+            
+        result = await self._convert(source, **kwargs)
+        await self._put_cached_render(source, result, **kwargs)
+        return result
+        
+    @abstractmethod
+    async def _convert(self, source: str, **kwargs) -> bytes:
+        """単一画像の変換処理（キャッシュは convert が参照する）.
         
         Args:
             source: 変換元の画像データ（文字列形式）
@@ -46,9 +106,37 @@ class BaseConverter(ABC):
         """サポートする画像タイプを返す."""
         pass
         
+    async def run_cpu_bound(self, func, *args):
+        """CPU 負荷の高い処理をイベントループ外で実行.
+        
+        プロセスプールが有効な場合は子プロセスで、無効な場合はスレッドで実行する。
+        """
+        if self.process_pool is not None:
+            return await self.process_pool.run(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+        
     async def batch_convert(self, sources: List[str], **kwargs) -> List[bytes]:
         """複数画像のバッチ変換.
         
+        CPU 負荷の高い変換はプロセスプールに分散される。
+        
+        Args:
+            sources: 変換元の画像データリスト
+            **kwargs: 追加のオプション
+            
+        Returns:
+            変換後の画像データリスト（変換に失敗した要素は含まない）
+        """
+        results = await self.convert_many(sources, **kwargs)
+        return [result for result in results if result is not None]
+        
+    async def convert_many(self, sources: List[str], **kwargs) -> List[Optional[bytes]]:
+        """複数画像を変換し、入力と同じ順序で結果を返す（失敗した要素は None）.
+        
+        同じソースは1回だけ変換する。_convert_batch を実装した変換器では、
+        レンダーキャッシュにないものだけをまとめて1回で変換する
+        （章内の図表をまとめて1つのヘッドレスセッションで描画するなど）。
+        
         Args:
             sources: 変換元の画像データリスト
             **kwargs: 追加のオプション
@@ -59,24 +147,49 @@ class BaseConverter(ABC):
         if not sources:
             return []
             
-        tasks = []
-        for source in sources:
-            task = asyncio.create_task(self._safe_convert(source, **kwargs))
-            tasks.append(task)
-            
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        unique_sources = list(dict.fromkeys(sources))
+        converted: Dict[str, Union[bytes, BaseException]] = {}
         
+        native_batch = type(self)._convert_batch is not BaseConverter._convert_batch
+        pending = unique_sources
+        if native_batch and self.render_cache is not None:
+            cached = await asyncio.gather(*(self._get_cached_render(source, **kwargs) for source in unique_sources))
+            pending = []
+            for source, result in zip(unique_sources, cached):
+                if result is not None:
+                    converted[source] = result
+                else:
+                    pending.append(source)
+                    
+        if pending:
+            results = await self._convert_batch(pending, **kwargs)
+            converted.update(zip(pending, results))
+            if native_batch and self.render_cache is not None:
+                await asyncio.gather(*(
+                    self._put_cached_render(source, result, **kwargs) for source, result in zip(pending, results)
+                ))
+                
         # エラーハンドリング
-        converted_images = []
-        for idx, result in enumerate(results):
-            if isinstance(result, Exception):
+        converted_images: List[Optional[bytes]] = []
+        for idx, source in enumerate(sources):
+            result = converted[source]
+            if isinstance(result, BaseException):
                 logger.error(f"Failed to convert image {idx}: {result}")
-                # エラー時はスキップ（または代替処理）
-                continue
-            converted_images.append(result)
-            
+                converted_images.append(None)
+            else:
+                converted_images.append(result)
+                
         return converted_images
         
+    async def _convert_batch(self, sources: List[str], **kwargs) -> List[Union[bytes, BaseException]]:
+        """未変換のソースをまとめて変換（失敗した要素は例外を返す）.
+        
+        既定では1件ずつ並列に convert する。複数の図表を1回の外部プロセスで
+        描画できる変換器はオーバーライドする（レンダーキャッシュは convert_many が参照する）。
+        """
+        tasks = [asyncio.create_task(self._safe_convert(source, **kwargs)) for source in sources]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+        
     async def _safe_convert(self, source: str, **kwargs) -> bytes:
         """セマフォ制御付きの安全な変換."""
         async with self.semaphore:
@@ -99,6 +212,29 @@ class BaseConverter(ABC):
             return False
         return True
         
+    async def _get_cached_render(self, source: str, **kwargs) -> Optional[bytes]:
+        """レンダーキャッシュから変換結果を取得（ファイル I/O はスレッドで行う）."""
+        return await asyncio.to_thread(self.render_cache.get, self.render_cache_key(source, **kwargs))
+        
+    async def _put_cached_render(self, source: str, result: Any, **kwargs) -> None:
+        """変換結果をレンダーキャッシュに保存（空の結果・失敗は保存しない）."""
+        if not isinstance(result, bytes) or not result:
+            return
+        await asyncio.to_thread(
+            self.render_cache.put,
+            self.render_cache_key(source, **kwargs),
+            result,
+            {"converter": type(self).__name__, "created_at": time.time()}
+        )
+        
+    def render_cache_key(self, source: str, **kwargs) -> str:
+        """ソース・変換器・出力パラメータ（幅・高さ・テーマ・形式など）からキャッシュキーを生成."""
+        params = dict(kwargs)
+        params.setdefault('width', self.config.image.width)
+        params.setdefault('height', self.config.image.height)
+        params.setdefault('format', self.get_output_format())
+        return content_key(type(self).__name__, self.RENDER_CACHE_VERSION, source, params)
+        
     def get_output_format(self) -> str:
         """出力フォーマットを取得."""
         return self.config.image.format.lower()
@@ -9,6 +9,7 @@ from typing import Optional
 import aiohttp
 
 from .base import BaseConverter, ImageType
+from .render_pool import HeadlessRenderPool, RenderError, RenderPoolUnavailable
 from ..config import Config
 
 logger = logging.getLogger(__name__)
@@ -23,11 +24,16 @@ class DrawIOConverter(BaseConverter):
         self.drawio_path = config.image.drawio_path
         self.timeout = config.image.conversion_timeout
         
+        # 常駐ヘッドレスブラウザのレンダリングプール（図表毎のブラウザ起動を避ける）
+        self.render_pool: Optional[HeadlessRenderPool] = None
+        if getattr(config.image, 'render_pool_enabled', False) is True:
+            self.render_pool = HeadlessRenderPool.shared(config)
+        
     def get_supported_type(self) -> ImageType:
         """サポートする画像タイプを返す."""
         return ImageType.DRAWIO
         
-    async def convert(self, source: str, **kwargs) -> bytes:
+    async def _convert(self, source: str, **kwargs) -> bytes:
         """DrawIOファイルをPNG画像に変換.
         
         Args:
@@ -63,6 +69,15 @@ class DrawIOConverter(BaseConverter):
                 
     async def _convert_from_content(self, content: str, **kwargs) -> bytes:
         """DrawIOコンテンツをPNG画像に変換."""
+        # 常駐レンダーサーバーを優先し、利用できない・描画に失敗した場合はサブプロセスで変換
+        if self.render_pool is not None:
+            try:
+                return await self.render_pool.render('drawio', content, **self._render_options(**kwargs))
+            except RenderPoolUnavailable as e:
+                logger.debug(f"Render pool unavailable, falling back to subprocess: {e}")
+            except RenderError as e:
+                logger.warning(f"Render pool failed to render drawio, falling back to subprocess: {e}")
+                
         # 一時ファイルを作成
         with tempfile.NamedTemporaryFile(mode='w', suffix='.drawio', delete=False) as temp_input:
             temp_input.write(content)
@@ -180,6 +195,13 @@ class DrawIOConverter(BaseConverter):
                 except OSError:
                     pass
                     
+    def _render_options(self, **kwargs) -> dict:
+        """レンダーサーバーに渡すオプション."""
+        return {
+            'width': kwargs.get('width', self.config.image.width),
+            'height': kwargs.get('height', self.config.image.height)
+        }
+        
     def _generate_puppeteer_script(self, input_path: str, output_path: str, **kwargs) -> str:
         """Puppeteerスクリプトを生成."""
         width = kwargs.get('width', self.config.image.width)
@@ -1,19 +1,76 @@
 """Mermaid図表変換器."""
 
 import asyncio
+import json
 import subprocess
 import tempfile
 import os
 import logging
-from typing import Optional
+from typing import List, Optional, Union
 import aiohttp
 
-from .base import BaseConverter, ImageType
+from .base import BaseConverter, ImageType, scratch_directory, scratch_root
+from .render_pool import HeadlessRenderPool, RenderError, RenderPoolUnavailable
 from ..config import Config
 
 logger = logging.getLogger(__name__)
 
 
+# 複数の図表を1つのブラウザ・ページで順に描画するスクリプト（node -e で実行）
+# MERMAID_BATCH_DIR の diagrams.json を読み、diagram-<番号>.png を書き出す
+BATCH_RENDER_SCRIPT = r"""
+const fs = require('fs');
+const path = require('path');
+const puppeteer = require('puppeteer');
+
+const WORKDIR = process.env.MERMAID_BATCH_DIR;
+const MERMAID_URL = 'https://cdn.jsdelivr.net/npm/mermaid@10.6.1/dist/mermaid.min.js';
+
+(async () => {
+  const job = JSON.parse(fs.readFileSync(path.join(WORKDIR, 'diagrams.json'), 'utf8'));
+  const errors = {};
+  const browser = await puppeteer.launch({
+    headless: true,
+    args: ['--no-sandbox', '--disable-setuid-sandbox']
+  });
+  try {
+    const page = await browser.newPage();
+    await page.setViewport({ width: job.width, height: job.height });
+    await page.setContent('<!DOCTYPE html><html><body style="margin:0"><div id="container"></div></body></html>');
+    await page.addScriptTag({ url: MERMAID_URL });
+    await page.evaluate((theme) => {
+      mermaid.initialize({ startOnLoad: false, theme: theme, fontFamily: 'Arial, sans-serif' });
+    }, job.theme);
+    
+    for (let i = 0; i < job.diagrams.length; i++) {
+      try {
+        await page.evaluate(async (source, id, background) => {
+          const { svg } = await mermaid.render(id, source);
+          const container = document.getElementById('container');
+          container.style.cssText = 'display:inline-block;padding:20px;background:' + background;
+          container.innerHTML = svg;
+        }, job.diagrams[i], 'diagram' + i, job.background);
+        const element = await page.$('#container');
+        await element.screenshot({
+          path: path.join(WORKDIR, 'diagram-' + i + '.png'),
+          type: 'png',
+          omitBackground: job.background === 'transparent'
+        });
+      } catch (error) {
+        errors[i] = String((error && error.message) || error);
+      }
+    }
+  } finally {
+    await browser.close();
+  }
+  process.stdout.write(JSON.stringify({ errors: errors }));
+})().catch((error) => {
+  console.error('Mermaid batch conversion error:', error);
+  process.exit(1);
+});
+"""
+
+
 class MermaidConverter(BaseConverter):
     """Mermaid図表をPNG画像に変換する変換器."""
     
@@ -22,12 +79,18 @@ class MermaidConverter(BaseConverter):
         super().__init__(config)
         self.mermaid_cli_path = getattr(config.image, 'mermaid_cli_path', 'mmdc')
         self.timeout = config.image.conversion_timeout
+        self._cli_available: Optional[bool] = None  # CLI の有無（初回の確認結果を使い回す）
+        
+        # 常駐ヘッドレスブラウザのレンダリングプール（図表毎のブラウザ起動を避ける）
+        self.render_pool: Optional[HeadlessRenderPool] = None
+        if getattr(config.image, 'render_pool_enabled', False) is True:
+            self.render_pool = HeadlessRenderPool.shared(config)
         
     def get_supported_type(self) -> ImageType:
         """サポートする画像タイプを返す."""
         return ImageType.MERMAID
         
-    async def convert(self, source: str, **kwargs) -> bytes:
+    async def _convert(self, source: str, **kwargs) -> bytes:
         """MermaidコードをPNG画像に変換.
         
         Args:
@@ -48,15 +111,22 @@ class MermaidConverter(BaseConverter):
             
     async def _convert_from_content(self, content: str, **kwargs) -> bytes:
         """MermaidコンテンツをPNG画像に変換."""
-        # 一時ファイルを作成
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.mmd', delete=False) as temp_input:
-            temp_input.write(content)
-            temp_input_path = temp_input.name
-            
-        try:
-            # 出力ファイルパス
-            temp_output_path = temp_input_path.replace('.mmd', '.png')
-            
+        # 常駐レンダーサーバーを優先し、利用できない・描画に失敗した場合はサブプロセスで変換
+        if self.render_pool is not None:
+            try:
+                return await self.render_pool.render('mermaid', content, **self._render_options(**kwargs))
+            except RenderPoolUnavailable as e:
+                logger.debug(f"Render pool unavailable, falling back to subprocess: {e}")
+            except RenderError as e:
+                logger.warning(f"Render pool failed to render mermaid, falling back to subprocess: {e}")
+                
+        # 一時ファイルはメモリ上の作業ディレクトリに作成
+        with scratch_directory(prefix="mermaid-") as workdir:
+            temp_input_path = os.path.join(workdir, 'diagram.mmd')
+            temp_output_path = os.path.join(workdir, 'diagram.png')
+            with open(temp_input_path, 'w') as temp_input:
+                temp_input.write(content)
+                
             # Mermaid CLI実行
             if await self._check_mermaid_cli():
                 result = await self._run_mermaid_cli(temp_input_path, temp_output_path, **kwargs)
@@ -73,17 +143,140 @@ class MermaidConverter(BaseConverter):
                 
             return image_data
             
-        finally:
-            # 一時ファイルを削除
-            for path in [temp_input_path, temp_output_path]:
-                if os.path.exists(path):
-                    try:
-                        os.unlink(path)
-                    except OSError:
-                        pass
-                        
+    async def _convert_batch(self, sources: List[str], **kwargs) -> List[Union[bytes, BaseException]]:
+        """章内の図表をまとめて変換.
+        
+        常駐レンダーサーバーが使えればそれに依頼し、使えなければ
+        Mermaid CLI（Markdown 入力）またはバッチ用 Puppeteer スクリプトを
+        1回だけ起動して全図表を描画する。
+        """
+        results: List[Union[bytes, BaseException, None]] = [None] * len(sources)
+        targets = []
+        for idx, source in enumerate(sources):
+            if self.validate_source(source):
+                targets.append(idx)
+            else:
+                results[idx] = ValueError("Invalid Mermaid source")
+                
+        if len(targets) <= 1:
+            for idx in targets:
+                try:
+                    results[idx] = await self._convert_one(sources[idx], **kwargs)
+                except Exception as e:
+                    results[idx] = e
+            return results
+            
+        diagrams = [sources[idx] for idx in targets]
+        if self.render_pool is not None:
+            options = self._render_options(**kwargs)
+            rendered = list(await asyncio.gather(
+                *(self.render_pool.render('mermaid', diagram, **options) for diagram in diagrams),
+                return_exceptions=True
+            ))
+            # 利用できない・描画に失敗したものだけをサブプロセスでまとめて変換
+            retry = [
+                position for position, result in enumerate(rendered)
+                if isinstance(result, (RenderPoolUnavailable, RenderError))
+            ]
+            if retry:
+                logger.debug(f"Render pool could not render {len(retry)} diagrams, falling back to batch subprocess")
+                fallback = await self._render_with_subprocess([diagrams[position] for position in retry], **kwargs)
+                for position, result in zip(retry, fallback):
+                    rendered[position] = result
+        else:
+            rendered = await self._render_with_subprocess(diagrams, **kwargs)
+            
+        for idx, result in zip(targets, rendered):
+            results[idx] = result
+        return results
+        
+    async def _render_with_subprocess(self, diagrams: List[str], **kwargs) -> List[Union[bytes, BaseException]]:
+        """サブプロセスでまとめて変換（失敗時は1件ずつ変換し直す）."""
+        try:
+            return await self._render_batch_subprocess(diagrams, **kwargs)
+        except Exception as e:
+            # 1つの不正な図表で全体が失敗する場合があるため、1件ずつ変換し直す
+            logger.warning(f"Mermaid batch conversion failed, converting one by one: {e}")
+            return list(await asyncio.gather(
+                *(self._convert_one(diagram, **kwargs) for diagram in diagrams),
+                return_exceptions=True
+            ))
+        
+    async def _convert_one(self, content: str, **kwargs) -> bytes:
+        """1件を変換（レンダーキャッシュは convert_many が参照するため通さない）."""
+        async with self.semaphore:
+            return await self._convert_from_content(content, **kwargs)
+            
+    async def _render_batch_subprocess(self, diagrams: List[str], **kwargs) -> List[Union[bytes, BaseException]]:
+        """複数の図表を1回のプロセス起動で描画."""
+        with scratch_directory(prefix="mermaid-batch-") as workdir:
+            if await self._check_mermaid_cli():
+                # Markdown 入力では各 mermaid ブロックが <出力名>-<番号>.png に書き出される
+                input_path = os.path.join(workdir, 'diagrams.md')
+                with open(input_path, 'w') as f:
+                    f.write(''.join(f"```mermaid\n{diagram}\n```\n\n" for diagram in diagrams))
+                # タイムアウトは図表数に比例させる
+                await self._run_mermaid_cli(
+                    input_path, os.path.join(workdir, 'rendered.md'),
+                    timeout=self.timeout * len(diagrams), output_format='png', **kwargs
+                )
+                paths = [os.path.join(workdir, f'rendered-{i + 1}.png') for i in range(len(diagrams))]
+                errors = {}
+            else:
+                errors = await self._run_mermaid_headless_batch(diagrams, workdir, **kwargs)
+                paths = [os.path.join(workdir, f'diagram-{i}.png') for i in range(len(diagrams))]
+                
+            results: List[Union[bytes, BaseException]] = []
+            for i, path in enumerate(paths):
+                if str(i) in errors:
+                    results.append(RuntimeError(f"Mermaid conversion failed: {errors[str(i)]}"))
+                elif os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        results.append(f.read())
+                else:
+                    results.append(RuntimeError("Mermaid conversion failed - output file not created"))
+            return results
+            
+    async def _run_mermaid_headless_batch(self, diagrams: List[str], workdir: str, **kwargs) -> dict:
+        """1つのブラウザセッションで複数の図表を描画.
+        
+        Returns:
+            図表番号（文字列）→ エラーメッセージ
+        """
+        options = self._render_options(**kwargs)
+        with open(os.path.join(workdir, 'diagrams.json'), 'w') as f:
+            json.dump(dict(options, diagrams=diagrams), f)
+            
+        process = await asyncio.create_subprocess_exec(
+            'node', '-e', BATCH_RENDER_SCRIPT,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=dict(os.environ, MERMAID_BATCH_DIR=workdir)
+        )
+        
+        try:
+            # タイムアウトは図表数に比例させる
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(),
+                timeout=self.timeout * len(diagrams)
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            logger.error("Mermaid headless batch conversion timed out")
+            raise
+            
+        if process.returncode != 0:
+            error_msg = stderr.decode() if stderr else "Unknown error"
+            raise RuntimeError(f"Mermaid headless batch conversion failed: {error_msg}")
+            
+        return json.loads(stdout.decode() or '{}').get('errors', {})
+        
     async def _check_mermaid_cli(self) -> bool:
-        """Mermaid CLIが利用可能かチェック."""
+        """Mermaid CLIが利用可能かチェック（結果はインスタンスで保持し、毎回プロセスを起動しない）."""
+        if self._cli_available is not None:
+            return self._cli_available
+            
         try:
             process = await asyncio.create_subprocess_exec(
                 self.mermaid_cli_path,
@@ -92,16 +285,18 @@ class MermaidConverter(BaseConverter):
                 stderr=asyncio.subprocess.PIPE
             )
             await process.wait()
-            return process.returncode == 0
+            self._cli_available = process.returncode == 0
         except (FileNotFoundError, OSError):
-            return False
-            
-    async def _run_mermaid_cli(self, input_path: str, output_path: str, **kwargs) -> bool:
-        """Mermaid CLIで変換."""
+            self._cli_available = False
+        return self._cli_available
+        
+    async def _run_mermaid_cli(self, input_path: str, output_path: str, timeout: Optional[float] = None, **kwargs) -> bool:
+        """Mermaid CLIで変換（timeout 未指定時は1図表分の conversion_timeout）."""
         width = kwargs.get('width', self.config.image.width)
         height = kwargs.get('height', self.config.image.height)
         theme = kwargs.get('theme', 'default')
         background = kwargs.get('background', 'white')
+        output_format = kwargs.get('output_format')
         
         cmd = [
             self.mermaid_cli_path,
@@ -112,6 +307,9 @@ class MermaidConverter(BaseConverter):
             '-t', theme,
             '-b', background
         ]
+        if output_format:
+            # Markdown 入力時の画像形式
+            cmd.extend(['-e', output_format])
         
         try:
             process = await asyncio.create_subprocess_exec(
@@ -122,7 +320,7 @@ class MermaidConverter(BaseConverter):
             
             stdout, stderr = await asyncio.wait_for(
                 process.communicate(),
-                timeout=self.timeout
+                timeout=timeout or self.timeout
             )
             
             if process.returncode != 0:
@@ -142,7 +340,7 @@ class MermaidConverter(BaseConverter):
         """ヘッドレスブラウザでMermaidを変換."""
         script_content = self._generate_puppeteer_script(content, output_path, **kwargs)
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as script_file:
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.js', dir=scratch_root(), delete=False) as script_file:
             script_file.write(script_content)
             script_path = script_file.name
             
@@ -179,6 +377,15 @@ class MermaidConverter(BaseConverter):
                 except OSError:
                     pass
                     
+    def _render_options(self, **kwargs) -> dict:
+        """レンダーサーバーに渡すオプション."""
+        return {
+            'width': kwargs.get('width', self.config.image.width),
+            'height': kwargs.get('height', self.config.image.height),
+            'theme': kwargs.get('theme', 'default'),
+            'background': kwargs.get('background', 'white')
+        }
+        
     def _generate_puppeteer_script(self, content: str, output_path: str, **kwargs) -> str:
         """Puppeteerスクリプトを生成."""
         width = kwargs.get('width', self.config.image.width)
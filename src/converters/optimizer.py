@@ -0,0 +1,231 @@
+"""変換後の画像の最適化.
+
+変換器が出力したフルサイズの PNG を、アップロード・埋め込みの前に最適化する。
+
+- PNG の再圧縮（optimize）とパレットへの減色
+- WebP / AVIF の追加出力
+- レスポンシブ用の縮小版（1回のラスタライズ結果から各幅を生成）
+
+エンコードは CPU 負荷が高いためプロセスプール（無効時はスレッド）で実行する。
+最適化で元より大きくなった場合や Pillow が利用できない場合は元の画像をそのまま使う。
+"""
+
+import asyncio
+import functools
+import io
+import logging
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .process_pool import ConversionProcessPool, get_process_pool
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# 追加出力に対応する形式と Pillow の保存形式名
+VARIANT_FORMATS = {"png": "PNG", "webp": "WEBP", "avif": "AVIF"}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def png_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """PNG の IHDR から幅・高さを読み取る（PNG でない場合は None）."""
+    if len(data) < 24 or not data.startswith(PNG_SIGNATURE) or data[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", data[16:24])
+
+
+def _encode(image, image_format: str, options: Dict[str, Any]) -> bytes:
+    """画像を指定の形式でエンコード."""
+    buffer = io.BytesIO()
+    if image_format == "png":
+        if options.get("quantize") and image.mode in ("RGB", "RGBA"):
+            method = Image.Quantize.FASTOCTREE if image.mode == "RGBA" else Image.Quantize.MEDIANCUT
+            image = image.quantize(colors=options.get("colors", 256), method=method)
+        image.save(buffer, format="PNG", optimize=True)
+    else:
+        image.save(buffer, format=VARIANT_FORMATS[image_format], quality=options.get("quality", 80))
+    return buffer.getvalue()
+
+
+def optimize_image(png_data: bytes, options: Dict[str, Any]) -> Dict[str, Any]:
+    """PNG を最適化し、追加の形式・幅の画像を生成（子プロセスで実行）.
+    
+    Args:
+        png_data: 変換器が出力した PNG
+        options: quantize / colors / quality / formats / widths
+    
+    Returns:
+        {'data': 最適化した PNG, 'width', 'height',
+         'variants': [{'format', 'width', 'height', 'data'}, ...]}
+    
+    Raises:
+        ImportError: Pillow が利用できない場合
+    """
+    image = Image.open(io.BytesIO(png_data))
+    image.load()
+    width, height = image.size
+    
+    optimized = _encode(image, "png", options)
+    if len(optimized) >= len(png_data):
+        optimized = png_data
+    
+    variants = []
+    sizes: List[Tuple[int, int]] = [(width, height)]
+    for target_width in sorted(set(options.get("widths") or []), reverse=True):
+        if 0 < target_width < width:
+            sizes.append((target_width, max(1, round(height * target_width / width))))
+    
+    formats = options.get("formats") or []
+    for size in sizes:
+        if size == (width, height):
+            # 元の幅の PNG は最適化済みのものを使う
+            resized, size_formats = image, [f for f in formats if f != "png"]
+        else:
+            # 縮小版は追加形式の指定がなくても PNG で出力する
+            resized, size_formats = image.resize(size, Image.LANCZOS), ["png"] + [f for f in formats if f != "png"]
+        for image_format in size_formats:
+            try:
+                data = _encode(resized, image_format, options)
+            except (KeyError, OSError, ValueError) as e:
+                # AVIF など、この環境の Pillow でエンコードできない形式
+                logger.debug(f"Skipping {image_format} variant: {e}")
+                continue
+            variants.append({"format": image_format, "width": size[0], "height": size[1], "data": data})
+    
+    return {"data": optimized, "width": width, "height": height, "variants": variants}
+
+
+@dataclass
+class ImageVariant:
+    """追加出力した画像."""
+    format: str
+    width: int
+    height: int
+    data: bytes
+
+
+@dataclass
+class OptimizedImage:
+    """最適化結果（width / height は不明な場合 None）."""
+    data: bytes
+    original_size: int
+    variants: List[ImageVariant] = field(default_factory=list)
+    width: Optional[int] = None
+    height: Optional[int] = None
+    
+    @property
+    def bytes_saved(self) -> int:
+        """最適化で削減したバイト数."""
+        return self.original_size - len(self.data)
+
+
+class ImageOptimizer:
+    """変換後の画像の最適化ステージ."""
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        quantize: bool = False,
+        colors: int = 256,
+        formats: Optional[List[str]] = None,
+        quality: int = 80,
+        widths: Optional[List[int]] = None,
+        process_pool: Optional[ConversionProcessPool] = None
+    ):
+        """初期化.
+        
+        Args:
+            enabled: 最適化するか
+            quantize: PNG をパレットに減色するか（非可逆）
+            colors: 減色後の色数
+            formats: 追加で出力する形式（"webp" / "avif" / "png"）
+            quality: WebP / AVIF の品質
+            widths: 追加で出力する幅（元の幅より小さいもののみ）
+            process_pool: エンコードを実行するプロセスプール（未指定時はスレッド）
+        """
+        self.enabled = enabled and PIL_AVAILABLE
+        self.options = {
+            "quantize": quantize,
+            "colors": max(2, min(256, colors)),
+            "formats": [f.lower() for f in (formats or []) if f.lower() in VARIANT_FORMATS],
+            "quality": quality,
+            "widths": sorted({w for w in (widths or []) if w > 0}, reverse=True),
+        }
+        self.process_pool = process_pool
+        self.stats = {"images": 0, "bytes_before": 0, "bytes_after": 0, "variants": 0, "variant_bytes": 0, "failures": 0}
+        if enabled and not PIL_AVAILABLE:
+            logger.warning("Pillow not available - image optimization disabled")
+    
+    @classmethod
+    def from_config(cls, config) -> "ImageOptimizer":
+        """設定（image.optimize_*）から作成."""
+        image = getattr(config, 'image', None)
+        
+        def setting(name: str, default, types):
+            value = getattr(image, name, default)
+            return value if isinstance(value, types) and not (types is int and isinstance(value, bool)) else default
+        
+        return cls(
+            enabled=getattr(image, 'optimize_enabled', False) is True,
+            quantize=setting('optimize_png_quantize', False, bool),
+            colors=setting('optimize_png_colors', 256, int),
+            formats=setting('optimize_formats', [], list),
+            quality=setting('optimize_quality', 80, int),
+            widths=setting('responsive_widths', [], list),
+            process_pool=get_process_pool(config)
+        )
+    
+    def signature(self) -> Dict[str, Any]:
+        """出力に影響する設定（キャッシュキーに含める）."""
+        return dict(self.options, enabled=self.enabled)
+    
+    async def optimize(self, png_data: bytes) -> OptimizedImage:
+        """PNG を最適化（失敗した場合は元の画像をそのまま返す）."""
+        if not self.enabled or not png_data:
+            return self._original(png_data)
+        
+        try:
+            if self.process_pool is not None:
+                result = await self.process_pool.run(optimize_image, png_data, self.options)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(optimize_image, png_data, self.options)
+                )
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.debug(f"Image optimization failed, using original: {e}")
+            return self._original(png_data)
+        
+        optimized = OptimizedImage(
+            data=result["data"],
+            original_size=len(png_data),
+            variants=[ImageVariant(**variant) for variant in result["variants"]],
+            width=result["width"],
+            height=result["height"]
+        )
+        self.stats["images"] += 1
+        self.stats["bytes_before"] += len(png_data)
+        self.stats["bytes_after"] += len(optimized.data)
+        self.stats["variants"] += len(optimized.variants)
+        self.stats["variant_bytes"] += sum(len(variant.data) for variant in optimized.variants)
+        return optimized
+    
+    @staticmethod
+    def _original(png_data: bytes) -> OptimizedImage:
+        """最適化しなかった場合の結果（寸法は PNG ヘッダーから読み取る）."""
+        width, height = png_size(png_data) or (None, None)
+        return OptimizedImage(data=png_data, original_size=len(png_data), width=width, height=height)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得."""
+        stats = self.stats.copy()
+        stats["enabled"] = self.enabled
+        stats["bytes_saved"] = stats["bytes_before"] - stats["bytes_after"]
+        return stats
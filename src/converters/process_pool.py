@@ -0,0 +1,155 @@
+"""CPU 負荷の高い変換処理のプロセスプール.
+
+cairosvg によるラスタライズや Pillow によるエンコードは同期処理で GIL を保持するため、
+イベントループ上で実行すると LLM 応答・ハートビートなど他のイベントが止まる。
+変換はバイト列を受け渡すモジュールレベルの関数として子プロセスで実行し、
+プロセスはワーカープールの初期化時に起動しておく（初回変換時の起動待ちを避ける）。
+"""
+
+import asyncio
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def rasterize_svg(svg_data: bytes, width: int, height: int) -> bytes:
+    """SVG を PNG にラスタライズ（子プロセスで実行）.
+    
+    Raises:
+        ImportError: cairosvg が利用できない場合
+    """
+    import cairosvg
+    
+    return cairosvg.svg2png(bytestring=svg_data, output_width=width, output_height=height)
+
+
+def encode_jpeg(png_data: bytes, quality: int = 90) -> bytes:
+    """PNG を JPEG にエンコード（透明部分は白背景で合成、子プロセスで実行）.
+    
+    Raises:
+        ImportError: Pillow が利用できない場合
+    """
+    from PIL import Image
+    
+    image = Image.open(io.BytesIO(png_data))
+    if image.mode == 'RGBA':
+        rgb_image = Image.new('RGB', image.size, (255, 255, 255))
+        rgb_image.paste(image, mask=image.split()[-1])
+        image = rgb_image
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def _warm_up() -> int:
+    """子プロセスの起動確認."""
+    return os.getpid()
+
+
+class ConversionProcessPool:
+    """変換処理用のプロセスプール."""
+    
+    _shared: Optional["ConversionProcessPool"] = None
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        """初期化.
+        
+        Args:
+            max_workers: プロセス数（未指定時は CPU コア数）
+        """
+        self.max_workers = max_workers if max_workers and max_workers > 0 else (os.cpu_count() or 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {"tasks": 0, "failures": 0, "restarts": 0}
+    
+    @classmethod
+    def from_config(cls, config) -> "ConversionProcessPool":
+        """設定（image.process_pool_workers）からプールを作成."""
+        workers = getattr(getattr(config, 'image', None), 'process_pool_workers', None)
+        return cls(workers if isinstance(workers, int) and not isinstance(workers, bool) else None)
+    
+    @classmethod
+    def shared(cls, config) -> "ConversionProcessPool":
+        """プロセス内で共有するプールを取得."""
+        if cls._shared is None:
+            cls._shared = cls.from_config(config)
+        return cls._shared
+    
+    @classmethod
+    async def close_shared(cls) -> None:
+        """共有プールを停止."""
+        pool, cls._shared = cls._shared, None
+        if pool is not None:
+            await pool.close()
+    
+    @property
+    def running(self) -> bool:
+        """子プロセスを起動済みか."""
+        return self._executor is not None
+    
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        """エグゼキューターを取得（未起動なら起動）."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+    
+    async def start(self) -> None:
+        """全プロセスを起動しておく."""
+        loop = asyncio.get_running_loop()
+        executor = self._ensure_executor()
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(executor, _warm_up) for _ in range(self.max_workers)
+        ))
+        logger.info(f"Conversion process pool started with {len(set(pids))} processes")
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """関数を子プロセスで実行（引数・戻り値は pickle 可能なもの）.
+        
+        子プロセスが異常終了してプールが壊れた場合は作り直して1回だけ再実行する。
+        """
+        loop = asyncio.get_running_loop()
+        self.stats["tasks"] += 1
+        for attempt in range(2):
+            try:
+                return await loop.run_in_executor(self._ensure_executor(), func, *args)
+            except BrokenProcessPool:
+                logger.warning("Conversion process pool broken, restarting")
+                self._discard_executor()
+                self.stats["restarts"] += 1
+                if attempt:
+                    self.stats["failures"] += 1
+                    raise
+            except Exception:
+                self.stats["failures"] += 1
+                raise
+    
+    def _discard_executor(self) -> None:
+        """壊れたエグゼキューターを破棄."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def close(self) -> None:
+        """子プロセスを停止（終了待ちはイベントループを止めない）."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得."""
+        stats = self.stats.copy()
+        stats["max_workers"] = self.max_workers
+        stats["running"] = self.running
+        return stats
+
+
+def get_process_pool(config) -> Optional[ConversionProcessPool]:
+    """設定に応じた共有プロセスプールを取得（無効時は None）."""
+    if getattr(getattr(config, 'image', None), 'process_pool_enabled', False) is not True:
+        return None
+    return ConversionProcessPool.shared(config)
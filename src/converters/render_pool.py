@@ -0,0 +1,443 @@
+"""常駐ヘッドレスブラウザによる図表レンダリングプール.
+
+Mermaid / draw.io の変換毎に Chromium を起動する代わりに、1つの Node.js
+レンダーサーバー（Puppeteer）を常駐させ、標準入出力のパイプ越しに
+JSON Lines でレンダリングを依頼する。サーバーは図表の種類毎にページを
+プールし、1図表あたりのレンダリング時間の上限と、一定回数のレンダリング後の
+ページの作り直しを行う。
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# レンダーサーバー（node -e で実行）
+RENDER_SERVER_SCRIPT = r"""
+const readline = require('readline');
+const puppeteer = require('puppeteer');
+
+const PAGES = parseInt(process.env.RENDER_POOL_PAGES || '4', 10);
+const MAX_RENDERS = parseInt(process.env.RENDER_POOL_MAX_RENDERS || '100', 10);
+const TIMEOUT_MS = parseFloat(process.env.RENDER_POOL_TIMEOUT || '15') * 1000;
+const MERMAID_URL = 'https://cdn.jsdelivr.net/npm/mermaid@10.6.1/dist/mermaid.min.js';
+const DRAWIO_URL = 'https://embed.diagrams.net/?embed=1&proto=json&spin=0';
+
+const send = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+
+function mermaidScript() {
+  try {
+    return { path: require.resolve('mermaid/dist/mermaid.min.js') };
+  } catch (error) {
+    return { url: MERMAID_URL };
+  }
+}
+
+const OPENERS = {
+  mermaid: async (page) => {
+    await page.setContent('<!DOCTYPE html><html><body style="margin:0"><div id="container"></div></body></html>');
+    await page.addScriptTag(mermaidScript());
+  },
+  drawio: async (page) => {
+    await page.goto(DRAWIO_URL, { waitUntil: 'networkidle0' });
+  },
+};
+
+const RENDERERS = {
+  mermaid: async (page, source, options) => {
+    await page.setViewport({ width: options.width || 800, height: options.height || 600 });
+    await page.evaluate(async (source, theme, background) => {
+      mermaid.initialize({ startOnLoad: false, theme: theme, fontFamily: 'Arial, sans-serif' });
+      const { svg } = await mermaid.render('diagram' + Date.now(), source);
+      const container = document.getElementById('container');
+      container.style.cssText = 'display:inline-block;padding:20px;background:' + background;
+      container.innerHTML = svg;
+    }, source, options.theme || 'default', options.background || 'white');
+    const element = await page.$('#container');
+    return await element.screenshot({
+      type: 'png',
+      encoding: 'base64',
+      omitBackground: options.background === 'transparent',
+    });
+  },
+  drawio: async (page, source, options) => {
+    await page.setViewport({ width: options.width || 800, height: options.height || 600 });
+    return await page.evaluate((xml) => new Promise((resolve) => {
+      const onMessage = (event) => {
+        let message;
+        try { message = JSON.parse(event.data); } catch (error) { return; }
+        if (message.event === 'load') {
+          window.postMessage(JSON.stringify({ action: 'export', format: 'png', spin: false }), '*');
+        } else if (message.event === 'export') {
+          window.removeEventListener('message', onMessage);
+          resolve(message.data.split(',')[1]);
+        }
+      };
+      window.addEventListener('message', onMessage);
+      window.postMessage(JSON.stringify({ action: 'load', xml: xml, autosave: 0 }), '*');
+    }), source);
+  },
+};
+
+class PagePool {
+  constructor(browser, kind) {
+    this.browser = browser;
+    this.kind = kind;
+    this.idle = [];
+    this.waiters = [];
+    this.size = 0;
+  }
+
+  async open() {
+    const page = await this.browser.newPage();
+    await OPENERS[this.kind](page);
+    return { page: page, renders: 0 };
+  }
+
+  async acquire() {
+    if (this.idle.length) return this.idle.pop();
+    if (this.size < PAGES) {
+      this.size++;
+      try {
+        return await this.open();
+      } catch (error) {
+        this.size--;
+        throw error;
+      }
+    }
+    return new Promise((resolve, reject) => this.waiters.push({ resolve, reject }));
+  }
+
+  async release(slot) {
+    if (slot.renders >= MAX_RENDERS) {
+      await slot.page.close().catch(() => {});
+      try {
+        slot = await this.open();
+      } catch (error) {
+        this.size--;
+        const waiter = this.waiters.shift();
+        if (waiter) this.acquire().then(waiter.resolve, waiter.reject);
+        return;
+      }
+    }
+    const waiter = this.waiters.shift();
+    if (waiter) waiter.resolve(slot);
+    else this.idle.push(slot);
+  }
+}
+
+async function handle(pools, request) {
+  const pool = pools[request.kind];
+  if (!pool) {
+    send({ id: request.id, ok: false, error: 'unsupported kind: ' + request.kind });
+    return;
+  }
+  let slot;
+  let timer;
+  try {
+    slot = await pool.acquire();
+    const budget = new Promise((_, reject) => {
+      timer = setTimeout(() => reject(new Error('render budget exceeded')), TIMEOUT_MS);
+    });
+    const data = await Promise.race([RENDERERS[request.kind](slot.page, request.source, request.options || {}), budget]);
+    slot.renders++;
+    send({ id: request.id, ok: true, data: data, page_renders: slot.renders });
+  } catch (error) {
+    // 失敗・タイムアウトしたページは状態が不明なため作り直す
+    if (slot) slot.renders = MAX_RENDERS;
+    send({ id: request.id, ok: false, error: String((error && error.message) || error) });
+  } finally {
+    clearTimeout(timer);
+    if (slot) await pool.release(slot);
+  }
+}
+
+(async () => {
+  const browser = await puppeteer.launch({
+    headless: true,
+    args: ['--no-sandbox', '--disable-setuid-sandbox'],
+  });
+  const pools = {};
+  for (const kind of Object.keys(RENDERERS)) pools[kind] = new PagePool(browser, kind);
+
+  const input = readline.createInterface({ input: process.stdin });
+  input.on('line', (line) => {
+    let request;
+    try { request = JSON.parse(line); } catch (error) { return; }
+    handle(pools, request);
+  });
+  input.on('close', async () => {
+    await browser.close().catch(() => {});
+    process.exit(0);
+  });
+  send({ ready: true, pages: PAGES, max_renders: MAX_RENDERS });
+})().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
+"""
+
+
+class RenderPoolUnavailable(RuntimeError):
+    """レンダーサーバーを利用できない場合の例外（呼び出し側はサブプロセス変換にフォールバック）."""
+
+
+class RenderError(RuntimeError):
+    """レンダーサーバーでの図表のレンダリングに失敗した場合の例外."""
+
+
+class HeadlessRenderPool:
+    """常駐レンダーサーバーのクライアント.
+    
+    サーバーは最初のレンダリング時に起動し、異常終了した場合は次のレンダリングで
+    再起動する。起動に失敗した場合は retry_interval 秒の間 RenderPoolUnavailable を
+    即座に返し、変換のたびに起動を試みないようにする。
+    """
+    
+    # 1行の JSON に base64 の PNG が入るため、StreamReader の上限を引き上げる
+    STREAM_LIMIT = 64 * 1024 * 1024
+    
+    _shared: Dict[str, "HeadlessRenderPool"] = {}
+    
+    def __init__(
+        self,
+        node_path: str = "node",
+        pages: int = 4,
+        max_renders_per_page: int = 100,
+        render_timeout: float = 15.0,
+        request_timeout: float = 60.0,
+        startup_timeout: float = 30.0,
+        retry_interval: float = 60.0
+    ):
+        """初期化.
+        
+        Args:
+            node_path: Node.js の実行ファイル
+            pages: 図表の種類毎に保持するページ数
+            max_renders_per_page: この回数レンダリングしたらページを作り直す
+            render_timeout: サーバー側での1図表あたりのレンダリング時間の上限（秒）
+            request_timeout: ページ待ちを含む1リクエストの待ち時間の上限（秒）
+            startup_timeout: サーバー起動の待ち時間の上限（秒）
+            retry_interval: 起動失敗後に再試行しない期間（秒）
+        """
+        self.node_path = node_path
+        self.pages = pages
+        self.max_renders_per_page = max_renders_per_page
+        self.render_timeout = render_timeout
+        self.request_timeout = request_timeout
+        self.startup_timeout = startup_timeout
+        self.retry_interval = retry_interval
+        
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._stderr_reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._lock = asyncio.Lock()
+        self._unavailable_until = 0.0
+        self.stats = {
+            "starts": 0,
+            "start_failures": 0,
+            "renders": 0,
+            "render_failures": 0,
+        }
+    
+    @classmethod
+    def from_config(cls, config) -> "HeadlessRenderPool":
+        """設定（image.render_pool_*）からプールを作成."""
+        image = getattr(config, 'image', None)
+        
+        def setting(name: str, default, types):
+            value = getattr(image, name, None)
+            return value if isinstance(value, types) and not isinstance(value, bool) else default
+        
+        render_timeout = setting('render_pool_render_timeout', 15.0, (int, float))
+        return cls(
+            node_path=setting('render_pool_node_path', "node", str),
+            pages=setting('render_pool_pages', 4, int),
+            max_renders_per_page=setting('render_pool_max_renders_per_page', 100, int),
+            render_timeout=render_timeout,
+            request_timeout=max(setting('conversion_timeout', 30.0, (int, float)), render_timeout) * 2
+        )
+    
+    @classmethod
+    def shared(cls, config) -> "HeadlessRenderPool":
+        """プロセス内で共有するプールを取得（Node.js の実行ファイル毎に1つ）."""
+        pool = cls.from_config(config)
+        return cls._shared.setdefault(pool.node_path, pool)
+    
+    @classmethod
+    async def close_shared(cls) -> None:
+        """共有プールをすべて停止."""
+        pools = list(cls._shared.values())
+        cls._shared.clear()
+        for pool in pools:
+            await pool.close()
+    
+    @property
+    def running(self) -> bool:
+        """サーバーが稼働中か."""
+        return self._process is not None and self._process.returncode is None
+    
+    def _server_command(self) -> List[str]:
+        """サーバーの起動コマンド."""
+        return [self.node_path, "-e", RENDER_SERVER_SCRIPT]
+    
+    def _server_env(self) -> Dict[str, str]:
+        """サーバーの環境変数."""
+        env = dict(os.environ)
+        env.update({
+            "RENDER_POOL_PAGES": str(self.pages),
+            "RENDER_POOL_MAX_RENDERS": str(self.max_renders_per_page),
+            "RENDER_POOL_TIMEOUT": str(self.render_timeout),
+        })
+        return env
+    
+    async def start(self) -> None:
+        """サーバーを起動（稼働中の場合は何もしない）.
+        
+        Raises:
+            RenderPoolUnavailable: 起動できない場合
+        """
+        async with self._lock:
+            if self.running:
+                return
+            if time.monotonic() < self._unavailable_until:
+                raise RenderPoolUnavailable("Render server failed to start recently")
+            
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    *self._server_command(),
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=self._server_env(),
+                    limit=self.STREAM_LIMIT
+                )
+                line = await asyncio.wait_for(self._process.stdout.readline(), timeout=self.startup_timeout)
+                if not json.loads(line or b"{}").get("ready"):
+                    raise RuntimeError("render server exited before becoming ready")
+            except Exception as e:
+                await self._terminate()
+                self.stats["start_failures"] += 1
+                self._unavailable_until = time.monotonic() + self.retry_interval
+                logger.warning(f"Render server unavailable: {e}")
+                raise RenderPoolUnavailable(str(e)) from e
+            
+            self.stats["starts"] += 1
+            self._reader = asyncio.create_task(self._read_responses(self._process))
+            self._stderr_reader = asyncio.create_task(self._read_stderr(self._process))
+            logger.info(f"Render server started (pages={self.pages}, max_renders={self.max_renders_per_page})")
+    
+    async def render(self, kind: str, source: str, **options: Any) -> bytes:
+        """図表をPNGにレンダリング.
+        
+        Args:
+            kind: 図表の種類（mermaid / drawio）
+            source: 図表のソース
+            **options: width, height, theme, background
+        
+        Returns:
+            PNG画像データ
+        
+        Raises:
+            RenderPoolUnavailable: サーバーを利用できない場合
+            RenderError: レンダリングに失敗した場合
+        """
+        await self.start()
+        
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        
+        request = {"id": request_id, "kind": kind, "source": source, "options": options}
+        try:
+            self._process.stdin.write((json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8"))
+            await self._process.stdin.drain()
+            response = await asyncio.wait_for(future, timeout=self.request_timeout)
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise RenderPoolUnavailable(f"Render server connection lost: {e}") from e
+        except asyncio.TimeoutError as e:
+            self.stats["render_failures"] += 1
+            raise RenderError(f"{kind} render timed out after {self.request_timeout}s") from e
+        finally:
+            self._pending.pop(request_id, None)
+        
+        if not response.get("ok"):
+            self.stats["render_failures"] += 1
+            raise RenderError(f"{kind} render failed: {response.get('error', 'unknown error')}")
+        
+        self.stats["renders"] += 1
+        return base64.b64decode(response["data"])
+    
+    async def _read_responses(self, process: asyncio.subprocess.Process) -> None:
+        """レスポンスを読み取り、対応するリクエストに渡す."""
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    response = json.loads(line)
+                except ValueError:
+                    logger.debug(f"Ignoring non-JSON render server output: {line[:200]!r}")
+                    continue
+                future = self._pending.get(response.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            # サーバーが終了した場合は待機中のリクエストを失敗させ、次回再起動する
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(RenderPoolUnavailable("Render server exited"))
+            if self._process is process:
+                logger.warning("Render server exited")
+                self._process = None
+    
+    async def _read_stderr(self, process: asyncio.subprocess.Process) -> None:
+        """サーバーの標準エラー出力をログに記録."""
+        while True:
+            line = await process.stderr.readline()
+            if not line:
+                return
+            logger.debug(f"render server: {line.decode(errors='replace').rstrip()}")
+    
+    async def _terminate(self) -> None:
+        """サーバープロセスを終了."""
+        process, self._process = self._process, None
+        if process is None or process.returncode is not None:
+            return
+        try:
+            if process.stdin:
+                process.stdin.close()
+            await asyncio.wait_for(process.wait(), timeout=5.0)
+        except (asyncio.TimeoutError, OSError):
+            process.kill()
+            await process.wait()
+    
+    async def close(self) -> None:
+        """サーバーを停止（標準入力を閉じるとサーバーはブラウザを閉じて終了する）."""
+        async with self._lock:
+            await self._terminate()
+            for task in (self._reader, self._stderr_reader):
+                if task is not None:
+                    task.cancel()
+                    try:
+                        await task
+                    except (asyncio.CancelledError, Exception):
+                        pass
+            self._reader = self._stderr_reader = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得."""
+        stats = self.stats.copy()
+        stats["running"] = self.running
+        stats["pending"] = len(self._pending)
+        return stats
@@ -3,9 +3,9 @@
 import logging
 from typing import Optional
 import base64
-import io
 
 from .base import BaseConverter, ImageType
+from .process_pool import encode_jpeg, rasterize_svg
 from ..config import Config
 
 logger = logging.getLogger(__name__)
@@ -22,7 +22,7 @@ class SVGConverter(BaseConverter):
         """サポートする画像タイプを返す."""
         return ImageType.SVG
         
-    async def convert(self, source: str, **kwargs) -> bytes:
+    async def _convert(self, source: str, **kwargs) -> bytes:
         """SVGをPNG/JPGに変換.
         
         Args:
@@ -107,16 +107,8 @@ class SVGConverter(BaseConverter):
             PNG画像データ
         """
         try:
-            # cairosvgを使用してPNGに変換
-            import cairosvg
-            
-            png_data = cairosvg.svg2png(
-                bytestring=svg_data.encode('utf-8'),
-                output_width=width,
-                output_height=height
-            )
-            
-            return png_data
+            # cairosvgを使用してPNGに変換（イベントループを止めないようプロセスプールで実行）
+            return await self.run_cpu_bound(rasterize_svg, svg_data.encode('utf-8'), width, height)
             
         except ImportError:
             # cairosvgが利用できない場合の代替実装
@@ -138,24 +130,8 @@ class SVGConverter(BaseConverter):
             # まずPNGに変換してからJPGに変換
             png_data = await self._convert_to_png(svg_data, width, height)
             
-            # PillowでPNGからJPGに変換
-            from PIL import Image
-            
-            # PNGデータを読み込み
-            png_image = Image.open(io.BytesIO(png_data))
-            
-            # RGBAからRGBに変換（JPGは透明度をサポートしないため）
-            if png_image.mode == 'RGBA':
-                # 白背景で合成
-                rgb_image = Image.new('RGB', png_image.size, (255, 255, 255))
-                rgb_image.paste(png_image, mask=png_image.split()[-1])
-                png_image = rgb_image
-                
-            # JPGとして保存
-            jpg_buffer = io.BytesIO()
-            png_image.save(jpg_buffer, format='JPEG', quality=90)
-            
-            return jpg_buffer.getvalue()
+            # PillowでPNGからJPGに変換（RGBAは白背景で合成）
+            return await self.run_cpu_bound(encode_jpeg, png_data, 90)
             
         except ImportError:
             logger.warning("PIL not available, using fallback conversion")
@@ -0,0 +1,446 @@
+"""テンプレートに基づくサムネイル画像のレンダリング.
+
+templates/thumbnail_template.yaml の解像度・セーフゾーン・文字スタイル・背景を使い、
+Pillow でサムネイルを描画する（ブラウザを使わない）。
+
+フォントの読み込み、背景（グラデーション・光の効果）の生成、タイトルの折り返しと
+文字サイズの計算はプロセス内でキャッシュし、章毎のサムネイルでは文字の描画と
+PNG のエンコードだけを行う。描画はプロセスプール（無効時はスレッド）で実行する。
+"""
+
+import asyncio
+import functools
+import io
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from .process_pool import ConversionProcessPool, get_process_pool
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+DEFAULT_TEMPLATE_PATH = "templates/thumbnail_template.yaml"
+
+# テンプレートの色名
+COLOR_NAMES = {
+    "水色": "#7FD3F7",
+    "青": "#1E88E5",
+    "紺": "#1A237E",
+    "黄色": "#FFD600",
+    "黄": "#FFD600",
+    "赤": "#E53935",
+    "緑": "#43A047",
+    "橙": "#FB8C00",
+    "オレンジ": "#FB8C00",
+    "紫": "#8E24AA",
+    "灰": "#9E9E9E",
+    "白": "#FFFFFF",
+    "黒": "#000000",
+}
+
+# サムネイル依頼の color_scheme → 背景グラデーション（上, 下）
+COLOR_SCHEMES = {
+    "blue": ("#1E88E5", "#E3F2FD"),
+    "green": ("#43A047", "#E8F5E9"),
+    "red": ("#E53935", "#FFEBEE"),
+    "orange": ("#FB8C00", "#FFF3E0"),
+    "purple": ("#8E24AA", "#F3E5F5"),
+    "dark": ("#212121", "#616161"),
+}
+
+GLOW_RADIUS = {"弱": 4, "中": 8, "強": 14}
+
+FONT_DIRS = [
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    "~/.fonts",
+    "~/.local/share/fonts",
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    "C:/Windows/Fonts",
+]
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+
+def _px(value: Any, default: int) -> int:
+    """"64px" などのサイズ指定を整数に変換."""
+    match = re.search(r"\d+", str(value)) if value is not None else None
+    return int(match.group(0)) if match else default
+
+
+def _color(value: Any, default: str) -> str:
+    """色指定（#RRGGBB または色名を含む文字列）を #RRGGBB に変換."""
+    if isinstance(value, str):
+        if re.fullmatch(r"#[0-9a-fA-F]{6}", value.strip()):
+            return value.strip()
+        for name, code in COLOR_NAMES.items():
+            if name in value:
+                return code
+    return default
+
+
+def _colors(value: Any) -> List[str]:
+    """"水色〜白のグラデーション" などから色の並びを取り出す."""
+    if not isinstance(value, str):
+        return []
+    return [_color(part, "") for part in re.split(r"[〜~→,、]", value) if _color(part, "")]
+
+
+@dataclass
+class TextStyle:
+    """文字スタイル."""
+    font: str = "Noto Sans JP Bold"
+    size: int = 64
+    color: str = "#FFFFFF"
+    outline_color: Optional[str] = None
+    outline_size: int = 0
+    glow_color: Optional[str] = None
+    glow_radius: int = 0
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], default_size: int) -> "TextStyle":
+        """テンプレートの typography 項目から作成."""
+        outline = data.get("outline") or {}
+        glow = data.get("glow") or {}
+        return cls(
+            font=data.get("font", cls.font),
+            size=_px(data.get("size"), default_size),
+            color=_color(data.get("color"), "#FFFFFF"),
+            outline_color=_color(outline.get("color"), "#000000") if outline else None,
+            outline_size=_px(outline.get("size"), 0) if outline else 0,
+            glow_color=_color(glow.get("color"), "#FFD600") if glow else None,
+            glow_radius=GLOW_RADIUS.get(str(glow.get("intensity", "")), 8) if glow else 0,
+        )
+
+
+@dataclass
+class ThumbnailTemplate:
+    """サムネイルテンプレート."""
+    width: int = 1536
+    height: int = 1024
+    safe_zone: Dict[str, int] = field(default_factory=lambda: {"top": 128, "bottom": 128, "left": 128, "right": 128})
+    headline: TextStyle = field(default_factory=TextStyle)
+    subheadline: TextStyle = field(default_factory=lambda: TextStyle(size=48, color="#000000"))
+    badge_color: Optional[str] = None
+    background: Tuple[str, ...] = ("#7FD3F7", "#FFFFFF")
+    highlight: bool = False
+    line_spacing: int = 15
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ThumbnailTemplate":
+        """テンプレートの YAML から作成."""
+        template = cls()
+        resolution = re.fullmatch(r"\s*(\d+)\s*[xX×]\s*(\d+)\s*", str(data.get("resolution", "")))
+        if resolution:
+            template.width, template.height = int(resolution.group(1)), int(resolution.group(2))
+        if isinstance(data.get("safe_zone"), dict):
+            template.safe_zone = {
+                side: _px(data["safe_zone"].get(side), template.safe_zone[side]) for side in template.safe_zone
+            }
+        
+        typography = (data.get("visual_identity") or {}).get("typography") or {}
+        if typography.get("headline"):
+            template.headline = TextStyle.from_dict(typography["headline"], 64)
+        if typography.get("subheadline"):
+            template.subheadline = TextStyle.from_dict(typography["subheadline"], 48)
+        
+        for text in data.get("main_texts") or []:
+            if text.get("id") == "header" and text.get("background_color"):
+                template.badge_color = _color(text["background_color"], "#FFD600")
+            if text.get("id") == "title" and text.get("line_spacing"):
+                template.line_spacing = _px(text["line_spacing"], template.line_spacing)
+        
+        background = data.get("background") or {}
+        colors = _colors(background.get("color")) or _colors(data.get("theme_color"))[:2]
+        if colors:
+            template.background = tuple(colors) if len(colors) > 1 else (colors[0], colors[0])
+        template.highlight = "光" in str(background.get("effect", ""))
+        return template
+    
+    def to_spec(self) -> Dict[str, Any]:
+        """子プロセスに渡す描画指定."""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "safe_zone": dict(self.safe_zone),
+            "headline": self.headline.__dict__.copy(),
+            "subheadline": self.subheadline.__dict__.copy(),
+            "badge_color": self.badge_color,
+            "background": list(self.background),
+            "highlight": self.highlight,
+            "line_spacing": self.line_spacing,
+        }
+
+
+@functools.lru_cache(maxsize=4)
+def load_template(path: str, mtime: float = 0.0) -> ThumbnailTemplate:
+    """テンプレートを読み込み（パスと更新時刻でキャッシュ）."""
+    with open(path, encoding="utf-8") as f:
+        return ThumbnailTemplate.from_dict(yaml.safe_load(f) or {})
+
+
+@functools.lru_cache(maxsize=1)
+def _font_files() -> Tuple[str, ...]:
+    """システムのフォントファイル一覧（初回のみ走査）."""
+    files = []
+    for directory in FONT_DIRS:
+        for root, _, names in os.walk(os.path.expanduser(directory)):
+            files.extend(os.path.join(root, name) for name in names if name.lower().endswith(FONT_EXTENSIONS))
+    return tuple(sorted(files))
+
+
+@functools.lru_cache(maxsize=32)
+def find_font(name: str) -> Optional[str]:
+    """フォント名（"Noto Sans JP Bold" など）に最も近いフォントファイルを探す."""
+    if os.path.isfile(name):
+        return name
+    tokens = [token for token in re.split(r"[\s_-]+", name.lower()) if token]
+    best, best_score = None, 1
+    for path in _font_files():
+        stem = re.sub(r"[\s_-]+", "", Path(path).stem.lower())
+        # 日本語の Noto フォントは CJK 版で代用できる
+        score = sum(1 for token in tokens if token in stem or (token == "jp" and "cjk" in stem))
+        if score > best_score:
+            best, best_score = path, score
+    return best
+
+
+@functools.lru_cache(maxsize=64)
+def _load_font(name: str, size: int):
+    """フォントを読み込み（フォント・サイズ毎にキャッシュ）."""
+    path = find_font(name)
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            logger.debug(f"Failed to load font: {path}")
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=16)
+def _background(width: int, height: int, colors: Tuple[str, ...], highlight: bool):
+    """グラデーション背景（サイズ・色毎にキャッシュ、描画時はコピーして使う）."""
+    top, bottom = (Image.new("RGB", (1, 1), color).getpixel((0, 0)) for color in (colors[0], colors[-1]))
+    gradient = Image.linear_gradient("L").resize((width, height))
+    background = Image.composite(Image.new("RGB", (width, height), bottom), Image.new("RGB", (width, height), top), gradient)
+    if highlight:
+        # 中央に光が当たったように明るくする
+        light = Image.radial_gradient("L").resize((width, height)).point(lambda value: max(0, 160 - value))
+        background = Image.composite(Image.new("RGB", (width, height), "#FFFFFF"), background, light)
+    return background
+
+
+@functools.lru_cache(maxsize=256)
+def _layout(text: str, font_name: str, size: int, max_width: int, max_height: int, spacing: int) -> Tuple[int, Tuple[str, ...]]:
+    """セーフゾーンに収まる文字サイズと折り返しを計算（文字列・スタイル毎にキャッシュ）.
+    
+    Returns:
+        (文字サイズ, 行のタプル)
+    """
+    while True:
+        font = _load_font(font_name, size)
+        lines: List[str] = []
+        for paragraph in text.split("\n"):
+            line = ""
+            for char in paragraph:
+                if line and font.getlength(line + char) > max_width:
+                    # 英単語の途中では折り返さない（日本語は文字単位で折り返す）
+                    space = line.rfind(" ")
+                    if space > 0 and char != " ":
+                        lines.append(line[:space])
+                        line = line[space + 1:] + char
+                    else:
+                        lines.append(line)
+                        line = char.lstrip()
+                else:
+                    line += char
+            lines.append(line)
+        height = len(lines) * size + (len(lines) - 1) * spacing
+        if (height <= max_height and len(lines) <= 3) or size <= 12:
+            return size, tuple(lines)
+        size = int(size * 0.9)
+
+
+def _draw_lines(image, lines: Tuple[str, ...], style: Dict[str, Any], size: int, top: int, spacing: int) -> int:
+    """行を中央揃えで描画し、描画後の下端を返す."""
+    font = _load_font(style["font"], size)
+    width = image.size[0]
+    positions = []
+    y = top
+    for line in lines:
+        positions.append(((width - font.getlength(line)) / 2, y, line))
+        y += size + spacing
+    
+    if style.get("glow_color") and style.get("glow_radius"):
+        glow = Image.new("RGBA", image.size, (0, 0, 0, 0))
+        glow_draw = ImageDraw.Draw(glow)
+        for x, line_y, line in positions:
+            glow_draw.text((x, line_y), line, font=font, fill=style["glow_color"],
+                           stroke_width=style["glow_radius"], stroke_fill=style["glow_color"])
+        image.alpha_composite(glow.filter(ImageFilter.GaussianBlur(style["glow_radius"])))
+    
+    draw = ImageDraw.Draw(image)
+    for x, line_y, line in positions:
+        draw.text((x, line_y), line, font=font, fill=style["color"],
+                  stroke_width=style.get("outline_size") or 0, stroke_fill=style.get("outline_color"))
+    return y - spacing
+
+
+def render_thumbnail(spec: Dict[str, Any], title: str, subtitle: str = "",
+                     width: Optional[int] = None, height: Optional[int] = None,
+                     background: Optional[List[str]] = None) -> bytes:
+    """サムネイルを PNG で描画（子プロセスで実行）.
+    
+    テンプレートの解像度と異なるサイズでは、セーフゾーン・文字サイズを比率に合わせて縮小する。
+    
+    Raises:
+        ImportError: Pillow が利用できない場合
+    """
+    width = width or spec["width"]
+    height = height or spec["height"]
+    scale = min(width / spec["width"], height / spec["height"])
+    safe = {side: int(value * scale) for side, value in spec["safe_zone"].items()}
+    spacing = max(1, int(spec["line_spacing"] * scale))
+    max_width = width - safe["left"] - safe["right"]
+    max_height = height - safe["top"] - safe["bottom"]
+    
+    colors = tuple(background or spec["background"])
+    image = _background(width, height, colors, spec["highlight"]).convert("RGBA")
+    
+    # 見出しと小見出しの大きさを先に決めて、まとめて縦方向の中央に配置する
+    headline, subheadline = spec["headline"], spec["subheadline"]
+    sub_size, sub_lines = (0, ())
+    if subtitle:
+        sub_size, sub_lines = _layout(subtitle, subheadline["font"], max(12, int(subheadline["size"] * scale)),
+                                      max_width, max_height // 3, spacing)
+    sub_height = len(sub_lines) * sub_size + max(0, len(sub_lines) - 1) * spacing
+    gap = spacing * 2 if sub_lines else 0
+    size, lines = _layout(title, headline["font"], max(12, int(headline["size"] * scale)),
+                          max_width, max_height - sub_height - gap, spacing)
+    title_height = len(lines) * size + (len(lines) - 1) * spacing
+    
+    top = safe["top"] + (max_height - sub_height - gap - title_height) // 2
+    if sub_lines:
+        if spec.get("badge_color"):
+            # 小見出しは帯の上に描画
+            font = _load_font(subheadline["font"], sub_size)
+            badge_width = max(font.getlength(line) for line in sub_lines) + spacing * 2
+            ImageDraw.Draw(image).rectangle(
+                ((width - badge_width) / 2, top - spacing, (width + badge_width) / 2, top + sub_height + spacing),
+                fill=spec["badge_color"]
+            )
+        top = _draw_lines(image, sub_lines, subheadline, sub_size, top, spacing) + gap
+    _draw_lines(image, lines, headline, size, top, spacing)
+    
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+class ThumbnailRenderer:
+    """テンプレートに基づくサムネイルレンダラー."""
+    
+    def __init__(self, template: ThumbnailTemplate, process_pool: Optional[ConversionProcessPool] = None):
+        """初期化.
+        
+        Args:
+            template: サムネイルテンプレート
+            process_pool: 描画を実行するプロセスプール（未指定時はスレッド）
+        """
+        self.template = template
+        self.spec = template.to_spec()
+        self.process_pool = process_pool
+        self.stats = {"rendered": 0, "failures": 0}
+    
+    @classmethod
+    def from_config(cls, config) -> Optional["ThumbnailRenderer"]:
+        """設定（image.thumbnail_template_path）から作成（Pillow が利用できない場合は None）."""
+        if not PIL_AVAILABLE:
+            logger.warning("Pillow not available - thumbnails are placeholders")
+            return None
+        
+        path = getattr(getattr(config, 'image', None), 'thumbnail_template_path', None)
+        path = path if isinstance(path, str) else DEFAULT_TEMPLATE_PATH
+        try:
+            template = load_template(path, os.path.getmtime(path))
+        except (OSError, yaml.YAMLError) as e:
+            logger.warning(f"Failed to load thumbnail template {path}, using defaults: {e}")
+            template = ThumbnailTemplate()
+        return cls(template, get_process_pool(config))
+    
+    async def render(
+        self,
+        title: str,
+        subtitle: str = "",
+        color_scheme: Optional[str] = None,
+        dimensions: Optional[Dict[str, int]] = None
+    ) -> bytes:
+        """サムネイルを描画.
+        
+        Args:
+            title: 見出し
+            subtitle: 小見出し（帯付き）
+            color_scheme: 背景の配色（未指定・不明な場合はテンプレートの背景）
+            dimensions: {'width', 'height'}（未指定時はテンプレートの解像度）
+        """
+        dimensions = dimensions or {}
+        args = (
+            self.spec, title, subtitle,
+            dimensions.get('width'), dimensions.get('height'),
+            list(COLOR_SCHEMES[color_scheme]) if color_scheme in COLOR_SCHEMES else None
+        )
+        try:
+            if self.process_pool is not None:
+                data = await self.process_pool.run(render_thumbnail, *args)
+            else:
+                data = await asyncio.get_running_loop().run_in_executor(None, functools.partial(render_thumbnail, *args))
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        self.stats["rendered"] += 1
+        return data
+    
+    async def render_batch(self, requests: List[Dict[str, Any]]) -> List[Optional[bytes]]:
+        """複数のサムネイル（章毎など）をまとめて描画（失敗した要素は None）.
+        
+        Args:
+            requests: {'title', 'subtitle', 'color_scheme', 'dimensions'} のリスト
+        """
+        results = await asyncio.gather(*(
+            self.render(
+                request.get('text_overlay') or request.get('title', ''),
+                request.get('subtitle', ''),
+                request.get('color_scheme'),
+                request.get('dimensions')
+            )
+            for request in requests
+        ), return_exceptions=True)
+        
+        rendered: List[Optional[bytes]] = []
+        for idx, result in enumerate(results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to render thumbnail {idx}: {result}")
+                rendered.append(None)
+            else:
+                rendered.append(result)
+        return rendered
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得."""
+        stats = self.stats.copy()
+        stats["template"] = f"{self.template.width}x{self.template.height}"
+        return stats
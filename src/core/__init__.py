@@ -11,7 +11,9 @@
 from .events import EventBus, Event, EventType
 from .state import StateManager, WorkflowStatus, WorkflowContext
 from .metrics import MetricsCollector
+from .routing import ModelRoute, ModelRoutingPolicy, ModelTier
 from .orchestrator import WorkflowOrchestrator
+from .planning import WorkflowPlan, WorkflowPlanner
 
 __all__ = [
     "EventBus",
@@ -21,5 +23,10 @@ __all__ = [
     "WorkflowStatus",
     "WorkflowContext",
     "MetricsCollector",
-    "WorkflowOrchestrator"
+    "ModelRoute",
+    "ModelRoutingPolicy",
+    "ModelTier",
+    "WorkflowOrchestrator",
+    "WorkflowPlan",
+    "WorkflowPlanner"
 ] 
\ No newline at end of file
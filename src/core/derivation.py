@@ -0,0 +1,147 @@
+"""出力フォーマット間の導出.
+
+出力フォーマットの依存関係を DAG として表し、依存元（記事など）の生成後に
+依存先（ツイート・説明文など）を導出する。短文は記事からの抽出的要約で
+ローカルに作成し、追加の生成リクエストを不要にする。
+"""
+
+import asyncio
+import math
+import re
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 依存元の結果（フォーマット名 → 結果）を受け取って結果を返す
+Producer = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class DerivationGraph:
+    """出力フォーマットの依存関係グラフ（DAG）."""
+    
+    def __init__(self, dependencies: Dict[str, List[str]]):
+        """初期化.
+        
+        Args:
+            dependencies: フォーマット名 → 依存元フォーマット名のリスト
+        
+        Raises:
+            ValueError: 未定義のノードへの依存、または循環がある場合
+        """
+        for node, upstream in dependencies.items():
+            unknown = [name for name in upstream if name not in dependencies]
+            if unknown:
+                raise ValueError(f"{node} depends on unknown outputs: {unknown}")
+        self.dependencies = {node: list(upstream) for node, upstream in dependencies.items()}
+        self._layers = self._build_layers()
+    
+    def _build_layers(self) -> List[List[str]]:
+        """トポロジカル順に並列実行可能な層へ分割."""
+        remaining = dict(self.dependencies)
+        done: set = set()
+        layers = []
+        while remaining:
+            layer = [node for node, upstream in remaining.items() if all(u in done for u in upstream)]
+            if not layer:
+                raise ValueError(f"Cycle in derivation graph: {sorted(remaining)}")
+            for node in layer:
+                del remaining[node]
+            done.update(layer)
+            layers.append(layer)
+        return layers
+    
+    def layers(self) -> List[List[str]]:
+        """実行順の層を取得."""
+        return [list(layer) for layer in self._layers]
+    
+    async def run(self, producers: Dict[str, Producer]) -> Dict[str, Any]:
+        """依存順に生成を実行.
+        
+        同じ層のノードは並列に実行する。失敗したノード（例外または None）は
+        依存先の入力から除外されるため、依存先は独立生成にフォールバックできる。
+        
+        Returns:
+            フォーマット名 → 結果（失敗時は例外）
+        """
+        results: Dict[str, Any] = {}
+        for layer in self._layers:
+            outputs = await asyncio.gather(
+                *(producers[node](self._upstream(node, results)) for node in layer),
+                return_exceptions=True
+            )
+            results.update(zip(layer, outputs))
+        return results
+    
+    def _upstream(self, node: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """成功した依存元の結果."""
+        return {
+            name: results[name]
+            for name in self.dependencies[node]
+            if results.get(name) is not None and not isinstance(results[name], BaseException)
+        }
+
+
+_SENTENCE_END = re.compile(r"(?<=[。！？!?])|(?<=\.)\s+|\n+")
+_MARKUP = re.compile(r"^#+\s*|【[^】]*】|[*_`>]+")
+_WORD = re.compile(r"[a-z0-9]+|[^\sa-z0-9]", re.IGNORECASE)
+
+
+def split_sentences(text: str) -> List[str]:
+    """テキストを文に分割（Markdown の見出し記号・装飾は除去）."""
+    sentences = []
+    for raw in _SENTENCE_END.split(text):
+        sentence = _MARKUP.sub("", raw or "").strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def _terms(sentence: str) -> List[str]:
+    """スコア計算用の語（英数字は単語、それ以外は文字 bigram）."""
+    tokens = _WORD.findall(sentence.lower())
+    terms = [t for t in tokens if len(t) > 1]
+    chars = [t for t in tokens if len(t) == 1 and not re.match(r"[\W_]", t)]
+    terms.extend(a + b for a, b in zip(chars, chars[1:]))
+    return terms
+
+
+def extractive_summary(text: str, max_chars: int = 120, min_sentence_chars: int = 8) -> str:
+    """文のスコアリングによる抽出的要約.
+    
+    文書全体での語の出現頻度を重みとして各文をスコアリングし、
+    先頭に近い文を優先しながら、平均以上のスコアで max_chars に収まる文を
+    元の順序で連結する。
+    """
+    sentences = [s for s in split_sentences(text) if len(s) >= min_sentence_chars]
+    if not sentences:
+        return text.strip()[:max_chars]
+    
+    frequencies = Counter(term for sentence in sentences for term in set(_terms(sentence)))
+    
+    def score(index: int) -> float:
+        terms = _terms(sentences[index])
+        if not terms:
+            return 0.0
+        weight = sum(frequencies[term] for term in terms) / math.sqrt(len(terms))
+        return weight * (1.0 + 1.0 / (index + 1))
+    
+    scores = [score(index) for index in range(len(sentences))]
+    # 平均未満の文（主題と関係の薄い余談など）は採用しない
+    cutoff = sum(scores) / len(scores)
+    ranked = sorted(range(len(sentences)), key=lambda index: scores[index], reverse=True)
+    selected: List[int] = []
+    length = 0
+    for index in ranked:
+        if scores[index] < cutoff and selected:
+            break
+        if length + len(sentences[index]) > max_chars:
+            continue
+        selected.append(index)
+        length += len(sentences[index])
+    
+    if not selected:
+        return sentences[0][:max_chars]
+    return "".join(sentences[index] for index in sorted(selected))
@@ -88,6 +88,10 @@ class EventBus:
         self._event_task: Optional[asyncio.Task] = None
         self._dead_letter_task: Optional[asyncio.Task] = None
         
+        # サーキットオープンにより保留中のイベント（サーキット名 → イベント）
+        self.parked: Dict[str, List[Event]] = {}
+        self._probe_timers: Dict[str, asyncio.TimerHandle] = {}
+        
     async def subscribe(self, event_type: EventType, handler: Callable):
         """イベントハンドラーの登録."""
         if event_type not in self.subscribers:
@@ -235,6 +239,76 @@ class EventBus:
             except Exception as e:
                 logger.error(f"Dead letter processing error: {e}")
                 
+    async def park(self, event: Event, circuit_name: str, retry_after: float = 0.0, breaker=None):
+        """サーキットオープン中のイベントを保留.
+        
+        リトライせずに保留し、retry_after 秒後に1件だけ試行用に再発行する。
+        breaker を渡した場合、サーキットが閉じた時点で残りをまとめて再発行する。
+        """
+        self.parked.setdefault(circuit_name, []).append(event)
+        logger.info(
+            f"Parked event {event.type.value} for workflow {event.workflow_id} "
+            f"(circuit {circuit_name} open)"
+        )
+        
+        if breaker is not None and hasattr(breaker, 'add_listener'):
+            breaker.add_listener(self._on_circuit_state_change)
+            
+        if circuit_name not in self._probe_timers:
+            self._schedule_probe(circuit_name, retry_after)
+            
+    def _schedule_probe(self, circuit_name: str, delay: float):
+        """delay 秒後に保留中のイベントを1件だけ試行用に再発行."""
+        def release_probe():
+            self._probe_timers.pop(circuit_name, None)
+            asyncio.ensure_future(self._release_probe(circuit_name, delay))
+            
+        loop = asyncio.get_running_loop()
+        self._probe_timers[circuit_name] = loop.call_later(max(0.0, delay), release_probe)
+        
+    async def _release_probe(self, circuit_name: str, delay: float):
+        """試行用に1件再発行し、残りがあれば次の試行を予約."""
+        await self.release_parked(circuit_name, limit=1)
+        if self.parked.get(circuit_name) and circuit_name not in self._probe_timers:
+            self._schedule_probe(circuit_name, delay)
+            
+    async def release_parked(self, circuit_name: str, limit: Optional[int] = None) -> int:
+        """保留中のイベントを再発行.
+        
+        Args:
+            circuit_name: サーキット名
+            limit: 再発行する最大件数（None の場合は全件）
+            
+        Returns:
+            再発行した件数
+        """
+        if limit is None:
+            timer = self._probe_timers.pop(circuit_name, None)
+            if timer:
+                timer.cancel()
+                
+        events = self.parked.get(circuit_name, [])
+        count = len(events) if limit is None else min(limit, len(events))
+        released, self.parked[circuit_name] = events[:count], events[count:]
+        if not self.parked[circuit_name]:
+            del self.parked[circuit_name]
+            
+        for event in released:
+            await self.publish(event)
+            
+        if released:
+            logger.info(f"Released {len(released)} parked events for circuit {circuit_name}")
+        return len(released)
+        
+    def _on_circuit_state_change(self, breaker, old_state, new_state):
+        """サーキットが閉じたら保留中のイベントを全て再発行."""
+        if getattr(new_state, 'value', new_state) == "closed" and breaker.name in self.parked:
+            asyncio.ensure_future(self.release_parked(breaker.name))
+            
+    def get_parked_count(self) -> int:
+        """保留中のイベント数を取得."""
+        return sum(len(events) for events in self.parked.values())
+        
     async def get_queue_size(self) -> int:
         """キューサイズの取得."""
         return self.queue.qsize()
@@ -21,6 +21,9 @@ from .events import EventBus, Event, EventType
 from .state import StateManager, WorkflowContext, WorkflowStatus
 from .metrics import MetricsCollector
 from ..workers.pool import WorkerPool
+from .planning import WorkflowPlan, WorkflowPlanner
+from ..clients.http_pool import HTTPClientRegistry
+from ..converters.render_pool import HeadlessRenderPool
 from ..config.settings import Config
 
 logger = logging.getLogger(__name__)
@@ -309,8 +312,32 @@ class WorkflowOrchestrator:
         # ワーカープールの初期化
         await self.worker_pool.initialize(self.event_bus, self.state_manager)
         
+        # APIへのコネクションを事前確立
+        await self._warm_up_connections()
+        
         self._running = True
         logger.info("Orchestrator initialized successfully")
+    
+    async def _warm_up_connections(self):
+        """APIキーが設定されたプロバイダーへのコネクションを事前確立."""
+        api = getattr(self.config, 'api', None)
+        if getattr(api, 'http_warmup_enabled', False) is not True:
+            return
+        
+        base_urls = [
+            getattr(api, f"{provider}_base_url", None)
+            for provider in ("claude", "openai")
+            if getattr(api, f"{provider}_api_key", None)
+        ]
+        base_urls = [url for url in base_urls if isinstance(url, str)]
+        if not base_urls:
+            return
+        
+        try:
+            results = await HTTPClientRegistry.warm_up(base_urls, config=self.config)
+            logger.info(f"HTTP connection warm-up: {results}")
+        except Exception as e:
+            logger.warning(f"HTTP connection warm-up failed: {e}")
         
     async def shutdown(self):
         """オーケストレーターのシャットダウン."""
@@ -327,6 +354,13 @@ class WorkflowOrchestrator:
         # 状態管理の終了
         await self.state_manager.close()
         
+        # 共有HTTPコネクションプールの解放
+        HTTPClientRegistry.publish_metrics(self.metrics)
+        await HTTPClientRegistry.close_all()
+        
+        # 常駐レンダーサーバーの停止
+        await HeadlessRenderPool.close_shared()
+        
         logger.info("Orchestrator shutdown completed")
         
     async def execute(self, lang: str, title: str, input_file: Optional[str] = None) -> WorkflowContext:
@@ -385,6 +419,17 @@ class WorkflowOrchestrator:
             self.completion_events.pop(context.workflow_id, None)
             self.workflow_start_times.pop(context.workflow_id, None)
     
+    async def plan(
+        self,
+        lang: str,
+        title: str,
+        input_file: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> WorkflowPlan:
+        """ワークフローを実行せずにリクエスト数・トークン・コスト・所要時間を見積もる."""
+        planner = WorkflowPlanner(self.config, concurrency=concurrency)
+        return await planner.plan(lang, title, input_file)
+    
     async def resume(self, workflow_id: str) -> WorkflowContext:
         """中断したワークフローの再開."""
         logger.info(f"Resuming workflow {workflow_id}")
@@ -0,0 +1,258 @@
+"""パラグラフのパッキング.
+
+同一セクション内で隣接する小さなパラグラフを目標トークン数までまとめ、
+1回の生成リクエストで処理できるようにする。生成結果は番号付きの構造化出力から
+パラグラフ単位に分配（デマルチプレクス）する。
+"""
+
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from ..utils.logger import get_logger
+from ..utils.prompt_loader import PromptParts, get_prompt_loader
+
+logger = get_logger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """テキストのトークン数を概算（1トークン ≒ 3文字）."""
+    return len(text) // 3 + 1
+
+
+class ParagraphPacker:
+    """隣接する小さなパラグラフをまとめるパッキングポリシー."""
+    
+    def __init__(
+        self,
+        config=None,
+        target_tokens: int = 600,
+        small_paragraph_tokens: int = 150,
+        max_paragraphs: int = 8
+    ):
+        """初期化.
+        
+        Args:
+            config: 設定（指定時は api.packing_* を優先）
+            target_tokens: 1グループあたりの入力トークン上限
+            small_paragraph_tokens: これ以下のパラグラフをパッキング対象とする
+            max_paragraphs: 1グループあたりの最大パラグラフ数
+        """
+        api = getattr(config, 'api', None)
+        
+        def setting(name: str, default: int) -> int:
+            value = getattr(api, name, None)
+            return value if isinstance(value, int) and not isinstance(value, bool) else default
+        
+        self.enabled = getattr(api, 'packing_enabled', True) is not False
+        self.target_tokens = setting('packing_target_tokens', target_tokens)
+        self.small_paragraph_tokens = setting('packing_small_paragraph_tokens', small_paragraph_tokens)
+        self.max_paragraphs = setting('packing_max_paragraphs', max_paragraphs)
+    
+    def pack(self, paragraphs: List[str]) -> List[List[int]]:
+        """パラグラフをグループに分割.
+        
+        Args:
+            paragraphs: セクション内のパラグラフ（出現順）
+        
+        Returns:
+            パラグラフインデックスのグループ（隣接するもののみをまとめる）
+        """
+        if not self.enabled:
+            return [[idx] for idx in range(len(paragraphs))]
+        
+        groups: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        
+        for idx, paragraph in enumerate(paragraphs):
+            tokens = estimate_tokens(paragraph)
+            if tokens > self.small_paragraph_tokens:
+                # 大きなパラグラフは単独で処理
+                if current:
+                    groups.append(current)
+                groups.append([idx])
+                current, current_tokens = [], 0
+                continue
+            
+            if current and (
+                current_tokens + tokens > self.target_tokens
+                or len(current) >= self.max_paragraphs
+            ):
+                groups.append(current)
+                current, current_tokens = [], 0
+            
+            current.append(idx)
+            current_tokens += tokens
+        
+        if current:
+            groups.append(current)
+        return groups
+
+
+class PackBuffer:
+    """パック単位でパラグラフイベントを集める.
+    
+    パックの一部が届かない場合に備え、最初のパラグラフの到着から max_wait 秒を
+    過ぎたパックは揃った分だけで取り出せる（pop / expired）。
+    """
+    
+    def __init__(self, max_wait: float = 5.0):
+        self.max_wait = max_wait
+        self._pending: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._started: Dict[str, float] = {}
+    
+    def add(self, key: str, paragraph_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """パラグラフを追加し、パックが揃ったら位置順のリストを返す."""
+        pack = paragraph_data["pack"]
+        members = self._pending.setdefault(key, {})
+        self._started.setdefault(key, time.monotonic())
+        members[pack["position"]] = paragraph_data
+        if len(members) < pack["size"]:
+            return None
+        return self.pop(key)
+    
+    def pop(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """揃っていなくてもパックを取り出す（未登録の場合は None）."""
+        members = self._pending.pop(key, None)
+        self._started.pop(key, None)
+        if not members:
+            return None
+        return [members[position] for position in sorted(members)]
+    
+    def expired(self, now: Optional[float] = None) -> List[str]:
+        """max_wait を過ぎても揃っていないパックのキー."""
+        now = time.monotonic() if now is None else now
+        return [key for key, started in self._started.items() if now - started >= self.max_wait]
+    
+    def pending_keys(self) -> List[str]:
+        """揃っていないパックのキー."""
+        return list(self._pending)
+    
+    def pending_count(self) -> int:
+        """揃っていないパックの数."""
+        return len(self._pending)
+
+
+def build_packed_prompt_parts(output_format: str, paragraphs: List[str]) -> PromptParts:
+    """パック用のプロンプトを構築（パラグラフ毎の結果をJSONで返させる）.
+    
+    システムプロンプトはパラグラフ毎の生成と同じフォーマット別のものを使う。
+    パック用の指示部分はフォーマット毎に同一のプレフィックスとし、パラグラフ数と本文は
+    可変サフィックスに置く（プロバイダーのプロンプトキャッシュの対象にする）。
+    """
+    segments = "\n\n".join(
+        f"<paragraph index=\"{idx}\">\n{paragraph}\n</paragraph>"
+        for idx, paragraph in enumerate(paragraphs)
+    )
+    prefix = (
+        f"後に続く各パラグラフについて、{output_format} を個別に生成してください。\n"
+        "パラグラフ同士の内容を混ぜず、次のJSON形式のみで出力してください。\n"
+        '{"items": [{"index": 0, "content": "..."}, ...]}'
+    )
+    if output_format == "script_json":
+        prefix += (
+            "\ncontent には次の形式のオブジェクトを入れてください。\n"
+            '{"scenes": [{"type": "main_content", "narration": "...", '
+            '"visual_elements": ["..."], "duration": 10}]}'
+        )
+    return PromptParts(
+        system=get_prompt_loader().load_system_prompt(output_format),
+        prefix=prefix,
+        suffix=f"パラグラフ数: {len(paragraphs)}\n\n{segments}"
+    )
+
+
+def build_packed_prompt(output_format: str, paragraphs: List[str]) -> str:
+    """パック用のプロンプトを1つの文字列として構築."""
+    return build_packed_prompt_parts(output_format, paragraphs).combined()
+
+
+def response_text(response: Dict[str, Any]) -> str:
+    """APIレスポンスからテキストを取り出す（Claude / OpenAI 形式に対応）."""
+    if isinstance(response.get("text"), str):
+        return response["text"]
+    content = response.get("content")
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    if isinstance(content, str):
+        return content
+    choices = response.get("choices") or []
+    if choices:
+        return choices[0].get("message", {}).get("content") or ""
+    return ""
+
+
+def normalize_script_json(content: Any) -> Dict[str, Any]:
+    """パック生成の script_json をパラグラフ毎の生成と同じ形式（scenes / total_duration）に揃える."""
+    if isinstance(content, str):
+        try:
+            content = json.loads(content)
+        except json.JSONDecodeError:
+            pass
+    if isinstance(content, list):
+        content = {"scenes": content}
+    
+    if isinstance(content, dict) and isinstance(content.get("scenes"), list):
+        raw_scenes = content["scenes"]
+    else:
+        # 構造化されていない場合は本編1シーンとして扱う
+        narration = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+        raw_scenes = [{"narration": narration}]
+    
+    scenes = []
+    for scene_id, scene in enumerate(raw_scenes, 1):
+        if not isinstance(scene, dict):
+            scene = {"narration": str(scene)}
+        narration = str(scene.get("narration", ""))
+        duration = scene.get("duration")
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)):
+            duration = len(narration.split()) * 1.5
+        visual_elements = scene.get("visual_elements")
+        scenes.append({
+            "scene_id": scene_id,
+            "type": str(scene.get("type") or "main_content"),
+            "narration": narration,
+            "visual_elements": list(visual_elements) if isinstance(visual_elements, list) else [],
+            "duration": duration,
+        })
+    return {"scenes": scenes, "total_duration": sum(scene["duration"] for scene in scenes)}
+
+
+def unpack_results(text: str, count: int, output_format: Optional[str] = None) -> List[Any]:
+    """構造化出力をパラグラフ毎の結果に分配.
+    
+    script_json は normalize_script_json で正規化した辞書、
+    それ以外のフォーマットは文字列を返す。
+    
+    Raises:
+        ValueError: 出力が解析できない、またはパラグラフ数と一致しない場合
+    """
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        raise ValueError("No JSON object in packed response")
+    
+    try:
+        items = json.loads(match.group(0)).get("items")
+    except (json.JSONDecodeError, AttributeError) as e:
+        raise ValueError(f"Invalid packed response: {e}") from e
+    
+    if not isinstance(items, list):
+        raise ValueError("Packed response has no items")
+    
+    contents: Dict[int, Any] = {}
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("index"), int):
+            content = item.get("content", "")
+            if output_format == "script_json":
+                contents[item["index"]] = normalize_script_json(content)
+            elif isinstance(content, (dict, list)):
+                contents[item["index"]] = json.dumps(content, ensure_ascii=False)
+            else:
+                contents[item["index"]] = str(content)
+    
+    missing = [idx for idx in range(count) if idx not in contents]
+    if missing:
+        raise ValueError(f"Packed response is missing paragraphs: {missing}")
+    return [contents[idx] for idx in range(count)]
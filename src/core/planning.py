@@ -0,0 +1,273 @@
+"""ワークフローの実行前見積もり.
+
+パーサー・構造解析の段階のみをローカルで実行し、設定された出力フォーマット・
+パッキング・近似重複の再利用・短文の導出・モデルルーティングを適用して、
+生成リクエスト数・トークン数・コスト・所要時間を API を呼ばずに見積もる。
+"""
+
+import math
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.packing import build_packed_prompt
+from ..core.routing import ModelRoute, ModelTier
+from ..utils.logger import get_logger
+from ..workers.ai import AIWorker
+from ..workers.parser import ParserWorker
+
+logger = get_logger(__name__)
+
+_ASCII_RUN = re.compile(r"[\x00-\x7f]+")
+
+
+def count_tokens(text: str) -> int:
+    """トークン数の高速な近似.
+    
+    英数字などの ASCII は約4文字で1トークン、日本語などの非 ASCII 文字は
+    1文字で約1トークンとして数える（トークナイザーを読み込まずに済む概算）。
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(len(run) for run in _ASCII_RUN.findall(text))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+@dataclass
+class FormatEstimate:
+    """出力フォーマット毎の見積もり."""
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+@dataclass
+class WorkflowPlan:
+    """ワークフローの見積もり結果."""
+    lang: str
+    title: str
+    provider: str
+    chapters: int = 0
+    sections: int = 0
+    paragraphs: int = 0
+    packed_paragraphs: int = 0
+    reused_paragraphs: int = 0
+    derived_outputs: int = 0
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0  # max_tokens の合計（上限）
+    cost_usd: float = 0.0
+    concurrency: int = 1
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    wall_clock_seconds: float = 0.0
+    bottleneck: str = "concurrency"
+    formats: Dict[str, FormatEstimate] = field(default_factory=dict)
+    unpriced_models: List[str] = field(default_factory=list)
+    
+    @property
+    def total_tokens(self) -> int:
+        """入力・出力トークンの合計."""
+        return self.input_tokens + self.output_tokens
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換."""
+        data = asdict(self)
+        data["total_tokens"] = self.total_tokens
+        return data
+
+
+class WorkflowPlanner:
+    """ワークフローの実行前見積もり."""
+    
+    # モデル毎の料金（USD / 100万トークン: 入力, 出力）
+    MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+        "claude-3-haiku-20240307": (0.25, 1.25),
+        "claude-3-sonnet-20240229": (3.0, 15.0),
+        "claude-3-opus-20240229": (15.0, 75.0),
+        "gpt-4": (30.0, 60.0),
+        "gpt-4o": (2.5, 10.0),
+        "gpt-4o-mini": (0.15, 0.6),
+    }
+    
+    # システムプロンプト・指示文など、パラグラフ本文以外の入力トークン
+    PROMPT_OVERHEAD_TOKENS = 200
+    
+    # 1リクエストのレイテンシ見込み（固定分 + 出力トークン / 生成速度）
+    BASE_LATENCY_SECONDS = 1.0
+    OUTPUT_TOKENS_PER_SECOND = {
+        ModelTier.SMALL: 150.0,
+        ModelTier.LARGE: 60.0,
+    }
+    
+    def __init__(self, config, provider: str = "claude", concurrency: Optional[int] = None):
+        """初期化.
+        
+        Args:
+            config: 設定（パッキング・重複再利用・導出・ルーティング・レート制限を参照）
+            provider: 見積もり対象のプロバイダー（claude / openai）
+            concurrency: 同時実行数（未指定時は設定から算出）
+        """
+        self.config = config
+        self.provider = provider
+        self.concurrency = concurrency if concurrency and concurrency > 0 else self._configured_concurrency()
+    
+    def _configured_concurrency(self) -> int:
+        """設定上の同時リクエスト数（AIワーカーの並列度と適応的制御の初期値の小さい方）."""
+        workers = getattr(self.config, 'workers', None)
+        counts = getattr(workers, 'counts', None)
+        ai_workers = counts.get("ai", 1) if isinstance(counts, dict) else 1
+        per_worker = getattr(self.config, 'max_concurrent_tasks', 10)
+        concurrency = ai_workers * per_worker if isinstance(per_worker, int) else ai_workers
+        
+        api = getattr(self.config, 'api', None)
+        if getattr(api, 'adaptive_concurrency_enabled', True) is not False:
+            initial = getattr(api, 'concurrency_initial', 4)
+            if isinstance(initial, int):
+                concurrency = min(concurrency, initial)
+        return max(1, concurrency)
+    
+    def _rate_limits(self) -> Tuple[Optional[int], Optional[int]]:
+        """プロバイダーの RPM / TPM."""
+        api = getattr(self.config, 'api', None)
+        rpm = getattr(api, f'{self.provider}_rate_limit', 60)
+        tpm = getattr(api, f'{self.provider}_tokens_per_minute', None)
+        return (
+            rpm if isinstance(rpm, int) and rpm > 0 else None,
+            tpm if isinstance(tpm, int) and tpm > 0 else None
+        )
+    
+    async def plan(self, lang: str, title: str, input_file: Optional[str] = None) -> WorkflowPlan:
+        """入力ファイルを解析して見積もる（未指定時はデフォルトコンテンツ）."""
+        parser = ParserWorker(self.config)
+        if input_file:
+            content = await parser._read_file(input_file)
+        else:
+            content = parser._get_default_content({"title": title})
+        return self.plan_content(content, lang, title, parser=parser)
+    
+    def plan_content(
+        self,
+        content: str,
+        lang: str,
+        title: str,
+        parser: Optional[ParserWorker] = None
+    ) -> WorkflowPlan:
+        """Markdown コンテンツから見積もる.
+        
+        ParserWorker と同じ分割・パッキングを行い、AIWorker と同じ条件で
+        重複再利用・導出・ルーティングを適用して生成リクエストを数える。
+        """
+        parser = parser or ParserWorker(self.config)
+        worker = AIWorker(self.config)
+        generated = [
+            output_format for output_format in worker.GENERATION_FORMATS
+            if not worker.generation_graph.dependencies[output_format]
+        ]
+        derived = len(worker.GENERATION_FORMATS) - len(generated)
+        
+        rpm, tpm = self._rate_limits()
+        plan = WorkflowPlan(
+            lang=lang,
+            title=title,
+            provider=self.provider,
+            concurrency=self.concurrency,
+            requests_per_minute=rpm,
+            tokens_per_minute=tpm,
+            formats={output_format: FormatEstimate() for output_format in generated}
+        )
+        latencies: List[float] = []
+        
+        for chapter_index, chapter in enumerate(parser._split_by_chapters(content)):
+            plan.chapters += 1
+            for section_index, section in enumerate(parser._split_by_sections(chapter["content"])):
+                plan.sections += 1
+                paragraphs = parser._split_by_paragraphs(section["content"])
+                plan.paragraphs += len(paragraphs)
+                
+                for group in parser.packer.pack(paragraphs):
+                    # 近似重複は生成済みの結果を再利用（AIWorker と同じくパック内でも除外）
+                    members = []
+                    for idx in group:
+                        key = f"{chapter_index}-{section_index}-{idx}"
+                        if worker.dedup_index is not None:
+                            if worker.dedup_index.query(paragraphs[idx]) is not None:
+                                plan.reused_paragraphs += 1
+                                continue
+                            worker.dedup_index.add(key, paragraphs[idx])
+                        members.append(paragraphs[idx])
+                    if not members:
+                        continue
+                    
+                    if len(group) > 1:
+                        plan.packed_paragraphs += len(members)
+                    plan.derived_outputs += derived * len(members)
+                    self._add_requests(plan, worker, generated, members, len(group) > 1, latencies)
+        
+        plan.requests = sum(estimate.requests for estimate in plan.formats.values())
+        plan.input_tokens = sum(estimate.input_tokens for estimate in plan.formats.values())
+        plan.output_tokens = sum(estimate.output_tokens for estimate in plan.formats.values())
+        plan.cost_usd = round(sum(estimate.cost_usd for estimate in plan.formats.values()), 6)
+        plan.wall_clock_seconds, plan.bottleneck = self._wall_clock(plan, latencies)
+        
+        logger.info(
+            f"Planned {plan.requests} requests for {plan.paragraphs} paragraphs "
+            f"({plan.total_tokens} tokens, ${plan.cost_usd:.4f}, {plan.wall_clock_seconds:.0f}s)"
+        )
+        return plan
+    
+    def _add_requests(
+        self,
+        plan: WorkflowPlan,
+        worker: AIWorker,
+        formats: List[str],
+        members: List[str],
+        packed: bool,
+        latencies: List[float]
+    ) -> None:
+        """1パラグラフ（またはパック）分の生成リクエストを加算."""
+        content = "\n\n".join(members)
+        routes = worker._route_formats({"content": content}, formats)
+        
+        for output_format in formats:
+            route = routes[output_format]
+            prompt = build_packed_prompt(output_format, members) if packed else content
+            input_tokens = count_tokens(prompt) + self.PROMPT_OVERHEAD_TOKENS
+            
+            estimate = plan.formats[output_format]
+            estimate.requests += 1
+            estimate.input_tokens += input_tokens
+            estimate.output_tokens += route.max_tokens
+            estimate.cost_usd += self._cost(plan, route, input_tokens)
+            latencies.append(
+                self.BASE_LATENCY_SECONDS + route.max_tokens / self.OUTPUT_TOKENS_PER_SECOND[route.tier]
+            )
+    
+    def _cost(self, plan: WorkflowPlan, route: ModelRoute, input_tokens: int) -> float:
+        """1リクエストのコスト（料金表にないモデルは 0 として記録）."""
+        model = route.models.get(self.provider)
+        pricing = self.MODEL_PRICING.get(model)
+        if pricing is None:
+            if model not in plan.unpriced_models:
+                plan.unpriced_models.append(model)
+            return 0.0
+        input_price, output_price = pricing
+        return (input_tokens * input_price + route.max_tokens * output_price) / 1_000_000
+    
+    def _wall_clock(self, plan: WorkflowPlan, latencies: List[float]) -> Tuple[float, str]:
+        """同時実行数・RPM・TPM のうち最も厳しい制約での所要時間."""
+        if not latencies:
+            return 0.0, "none"
+        
+        bounds = {
+            "concurrency": max(sum(latencies) / plan.concurrency, max(latencies)),
+        }
+        if plan.requests_per_minute:
+            bounds["requests_per_minute"] = plan.requests / plan.requests_per_minute * 60
+        if plan.tokens_per_minute:
+            # レート制限器と同じく入力トークン + max_tokens で消費する
+            bounds["tokens_per_minute"] = plan.total_tokens / plan.tokens_per_minute * 60
+        
+        bottleneck = max(bounds, key=bounds.get)
+        return round(bounds[bottleneck], 1), bottleneck
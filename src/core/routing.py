@@ -0,0 +1,154 @@
+"""モデルルーティング.
+
+コンテンツの複雑さ・種類・出力フォーマット・長さから、使用するモデルの
+ティア（小型／大型）と max_tokens を決定する。
+"""
+
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ModelTier(Enum):
+    """モデルのティア."""
+    SMALL = "small"  # 高速・低コスト
+    LARGE = "large"  # 高品質
+
+
+@dataclass
+class ModelRoute:
+    """ルーティング結果."""
+    output_format: str
+    tier: ModelTier
+    max_tokens: int
+    models: Dict[str, str] = field(default_factory=dict)  # プロバイダー名 → モデル名
+    reason: str = ""
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換."""
+        data = asdict(self)
+        data["tier"] = self.tier.value
+        return data
+
+
+class ModelRoutingPolicy:
+    """出力フォーマットとコンテンツ特性に基づくモデルルーティングポリシー."""
+    
+    # 常に小型モデルで十分な短文フォーマット
+    SHORT_FORMATS = {"tweet", "description"}
+    # 品質を優先し常に大型モデルを使うフォーマット
+    QUALITY_FORMATS = {"article"}
+    
+    # フォーマット別の max_tokens（下限, 上限）
+    MAX_TOKENS = {
+        "tweet": (300, 800),
+        "description": (400, 1000),
+        "script": (1000, 3000),
+        "script_json": (1000, 3000),
+        "article": (2000, 4096),
+    }
+    DEFAULT_MAX_TOKENS = (1000, 4096)
+    
+    # 入力1文字あたりの出力トークン見込み（補足説明を加えるため入力より長くなる）
+    OUTPUT_TOKENS_PER_CHAR = {
+        "script": 1.5,
+        "script_json": 1.5,
+        "article": 3.0,
+    }
+    
+    def __init__(self, config=None, metrics=None):
+        """初期化.
+        
+        Args:
+            config: 設定（api.*_model / api.*_small_model を参照）
+            metrics: メトリクスコレクター（ルートを記録）
+        """
+        api = getattr(config, 'api', None)
+        self.enabled = getattr(api, 'model_routing_enabled', True)
+        self.metrics = metrics
+        self.tier_models: Dict[ModelTier, Dict[str, str]] = {
+            ModelTier.SMALL: {
+                "claude": getattr(api, 'claude_small_model', "claude-3-haiku-20240307"),
+                "openai": getattr(api, 'openai_small_model', "gpt-4o-mini"),
+            },
+            ModelTier.LARGE: {
+                "claude": getattr(api, 'claude_model', "claude-3-sonnet-20240229"),
+                "openai": getattr(api, 'openai_model', "gpt-4"),
+            },
+        }
+        self.stats: Dict[str, int] = {}
+    
+    def route(
+        self,
+        output_format: str,
+        content: str,
+        complexity: Optional[str] = None,
+        content_type: Optional[str] = None
+    ) -> ModelRoute:
+        """生成リクエストのルートを決定.
+        
+        Args:
+            output_format: 出力フォーマット（article, script, tweet など）
+            content: 入力コンテンツ
+            complexity: 複雑さ（simple / moderate / complex）
+            content_type: コンテンツタイプ（technical / example / overview / general）
+        
+        Returns:
+            ルーティング結果
+        """
+        tier, reason = self._select_tier(output_format, complexity, content_type)
+        route = ModelRoute(
+            output_format=output_format,
+            tier=tier,
+            max_tokens=self._max_tokens(output_format, content),
+            models=dict(self.tier_models[tier]),
+            reason=reason
+        )
+        self._record(route)
+        return route
+    
+    def _select_tier(
+        self,
+        output_format: str,
+        complexity: Optional[str],
+        content_type: Optional[str]
+    ) -> tuple[ModelTier, str]:
+        """ティアを選択."""
+        if not self.enabled:
+            return ModelTier.LARGE, "routing disabled"
+        if output_format in self.QUALITY_FORMATS:
+            return ModelTier.LARGE, "quality format"
+        if output_format in self.SHORT_FORMATS:
+            return ModelTier.SMALL, "short format"
+        if complexity == "simple" and content_type != "technical":
+            return ModelTier.SMALL, "simple content"
+        return ModelTier.LARGE, f"{complexity or 'unknown'} {content_type or 'content'}"
+    
+    def _max_tokens(self, output_format: str, content: str) -> int:
+        """入力の長さから max_tokens を決定."""
+        lower, upper = self.MAX_TOKENS.get(output_format, self.DEFAULT_MAX_TOKENS)
+        ratio = self.OUTPUT_TOKENS_PER_CHAR.get(output_format)
+        if ratio is None:
+            return lower
+        return int(min(upper, max(lower, len(content) * ratio)))
+    
+    def _record(self, route: ModelRoute) -> None:
+        """ルートを統計・メトリクスに記録."""
+        key = f"{route.output_format}:{route.tier.value}"
+        self.stats[key] = self.stats.get(key, 0) + 1
+        
+        if self.metrics:
+            labels = {"format": route.output_format, "tier": route.tier.value}
+            try:
+                self.metrics.increment_counter("ai.model_route", labels=labels)
+                self.metrics.record_histogram("ai.model_route.max_tokens", route.max_tokens, labels=labels)
+            except Exception as e:
+                logger.debug(f"Failed to record model route metrics: {e}")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """フォーマット・ティア別のルート数を取得."""
+        return dict(self.stats)
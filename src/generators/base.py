@@ -23,7 +23,7 @@ except ImportError:
                 self.workers.max_concurrent_tasks = 10
 
 # プロンプトローダーをインポート
-from ..utils.prompt_loader import get_prompt_loader
+from ..utils.prompt_loader import PromptParts, get_prompt_loader
 
 logger = logging.getLogger(__name__)
 
@@ -176,6 +176,26 @@ class BaseGenerator(ABC):
         generation_type = self.get_generation_type().value
         
         # プロンプト変数を準備
+        prompt_vars = self._build_prompt_vars(request)
+        
+        # プロンプトテンプレートを取得してフォーマット
+        return self.prompt_loader.get_combined_prompt(generation_type, **prompt_vars)
+        
+    def build_prompt_parts(self, request: GenerationRequest) -> PromptParts:
+        """キャッシュ可能なプレフィックスと可変サフィックスに分けてプロンプトを構築.
+        
+        Args:
+            request: 生成リクエスト
+            
+        Returns:
+            分割済みプロンプト（system / prefix / suffix）
+        """
+        generation_type = self.get_generation_type().value
+        prompt_vars = self._build_prompt_vars(request)
+        return self.prompt_loader.get_prompt_parts(generation_type, **prompt_vars)
+        
+    def _build_prompt_vars(self, request: GenerationRequest) -> Dict[str, Any]:
+        """プロンプト変数を準備."""
         prompt_vars = {
             "CHAPTER_TITLE": request.options.get("chapter_title", ""),
             "SECTION_TITLE": request.title,
@@ -188,9 +208,7 @@ class BaseGenerator(ABC):
         
         # リクエストのオプションをマージ
         prompt_vars.update(request.options)
-        
-        # プロンプトテンプレートを取得してフォーマット
-        return self.prompt_loader.get_combined_prompt(generation_type, **prompt_vars)
+        return prompt_vars
             
     def extract_metadata(self, request: GenerationRequest, generated_content: str) -> Dict[str, Any]:
         """生成されたコンテンツからメタデータを抽出.
@@ -5,6 +5,7 @@ import logging
 from typing import Dict, Any, Optional
 
 from .base import BaseGenerator, GenerationType, GenerationRequest, GenerationResult
+from ..utils.prompt_loader import PromptParts
 
 # Config のインポートをオプション化
 try:
@@ -50,11 +51,11 @@ class ScriptGenerator(BaseGenerator):
             )
             
         try:
-            # プロンプトを構築
-            prompt = self.build_prompt(request)
+            # プロンプトを構築（キャッシュ可能なプレフィックスと可変サフィックスに分割）
+            prompt_parts = self.build_prompt_parts(request)
             
             # AI生成を実行
-            script_content = await self._generate_script_content(prompt, request.options)
+            script_content = await self._generate_script_content(prompt_parts, request.options)
             
             # 結果の後処理
             processed_script = self._post_process_script(script_content, request)
@@ -80,16 +81,16 @@ class ScriptGenerator(BaseGenerator):
                 error=str(e)
             )
             
-    async def _generate_script_content(self, prompt: str, options: Dict[str, Any]) -> str:
+    async def _generate_script_content(self, prompt_parts: PromptParts, options: Dict[str, Any]) -> str:
         """AIを使用して台本コンテンツを生成."""
         if not self.ai_client:
             # AI客户端未设置时使用模拟生成
-            return await self._simulate_script_generation(prompt, options)
+            return await self._simulate_script_generation(prompt_parts.combined(), options)
             
         try:
             # AI呼び出し
             response = await self.ai_client.generate(
-                prompt=prompt,
+                **prompt_parts.request_kwargs(),
                 max_tokens=options.get("max_tokens", 2000),
                 temperature=options.get("temperature", 0.7)
             )
@@ -101,7 +102,7 @@ class ScriptGenerator(BaseGenerator):
                 
         except Exception as e:
             logger.warning(f"AI generation failed, using fallback: {e}")
-            return await self._simulate_script_generation(prompt, options)
+            return await self._simulate_script_generation(prompt_parts.combined(), options)
             
     async def _simulate_script_generation(self, prompt: str, options: Dict[str, Any]) -> str:
         """AI生成のシミュレーション（テスト用）."""
@@ -6,6 +6,7 @@ import re
 from typing import Dict, Any, Optional, List
 
 from .base import BaseGenerator, GenerationType, GenerationRequest, GenerationResult
+from ..utils.prompt_loader import PromptParts
 from ..config import Config
 
 logger = logging.getLogger(__name__)
@@ -43,11 +44,11 @@ class TweetGenerator(BaseGenerator):
             )
             
         try:
-            # プロンプトを構築
-            prompt = self.build_prompt(request)
+            # プロンプトを構築（キャッシュ可能なプレフィックスと可変サフィックスに分割）
+            prompt_parts = self.build_prompt_parts(request)
             
             # AI生成を実行
-            tweet_content = await self._generate_tweet_content(prompt, request.options)
+            tweet_content = await self._generate_tweet_content(prompt_parts, request.options)
             
             # 結果の後処理
             processed_tweets = self._post_process_tweets(tweet_content, request)
@@ -73,16 +74,16 @@ class TweetGenerator(BaseGenerator):
                 error=str(e)
             )
             
-    async def _generate_tweet_content(self, prompt: str, options: Dict[str, Any]) -> str:
+    async def _generate_tweet_content(self, prompt_parts: PromptParts, options: Dict[str, Any]) -> str:
         """AIを使用してツイートコンテンツを生成."""
         if not self.ai_client:
             # AI客户端未设置时使用模拟生成
-            return await self._simulate_tweet_generation(prompt, options)
+            return await self._simulate_tweet_generation(prompt_parts.combined(), options)
             
         try:
             # AI呼び出し
             response = await self.ai_client.generate(
-                prompt=prompt,
+                **prompt_parts.request_kwargs(),
                 max_tokens=options.get("max_tokens", 800),
                 temperature=options.get("temperature", 0.8)  # ツイートは創造性を重視
             )
@@ -94,7 +95,7 @@ class TweetGenerator(BaseGenerator):
                 
         except Exception as e:
             logger.warning(f"AI generation failed, using fallback: {e}")
-            return await self._simulate_tweet_generation(prompt, options)
+            return await self._simulate_tweet_generation(prompt_parts.combined(), options)
             
     async def _simulate_tweet_generation(self, prompt: str, options: Dict[str, Any]) -> str:
         """AI生成のシミュレーション（テスト用）."""
@@ -1,6 +1,6 @@
 """データモデル."""
 
-from .content import Content
+from .content import Content, Chapter, Section, Paragraph
 from .workflow import WorkflowContext, WorkflowStatus
 
-__all__ = ["Content", "WorkflowContext", "WorkflowStatus"] 
\ No newline at end of file
+__all__ = ["Content", "Chapter", "Section", "Paragraph", "WorkflowContext", "WorkflowStatus"] 
\ No newline at end of file
@@ -1,23 +1,99 @@
-"""コンテンツモデル."""
+"""コンテンツモデル.
 
-from dataclasses import dataclass
-from typing import Dict, Any, Optional, List
-from pathlib import Path
+本文は共有のソースバッファ上の範囲（start, end）として保持し、
+`content` を参照した時点で初めて文字列を切り出す。
+分割した章・セクション・パラグラフは親と同じバッファを参照するため、
+分割のたびに本文をコピーしない。
+"""
 
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-@dataclass
-class Content:
-    """コンテンツデータモデル."""
+# 空白以外の文字
+_NON_SPACE_PATTERN = re.compile(r'\S')
+
+
+def iter_line_spans(source: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """範囲内の各行の範囲を返す（`text.split('\\n')` と同じ区切り）."""
+    position = start
+    while True:
+        newline = source.find('\n', position, end)
+        if newline < 0:
+            yield position, end
+            return
+        yield position, newline
+        position = newline + 1
+
+
+def split_spans(source: str, start: int, end: int, separator: str) -> Iterator[Tuple[int, int]]:
+    """範囲を区切り文字で分割した各範囲を返す（`text.split(separator)` と同じ区切り）."""
+    position = start
+    while True:
+        found = source.find(separator, position, end)
+        if found < 0:
+            yield position, end
+            return
+        yield position, found
+        position = found + len(separator)
+
+
+def strip_span(source: str, start: int, end: int) -> Tuple[int, int]:
+    """範囲の前後の空白を除いた範囲を返す（空白のみの場合は空の範囲）."""
+    match = _NON_SPACE_PATTERN.search(source, start, end)
+    if match is None:
+        return start, start
+    start = match.start()
+    while end > start and source[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+class TextSpan(ABC):
+    """ソースバッファ上の範囲として本文を保持する基底クラス."""
+    
+    __slots__ = ("_source", "_start", "_end")
+    
+    def _set_span(self, content: Optional[str], source: Optional[str], start: int, end: Optional[int]) -> None:
+        """本文（文字列またはソースバッファ上の範囲）を設定."""
+        if source is None:
+            source = content or ""
+            start, end = 0, len(source)
+        elif end is None:
+            end = len(source)
+        self._source = source
+        self._start = start
+        self._end = end
+    
+    @property
+    def content(self) -> str:
+        """本文（参照のたびにソースバッファから切り出す）."""
+        return self._source[self._start:self._end]
+    
+    @content.setter
+    def content(self, value: str) -> None:
+        """本文を置き換え（以降は独立した文字列を参照）."""
+        self._set_span(value, None, 0, None)
+    
+    @property
+    def source(self) -> str:
+        """共有のソースバッファ."""
+        return self._source
+    
+    @property
+    def start(self) -> int:
+        """ソースバッファ上の開始位置."""
+        return self._start
     
-    title: str
-    content: str
-    content_type: str = "text"
-    metadata: Dict[str, Any] = None
+    @property
+    def end(self) -> int:
+        """ソースバッファ上の終了位置."""
+        return self._end
     
-    def __post_init__(self):
-        """初期化後処理."""
-        if self.metadata is None:
-            self.metadata = {}
+    @property
+    def span(self) -> Tuple[int, int]:
+        """ソースバッファ上の範囲."""
+        return self._start, self._end
     
     @property
     def word_count(self) -> int:
@@ -27,62 +103,273 @@ class Content:
     @property
     def char_count(self) -> int:
         """文字数を取得."""
-        return len(self.content)
+        return self._end - self._start
     
     def is_empty(self) -> bool:
         """コンテンツが空かどうか."""
-        return not self.content or not self.content.strip()
+        return _NON_SPACE_PATTERN.search(self._source, self._start, self._end) is None
+    
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書に変換（等価比較にも使う）."""
+    
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        title = getattr(self, "title", "")
+        return f"{type(self).__name__}(id={self.id!r}, title={title!r}, span={self.span})"
 
 
-@dataclass
-class Chapter:
-    """章モデル."""
+class Content(TextSpan):
+    """コンテンツデータモデル."""
+    
+    __slots__ = ("id", "title", "content_type", "metadata")
+    
+    def __init__(
+        self,
+        title: str = "",
+        content: Optional[str] = None,
+        content_type: str = "text",
+        metadata: Optional[Dict[str, Any]] = None,
+        id: Optional[str] = None,
+        *,
+        source: Optional[str] = None,
+        start: int = 0,
+        end: Optional[int] = None
+    ):
+        """初期化（source を指定した場合は source[start:end] を本文とする）."""
+        self.id = id
+        self.title = title
+        self.content_type = content_type
+        self.metadata = metadata if metadata is not None else {}
+        self._set_span(content, source, start, end)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書に変換（content_type は既定値以外の場合のみ含める）."""
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "content": self.content,
+            "metadata": self.metadata
+        }
+        if self.content_type != "text":
+            data["content_type"] = self.content_type
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Content":
+        """辞書から復元."""
+        return cls(
+            id=data.get("id"),
+            title=data.get("title", ""),
+            content=data.get("content", ""),
+            content_type=data.get("content_type", "text"),
+            metadata=dict(data.get("metadata") or {})
+        )
+
+
+class Paragraph(TextSpan):
+    """パラグラフモデル."""
+    
+    __slots__ = (
+        "id", "index", "title", "section_index", "chapter_index", "content_type",
+        "content_focus", "original_text", "content_sequence", "metadata"
+    )
+    
+    def __init__(
+        self,
+        index: Optional[int] = None,
+        content: Optional[str] = None,
+        section_index: int = 0,
+        chapter_index: int = 0,
+        content_type: str = "text",
+        metadata: Optional[Dict[str, Any]] = None,
+        id: Optional[str] = None,
+        title: str = "",
+        type: Optional[str] = None,
+        order: Optional[int] = None,
+        content_focus: str = "",
+        original_text: str = "",
+        content_sequence: Optional[List[Dict[str, Any]]] = None,
+        *,
+        source: Optional[str] = None,
+        start: int = 0,
+        end: Optional[int] = None
+    ):
+        """初期化（type / order は content_type / index の別名）."""
+        self.id = id
+        self.index = index if index is not None else (order or 0)
+        self.title = title
+        self.section_index = section_index
+        self.chapter_index = chapter_index
+        self.content_type = type if type is not None else content_type
+        self.content_focus = content_focus
+        self.original_text = original_text
+        self.content_sequence = content_sequence if content_sequence is not None else []
+        self.metadata = metadata if metadata is not None else {}
+        self._set_span(content, source, start, end)
+    
+    @property
+    def type(self) -> str:
+        """パラグラフの種類（content_type の別名）."""
+        return self.content_type
+    
+    @property
+    def order(self) -> int:
+        """セクション内の順序（index の別名）."""
+        return self.index
     
-    index: int
-    title: str
-    content: str
-    sections: List['Section'] = None
-    metadata: Dict[str, Any] = None
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書に変換."""
+        return {
+            "id": self.id,
+            "index": self.index,
+            "order": self.index,
+            "title": self.title,
+            "content": self.content,
+            "type": self.content_type,
+            "section_index": self.section_index,
+            "chapter_index": self.chapter_index,
+            "content_focus": self.content_focus,
+            "original_text": self.original_text,
+            "content_sequence": self.content_sequence,
+            "metadata": self.metadata
+        }
     
-    def __post_init__(self):
-        """初期化後処理."""
-        if self.sections is None:
-            self.sections = []
-        if self.metadata is None:
-            self.metadata = {}
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Paragraph":
+        """辞書から復元."""
+        return cls(
+            id=data.get("id"),
+            index=data.get("index", data.get("order")),
+            title=data.get("title", ""),
+            content=data.get("content", ""),
+            content_type=data.get("type", data.get("content_type", "text")),
+            section_index=data.get("section_index", 0),
+            chapter_index=data.get("chapter_index", 0),
+            content_focus=data.get("content_focus", ""),
+            original_text=data.get("original_text", ""),
+            content_sequence=list(data.get("content_sequence") or []),
+            metadata=dict(data.get("metadata") or {})
+        )
 
 
-@dataclass
-class Section:
+class Section(TextSpan):
     """セクションモデル."""
     
-    index: int
-    title: str
-    content: str
-    chapter_index: int
-    paragraphs: List['Paragraph'] = None
-    metadata: Dict[str, Any] = None
+    __slots__ = ("id", "index", "title", "chapter_index", "paragraphs", "learning_objectives", "metadata")
+    
+    def __init__(
+        self,
+        index: int = 0,
+        title: str = "",
+        content: Optional[str] = None,
+        chapter_index: int = 0,
+        paragraphs: Optional[List[Paragraph]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        id: Optional[str] = None,
+        learning_objectives: Optional[List[str]] = None,
+        *,
+        source: Optional[str] = None,
+        start: int = 0,
+        end: Optional[int] = None
+    ):
+        """初期化（source を指定した場合は source[start:end] を本文とする）."""
+        self.id = id
+        self.index = index
+        self.title = title
+        self.chapter_index = chapter_index
+        self.paragraphs = paragraphs if paragraphs is not None else []
+        self.learning_objectives = learning_objectives if learning_objectives is not None else []
+        self.metadata = metadata if metadata is not None else {}
+        self._set_span(content, source, start, end)
+    
+    def add_paragraph(self, paragraph: Paragraph) -> None:
+        """パラグラフを追加."""
+        self.paragraphs.append(paragraph)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書に変換."""
+        return {
+            "id": self.id,
+            "index": self.index,
+            "title": self.title,
+            "content": self.content,
+            "chapter_index": self.chapter_index,
+            "learning_objectives": self.learning_objectives,
+            "paragraphs": [paragraph.to_dict() for paragraph in self.paragraphs],
+            "metadata": self.metadata
+        }
     
-    def __post_init__(self):
-        """初期化後処理."""
-        if self.paragraphs is None:
-            self.paragraphs = []
-        if self.metadata is None:
-            self.metadata = {}
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Section":
+        """辞書から復元."""
+        return cls(
+            id=data.get("id"),
+            index=data.get("index", 0),
+            title=data.get("title", ""),
+            content=data.get("content", ""),
+            chapter_index=data.get("chapter_index", 0),
+            learning_objectives=list(data.get("learning_objectives") or []),
+            paragraphs=[Paragraph.from_dict(paragraph) for paragraph in data.get("paragraphs") or []],
+            metadata=dict(data.get("metadata") or {})
+        )
 
 
-@dataclass
-class Paragraph:
-    """パラグラフモデル."""
+class Chapter(TextSpan):
+    """章モデル."""
+    
+    __slots__ = ("id", "index", "title", "sections", "metadata")
+    
+    def __init__(
+        self,
+        index: int = 0,
+        title: str = "",
+        content: Optional[str] = None,
+        sections: Optional[List[Section]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        id: Optional[str] = None,
+        *,
+        source: Optional[str] = None,
+        start: int = 0,
+        end: Optional[int] = None
+    ):
+        """初期化（source を指定した場合は source[start:end] を本文とする）."""
+        self.id = id
+        self.index = index
+        self.title = title
+        self.sections = sections if sections is not None else []
+        self.metadata = metadata if metadata is not None else {}
+        self._set_span(content, source, start, end)
+    
+    def add_section(self, section: Section) -> None:
+        """セクションを追加."""
+        self.sections.append(section)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書に変換."""
+        return {
+            "id": self.id,
+            "index": self.index,
+            "title": self.title,
+            "content": self.content,
+            "sections": [section.to_dict() for section in self.sections],
+            "metadata": self.metadata
+        }
     
-    index: int
-    content: str
-    section_index: int
-    chapter_index: int
-    content_type: str = "text"
-    metadata: Dict[str, Any] = None
-    
-    def __post_init__(self):
-        """初期化後処理."""
-        if self.metadata is None:
-            self.metadata = {} 
\ No newline at end of file
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Chapter":
+        """辞書から復元."""
+        return cls(
+            id=data.get("id"),
+            index=data.get("index", 0),
+            title=data.get("title", ""),
+            content=data.get("content", ""),
+            sections=[Section.from_dict(section) for section in data.get("sections") or []],
+            metadata=dict(data.get("metadata") or {})
+        )
@@ -6,7 +6,9 @@ import logging
 
 from .base import BaseProcessor, ProcessorType, ProcessingRequest, ProcessingResult
 from ..models import Chapter, Section
+from ..models.content import split_spans, strip_span
 from ..config import Config
+from ..utils.markdown_ast import parse_markdown
 
 logger = logging.getLogger(__name__)
 
@@ -94,59 +96,63 @@ class ChapterProcessor(BaseProcessor):
             return self._split_by_headings(chapter)
             
     def _split_by_headings(self, chapter: Chapter) -> List[Section]:
-        """見出しベースでセクションに分割."""
+        """見出しベースでセクションに分割（本文はソースバッファ上の範囲として共有）."""
         sections = []
-        text = chapter.content
-        
-        # H3以降の見出しで分割
-        section_pattern = r'^(#{3,})\s+(.+)$'
-        lines = text.split('\n')
+        source = chapter.source
         
         current_section = None
-        current_content = []
+        current_start = None
+        current_level = None
         section_index = 0
         
-        for line in lines:
-            match = re.match(section_pattern, line, re.MULTILINE)
-            if match:
-                # 前のセクションを保存
-                if current_section:
-                    sections.append(Section(
-                        title=current_section,
-                        content='\n'.join(current_content),
-                        index=section_index,
-                        chapter_index=chapter.index,
-                        metadata={
-                            "chapter_title": chapter.title,
-                            "heading_level": len(match.group(1))
-                        }
-                    ))
-                    section_index += 1
-                
-                # 新しいセクション開始
-                current_section = match.group(2).strip()
-                current_content = [line]
-            else:
-                current_content.append(line)
+        # H3以降の見出しで分割（コードブロック内の # は見出しにしない）
+        for heading in parse_markdown(source).headings(chapter.start, chapter.end, min_level=3):
+            # 前のセクションを保存（見出し行から次の見出しの直前の改行まで）
+            if current_section:
+                sections.append(Section(
+                    title=current_section,
+                    index=section_index,
+                    chapter_index=chapter.index,
+                    metadata={
+                        "chapter_title": chapter.title,
+                        "heading_level": current_level
+                    },
+                    source=source,
+                    start=current_start,
+                    end=heading.start - 1
+                ))
+                section_index += 1
+            
+            # 新しいセクション開始
+            current_section = heading.title
+            current_start = heading.start
+            current_level = heading.level
         
         # 最後のセクションを保存
-        if current_section and current_content:
+        if current_section:
             sections.append(Section(
                 title=current_section,
-                content='\n'.join(current_content),
                 index=section_index,
                 chapter_index=chapter.index,
-                metadata={"chapter_title": chapter.title}
+                metadata={
+                    "chapter_title": chapter.title,
+                    "heading_level": current_level
+                },
+                source=source,
+                start=current_start,
+                end=chapter.end
             ))
         
         # セクションが見つからない場合は全体を1つのセクションとする
         if not sections:
             sections.append(Section(
                 title=f"{chapter.title} - Section 1",
-                content=chapter.content,
                 index=0,
                 chapter_index=chapter.index,
-                metadata={"chapter_title": chapter.title}
+                metadata={"chapter_title": chapter.title},
+                source=source,
+                start=chapter.start,
+                end=chapter.end
             ))
         
         return sections
@@ -154,44 +160,48 @@ class ChapterProcessor(BaseProcessor):
     def _split_by_length(self, chapter: Chapter, max_length: int) -> List[Section]:
         """長さベースでセクションに分割."""
         sections = []
-        text = chapter.content
         
-        # 段落で分割
-        paragraphs = text.split('\n\n')
-        
-        current_content = []
+        # 段落（空行区切り）を続けて並べた範囲を1セクションとする
+        current_start = None
+        current_end = None
         current_length = 0
         section_index = 0
         
-        for paragraph in paragraphs:
-            paragraph_length = len(paragraph)
+        for paragraph_start, paragraph_end in split_spans(chapter.source, chapter.start, chapter.end, '\n\n'):
+            paragraph_length = paragraph_end - paragraph_start
             
-            if current_length + paragraph_length > max_length and current_content:
+            if current_length + paragraph_length > max_length and current_start is not None:
                 # 現在のセクションを保存
                 sections.append(Section(
                     title=f"{chapter.title} - Section {section_index + 1}",
-                    content='\n\n'.join(current_content),
                     index=section_index,
                     chapter_index=chapter.index,
-                    metadata={"chapter_title": chapter.title}
+                    metadata={"chapter_title": chapter.title},
+                    source=chapter.source,
+                    start=current_start,
+                    end=current_end
                 ))
                 
                 # 新しいセクション開始
-                current_content = [paragraph]
+                current_start = paragraph_start
                 current_length = paragraph_length
                 section_index += 1
             else:
-                current_content.append(paragraph)
+                if current_start is None:
+                    current_start = paragraph_start
                 current_length += paragraph_length
+            current_end = paragraph_end
         
         # 最後のセクションを保存
-        if current_content:
+        if current_start is not None:
             sections.append(Section(
                 title=f"{chapter.title} - Section {section_index + 1}",
-                content='\n\n'.join(current_content),
                 index=section_index,
                 chapter_index=chapter.index,
-                metadata={"chapter_title": chapter.title}
+                metadata={"chapter_title": chapter.title},
+                source=chapter.source,
+                start=current_start,
+                end=current_end
             ))
         
         return sections
@@ -199,24 +209,32 @@ class ChapterProcessor(BaseProcessor):
     def _split_by_paragraphs(self, chapter: Chapter) -> List[Section]:
         """段落ベースでセクションに分割."""
         sections = []
-        text = chapter.content
-        
-        # 空行で段落を分割
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+        source = chapter.source
         
-        for idx, paragraph in enumerate(paragraphs):
-            # 各段落を1つのセクションとする
-            title = self._extract_paragraph_title(paragraph) or f"{chapter.title} - Paragraph {idx + 1}"
+        # 空行で区切る（コードブロック内の空行では区切らない）
+        for block_start, block_end in parse_markdown(source).chunks(chapter.start, chapter.end):
+            # 段落の前後の空白を除く
+            paragraph_start, paragraph_end = strip_span(source, block_start, block_end)
+            if paragraph_start == paragraph_end:
+                continue
+            idx = len(sections)
+            
+            # 各段落を1つのセクションとする（タイトルは最初の行から抽出）
+            first_line_end = source.find('\n', paragraph_start, paragraph_end)
+            first_line = source[paragraph_start:first_line_end if first_line_end >= 0 else paragraph_end]
+            title = self._extract_paragraph_title(first_line) or f"{chapter.title} - Paragraph {idx + 1}"
             
             sections.append(Section(
                 title=title,
-                content=paragraph,
                 index=idx,
                 chapter_index=chapter.index,
                 metadata={
                     "chapter_title": chapter.title,
                     "paragraph_index": idx
-                }
+                },
+                source=source,
+                start=paragraph_start,
+                end=paragraph_end
             ))
         
         return sections
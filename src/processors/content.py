@@ -1,12 +1,13 @@
 """コンテンツ処理器."""
 
-import re
 from typing import List, Dict, Any
 import logging
 
 from .base import BaseProcessor, ProcessorType, ProcessingRequest, ProcessingResult
 from ..models import Content, Chapter
+from ..models.content import split_spans
 from ..config import Config
+from ..utils.markdown_ast import parse_markdown
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +58,7 @@ class ContentProcessor(BaseProcessor):
             metadata = self.extract_metadata(request, chapters)
             metadata.update({
                 "chapter_count": len(chapters),
-                "total_length": len(content.content),
+                "total_length": content.char_count,
                 "split_method": request.options.get("split_method", "heading")
             })
             
@@ -92,45 +93,41 @@ class ContentProcessor(BaseProcessor):
             return self._split_by_headings(content)
             
     def _split_by_headings(self, content: Content) -> List[Chapter]:
-        """見出しベースでチャプターに分割."""
+        """見出しベースでチャプターに分割（本文はソースバッファ上の範囲として共有）."""
         chapters = []
-        text = content.content
-        
-        # H1またはH2見出しで分割
-        chapter_pattern = r'^(#{1,2})\s+(.+)$'
-        lines = text.split('\n')
+        source = content.source
         
         current_chapter = None
-        current_content = []
+        current_start = None
         
-        for line in lines:
-            match = re.match(chapter_pattern, line, re.MULTILINE)
-            if match:
-                # 前のチャプターを保存
-                if current_chapter:
-                    chapters.append(Chapter(
-                        id=f"chapter-{len(chapters)}",
-                        title=current_chapter,
-                        content='\n'.join(current_content),
-                        index=len(chapters),
-                        metadata={"source_title": content.title}
-                    ))
-                
-                # 新しいチャプター開始
-                current_chapter = match.group(2).strip()
-                current_content = [line]
-            else:
-                if current_content:
-                    current_content.append(line)
+        # H1またはH2見出しで分割（コードブロック内の # は見出しにしない）
+        for heading in parse_markdown(source).headings(content.start, content.end, max_level=2):
+            # 前のチャプターを保存（見出し行から次の見出しの直前の改行まで）
+            if current_chapter:
+                chapters.append(Chapter(
+                    id=f"chapter-{len(chapters)}",
+                    title=current_chapter,
+                    index=len(chapters),
+                    metadata={"source_title": content.title},
+                    source=source,
+                    start=current_start,
+                    end=heading.start - 1
+                ))
+            
+            # 新しいチャプター開始
+            current_chapter = heading.title
+            current_start = heading.start
         
         # 最後のチャプターを保存
-        if current_chapter and current_content:
+        if current_chapter:
             chapters.append(Chapter(
                 id=f"chapter-{len(chapters)}",
                 title=current_chapter,
-                content='\n'.join(current_content),
                 index=len(chapters),
-                metadata={"source_title": content.title}
+                metadata={"source_title": content.title},
+                source=source,
+                start=current_start,
+                end=content.end
             ))
         
         # チャプターが見つからない場合は全体を1つのチャプターとする
@@ -138,9 +135,11 @@ class ContentProcessor(BaseProcessor):
             chapters.append(Chapter(
                 id="chapter-0",
                 title=content.title,
-                content=content.content,
                 index=0,
-                metadata={"source_title": content.title}
+                metadata={"source_title": content.title},
+                source=source,
+                start=content.start,
+                end=content.end
             ))
         
         return chapters
@@ -148,44 +147,48 @@ class ContentProcessor(BaseProcessor):
     def _split_by_length(self, content: Content, max_length: int) -> List[Chapter]:
         """長さベースでチャプターに分割."""
         chapters = []
-        text = content.content
-        
-        # 段落で分割
-        paragraphs = text.split('\n\n')
         
-        current_content = []
+        # 段落（空行区切り）を続けて並べた範囲を1チャプターとする
+        current_start = None
+        current_end = None
         current_length = 0
         chapter_index = 0
         
-        for paragraph in paragraphs:
-            paragraph_length = len(paragraph)
+        for paragraph_start, paragraph_end in split_spans(content.source, content.start, content.end, '\n\n'):
+            paragraph_length = paragraph_end - paragraph_start
             
-            if current_length + paragraph_length > max_length and current_content:
+            if current_length + paragraph_length > max_length and current_start is not None:
                 # 現在のチャプターを保存
                 chapters.append(Chapter(
                     id=f"chapter-{chapter_index}",
                     title=f"{content.title} - Part {chapter_index + 1}",
-                    content='\n\n'.join(current_content),
                     index=chapter_index,
-                    metadata={"source_title": content.title}
+                    metadata={"source_title": content.title},
+                    source=content.source,
+                    start=current_start,
+                    end=current_end
                 ))
                 
                 # 新しいチャプター開始
-                current_content = [paragraph]
+                current_start = paragraph_start
                 current_length = paragraph_length
                 chapter_index += 1
             else:
-                current_content.append(paragraph)
+                if current_start is None:
+                    current_start = paragraph_start
                 current_length += paragraph_length
+            current_end = paragraph_end
         
         # 最後のチャプターを保存
-        if current_content:
+        if current_start is not None:
             chapters.append(Chapter(
                 id=f"chapter-{chapter_index}",
                 title=f"{content.title} - Part {chapter_index + 1}",
-                content='\n\n'.join(current_content),
                 index=chapter_index,
-                metadata={"source_title": content.title}
+                metadata={"source_title": content.title},
+                source=content.source,
+                start=current_start,
+                end=current_end
             ))
         
         return chapters 
\ No newline at end of file
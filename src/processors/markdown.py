@@ -12,7 +12,9 @@ import frontmatter
 import yaml
 
 from .base import BaseProcessor, ProcessorType, ProcessingRequest, ProcessingResult
-from ..models.content import Chapter, Content, Paragraph, Section
+from ..models.content import Chapter, Content, Paragraph, Section, iter_line_spans
+from ..utils.asset_scanner import SpanKind, scan_assets
+from ..utils.markdown_ast import BlockType, LineKind, MarkdownDocument, parse_markdown
 from ..utils.validation import validate_markdown_content
 from ..utils.logger import get_logger
 
@@ -159,8 +161,11 @@ class MarkdownProcessor(BaseProcessor):
         """Markdownコンテンツをパース."""
         self.reset()
         
+        # 文書を1回だけ解析し、バリデーションと要素の抽出で共有する
+        document = parse_markdown(content)
+        
         # バリデーション
-        validation_result = validate_markdown_content(content)
+        validation_result = validate_markdown_content(content, document)
         
         # front matterの処理
         try:
@@ -172,9 +177,9 @@ class MarkdownProcessor(BaseProcessor):
             self.front_matter = {}
             self.content_without_frontmatter = content
         
-        # 行ごとに解析
-        lines = self.content_without_frontmatter.split('\n')
-        self._parse_lines(lines)
+        # ブロックごとに解析
+        body_document, body_start = self._body_document(content, document)
+        self._parse_document(body_document, body_start)
         
         return {
             "validation": validation_result,
@@ -189,90 +194,73 @@ class MarkdownProcessor(BaseProcessor):
             "structure": self._build_structure()
         }
     
+    def _body_document(self, content: str, document: MarkdownDocument) -> Tuple[MarkdownDocument, int]:
+        """front matter を除いた本文の解析結果と、その中での本文の開始位置を返す."""
+        body = self.content_without_frontmatter
+        offset = content.rfind(body) if body else -1
+        if offset >= document.body_start and document.is_block_boundary(offset):
+            return document, offset
+        
+        # front matter の判定が解析結果と異なる場合（JSON・TOML の front matter、YAML のエラー）は本文のみを解析
+        return parse_markdown(body, front_matter=False), 0
+    
     def _parse_lines(self, lines: List[str]) -> None:
         """行ごとの解析."""
-        i = 0
-        in_code_block = False
-        current_code_block = None
-        in_table = False
-        current_table = None
+        self._parse_document(parse_markdown('\n'.join(lines), front_matter=False))
+    
+    def _parse_document(self, document: MarkdownDocument, start: int = 0) -> None:
+        """解析済みのブロックから要素を抽出（行番号は start の行を1とする）."""
+        first_line = document.line_index(start)
         
-        while i < len(lines):
-            line = lines[i]
-            line_number = i + 1
+        for block in document.iter_blocks(start):
+            line_number = block.start_line - first_line + 1
             
-            # コードブロックの処理
-            if line.strip().startswith('```'):
-                if not in_code_block:
-                    # コードブロック開始
-                    in_code_block = True
-                    language = line.strip()[3:].strip()
-                    current_code_block = ParsedCodeBlock(
-                        element_type="code_block",
-                        content="",
-                        language=language,
+            if block.type == BlockType.HEADING:
+                # レベル7以上・タイトルが空の見出しは要素にしない
+                if 1 <= block.level <= 6 and block.title:
+                    heading = ParsedHeading(
+                        element_type="heading",
+                        content=block.title,
+                        level=block.level,
                         line_number=line_number
                     )
-                else:
-                    # コードブロック終了
-                    in_code_block = False
-                    if current_code_block:
-                        self.code_blocks.append(current_code_block)
-                        self.elements.append(current_code_block)
-                    current_code_block = None
-                i += 1
-                continue
-            
-            if in_code_block and current_code_block:
-                current_code_block.content += line + "\n"
-                i += 1
-                continue
-            
-            # 見出しの処理
-            if line.strip().startswith('#'):
-                heading = self._parse_heading(line, line_number)
-                if heading:
                     self.headings.append(heading)
                     self.elements.append(heading)
             
-            # テーブルの処理
-            elif '|' in line and line.strip().startswith('|'):
-                if not in_table:
-                    # テーブル開始
-                    in_table = True
-                    current_table = ParsedTable(
-                        element_type="table",
-                        content="",
+            elif block.type == BlockType.CODE:
+                # 閉じていないコードブロックは要素にしない
+                if block.closed:
+                    code_block = ParsedCodeBlock(
+                        element_type="code_block",
+                        content="".join(
+                            document.line(i) + "\n" for i in range(block.start_line + 1, block.end_line - 1)
+                        ),
+                        language=block.language,
                         line_number=line_number
                     )
-                    # ヘッダー行として処理
-                    current_table.headers = self._parse_table_row(line)
-                else:
-                    # テーブル継続
-                    if not line.strip().startswith('|---') and not line.strip().startswith('|-'):
-                        # セパレーター行ではない場合
-                        row = self._parse_table_row(line)
-                        current_table.rows.append(row)
-                        
-                current_table.content += line + "\n"
-                
-            else:
-                # テーブル終了チェック
-                if in_table and current_table:
-                    self.tables.append(current_table)
-                    self.elements.append(current_table)
-                    in_table = False
-                    current_table = None
-                
+                    self.code_blocks.append(code_block)
+                    self.elements.append(code_block)
+            
+            elif block.type == BlockType.TABLE:
+                lines = [document.line(i) for i in range(block.start_line, block.end_line)]
+                table = ParsedTable(
+                    element_type="table",
+                    content="".join(line + "\n" for line in lines),
+                    line_number=line_number
+                )
+                table.headers = self._parse_table_row(lines[0])
+                table.rows = [
+                    self._parse_table_row(line) for line in lines[1:]
+                    if not line.strip().startswith('|-')
+                ]
+                self.tables.append(table)
+                self.elements.append(table)
+            
+            elif block.type != BlockType.FRONT_MATTER:
                 # 画像とリンクの解析
-                self._parse_images_and_links(line, line_number)
-                
-            i += 1
-        
-        # 最後のテーブルが終了していない場合
-        if in_table and current_table:
-            self.tables.append(current_table)
-            self.elements.append(current_table)
+                for i in range(block.start_line, block.end_line):
+                    if document.kinds[i] != LineKind.BLANK:
+                        self._parse_images_and_links(document.line(i), i - first_line + 1)
     
     def _parse_heading(self, line: str, line_number: int) -> Optional[ParsedHeading]:
         """見出しをパース."""
@@ -296,44 +284,31 @@ class MarkdownProcessor(BaseProcessor):
         return cells
     
     def _parse_images_and_links(self, line: str, line_number: int) -> None:
-        """画像とリンクをパース."""
-        # 画像パターン: ![alt](url "title")
-        image_pattern = r'!\[([^\]]*)\]\(([^)]+)(?:\s+"([^"]*)")?\)'
-        for match in re.finditer(image_pattern, line):
-            alt_text = match.group(1)
-            url = match.group(2)
-            title = match.group(3) or ""
-            
-            image = ParsedImage(
-                element_type="image",
-                content=match.group(0),
-                alt_text=alt_text,
-                url=url,
-                title=title,
-                line_number=line_number
-            )
-            self.images.append(image)
-            self.elements.append(image)
-        
-        # リンクパターン: [text](url "title")
-        link_pattern = r'\[([^\]]+)\]\(([^)]+)(?:\s+"([^"]*)")?\)'
-        for match in re.finditer(link_pattern, line):
-            # 画像リンクでない場合のみ
-            if not line[max(0, match.start() - 1):match.start()] == '!':
-                text = match.group(1)
-                url = match.group(2)
-                title = match.group(3) or ""
-                
-                link = ParsedLink(
+        """画像とリンクをパース（1回の走査で出現順に、インラインコード内は除く）."""
+        for span in scan_assets(line, {SpanKind.IMAGE, SpanKind.LINK}):
+            if span.kind == SpanKind.IMAGE:
+                # 画像: ![alt](url "title")
+                element = ParsedImage(
+                    element_type="image",
+                    content=span.text,
+                    alt_text=span.label,
+                    url=span.url,
+                    title=span.title,
+                    line_number=line_number
+                )
+                self.images.append(element)
+            else:
+                # リンク: [text](url "title")
+                element = ParsedLink(
                     element_type="link",
-                    content=match.group(0),
-                    text=text,
-                    url=url,
-                    title=title,
+                    content=span.text,
+                    text=span.label,
+                    url=span.url,
+                    title=span.title,
                     line_number=line_number
                 )
-                self.links.append(link)
-                self.elements.append(link)
+                self.links.append(element)
+            self.elements.append(element)
     
     def _build_structure(self) -> Dict[str, Any]:
         """構造化されたドキュメント情報を構築."""
@@ -341,7 +316,7 @@ class MarkdownProcessor(BaseProcessor):
             "document": {
                 "title": self.front_matter.get("title", ""),
                 "has_front_matter": bool(self.front_matter),
-                "total_lines": len(self.content_without_frontmatter.split('\n')),
+                "total_lines": self.content_without_frontmatter.count('\n') + 1,
                 "total_characters": len(self.content_without_frontmatter)
             },
             "hierarchy": self._build_hierarchy(),
@@ -451,9 +426,9 @@ class MarkdownProcessor(BaseProcessor):
                 }
             ))
         else:
-            # セクションごとにContentを作成
+            # セクションごとにContentを作成（本文は元のテキスト上の範囲として共有）
             content_text = parsed_data["content"]
-            lines = content_text.split('\n')
+            lines = list(iter_line_spans(content_text, 0, len(content_text)))
             
             for i, section in enumerate(sections):
                 start_line = section["start_line"] - 1
@@ -462,12 +437,15 @@ class MarkdownProcessor(BaseProcessor):
                 if i + 1 < len(sections):
                     end_line = sections[i + 1]["start_line"] - 1
                 
-                section_content = '\n'.join(lines[start_line:end_line])
+                section_lines = lines[start_line:end_line]
+                start, end = (section_lines[0][0], section_lines[-1][1]) if section_lines else (0, 0)
                 
                 contents.append(Content(
                     id=f"section-{i}",
                     title=section["title"],
-                    content=section_content,
+                    source=content_text,
+                    start=start,
+                    end=end,
                     metadata={
                         "section_index": i,
                         "level": section["level"],
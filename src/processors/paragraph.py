@@ -1,12 +1,13 @@
 """パラグラフ処理器."""
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import logging
 
 from .base import BaseProcessor, ProcessorType, ProcessingRequest, ProcessingResult
 from ..models import Paragraph
 from ..config import Config
+from ..utils.asset_scanner import SpanKind, scan_assets, splice
 
 logger = logging.getLogger(__name__)
 
@@ -82,20 +83,13 @@ class ParagraphProcessor(BaseProcessor):
         if options.get("normalize_text", True):
             content = self._normalize_text(content)
         
-        # 画像の抽出
-        images = []
-        if options.get("extract_images", True):
-            content, images = self._extract_images(content)
-        
-        # コードブロックの抽出
-        code_blocks = []
-        if options.get("extract_code", True):
-            content, code_blocks = self._extract_code_blocks(content)
-        
-        # リンクの抽出
-        links = []
-        if options.get("extract_links", True):
-            content, links = self._extract_links(content)
+        # 画像・コードブロック・リンクの抽出（1回の走査でまとめて行う）
+        content, images, code_blocks, links = self._extract_assets(
+            content,
+            images=options.get("extract_images", True),
+            code=options.get("extract_code", True),
+            links=options.get("extract_links", True)
+        )
         
         # メタデータの更新
         metadata = paragraph.metadata.copy()
@@ -135,104 +129,72 @@ class ParagraphProcessor(BaseProcessor):
         
         return text
         
-    def _extract_images(self, text: str) -> tuple[str, List[Dict[str, Any]]]:
-        """画像を抽出."""
-        images = []
-        
-        # Markdown画像パターン
-        image_pattern = r'!\[([^\]]*)\]\(([^\)]+)\)'
-        matches = re.finditer(image_pattern, text)
+    def _extract_assets(
+        self,
+        text: str,
+        images: bool = True,
+        code: bool = True,
+        links: bool = True
+    ) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """画像・コードブロック・リンクを1回の走査で抽出し、1回の連結で置換.
         
-        for match in matches:
-            alt_text = match.group(1)
-            url = match.group(2)
-            
-            images.append({
-                "alt_text": alt_text,
-                "url": url,
-                "type": self._detect_image_type(url),
-                "original_markdown": match.group(0)
-            })
-        
-        # 画像タグを除去（または置換）
-        cleaned_text = re.sub(image_pattern, '[画像]', text)
+        コードブロック内の画像・リンクは抽出しない。
         
+        Returns:
+            (置換後のテキスト, 画像, コードブロック, リンク)
+        """
+        extracted_images: List[Dict[str, Any]] = []
+        code_blocks: List[Dict[str, Any]] = []
+        extracted_links: List[Dict[str, Any]] = []
+        replacements = []
+        
+        for span in scan_assets(text):
+            if span.kind == SpanKind.IMAGE and images:
+                extracted_images.append({
+                    "alt_text": span.label,
+                    "url": span.url,
+                    "type": self._detect_image_type(span.url),
+                    "original_markdown": span.text
+                })
+                replacements.append((span.start, span.end, '[画像]'))
+            elif span.kind == SpanKind.FENCED_CODE and code:
+                code_blocks.append({
+                    "language": span.language or "text",
+                    "code": span.body,
+                    "original_markdown": span.text
+                })
+                replacements.append((span.start, span.end, '[コードブロック]'))
+            elif span.kind == SpanKind.INLINE_CODE and code:
+                code_blocks.append({
+                    "language": "inline",
+                    "code": span.body,
+                    "original_markdown": span.text
+                })
+                replacements.append((span.start, span.end, '[コード]'))
+            elif span.kind in (SpanKind.LINK, SpanKind.URL) and links:
+                extracted_links.append({
+                    "text": span.label,
+                    "url": span.url,
+                    "type": self._detect_link_type(span.url),
+                    "original_markdown": span.text
+                })
+                replacements.append((span.start, span.end, span.label if span.kind == SpanKind.LINK else '[リンク]'))
+        
+        return splice(text, replacements), extracted_images, code_blocks, extracted_links
+        
+    def _extract_images(self, text: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """画像を抽出."""
+        cleaned_text, images, _, _ = self._extract_assets(text, images=True, code=False, links=False)
         return cleaned_text, images
         
-    def _extract_code_blocks(self, text: str) -> tuple[str, List[Dict[str, Any]]]:
+    def _extract_code_blocks(self, text: str) -> Tuple[str, List[Dict[str, Any]]]:
         """コードブロックを抽出."""
-        code_blocks = []
-        
-        # フェンスコードブロック
-        fence_pattern = r'```(\w+)?\n(.*?)\n```'
-        matches = re.finditer(fence_pattern, text, re.DOTALL)
-        
-        for match in matches:
-            language = match.group(1) or "text"
-            code = match.group(2)
-            
-            code_blocks.append({
-                "language": language,
-                "code": code,
-                "original_markdown": match.group(0)
-            })
-        
-        # インラインコード
-        inline_pattern = r'`([^`]+)`'
-        inline_matches = re.finditer(inline_pattern, text)
-        
-        for match in inline_matches:
-            code = match.group(1)
-            
-            code_blocks.append({
-                "language": "inline",
-                "code": code,
-                "original_markdown": match.group(0)
-            })
-        
-        # コードブロックを除去（または置換）
-        cleaned_text = re.sub(fence_pattern, '[コードブロック]', text, flags=re.DOTALL)
-        cleaned_text = re.sub(inline_pattern, '[コード]', cleaned_text)
-        
+        cleaned_text, _, code_blocks, _ = self._extract_assets(text, images=False, code=True, links=False)
         return cleaned_text, code_blocks
         
-    def _extract_links(self, text: str) -> tuple[str, List[Dict[str, Any]]]:
+    def _extract_links(self, text: str) -> Tuple[str, List[Dict[str, Any]]]:
         """リンクを抽出."""
-        links = []
-        
-        # Markdownリンク
-        link_pattern = r'\[([^\]]+)\]\(([^\)]+)\)'
-        matches = re.finditer(link_pattern, text)
-        
-        for match in matches:
-            text_part = match.group(1)
-            url = match.group(2)
-            
-            links.append({
-                "text": text_part,
-                "url": url,
-                "type": self._detect_link_type(url),
-                "original_markdown": match.group(0)
-            })
-        
-        # 直接URL
-        url_pattern = r'https?://[^\s]+'
-        url_matches = re.finditer(url_pattern, text)
-        
-        for match in url_matches:
-            url = match.group(0)
-            
-            links.append({
-                "text": url,
-                "url": url,
-                "type": self._detect_link_type(url),
-                "original_markdown": url
-            })
-        
-        # リンクを除去（または置換）
-        cleaned_text = re.sub(link_pattern, r'\1', text)
-        cleaned_text = re.sub(url_pattern, '[リンク]', cleaned_text)
-        
+        cleaned_text, _, _, links = self._extract_assets(text, images=False, code=False, links=True)
         return cleaned_text, links
         
     def _detect_image_type(self, url: str) -> str:
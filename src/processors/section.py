@@ -6,7 +6,9 @@ import logging
 
 from .base import BaseProcessor, ProcessorType, ProcessingRequest, ProcessingResult
 from ..models import Section, Paragraph
+from ..models.content import strip_span
 from ..config import Config
+from ..utils.markdown_ast import parse_markdown
 
 logger = logging.getLogger(__name__)
 
@@ -94,29 +96,33 @@ class SectionProcessor(BaseProcessor):
             return self._split_by_empty_lines(section)
             
     def _split_by_empty_lines(self, section: Section) -> List[Paragraph]:
-        """空行ベースでパラグラフに分割."""
+        """空行ベースでパラグラフに分割（本文はソースバッファ上の範囲として共有）."""
         paragraphs = []
-        text = section.content
+        source = section.source
         
-        # 空行で分割
-        paragraph_texts = [p.strip() for p in text.split('\n\n') if p.strip()]
+        # 空行で分割（コードブロック内の空行では区切らない）
+        spans = (strip_span(source, start, end) for start, end in parse_markdown(source).chunks(section.start, section.end))
+        blocks = [(start, end) for start, end in spans if start != end]
         
-        for idx, paragraph_text in enumerate(paragraph_texts):
+        for idx, (start, end) in enumerate(blocks):
             # 見出し行を除外するかチェック
-            if self._is_heading(paragraph_text):
+            if self._is_heading_span(source, start, end):
                 continue
                 
-            paragraphs.append(Paragraph(
-                content=paragraph_text,
+            paragraph = Paragraph(
                 index=idx,
                 section_index=section.index,
                 chapter_index=section.chapter_index,
-                metadata={
-                    "section_title": section.title,
-                    "word_count": len(paragraph_text.split()),
-                    "char_count": len(paragraph_text)
-                }
-            ))
+                source=source,
+                start=start,
+                end=end
+            )
+            paragraph.metadata = {
+                "section_title": section.title,
+                "word_count": paragraph.word_count,
+                "char_count": paragraph.char_count
+            }
+            paragraphs.append(paragraph)
         
         return paragraphs
         
@@ -225,14 +231,16 @@ class SectionProcessor(BaseProcessor):
         
     def _is_heading(self, text: str) -> bool:
         """テキストが見出しかどうかを判定."""
-        text = text.strip()
+        return self._is_heading_span(text, *strip_span(text, 0, len(text)))
         
+    def _is_heading_span(self, source: str, start: int, end: int) -> bool:
+        """ソースバッファ上の範囲（前後の空白を除いたもの）が見出しかどうかを判定."""
         # Markdown見出し
-        if text.startswith('#'):
+        if source.startswith('#', start, end):
             return True
             
         # 短すぎる行は見出しの可能性が高い
-        if len(text) < 50 and not text.endswith(('。', '.', '!', '?')):
+        if end - start < 50 and not source.endswith(('。', '.', '!', '?'), start, end):
             return True
             
         return False
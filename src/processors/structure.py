@@ -8,9 +8,13 @@ from dataclasses import dataclass
 from .base import BaseProcessor, ProcessorType, ProcessingRequest, ProcessingResult
 from ..models import Content, Chapter, Section, Paragraph
 from ..config import Config
+from ..utils.markdown_ast import BlockType, parse_markdown
 
 logger = logging.getLogger(__name__)
 
+# リストの項目（- * + または 1. 1) で始まる行）
+LIST_ITEM_PATTERN = re.compile(r'(?:([-*+])|\d{1,9}[.)])(?:\s+|$)')
+
 
 @dataclass
 class StructureElement:
@@ -118,58 +122,37 @@ class StructureProcessor(BaseProcessor):
             return self._analyze_markdown_structure(text, title)
             
     def _analyze_markdown_structure(self, text: str, title: str) -> DocumentStructure:
-        """Markdown文書の構造を解析."""
+        """Markdown文書の構造を解析（parse_markdown のブロックから要素を構築）."""
         elements = []
-        lines = text.split('\n')
+        document = parse_markdown(text)
         
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+        for block in document.iter_blocks():
+            lines = [document.line(i) for i in range(block.start_line, block.end_line)]
             
-            if not line:
-                i += 1
-                continue
-                
             # 見出し
-            if line.startswith('#'):
-                element = self._parse_heading(line)
-                elements.append(element)
+            if block.type == BlockType.HEADING:
+                elements.append(self._parse_heading(lines[0].strip()))
                 
             # コードブロック
-            elif line.startswith('```'):
-                code_element, skip_lines = self._parse_code_block(lines, i)
-                elements.append(code_element)
-                i += skip_lines
+            elif block.type == BlockType.CODE:
+                elements.append(self._parse_code_block(lines, 0)[0])
                 
             # リスト
-            elif line.startswith(('-', '*', '+')):
-                list_element, skip_lines = self._parse_list(lines, i)
-                elements.append(list_element)
-                i += skip_lines
+            elif block.type == BlockType.LIST:
+                elements.append(self._parse_list(lines, 0)[0])
                 
             # 画像
-            elif line.startswith('!['):
-                element = self._parse_image(line)
-                elements.append(element)
+            elif block.type == BlockType.IMAGE:
+                elements.append(self._parse_image(lines[0].strip()))
                 
             # テーブル
-            elif '|' in line:
-                table_element, skip_lines = self._parse_table(lines, i)
-                if table_element:
-                    elements.append(table_element)
-                    i += skip_lines
-                else:
-                    # 通常の段落として処理
-                    element = self._parse_paragraph(line)
-                    elements.append(element)
-                    
-            # 通常の段落
-            else:
-                paragraph_element, skip_lines = self._parse_paragraph_block(lines, i)
-                elements.append(paragraph_element)
-                i += skip_lines
+            elif block.type == BlockType.TABLE:
+                table_element, _ = self._parse_table(lines, 0)
+                elements.append(table_element)
                 
-            i += 1
+            # 通常の段落（front matter は要素にしない）
+            elif block.type == BlockType.PARAGRAPH:
+                elements.append(self._build_paragraph([line.strip() for line in lines]))
         
         # 階層構造の構築
         hierarchy = self._build_hierarchy(elements)
@@ -236,16 +219,21 @@ class StructureProcessor(BaseProcessor):
         list_items = []
         i = start
         
+        list_type = "unordered"
+        
         while i < len(lines):
             line = lines[i].strip()
             if not line:
                 i += 1
                 continue
-            if not line.startswith(('-', '*', '+')):
+            match = LIST_ITEM_PATTERN.match(line)
+            if not match:
                 break
+            if not list_items and not match.group(1):
+                list_type = "ordered"
                 
             # リストアイテムの内容を抽出
-            item_content = line[1:].strip()
+            item_content = line[match.end():].strip()
             list_items.append(item_content)
             i += 1
             
@@ -255,7 +243,7 @@ class StructureProcessor(BaseProcessor):
             content='\n'.join(list_items),
             metadata={
                 "item_count": len(list_items),
-                "list_type": "unordered"
+                "list_type": list_type
             }
         ), i - start - 1
         
@@ -347,6 +335,10 @@ class StructureProcessor(BaseProcessor):
             else:
                 break
                 
+        return self._build_paragraph(paragraph_lines), i - start - 1
+        
+    def _build_paragraph(self, paragraph_lines: List[str]) -> StructureElement:
+        """行を連結して段落の要素を作成."""
         content = ' '.join(paragraph_lines)
         
         return StructureElement(
@@ -358,7 +350,7 @@ class StructureProcessor(BaseProcessor):
                 "char_count": len(content),
                 "line_count": len(paragraph_lines)
             }
-        ), i - start - 1
+        )
         
     def _is_special_line(self, line: str) -> bool:
         """特殊な行（見出し、リスト等）かどうかを判定."""
@@ -4,7 +4,7 @@ from .logger import get_logger, setup_logging
 from .cache import LRUCache
 from .validation import validate_markdown_content, validate_file_path
 from .retry import retry_async, RetryConfig
-from .prompt_loader import PromptLoader, get_prompt_loader
+from .prompt_loader import PromptLoader, PromptParts, get_prompt_loader
 
 __all__ = [
     "get_logger",
@@ -15,5 +15,6 @@ __all__ = [
     "retry_async",
     "RetryConfig",
     "PromptLoader",
+    "PromptParts",
     "get_prompt_loader"
 ] 
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""埋め込みアセットのシングルパス走査.
+
+フェンスコードブロック・インラインコード・インライン SVG・画像・リンク・URL を
+1つにまとめた正規表現で先頭から1回だけ走査し、種類とオフセット付きのスパンを返す。
+アセットの種類や参照の数に関係なく走査は1回で済み、置換もスパンを使った
+1回の連結で行う（参照毎の str.replace を繰り返さない）。
+コードブロック内の画像・リンクは拾わない。
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+
+class SpanKind(str, Enum):
+    """スパンの種類."""
+    FENCED_CODE = "fenced_code"
+    INLINE_CODE = "inline_code"
+    SVG = "svg"
+    IMAGE = "image"
+    LINK = "link"
+    URL = "url"
+
+
+# 同じ位置では上から順に試す（コード > SVG > 画像 > リンク > URL）
+_ASSET_PATTERN = re.compile(
+    r"(?P<fence>```(?P<fence_lang>[\w+#.-]+)?[ \t]*\n(?s:(?P<fence_body>.*?))\n```)"
+    r"|(?P<inline>`(?P<inline_body>[^`]+)`)"
+    r"|(?P<svg>(?s:<svg[^>]*>.*?</svg>))"
+    r"|(?P<image>!\[(?P<image_label>[^\]]*)\]\((?P<image_url>[^)]+?)(?:\s+\"(?P<image_title>[^\"]*)\")?\))"
+    r"|(?P<link>\[(?P<link_label>[^\]]+)\]\((?P<link_url>[^)]+?)(?:\s+\"(?P<link_title>[^\"]*)\")?\))"
+    r"|(?P<url>https?://[^\s]+)"
+)
+
+
+@dataclass(frozen=True)
+class AssetSpan:
+    """走査で見つかったアセット.
+    
+    text は元テキストの text[start:end]。body はコードブロック・インラインコードの中身、
+    label は画像の代替テキスト・リンクのテキスト。
+    """
+    kind: SpanKind
+    start: int
+    end: int
+    text: str
+    body: str = ""
+    language: str = ""
+    url: str = ""
+    label: str = ""
+    title: str = ""
+
+
+def _to_span(match: "re.Match[str]") -> AssetSpan:
+    """マッチをスパンに変換."""
+    group = match.lastgroup
+    start, end = match.span()
+    text = match.group(0)
+    if group == "fence":
+        return AssetSpan(
+            SpanKind.FENCED_CODE, start, end, text,
+            body=match.group("fence_body"), language=match.group("fence_lang") or ""
+        )
+    if group == "inline":
+        return AssetSpan(SpanKind.INLINE_CODE, start, end, text, body=match.group("inline_body"))
+    if group == "svg":
+        return AssetSpan(SpanKind.SVG, start, end, text, body=text)
+    if group == "image":
+        return AssetSpan(
+            SpanKind.IMAGE, start, end, text,
+            url=match.group("image_url"), label=match.group("image_label"),
+            title=match.group("image_title") or ""
+        )
+    if group == "link":
+        return AssetSpan(
+            SpanKind.LINK, start, end, text,
+            url=match.group("link_url"), label=match.group("link_label"),
+            title=match.group("link_title") or ""
+        )
+    return AssetSpan(SpanKind.URL, start, end, text, url=text, label=text)
+
+
+def iter_assets(text: str, kinds: Optional[Set[SpanKind]] = None) -> Iterator[AssetSpan]:
+    """テキストを1回走査してスパンを出現順に返す.
+    
+    Args:
+        text: 対象のテキスト
+        kinds: 返す種類（未指定時はすべて）。指定外の種類も走査では認識されるため、
+            例えばコードブロック内のリンクは kinds に関係なく返らない
+    """
+    for match in _ASSET_PATTERN.finditer(text):
+        span = _to_span(match)
+        if kinds is None or span.kind in kinds:
+            yield span
+
+
+def scan_assets(text: str, kinds: Optional[Set[SpanKind]] = None) -> List[AssetSpan]:
+    """テキストを1回走査してスパンのリストを返す."""
+    return list(iter_assets(text, kinds))
+
+
+Replacement = Union[Tuple[int, int, str], AssetSpan]
+
+
+def splice(
+    text: str,
+    replacements: Iterable[Replacement],
+    replace: Optional[Callable[[AssetSpan], Optional[str]]] = None
+) -> str:
+    """スパンの位置を置換した文字列を1回の連結で作る.
+    
+    Args:
+        text: 元のテキスト
+        replacements: (開始, 終了, 置換後) または AssetSpan（replace で置換後を決める）
+        replace: AssetSpan の置換後の文字列を返す関数（None を返したスパンはそのまま残す）
+    
+    重なるスパンは先に始まるものを優先する。
+    """
+    edits: List[Tuple[int, int, str]] = []
+    for item in replacements:
+        if isinstance(item, AssetSpan):
+            value = replace(item) if replace else None
+            if value is not None:
+                edits.append((item.start, item.end, value))
+        else:
+            edits.append(item)
+    if not edits:
+        return text
+    
+    edits.sort(key=lambda edit: edit[0])
+    parts: List[str] = []
+    position = 0
+    for start, end, value in edits:
+        if start < position:
+            continue
+        parts.append(text[position:start])
+        parts.append(value)
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
+
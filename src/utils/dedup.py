@@ -0,0 +1,229 @@
+"""近似重複検出.
+
+正規化したテキストの文字シングルから MinHash シグネチャを計算し、
+LSH（バンド分割）で近似重複の候補を高速に検索する。
+NumPy が利用できる場合はシグネチャ計算をベクトル化する。
+"""
+
+import random
+import re
+import unicodedata
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, Hashable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+K = TypeVar('K', bound=Hashable)
+
+# ハッシュ族 h(x) = (a * x + b) mod p（a, x < 2^31 のため 64bit に収まる）
+_MERSENNE_PRIME = (1 << 31) - 1
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """比較用にテキストを正規化（全半角統一・小文字化・記号と空白の除去）.
+    
+    数字は内容の違い（バージョン・数値・手順番号など）を表すため保持する。
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _PUNCTUATION.sub("", text)
+    return _WHITESPACE.sub("", text)
+
+
+def shingles(text: str, size: int = 3) -> Set[int]:
+    """文字 n-gram シングルのハッシュ集合（日本語は空白で分かち書きされないため文字単位）."""
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8")) % _MERSENNE_PRIME} if text else set()
+    return {
+        zlib.crc32(text[i:i + size].encode("utf-8")) % _MERSENNE_PRIME
+        for i in range(len(text) - size + 1)
+    }
+
+
+class MinHasher:
+    """MinHash シグネチャ計算器."""
+    
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        """初期化.
+        
+        Args:
+            num_perm: ハッシュ関数（シグネチャ長）の数
+            seed: ハッシュ係数の乱数シード（インデックス内で一定である必要がある）
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._a = [rng.randrange(1, _MERSENNE_PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _MERSENNE_PRIME) for _ in range(num_perm)]
+        if NUMPY_AVAILABLE:
+            self._a_array = np.array(self._a, dtype=np.uint64)[:, None]
+            self._b_array = np.array(self._b, dtype=np.uint64)[:, None]
+    
+    def signature(self, hashes: Set[int]) -> Tuple[int, ...]:
+        """シングルのハッシュ集合から MinHash シグネチャを計算."""
+        if not hashes:
+            return tuple([_MERSENNE_PRIME] * self.num_perm)
+        
+        if NUMPY_AVAILABLE:
+            values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))[None, :]
+            permuted = (self._a_array * values + self._b_array) % _MERSENNE_PRIME
+            return tuple(int(v) for v in permuted.min(axis=1))
+        
+        return tuple(
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+
+
+def estimate_similarity(left: Sequence[int], right: Sequence[int]) -> float:
+    """シグネチャから Jaccard 類似度を推定."""
+    if not left or len(left) != len(right):
+        return 0.0
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+@dataclass
+class DuplicateMatch(Generic[K]):
+    """近似重複の検索結果."""
+    key: K
+    similarity: float
+    payload: Any
+
+
+class NearDuplicateIndex(Generic[K]):
+    """MinHash/LSH による近似重複インデックス.
+    
+    シグネチャを bands 個のバンドに分割し、いずれかのバンドが一致したものを候補とする。
+    候補はシグネチャの一致率（推定 Jaccard 類似度）で絞り込む。
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3,
+        min_length: int = 20,
+        max_entries: int = 10000,
+        seed: int = 1
+    ):
+        """初期化.
+        
+        Args:
+            threshold: 近似重複とみなす類似度の下限
+            num_perm: MinHash のハッシュ関数の数
+            bands: LSH のバンド数（num_perm を割り切れること）
+            shingle_size: シングルの文字数
+            min_length: これより短い正規化テキストは対象外（誤検出防止）
+            max_entries: 保持する最大エントリ数（古いものから削除）
+            seed: ハッシュ係数の乱数シード
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_length = min_length
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm, seed)
+        
+        self._entries: "OrderedDict[K, Tuple[Tuple[int, ...], Any]]" = OrderedDict()
+        self._buckets: List[Dict[Tuple[int, ...], Set[K]]] = [{} for _ in range(bands)]
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "skipped_short": 0,
+            "candidates": 0,
+        }
+    
+    def _signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        """テキストのシグネチャ（対象外の場合は None）."""
+        normalized = normalize_text(text)
+        if len(normalized) < self.min_length:
+            return None
+        return self.hasher.signature(shingles(normalized, self.shingle_size))
+    
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """シグネチャをバンドに分割."""
+        return [
+            signature[band * self.rows:(band + 1) * self.rows]
+            for band in range(self.bands)
+        ]
+    
+    def add(self, key: K, text: str, payload: Any = None) -> bool:
+        """テキストを登録.
+        
+        Returns:
+            登録したか（短すぎるテキストは登録しない）
+        """
+        signature = self._signature(text)
+        if signature is None:
+            return False
+        
+        if key in self._entries:
+            self.remove(key)
+        
+        self._entries[key] = (signature, payload)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, set()).add(key)
+        
+        while len(self._entries) > self.max_entries:
+            self.remove(next(iter(self._entries)))
+        return True
+    
+    def remove(self, key: K) -> None:
+        """エントリを削除."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band, band_key in enumerate(self._band_keys(entry[0])):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+    
+    def query(self, text: str) -> Optional[DuplicateMatch[K]]:
+        """最も類似度の高い近似重複を検索（閾値未満の場合は None）."""
+        self.stats["lookups"] += 1
+        signature = self._signature(text)
+        if signature is None:
+            self.stats["skipped_short"] += 1
+            return None
+        
+        candidates: Set[K] = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        self.stats["candidates"] += len(candidates)
+        
+        best: Optional[DuplicateMatch[K]] = None
+        for key in candidates:
+            candidate_signature, payload = self._entries[key]
+            similarity = estimate_similarity(signature, candidate_signature)
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = DuplicateMatch(key, similarity, payload)
+        
+        if best is not None:
+            self.stats["hits"] += 1
+            self._entries.move_to_end(best.key)
+        return best
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得."""
+        stats = self.stats.copy()
+        stats["entries"] = len(self._entries)
+        stats["numpy"] = NUMPY_AVAILABLE
+        return stats
@@ -0,0 +1,261 @@
+"""コンテンツアドレス型のディスクキャッシュ.
+
+キー（内容のハッシュ）の先頭文字でディレクトリをシャーディングしてバイナリを保存する。
+書き込みは一時ファイルからのリネームで原子的に行い、合計バイト数が上限を超えたら
+最終アクセスの古いものから削除する（バイトサイズ基準の LRU）。
+エントリ毎に JSON のメタデータ（アップロード先など）を付けられる。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+_DATA_SUFFIX = ".bin"
+_META_SUFFIX = ".json"
+
+
+def content_key(*parts: Any) -> str:
+    """キーの構成要素から SHA-256 のキーを生成（辞書は順序に依存しない）."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """シャーディング・原子的書き込み・バイトサイズ LRU のディスクキャッシュ."""
+    
+    _shared: Dict[str, "DiskCache"] = {}
+    _shared_lock = RLock()
+    
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        """初期化.
+        
+        Args:
+            directory: 保存先ディレクトリ
+            max_bytes: データの合計バイト数の上限
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = RLock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # キー → バイト数（古い順）
+        self._total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._load_index()
+    
+    @classmethod
+    def shared(cls, directory: str, max_bytes: int = 512 * 1024 * 1024) -> "DiskCache":
+        """ディレクトリ毎に共有するキャッシュを取得（インデックスをプロセス内で一貫させる）."""
+        key = str(Path(directory).resolve())
+        with cls._shared_lock:
+            cache = cls._shared.get(key)
+            if cache is None:
+                cache = cls._shared[key] = cls(directory, max_bytes)
+            return cache
+    
+    def _load_index(self) -> None:
+        """既存のエントリを最終アクセス順に読み込む."""
+        if not self.directory.exists():
+            return
+        entries = []
+        for path in self.directory.glob(f"*/*/*{_DATA_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._evict()
+    
+    def _path(self, key: str, suffix: str = _DATA_SUFFIX) -> Path:
+        """エントリのパス（先頭4文字で2階層にシャーディング）."""
+        return self.directory / key[:2] / key[2:4] / f"{key}{suffix}"
+    
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        """同じディレクトリの一時ファイルに書いてからリネーム."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """データを取得（ヒット時は最終アクセス時刻を更新）."""
+        with self._lock:
+            if key not in self._index:
+                self.stats["misses"] += 1
+                return None
+            path = self._path(key)
+            try:
+                data = path.read_bytes()
+                now = time.time()
+                os.utime(path, (now, now))
+            except OSError:
+                self._forget(key)
+                self.stats["misses"] += 1
+                return None
+            self._index.move_to_end(key)
+            self.stats["hits"] += 1
+            return data
+    
+    def put(self, key: str, data: bytes, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """データを保存（メタデータは任意）."""
+        with self._lock:
+            try:
+                self._write_atomic(self._path(key), data)
+                if metadata is not None:
+                    self._write_metadata(key, metadata)
+            except OSError as e:
+                logger.warning(f"Failed to write cache entry {key[:12]}: {e}")
+                return
+            self._total_bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self.stats["writes"] += 1
+            self._evict()
+    
+    def get_path(self, key: str) -> Optional[Path]:
+        """データファイルのパスを取得（mmap などで直接読む場合。ヒット時は最終アクセス時刻を更新）."""
+        with self._lock:
+            if key not in self._index:
+                self.stats["misses"] += 1
+                return None
+            path = self._path(key)
+            try:
+                now = time.time()
+                os.utime(path, (now, now))
+            except OSError:
+                self._forget(key)
+                self.stats["misses"] += 1
+                return None
+            self._index.move_to_end(key)
+            self.stats["hits"] += 1
+            return path
+    
+    def temp_file(self) -> str:
+        """put_file に渡す一時ファイルを作成（リネームできるようキャッシュと同じファイルシステム上）."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        return temp_path
+    
+    def put_file(self, key: str, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """書き込み済みのファイルをエントリとして移動（大きなデータをメモリに載せずに保存）.
+        
+        Returns:
+            保存したか（失敗した場合はファイルを削除して False）
+        """
+        with self._lock:
+            path = self._path(key)
+            try:
+                size = os.path.getsize(file_path)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(file_path, path)
+                if metadata is not None:
+                    self._write_metadata(key, metadata)
+            except OSError as e:
+                logger.warning(f"Failed to write cache entry {key[:12]}: {e}")
+                try:
+                    os.unlink(file_path)
+                except OSError:
+                    pass
+                return False
+            self._total_bytes += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self.stats["writes"] += 1
+            self._evict()
+            return True
+    
+    def get_metadata(self, key: str) -> Dict[str, Any]:
+        """メタデータを取得（ない場合は空の辞書）."""
+        with self._lock:
+            if key not in self._index:
+                return {}
+            try:
+                return json.loads(self._path(key, _META_SUFFIX).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return {}
+    
+    def update_metadata(self, key: str, **values: Any) -> bool:
+        """メタデータを更新.
+        
+        Returns:
+            更新したか（エントリがない場合は False）
+        """
+        with self._lock:
+            if key not in self._index:
+                return False
+            metadata = self.get_metadata(key)
+            metadata.update(values)
+            try:
+                self._write_metadata(key, metadata)
+            except OSError as e:
+                logger.warning(f"Failed to write cache metadata {key[:12]}: {e}")
+                return False
+            return True
+    
+    def _write_metadata(self, key: str, metadata: Dict[str, Any]) -> None:
+        """メタデータを書き込み."""
+        payload = json.dumps(metadata, ensure_ascii=False, default=str).encode("utf-8")
+        self._write_atomic(self._path(key, _META_SUFFIX), payload)
+    
+    def delete(self, key: str) -> bool:
+        """エントリを削除."""
+        with self._lock:
+            if key not in self._index:
+                return False
+            self._forget(key)
+            return True
+    
+    def _forget(self, key: str) -> None:
+        """インデックスとファイルからエントリを削除."""
+        self._total_bytes -= self._index.pop(key, 0)
+        for suffix in (_DATA_SUFFIX, _META_SUFFIX):
+            try:
+                self._path(key, suffix).unlink()
+            except OSError:
+                pass
+    
+    def _evict(self) -> None:
+        """上限を超えた分を最終アクセスの古い順に削除."""
+        while self._total_bytes > self.max_bytes and self._index:
+            self._forget(next(iter(self._index)))
+            self.stats["evictions"] += 1
+    
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._index
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """統計情報を取得."""
+        with self._lock:
+            stats = self.stats.copy()
+            stats["entries"] = len(self._index)
+            stats["bytes"] = self._total_bytes
+            stats["max_bytes"] = self.max_bytes
+            return stats
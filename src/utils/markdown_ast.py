@@ -0,0 +1,433 @@
+"""Markdown のブロック構造解析.
+
+1回の走査で各行を分類し（見出し・コードブロック・リスト・表・画像・段落・空行）、
+ブロックの一覧を作る。解析結果は内容のハッシュでキャッシュし、
+バリデーション・各処理器・ParserWorker が同じ規則で文書の構造を参照する。
+
+- コードブロック（```）内の行は見出しやリストとして扱わない
+- 見出しは行頭の3個までの空白に続く # の連続と、空白または行末。
+  レベル7以上やタイトルが空の見出しも見出しとして記録し、扱いは利用側で決める
+- 表は | で始まる行の連続のうち、2行目が区切り行のもの
+- リストは空行を挟んで続く項目を1つのブロックとする
+- 文書の先頭が --- の行で始まり、閉じる --- の行がある場合はその範囲を front matter とする
+"""
+
+import hashlib
+from array import array
+from bisect import bisect_left, bisect_right
+from enum import Enum, IntEnum
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from .cache import LRUCache
+
+# 行の分類（行頭の空白は読み飛ばす。行末は match の endpos で指定する）
+# 見出しの前の空白は3個まで（4個以上はインデントされたコードブロックの行）
+_LINE_PATTERN = re.compile(r"""
+    (?:
+        [\ ]{0,3}(?P<HEADING>(?P<hashes>\#+)(?:[^\S\n]+(?P<title>.*?))?[^\S\n]*$)
+      | [^\S\n]*
+        (?:
+            (?P<FENCE>```(?P<info>.*))
+          | (?P<LIST>(?:[-*+]|\d{1,9}[.)])(?:[^\S\n]|$))
+          | (?P<IMAGE>!\[)
+          | (?P<PIPE>\|)
+          | (?P<BLANK>$)
+          | (?P<TEXT>)
+        )
+    )
+""", re.VERBOSE)
+
+# 文書先頭の front matter（python-frontmatter の YAML の区切りと同じ）
+_FRONT_MATTER_PATTERN = re.compile(r'\s*-{3,}[^\S\n]*\n(?:.*\n)*?-{3,}[^\S\n]*(?:\n|$)')
+
+# 表の区切り行（|---|:---:|）
+_TABLE_SEPARATOR_PATTERN = re.compile(r'[\|\-\s:]+$')
+
+
+class LineKind(IntEnum):
+    """行の種類."""
+    BLANK = 0
+    TEXT = 1
+    HEADING = 2
+    FENCE = 3  # コードブロックの開始・終了行
+    CODE = 4  # コードブロック内の行
+    LIST = 5
+    PIPE = 6  # | で始まる行（表の候補）
+    IMAGE = 7
+    FRONT_MATTER = 8
+
+
+_KINDS_BY_NAME = {kind.name: kind for kind in LineKind}
+_KIND_VALUES_BY_NAME = {kind.name: int(kind) for kind in LineKind}
+_BLANK, _TEXT, _HEADING, _FENCE, _CODE, _LIST, _PIPE, _IMAGE, _FRONT_MATTER = (int(kind) for kind in LineKind)
+
+
+class BlockType(str, Enum):
+    """ブロックの種類."""
+    HEADING = "heading"
+    CODE = "code"
+    LIST = "list"
+    TABLE = "table"
+    IMAGE = "image"
+    PARAGRAPH = "paragraph"
+    FRONT_MATTER = "front_matter"
+
+
+_BLOCK_TYPES = tuple(BlockType)
+_BLOCK_TYPE_VALUES = {block_type: number for number, block_type in enumerate(_BLOCK_TYPES)}
+
+
+class Block:
+    """文書中のブロック（行番号は0始まり、end_line・end は含まない）."""
+    
+    __slots__ = ("type", "start_line", "end_line", "start", "end", "level", "title", "language", "closed")
+    
+    def __init__(
+        self,
+        type: BlockType,
+        start_line: int,
+        end_line: int,
+        start: int,
+        end: int,
+        level: int = 0,
+        title: str = "",
+        language: str = "",
+        closed: bool = True
+    ):
+        self.type = type
+        self.start_line = start_line
+        self.end_line = end_line
+        self.start = start
+        self.end = end
+        self.level = level  # 見出しのレベル
+        self.title = title  # 見出しのタイトル
+        self.language = language  # コードブロックの言語
+        self.closed = closed  # コードブロックが閉じているか
+    
+    def __repr__(self) -> str:
+        return f"Block({self.type.value}, lines={self.start_line}-{self.end_line}, level={self.level}, title={self.title!r})"
+
+
+class LineToken:
+    """行の分類結果."""
+    
+    __slots__ = ("kind", "match")
+    
+    def __init__(self, kind: LineKind, match):
+        self.kind = kind
+        self.match = match
+    
+    @property
+    def level(self) -> int:
+        """見出しのレベル."""
+        return len(self.match.group("hashes")) if self.kind == LineKind.HEADING else 0
+    
+    @property
+    def title(self) -> str:
+        """見出しのタイトル（前後の空白を除く）."""
+        return (self.match.group("title") or "") if self.kind == LineKind.HEADING else ""
+    
+    @property
+    def language(self) -> str:
+        """コードブロック開始行の言語."""
+        return self.match.group("info").strip() if self.kind == LineKind.FENCE else ""
+
+
+class LineTokenizer:
+    """行を順に分類する（コードブロックの内外を追跡）.
+    
+    MarkdownDocument の構築とストリーミング分割（markdown_stream）で共有する。
+    """
+    
+    def __init__(self):
+        """初期化."""
+        self.in_fence = False
+    
+    def feed(self, text: str, start: int = 0, end: Optional[int] = None) -> LineToken:
+        """text[start:end] の1行を分類."""
+        match = _LINE_PATTERN.match(text, start, len(text) if end is None else end)
+        kind = _KINDS_BY_NAME[match.lastgroup]
+        if self.in_fence:
+            if kind == LineKind.FENCE:
+                self.in_fence = False
+                return LineToken(LineKind.FENCE, match)
+            return LineToken(LineKind.CODE, match)
+        if kind == LineKind.FENCE:
+            self.in_fence = True
+        return LineToken(kind, match)
+
+
+class MarkdownDocument:
+    """Markdown 文書のブロック構造.
+    
+    行の開始位置・行の種類・ブロックの範囲は array / bytearray で保持し、
+    Block は参照時に作る（段落の多い文書でも1ブロックあたり数バイト）。
+    見出しのレベル・タイトルとコードブロックの言語は参照時に先頭行から取り出す。
+    """
+    
+    def __init__(self, text: str, front_matter: bool = True):
+        """1回の走査で行を分類し、ブロックを構築（front_matter=False の場合は先頭の --- も本文）."""
+        self.text = text
+        self.front_matter = front_matter
+        self.line_starts = array('i' if len(text) < 2 ** 31 else 'q')
+        self.kinds = bytearray()
+        self.unclosed_fence = False
+        # 本文の開始位置（front matter がない場合は0）
+        self.body_start = 0
+        if front_matter:
+            match = _FRONT_MATTER_PATTERN.match(text)
+            if match:
+                self.body_start = match.end()
+        
+        self._block_types = bytearray()
+        self._block_start_lines = array('i')
+        self._block_end_lines = array('i')
+        self._heading_blocks = array('i')
+        
+        self._scan_lines()
+        self._build_blocks()
+    
+    @property
+    def line_count(self) -> int:
+        """行数."""
+        return len(self.kinds)
+    
+    @property
+    def block_count(self) -> int:
+        """ブロック数."""
+        return len(self._block_types)
+    
+    @property
+    def blocks(self) -> List[Block]:
+        """全ブロック."""
+        return list(self.iter_blocks())
+    
+    def line_span(self, index: int) -> Tuple[int, int]:
+        """行の範囲（改行を含まない）."""
+        start = self.line_starts[index]
+        end = self.line_starts[index + 1] - 1 if index + 1 < len(self.line_starts) else len(self.text)
+        return start, end
+    
+    def line(self, index: int) -> str:
+        """行のテキスト."""
+        start, end = self.line_span(index)
+        return self.text[start:end]
+    
+    def line_index(self, offset: int) -> int:
+        """位置を含む行の番号."""
+        return max(0, bisect_right(self.line_starts, offset) - 1)
+    
+    def block(self, number: int) -> Block:
+        """番号のブロック."""
+        block_type = _BLOCK_TYPES[self._block_types[number]]
+        start_line = self._block_start_lines[number]
+        end_line = self._block_end_lines[number]
+        block = Block(block_type, start_line, end_line, self.line_starts[start_line], self.line_span(end_line - 1)[1])
+        if block_type == BlockType.HEADING:
+            match = _LINE_PATTERN.match(self.text, *self.line_span(start_line))
+            block.level = len(match.group("hashes"))
+            block.title = match.group("title") or ""
+        elif block_type == BlockType.CODE:
+            match = _LINE_PATTERN.match(self.text, *self.line_span(start_line))
+            block.language = match.group("info").strip()
+            # 閉じていないコードブロックは文書の最後まで（最終行が終了行でない）
+            block.closed = end_line - start_line >= 2 and self.kinds[end_line - 1] == _FENCE
+        return block
+    
+    def block_text(self, block: Block) -> str:
+        """ブロックのテキスト."""
+        return self.text[block.start:block.end]
+    
+    def iter_blocks(self, start: int = 0, end: Optional[int] = None) -> Iterator[Block]:
+        """範囲内で始まるブロックを順に返す."""
+        end = len(self.text) if end is None else end
+        for number in range(bisect_left(self._block_start_lines, self._first_line_from(start)), self.block_count):
+            block = self.block(number)
+            if block.start >= end:
+                return
+            yield block
+    
+    def is_block_boundary(self, offset: int) -> bool:
+        """位置を含む行がブロックの途中の行でないか."""
+        line = self.line_index(offset)
+        number = bisect_right(self._block_start_lines, line) - 1
+        return number < 0 or self._block_start_lines[number] == line or self._block_end_lines[number] <= line
+    
+    def headings(
+        self,
+        start: int = 0,
+        end: Optional[int] = None,
+        min_level: int = 1,
+        max_level: Optional[int] = None
+    ) -> Iterator[Block]:
+        """範囲内の指定レベルの見出しを順に返す（max_level を省略した場合は上限なし）."""
+        end = len(self.text) if end is None else end
+        first_line = self._first_line_from(start)
+        heading_blocks = self._heading_blocks
+        position = bisect_left(heading_blocks, bisect_left(self._block_start_lines, first_line))
+        for number in heading_blocks[position:]:
+            block = self.block(number)
+            if block.start >= end:
+                return
+            if block.level < min_level:
+                continue
+            if max_level is None or block.level <= max_level:
+                yield block
+    
+    def chunks(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """範囲を空行で区切った各範囲を返す（コードブロック内の空行では区切らない）."""
+        end = len(self.text) if end is None else end
+        if end <= start:
+            return
+        kinds = self.kinds
+        index = self.line_index(start)
+        last = self.line_index(end - 1)
+        while index <= last:
+            if kinds[index] == _BLANK:
+                index += 1
+                continue
+            stop = kinds.find(_BLANK, index, last + 1)
+            if stop < 0:
+                stop = last + 1
+            chunk_start = max(self.line_starts[index], start)
+            chunk_end = min(self.line_span(stop - 1)[1], end)
+            if chunk_start < chunk_end:
+                yield chunk_start, chunk_end
+            index = stop + 1
+    
+    def _first_line_from(self, offset: int) -> int:
+        """位置以降で始まる最初の行の番号."""
+        line = self.line_index(offset)
+        return line if self.line_starts[line] >= offset else line + 1
+    
+    def _scan_lines(self) -> None:
+        """各行を分類."""
+        text = self.text
+        length = len(text)
+        body_start = self.body_start
+        find = text.find
+        match_line = _LINE_PATTERN.match
+        kinds_by_name = _KIND_VALUES_BY_NAME
+        append_start = self.line_starts.append
+        append_kind = self.kinds.append
+        in_fence = False
+        position = 0
+        while True:
+            newline = find('\n', position)
+            line_end = length if newline < 0 else newline
+            append_start(position)
+            if position < body_start:
+                append_kind(_FRONT_MATTER)
+            else:
+                match = match_line(text, position, line_end)
+                kind = kinds_by_name[match.lastgroup]
+                if in_fence:
+                    if kind == _FENCE:
+                        in_fence = False
+                    else:
+                        kind = _CODE
+                elif kind == _FENCE:
+                    in_fence = True
+                append_kind(kind)
+            if newline < 0:
+                break
+            position = newline + 1
+        self.unclosed_fence = in_fence
+    
+    def _build_blocks(self) -> None:
+        """行の分類からブロックを構築."""
+        kinds = self.kinds
+        count = len(kinds)
+        index = 0
+        while index < count:
+            kind = kinds[index]
+            if kind == _BLANK:
+                index += 1
+                continue
+            
+            if kind == _FRONT_MATTER:
+                end = index + 1
+                while end < count and kinds[end] == _FRONT_MATTER:
+                    end += 1
+                self._add_block(BlockType.FRONT_MATTER, index, end)
+                index = end
+            elif kind == _HEADING:
+                self._heading_blocks.append(self.block_count)
+                self._add_block(BlockType.HEADING, index, index + 1)
+                index += 1
+            elif kind == _FENCE:
+                # 閉じていないコードブロックは文書の最後まで
+                end = index + 1
+                while end < count and kinds[end] == _CODE:
+                    end += 1
+                self._add_block(BlockType.CODE, index, end + 1 if end < count else end)
+                index = end + 1
+            elif kind == _LIST:
+                end = index + 1
+                last = index
+                while end < count and (kinds[end] == _LIST or kinds[end] == _BLANK):
+                    if kinds[end] == _LIST:
+                        last = end
+                    end += 1
+                self._add_block(BlockType.LIST, index, last + 1)
+                index = last + 1
+            elif kind == _IMAGE:
+                self._add_block(BlockType.IMAGE, index, index + 1)
+                index += 1
+            elif kind == _PIPE:
+                end = index + 1
+                while end < count and kinds[end] == _PIPE:
+                    end += 1
+                if end - index >= 2 and _TABLE_SEPARATOR_PATTERN.match(self.text, *self.line_span(index + 1)):
+                    self._add_block(BlockType.TABLE, index, end)
+                else:
+                    # 区切り行のない | の行は段落として扱う
+                    self._add_block(BlockType.PARAGRAPH, index, end)
+                index = end
+            else:
+                end = index + 1
+                while end < count and kinds[end] == _TEXT:
+                    end += 1
+                self._add_block(BlockType.PARAGRAPH, index, end)
+                index = end
+    
+    def _add_block(self, block_type: BlockType, start_line: int, end_line: int) -> None:
+        """ブロックを追加."""
+        self._block_types.append(_BLOCK_TYPE_VALUES[block_type])
+        self._block_start_lines.append(start_line)
+        self._block_end_lines.append(end_line)
+
+
+# ハッシュ計算で一度にエンコードする文字数（文書全体のバイト列を作らない）
+_HASH_CHUNK_SIZE = 1 << 16
+
+
+def content_hash(text: str) -> str:
+    """テキストの SHA-256（UTF-8）."""
+    digest = hashlib.sha256()
+    for position in range(0, len(text), _HASH_CHUNK_SIZE):
+        digest.update(text[position:position + _HASH_CHUNK_SIZE].encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+# 内容のハッシュをキーにした解析結果のキャッシュ
+_document_cache: LRUCache = LRUCache(max_size=8)
+_last_document: Optional[MarkdownDocument] = None
+
+
+def parse_markdown(text: str, front_matter: bool = True) -> MarkdownDocument:
+    """Markdown を解析（同じ内容の文書は解析結果を再利用）."""
+    global _last_document
+    last = _last_document
+    if last is not None and last.text is text and last.front_matter == front_matter:
+        # 同じバッファを共有する章・セクションからの参照はハッシュ計算も省く
+        return last
+    
+    key = (content_hash(text), front_matter)
+    document = _document_cache.get(key)
+    if document is None:
+        document = MarkdownDocument(text, front_matter)
+        _document_cache.put(key, document)
+    _last_document = document
+    return document
@@ -0,0 +1,139 @@
+"""Markdown のストリーミング分割.
+
+入力ファイル全体を文字列として読み込まず、mmap で1行ずつ読みながら
+チャプター・セクション・パラグラフを確定した順に返す。
+保持するのは分割中の1単位の行のみで、ピークメモリは最大のチャプターに比例する。
+
+行の分類には markdown_ast の LineTokenizer を使い、parse_markdown と同じ規則で
+見出しとコードブロックを判定する（コードブロック内の # は見出しにしない）。
+
+- 最初の見出しより前の行とタイトルが空の見出しの単位は破棄する
+- 単位が1つもない場合は全体を1単位として返す（それまでは全体の行を保持する）
+- 各単位の本文は行を改行で連結して前後の空白を除いたもの
+"""
+
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .markdown_ast import LineKind, LineTokenizer
+
+# セクションとして扱う見出しのレベル（H2〜H4）
+SECTION_LEVELS = (2, 3, 4)
+
+
+def iter_file_lines(file_path: Union[str, Path], encoding: str = "utf-8") -> Iterator[str]:
+    """ファイルを mmap で1行ずつ読み込む（行末の改行は除く）.
+    
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+        UnicodeDecodeError: 指定のエンコーディングで読めない行があった場合
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # 空ファイルは mmap できない
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for raw in iter(mm.readline, b""):
+                line = raw.decode(encoding)
+                # テキストモードの読み込みと同じく CRLF も LF として扱う
+                if line.endswith("\r\n"):
+                    yield line[:-2]
+                elif line.endswith("\n"):
+                    yield line[:-1]
+                else:
+                    yield line
+
+
+def _join(lines: List[str]) -> str:
+    """行を連結して前後の空白を除く."""
+    return "\n".join(lines).strip()
+
+
+def iter_chapters(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """H1 見出しでチャプターに分割（{'title', 'content'}）."""
+    title = ""
+    current: List[str] = []
+    # タイトル付きの H1 が現れるまでは全体を保持（チャプターがない場合に使う）
+    everything: Optional[List[str]] = []
+    tokenizer = LineTokenizer()
+    
+    for line in lines:
+        if everything is not None:
+            everything.append(line)
+        token = tokenizer.feed(line)
+        if token.kind == LineKind.HEADING and token.level == 1:
+            # 見出しのないチャプター（タイトルが空）は破棄
+            if title:
+                yield {"title": title, "content": _join(current)}
+            title = token.title
+            current = []
+            if title:
+                everything = None
+        else:
+            current.append(line)
+    
+    if title:
+        yield {"title": title, "content": _join(current)}
+    elif everything is not None:
+        # チャプターがない場合は全体を1つのチャプターとする
+        yield {"title": "Main Content", "content": _join(everything)}
+
+
+def iter_sections(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """H2〜H4 見出しでセクションに分割（{'title', 'content', 'level'}）."""
+    title = ""
+    level = 2
+    current: List[str] = []
+    everything: Optional[List[str]] = []
+    tokenizer = LineTokenizer()
+    
+    for line in lines:
+        if everything is not None:
+            everything.append(line)
+        token = tokenizer.feed(line)
+        if token.kind != LineKind.HEADING or token.level not in SECTION_LEVELS:
+            current.append(line)
+            continue
+        
+        if title:
+            yield {"title": title, "content": _join(current), "level": level}
+        title = token.title
+        level = token.level
+        current = []
+        if title:
+            everything = None
+    
+    if title:
+        yield {"title": title, "content": _join(current), "level": level}
+    elif everything is not None:
+        # セクションがない場合は全体を1つのセクションとする
+        yield {"title": "Main Section", "content": _join(everything), "level": 2}
+
+
+def iter_paragraphs(lines: Iterable[str]) -> Iterator[str]:
+    """空行でパラグラフに分割（各行の前後の空白は除く）.
+    
+    コードブロック内の行はインデントを保持し、空行でも分割しない。
+    """
+    current: List[str] = []
+    tokenizer = LineTokenizer()
+    
+    for line in lines:
+        kind = tokenizer.feed(line).kind
+        if kind == LineKind.CODE:
+            current.append(line)
+        elif kind != LineKind.BLANK:
+            current.append(line.strip())
+        elif current:
+            yield "\n".join(current)
+            current = []
+    
+    if current:
+        yield "\n".join(current)
+
+
+def stream_chapters(file_path: Union[str, Path], encoding: str = "utf-8") -> Iterator[Dict[str, Any]]:
+    """ファイルを読みながらチャプターを確定した順に返す."""
+    return iter_chapters(iter_file_lines(file_path, encoding))
@@ -0,0 +1,418 @@
+"""解析結果のディスクキャッシュ.
+
+入力 Markdown の分割結果（チャプター・セクション・パラグラフの階層と、
+パラグラフ毎の安定 ID・内容ハッシュ）をコンパクトなバイナリとして保存し、
+同じ内容のファイルを再実行・再開する際は解析せずに mmap で読み込む。
+
+キャッシュのキーは入力ファイルの SHA-256。ファイルのパス・サイズ・更新時刻から
+SHA-256 への対応も保存し、変更のないファイルはハッシュの再計算も省く。
+
+ファイル形式（整数はリトルエンディアン）:
+
+- ヘッダー: マジック（8バイト）・パラグラフ表の位置・パラグラフ数・階層の位置
+- 本文: UTF-8 のテキスト。チャプターの本文を1度だけ書き、セクションとパラグラフは
+  その部分文字列であればバイト範囲で参照する（そうでなければ本文を追記する）
+- パラグラフ表: パラグラフ毎に（位置・長さ・SHA-256・同じ内容の出現番号）
+- 階層: チャプターとセクションの JSON（セクションはパラグラフ表の範囲を持つ）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .disk_cache import DiskCache, content_key
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# 分割規則や形式を変えたら上げる（古いキャッシュは使われなくなる）
+FORMAT_VERSION = 1
+
+_MAGIC = b"MDPARSE" + bytes([FORMAT_VERSION])
+_HEADER = struct.Struct("<8sQQQ")
+_PARAGRAPH = struct.Struct("<QI32sI")
+_HASH_CHUNK_SIZE = 1 << 20
+
+# 開いたままにする解析結果の数
+_OPEN_BOOKS = 4
+
+
+def paragraph_id(chapter_index: int, section_index: int, content_hash: str, occurrence: int = 0) -> str:
+    """パラグラフの安定 ID（位置と内容ハッシュから生成し、再実行しても変わらない）."""
+    base = f"{chapter_index}-{section_index}-{content_hash[:12]}"
+    return f"{base}-{occurrence}" if occurrence else base
+
+
+def _paragraph_digests(paragraphs: List[str]) -> List[Tuple[str, int]]:
+    """各パラグラフの（内容の SHA-256, セクション内での同じ内容の出現番号）."""
+    digests = []
+    occurrences: Dict[str, int] = {}
+    for paragraph in paragraphs:
+        digest = hashlib.sha256(paragraph.encode("utf-8")).hexdigest()
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        digests.append((digest, occurrence))
+    return digests
+
+
+def paragraph_keys(chapter_index: int, section_index: int, paragraphs: List[str]) -> List[Tuple[str, str]]:
+    """各パラグラフの（安定 ID, 内容の SHA-256）を返す（同じ内容は出現番号で区別）."""
+    return [
+        (paragraph_id(chapter_index, section_index, digest, occurrence), digest)
+        for digest, occurrence in _paragraph_digests(paragraphs)
+    ]
+
+
+def file_sha256(file_path: Union[str, Path]) -> str:
+    """ファイルの SHA-256 を mmap で計算（全体を読み込まない）."""
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return sha.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start in range(0, len(mm), _HASH_CHUNK_SIZE):
+                sha.update(mm[start:start + _HASH_CHUNK_SIZE])
+    return sha.hexdigest()
+
+
+class ParsedBook:
+    """mmap で読み込んだ解析結果（本文は参照した時点でデコードする）."""
+    
+    def __init__(self, path: Union[str, Path], source_hash: str):
+        """初期化.
+        
+        Raises:
+            OSError: ファイルを開けない場合
+            ValueError: 形式が正しくない場合
+        """
+        self.source_hash = source_hash
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < _HEADER.size:
+                raise ValueError("truncated parse cache entry")
+            magic, self._table_offset, self._paragraph_count, index_offset = _HEADER.unpack_from(self._mm)
+            if magic != _MAGIC:
+                raise ValueError("unsupported parse cache format")
+            if self._table_offset + self._paragraph_count * _PARAGRAPH.size != index_offset:
+                raise ValueError("corrupted parse cache entry")
+            self._chapters: List[Dict[str, Any]] = json.loads(self._mm[index_offset:].decode("utf-8"))["chapters"]
+        except BaseException:
+            self._mm.close()
+            raise
+    
+    def _text(self, offset: int, length: int) -> str:
+        """本文のバイト範囲をデコード."""
+        return self._mm[offset:offset + length].decode("utf-8")
+    
+    @property
+    def chapter_count(self) -> int:
+        """チャプター数."""
+        return len(self._chapters)
+    
+    @property
+    def paragraph_count(self) -> int:
+        """パラグラフ数."""
+        return self._paragraph_count
+    
+    def iter_chapters(self) -> Iterator[Dict[str, Any]]:
+        """チャプターを順に返す（{'title', 'content'}）."""
+        for chapter in self._chapters:
+            yield {"title": chapter["title"], "content": self._text(chapter["offset"], chapter["length"])}
+    
+    def sections(self, chapter_index: int) -> List[Dict[str, Any]]:
+        """チャプターのセクション（{'title', 'content', 'level'}）."""
+        return [
+            {
+                "title": section["title"],
+                "content": self._text(section["offset"], section["length"]),
+                "level": section["level"]
+            }
+            for section in self._chapters[chapter_index]["sections"]
+        ]
+    
+    def paragraphs(self, chapter_index: int, section_index: int) -> List[Dict[str, Any]]:
+        """セクションのパラグラフ（{'content', 'paragraph_id', 'content_hash'}）."""
+        section = self._chapters[chapter_index]["sections"][section_index]
+        paragraphs = []
+        for number in range(section["first"], section["first"] + section["count"]):
+            offset, length, digest, occurrence = _PARAGRAPH.unpack_from(
+                self._mm, self._table_offset + number * _PARAGRAPH.size
+            )
+            content_hash = digest.hex()
+            paragraphs.append({
+                "content": self._text(offset, length),
+                "paragraph_id": paragraph_id(chapter_index, section_index, content_hash, occurrence),
+                "content_hash": content_hash
+            })
+        return paragraphs
+    
+    def close(self) -> None:
+        """mmap を閉じる."""
+        self._mm.close()
+
+
+class _SpanLocator:
+    """書き込み済みの本文の中から部分文字列のバイト範囲を前から順に探す."""
+    
+    def __init__(self, text: str, offset: int):
+        """初期化（offset は text の本文上のバイト位置）."""
+        self._text = text
+        self._char = 0
+        self._byte = offset
+    
+    def locate(self, part: str) -> Optional[Tuple[int, int]]:
+        """part のバイト範囲（見つからない場合は None）."""
+        position = self._text.find(part, self._char)
+        if position < 0:
+            return None
+        self._byte += len(self._text[self._char:position].encode("utf-8"))
+        self._char = position
+        return self._byte, len(part.encode("utf-8"))
+
+
+class ParseCacheWriter:
+    """解析結果をチャプター毎に一時ファイルへ書き込み、完了時にキャッシュに登録する."""
+    
+    def __init__(self, cache: "ParseCache", source_hash: str, source_path: Union[str, Path]):
+        """初期化."""
+        self._cache = cache
+        self._source_hash = source_hash
+        self._source_path = source_path
+        self._source_stat = _stat_signature(source_path)
+        self._temp_path: Optional[str] = cache.disk_cache.temp_file()
+        self._file = open(self._temp_path, "wb")
+        self._file.write(bytes(_HEADER.size))
+        self._offset = _HEADER.size
+        self._table = bytearray()
+        self._paragraph_count = 0
+        self._chapters: List[Dict[str, Any]] = []
+    
+    def _append(self, text: str) -> Tuple[int, int]:
+        """本文を追記してバイト範囲を返す."""
+        data = text.encode("utf-8")
+        offset = self._offset
+        self._file.write(data)
+        self._offset += len(data)
+        return offset, len(data)
+    
+    def add_chapter(self, title: str, content: str, sections: List[Dict[str, Any]]) -> None:
+        """チャプターを追加.
+        
+        Args:
+            title: チャプターのタイトル
+            content: チャプターの本文
+            sections: セクション（'title', 'content', 'level' と本文の 'paragraphs' のリスト）
+        """
+        chapter_offset, chapter_length = self._append(content)
+        chapter_sections = []
+        chapter_locator = _SpanLocator(content, chapter_offset)
+        
+        for section_index, section in enumerate(sections):
+            section_offset, section_length = chapter_locator.locate(section["content"]) or self._append(section["content"])
+            section_locator = _SpanLocator(section["content"], section_offset)
+            paragraphs = section["paragraphs"]
+            
+            for paragraph, (digest, occurrence) in zip(paragraphs, _paragraph_digests(paragraphs)):
+                offset, length = section_locator.locate(paragraph) or self._append(paragraph)
+                self._table += _PARAGRAPH.pack(offset, length, bytes.fromhex(digest), occurrence)
+            
+            chapter_sections.append({
+                "title": section["title"],
+                "level": section["level"],
+                "offset": section_offset,
+                "length": section_length,
+                "first": self._paragraph_count,
+                "count": len(paragraphs)
+            })
+            self._paragraph_count += len(paragraphs)
+        
+        self._chapters.append({
+            "title": title,
+            "offset": chapter_offset,
+            "length": chapter_length,
+            "sections": chapter_sections
+        })
+    
+    def commit(self) -> Optional[ParsedBook]:
+        """書き込みを完了してキャッシュに登録（入力ファイルが途中で変わった場合は破棄）."""
+        if self._temp_path is None:
+            return None
+        if _stat_signature(self._source_path) != self._source_stat:
+            logger.warning(f"Input file changed while parsing, not caching: {self._source_path}")
+            self.discard()
+            return None
+        
+        table_offset = self._offset
+        index_offset = table_offset + len(self._table)
+        try:
+            self._file.write(self._table)
+            self._file.write(json.dumps({"chapters": self._chapters}, ensure_ascii=False).encode("utf-8"))
+            self._file.seek(0)
+            self._file.write(_HEADER.pack(_MAGIC, table_offset, self._paragraph_count, index_offset))
+            self._file.close()
+        except OSError as e:
+            logger.warning(f"Failed to write parse cache for {self._source_path}: {e}")
+            self.discard()
+            return None
+        
+        temp_path, self._temp_path = self._temp_path, None
+        return self._cache._register(self._source_hash, self._source_path, self._source_stat, temp_path)
+    
+    def discard(self) -> None:
+        """書き込みを中止して一時ファイルを削除（登録済みの場合は何もしない）."""
+        if self._temp_path is None:
+            return
+        self._file.close()
+        try:
+            os.unlink(self._temp_path)
+        except OSError:
+            pass
+        self._temp_path = None
+
+
+def _stat_signature(file_path: Union[str, Path]) -> Tuple[str, int, int]:
+    """ファイルの（絶対パス, サイズ, 更新時刻）."""
+    stat = os.stat(file_path)
+    return str(Path(file_path).resolve()), stat.st_size, stat.st_mtime_ns
+
+
+class ParseCache:
+    """入力ファイルの SHA-256 をキーにした解析結果のキャッシュ."""
+    
+    _shared: Dict[str, "ParseCache"] = {}
+    _shared_lock = RLock()
+    
+    def __init__(self, directory: str, max_bytes: int = 1024 * 1024 * 1024):
+        """初期化.
+        
+        Args:
+            directory: 保存先ディレクトリ
+            max_bytes: 解析結果の合計バイト数の上限
+        """
+        self.disk_cache = DiskCache(directory, max_bytes)
+        self._lock = RLock()
+        self._books: "OrderedDict[str, ParsedBook]" = OrderedDict()
+    
+    @classmethod
+    def shared(cls, directory: str, max_bytes: int = 1024 * 1024 * 1024) -> "ParseCache":
+        """ディレクトリ毎に共有するキャッシュを取得（複数のワーカーで読み込んだ結果を共有する）."""
+        key = str(Path(directory).resolve())
+        with cls._shared_lock:
+            cache = cls._shared.get(key)
+            if cache is None:
+                cache = cls._shared[key] = cls(directory, max_bytes)
+            return cache
+    
+    @staticmethod
+    def _source_key(signature: Tuple[str, int, int]) -> str:
+        """（パス, サイズ, 更新時刻）→ SHA-256 の対応のキー."""
+        return content_key("parse-source", *signature)
+    
+    @staticmethod
+    def _result_key(source_hash: str) -> str:
+        """解析結果のキー."""
+        return content_key("parse-result", FORMAT_VERSION, source_hash)
+    
+    def source_hash(self, file_path: Union[str, Path]) -> str:
+        """入力ファイルの SHA-256（パス・サイズ・更新時刻が同じなら保存済みの値を使う）.
+        
+        Raises:
+            OSError: ファイルを読めない場合
+        """
+        signature = _stat_signature(file_path)
+        cached = self.disk_cache.get(self._source_key(signature))
+        if cached is not None:
+            return cached.decode("ascii")
+        return file_sha256(file_path)
+    
+    def load(self, file_path: Union[str, Path]) -> Tuple[str, Optional[ParsedBook]]:
+        """入力ファイルの（SHA-256, 解析結果）を返す（キャッシュにない場合は解析結果が None）.
+        
+        Raises:
+            OSError: ファイルを読めない場合
+        """
+        source_hash = self.source_hash(file_path)
+        book = self.book(source_hash)
+        if book is not None:
+            # 内容が同じで更新時刻だけ変わった場合も次回はハッシュを計算しない
+            self.disk_cache.put(self._source_key(_stat_signature(file_path)), source_hash.encode("ascii"))
+        return source_hash, book
+    
+    def book(self, source_hash: str) -> Optional[ParsedBook]:
+        """SHA-256 に対応する解析結果（壊れたエントリは削除して None）."""
+        with self._lock:
+            book = self._books.get(source_hash)
+            if book is not None:
+                self._books.move_to_end(source_hash)
+                return book
+            
+            key = self._result_key(source_hash)
+            path = self.disk_cache.get_path(key)
+            if path is None:
+                return None
+            try:
+                book = ParsedBook(path, source_hash)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable parse cache entry {key[:12]}: {e}")
+                self.disk_cache.delete(key)
+                return None
+            self._remember(book)
+            return book
+    
+    def writer(self, source_hash: str, file_path: Union[str, Path]) -> ParseCacheWriter:
+        """解析結果の書き込みを開始.
+        
+        Raises:
+            OSError: 一時ファイルを作成できない場合
+        """
+        return ParseCacheWriter(self, source_hash, file_path)
+    
+    def _register(
+        self,
+        source_hash: str,
+        file_path: Union[str, Path],
+        signature: Tuple[str, int, int],
+        temp_path: str
+    ) -> Optional[ParsedBook]:
+        """書き込み済みの一時ファイルを登録して読み込む."""
+        with self._lock:
+            if not self.disk_cache.put_file(self._result_key(source_hash), temp_path, {"source": str(file_path)}):
+                return None
+            self.disk_cache.put(self._source_key(signature), source_hash.encode("ascii"))
+            return self.book(source_hash)
+    
+    def _remember(self, book: ParsedBook) -> None:
+        """開いた解析結果を保持（古いものから閉じる）."""
+        self._books[book.source_hash] = book
+        while len(self._books) > _OPEN_BOOKS:
+            _, evicted = self._books.popitem(last=False)
+            evicted.close()
+    
+    def close(self) -> None:
+        """開いている解析結果をすべて閉じる."""
+        with self._lock:
+            while self._books:
+                self._books.popitem()[1].close()
+
+
+def get_parse_cache(config: Any) -> Optional[ParseCache]:
+    """設定に応じた共有の解析結果キャッシュを取得（無効時は None）."""
+    storage = getattr(config, 'storage', None)
+    if getattr(storage, 'parse_cache_enabled', False) is not True:
+        return None
+    
+    cache_dir = getattr(storage, 'cache_dir', None)
+    max_bytes = getattr(storage, 'parse_cache_max_bytes', None)
+    return ParseCache.shared(
+        os.path.join(cache_dir if isinstance(cache_dir, str) else "./cache", "parsed"),
+        max_bytes if isinstance(max_bytes, int) and max_bytes > 0 else 1024 * 1024 * 1024
+    )
@@ -1,13 +1,48 @@
 """プロンプトとテンプレートローダー."""
 
 import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Iterable
 import yaml
 import logging
 
 logger = logging.getLogger(__name__)
 
+# パラグラフ毎に変化するテンプレート変数（プロンプト末尾の可変部分に配置する）
+VARIABLE_PROMPT_KEYS = (
+    "SECTION_CONTENT",
+    "ARTICLE_CONTENT",
+    "PARAGRAPH_CONTENT",
+    "content",
+)
+
+
+@dataclass
+class PromptParts:
+    """プレフィックスキャッシュ向けに分割したプロンプト.
+    
+    system と prefix はセクション内の全パラグラフで共通となるため、
+    プロバイダーのプロンプトキャッシュの対象にできる。
+    """
+    system: str
+    prefix: str
+    suffix: str
+    
+    def combined(self) -> str:
+        """単一文字列のプロンプトに結合."""
+        return "\n\n".join(part for part in (self.system, self.prefix, self.suffix) if part)
+    
+    def request_kwargs(self) -> Dict[str, Optional[str]]:
+        """クライアントの引数（prompt / system_prompt / context）に変換.
+        
+        プレフィックスは context として送り、プロバイダーのプロンプトキャッシュの対象にする。
+        可変部分がない場合はプレフィックスをそのままプロンプトとする。
+        """
+        if not self.suffix:
+            return {"prompt": self.prefix, "system_prompt": self.system or None, "context": None}
+        return {"prompt": self.suffix, "system_prompt": self.system or None, "context": self.prefix or None}
+
 
 class PromptLoader:
     """プロンプトとテンプレートを読み込むローダー."""
@@ -191,6 +226,48 @@ class PromptLoader:
             return formatted_message
         else:
             return ""
+            
+    def get_prompt_parts(
+        self,
+        prompt_type: str,
+        variable_keys: Iterable[str] = VARIABLE_PROMPT_KEYS,
+        **kwargs
+    ) -> PromptParts:
+        """安定したプレフィックスと可変サフィックスに分けてプロンプトを構築.
+        
+        メッセージテンプレート内の可変変数（パラグラフ本文など）は参照表記に置き換え、
+        実際の値はサフィックスとして末尾にまとめる。これによりシステムプロンプト・
+        テンプレート・章/セクションのコンテキストがリクエスト間でバイト単位で一致する。
+        
+        Args:
+            prompt_type: プロンプトタイプ（article, script, tweet等）
+            variable_keys: 可変部分として扱うテンプレート変数名
+            **kwargs: テンプレート変数
+            
+        Returns:
+            分割済みプロンプト
+        """
+        system_prompt = self.load_system_prompt(prompt_type)
+        message_prompt = self.load_message_prompt(prompt_type)
+        
+        stable_vars = {}
+        suffix_blocks = []
+        for key, value in kwargs.items():
+            if key in variable_keys:
+                placeholder = f"{{{{{key}}}}}"
+                if placeholder in message_prompt:
+                    stable_vars[key] = f"（末尾の「{key}」を参照）"
+                    suffix_blocks.append(f"## {key}\n{value}")
+            else:
+                stable_vars[key] = value
+                
+        prefix = self.format_prompt(message_prompt, **stable_vars)
+        
+        return PromptParts(
+            system=system_prompt,
+            prefix=prefix,
+            suffix="\n\n".join(suffix_blocks)
+        )
 
 
 # グローバルインスタンス
@@ -2,101 +2,419 @@
 
 import asyncio
 import time
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple, Union
 
 from .logger import get_logger
 
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
 logger = get_logger(__name__)
 
 
 class RateLimiter:
-    """レート制限器."""
+    """GCRA（Generic Cell Rate Algorithm）によるレート制限器.
+    
+    理論到着時刻（TAT）のみを保持するトークンバケット相当の実装。
+    acquire は O(1) で予約を確定し、ロックを保持せずに待機するため、
+    待機者は呼び出し順（FIFO）に解放される。cost を指定すると
+    トークン数などの重み付きで消費できる。
+    """
     
-    def __init__(self, requests_per_minute: int, service_name: str = "default"):
+    def __init__(
+        self,
+        requests_per_minute: int,
+        service_name: str = "default",
+        burst: Optional[float] = None
+    ):
         self.requests_per_minute = requests_per_minute
         self.service_name = service_name
-        self.request_times: list[float] = []
-        self.lock = asyncio.Lock()
         
         # 1分間を秒に変換
         self.window_seconds = 60.0
+        # 1単位あたりの放出間隔
         self.min_interval = self.window_seconds / requests_per_minute if requests_per_minute > 0 else 0
+        # 待機なしで通過できる量（デフォルトは1単位＝従来の最小間隔制御と同等）
+        self.burst = max(1.0, float(burst)) if burst else 1.0
+        
+        self._tat = 0.0
+        self._last_acquire_time: Optional[float] = None
+        self.stats = {
+            "acquired": 0,
+            "units_acquired": 0.0,
+            "waited": 0,
+            "total_wait_time": 0.0,
+        }
         
         logger.debug(f"RateLimiter initialized for {service_name}: {requests_per_minute} req/min")
+    
+    def reserve(self, cost: float = 1.0) -> float:
+        """容量を予約し、待機すべき秒数を返す（待機はしない）."""
+        if self.min_interval <= 0:
+            return 0.0
+        
+        now = time.monotonic()
+        tat = max(self._tat, now)
+        new_tat = tat + cost * self.min_interval
+        wait_time = new_tat - now - self.burst * self.min_interval
+        
+        self._tat = new_tat
+        return max(0.0, wait_time)
+    
+    def refund(self, cost: float = 1.0) -> None:
+        """未使用の予約を返却."""
+        self._tat = max(time.monotonic(), self._tat - cost * self.min_interval)
+    
+    async def acquire(self, cost: float = 1.0) -> None:
+        """レート制限チェックとリクエスト許可.
+        
+        Args:
+            cost: 消費量（リクエスト数またはトークン数）
+        """
+        wait_time = self.reserve(cost)
+        
+        if wait_time > 0:
+            logger.debug(
+                f"Rate limit reached for {self.service_name}. "
+                f"Waiting {wait_time:.2f} seconds"
+            )
+            try:
+                await asyncio.sleep(wait_time)
+            except asyncio.CancelledError:
+                self.refund(cost)
+                raise
+                
+        self._record_acquire(cost, wait_time)
+        
+    def _record_acquire(self, cost: float, wait_time: float) -> None:
+        """取得統計を記録."""
+        if wait_time > 0:
+            self.stats["waited"] += 1
+            self.stats["total_wait_time"] += wait_time
+        self.stats["acquired"] += 1
+        self.stats["units_acquired"] += cost
+        self._last_acquire_time = time.time()
+    
+    def release(self) -> None:
+        """リクエスト完了通知（現在は何もしない）."""
+        pass
+    
+    def available(self) -> float:
+        """現在待機なしで消費できる量."""
+        if self.min_interval <= 0:
+            return float("inf")
+        backlog = max(0.0, self._tat - time.monotonic()) / self.min_interval
+        return max(0.0, self.burst - backlog)
+    
+    def get_stats(self) -> Dict[str, any]:
+        """統計情報を取得."""
+        stats = self.stats.copy()
+        stats.update({
+            "service_name": self.service_name,
+            "requests_per_minute": self.requests_per_minute,
+            "burst": self.burst,
+            "remaining_requests": int(self.available()) if self.min_interval > 0 else self.requests_per_minute,
+            "last_request_time": self._last_acquire_time,
+        })
+        return stats
+    
+    def reset(self) -> None:
+        """レート制限をリセット."""
+        self._tat = 0.0
+        self._last_acquire_time = None
+        logger.debug(f"Rate limiter reset for {self.service_name}")
+
+
+class ModelRateLimiter:
+    """モデル単位のRPM（リクエスト数）・TPM（トークン数）レート制限器.
+    
+    request_limiter / token_limiter に DistributedRateLimiter を渡すと
+    RPM・TPM の両バケットをプロセス間で共有する。
+    """
+    
+    def __init__(
+        self,
+        service_name: str,
+        model: str,
+        requests_per_minute: int,
+        tokens_per_minute: Optional[int] = None,
+        request_limiter: Optional["DistributedRateLimiter"] = None,
+        token_limiter: Optional["DistributedRateLimiter"] = None
+    ):
+        self.service_name = service_name
+        self.model = model
+        name = f"{service_name}:{model}"
         
-    async def acquire(self) -> None:
-        """レート制限チェックとリクエスト許可."""
-        async with self.lock:
-            current_time = time.time()
+        self.request_limiter = request_limiter or RateLimiter(requests_per_minute, f"{name}:rpm")
+        # TPMは1分間の予算をバースト量として許容する
+        self.token_limiter = token_limiter or (
+            RateLimiter(tokens_per_minute, f"{name}:tpm", burst=tokens_per_minute)
+            if tokens_per_minute else None
+        )
+    
+    async def acquire(self, tokens: int = 0) -> None:
+        """リクエスト1件と推定トークン数を消費.
+        
+        ローカルの場合は両方のバケットを同時に予約し、長い方の待ち時間だけ待機する。
+        Redis共有の場合は RPM・TPM の順に取得する。
+        """
+        use_tokens = self.token_limiter is not None and tokens > 0
+        if not isinstance(self.request_limiter, RateLimiter) or (
+            use_tokens and not isinstance(self.token_limiter, RateLimiter)
+        ):
+            await self.request_limiter.acquire(1)
+            if use_tokens:
+                await self.token_limiter.acquire(tokens)
+            return
             
-            # 古いリクエスト時間を削除（1分より古いもの）
-            cutoff_time = current_time - self.window_seconds
-            self.request_times = [t for t in self.request_times if t > cutoff_time]
+        wait_time = self.request_limiter.reserve(1)
+        if use_tokens:
+            wait_time = max(wait_time, self.token_limiter.reserve(tokens))
             
-            # レート制限チェック
-            if len(self.request_times) >= self.requests_per_minute:
-                # 最古のリクエストから1分経過するまで待機
-                oldest_request = self.request_times[0]
-                wait_time = self.window_seconds - (current_time - oldest_request)
+        if wait_time > 0:
+            try:
+                await asyncio.sleep(wait_time)
+            except asyncio.CancelledError:
+                self.request_limiter.refund(1)
+                if use_tokens:
+                    self.token_limiter.refund(tokens)
+                raise
                 
-                if wait_time > 0:
-                    logger.debug(
-                        f"Rate limit reached for {self.service_name}. "
-                        f"Waiting {wait_time:.2f} seconds"
-                    )
-                    await asyncio.sleep(wait_time)
-                    
-                    # 再度古いリクエスト時間を削除
-                    current_time = time.time()
-                    cutoff_time = current_time - self.window_seconds
-                    self.request_times = [t for t in self.request_times if t > cutoff_time]
+        self.request_limiter._record_acquire(1, wait_time)
+        if use_tokens:
+            self.token_limiter._record_acquire(tokens, wait_time)
+    
+    def release(self) -> None:
+        """リクエスト完了通知（現在は何もしない）."""
+        pass
+    
+    def get_stats(self) -> Dict[str, any]:
+        """統計情報を取得."""
+        stats = {
+            "model": self.model,
+            "requests": self.request_limiter.get_stats(),
+        }
+        if self.token_limiter:
+            stats["tokens"] = self.token_limiter.get_stats()
+        return stats
+    
+    def reset(self) -> None:
+        """レート制限をリセット."""
+        self.request_limiter.reset()
+        if self.token_limiter:
+            self.token_limiter.reset()
+
+
+# 原子的トークンバケット（Redis側の時刻を使用し、プロセス間で時計ずれの影響を受けない）
+# KEYS[1]: バケットキー
+# ARGV: 1秒あたりの補充量, 容量, 要求量（リース込み）, 最低要求量, 返却量
+# 戻り値: {付与量, 待機秒数}
+TOKEN_BUCKET_LUA = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local minimum = tonumber(ARGV[4])
+local refund = tonumber(ARGV[5] or '0')
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local data = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(data[1])
+local ts = tonumber(data[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate + refund)
+
+local granted = 0
+local wait = 0
+if tokens >= minimum then
+    granted = math.min(tokens, requested)
+    tokens = tokens - granted
+else
+    wait = (minimum - tokens) / rate
+end
+
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 1000)
+return {tostring(granted), tostring(wait)}
+"""
+
+
+class DistributedRateLimiter:
+    """Redisを使ったプロセス間共有のレート制限器.
+    
+    RateLimiter と同じインターフェースを持つ。Redis上のトークンバケットから
+    lease_size 単位でまとめて前借り（リース）し、ローカルで消費することで
+    リクエスト毎のRedis往復を避ける。Redisに接続できない間は
+    ローカルの RateLimiter にフォールバックする。
+    """
+    
+    def __init__(
+        self,
+        redis,
+        requests_per_minute: int,
+        service_name: str = "default",
+        burst: Optional[float] = None,
+        lease_size: float = 5,
+        lease_ttl: float = 1.0,
+        key_prefix: str = "ratelimit",
+        fallback_share: float = 1.0,
+        retry_interval: float = 5.0
+    ):
+        """初期化.
+        
+        Args:
+            redis: redis.asyncio.Redis 互換クライアント
+            requests_per_minute: 1分あたりの上限（全プロセス合計）
+            service_name: サービス名（Redisキーに使用）
+            burst: バケット容量（デフォルトは lease_size）
+            lease_size: 1回のRedis呼び出しで前借りする量
+            lease_ttl: リースの有効期間（秒）。期限切れの残量は次回のRedis呼び出しで返却する
+            key_prefix: Redisキーのプレフィックス
+            fallback_share: Redis停止時にこのプロセスが使う割合
+            retry_interval: Redis停止検出後、再接続を試みるまでの秒数
+        """
+        self.redis = redis
+        self.requests_per_minute = requests_per_minute
+        self.service_name = service_name
+        self.rate_per_second = requests_per_minute / 60.0
+        self.lease_size = max(1.0, float(lease_size))
+        self.capacity = max(self.lease_size, float(burst or self.lease_size))
+        self.lease_ttl = lease_ttl
+        self.key = f"{key_prefix}:{service_name}"
+        self.retry_interval = retry_interval
+        
+        self.fallback = RateLimiter(
+            max(1, int(requests_per_minute * fallback_share)),
+            f"{service_name}:fallback",
+            burst=burst * fallback_share if burst else None
+        )
+        
+        self._script = redis.register_script(TOKEN_BUCKET_LUA) if redis is not None else None
+        self._lease = 0.0
+        self._lease_expires = 0.0
+        # 期限切れで未使用のままになったリース（次回のRedis呼び出しで返却）
+        self._pending_refund = 0.0
+        self._redis_down_until = 0.0
+        # リース補充を直列化する（補充待ちの間はロックを保持しない）
+        self._lock = asyncio.Lock()
+        
+        self.stats = {
+            "acquired": 0,
+            "redis_calls": 0,
+            "redis_errors": 0,
+            "fallback_acquired": 0,
+            "waited": 0,
+            "total_wait_time": 0.0,
+        }
+        
+    async def acquire(self, cost: float = 1.0) -> None:
+        """レート制限チェックとリクエスト許可.
+        
+        リース補充はロック内で直列化するが、補充待ちの sleep と
+        フォールバックの待機はロックを解放してから行う。
+        """
+        if self.rate_per_second <= 0:
+            return
             
-            # 最小間隔制限
-            if self.request_times and self.min_interval > 0:
-                last_request = self.request_times[-1]
-                interval_wait = self.min_interval - (current_time - last_request)
+        while True:
+            use_fallback = False
+            wait_time = 0.0
+            async with self._lock:
+                now = time.monotonic()
+                if now >= self._lease_expires and self._lease > 0:
+                    self._pending_refund += self._lease
+                    self._lease = 0.0
+                    
+                if self._lease >= cost:
+                    self._lease -= cost
+                    self.stats["acquired"] += 1
+                    return
+                    
+                if self._script is None or now < self._redis_down_until:
+                    use_fallback = True
+                else:
+                    try:
+                        granted, wait_time = await self._fetch_lease(cost - self._lease)
+                    except Exception as e:
+                        logger.warning(
+                            f"Redis rate limiter unavailable for {self.service_name}, "
+                            f"falling back to local limiting: {e}"
+                        )
+                        self.stats["redis_errors"] += 1
+                        self._redis_down_until = now + self.retry_interval
+                        continue
+                        
+                    if granted > 0:
+                        self._lease += granted
+                        self._lease_expires = time.monotonic() + self.lease_ttl
+                        continue
+                        
+                    self.stats["waited"] += 1
+                    self.stats["total_wait_time"] += wait_time
+                    
+            if use_fallback:
+                await self.fallback.acquire(cost)
+                self.stats["fallback_acquired"] += 1
+                return
                 
-                if interval_wait > 0:
-                    logger.debug(
-                        f"Enforcing minimum interval for {self.service_name}. "
-                        f"Waiting {interval_wait:.2f} seconds"
-                    )
-                    await asyncio.sleep(interval_wait)
-                    current_time = time.time()
-            
-            # リクエスト時間を記録
-            self.request_times.append(current_time)
-            
+            await asyncio.sleep(wait_time)
+                
+    async def _fetch_lease(self, needed: float) -> Tuple[float, float]:
+        """Redisからリースを取得（付与量, 待機秒数）."""
+        self.stats["redis_calls"] += 1
+        requested = max(needed, self.lease_size)
+        refund = self._pending_refund
+        result = await self._script(
+            keys=[self.key],
+            args=[self.rate_per_second, max(self.capacity, needed), requested, needed, refund]
+        )
+        # 返却はスクリプトが成功した場合のみ確定する
+        self._pending_refund -= refund
+        granted, wait_time = result
+        return float(granted), float(wait_time)
+        
     def release(self) -> None:
         """リクエスト完了通知（現在は何もしない）."""
         pass
         
     def get_stats(self) -> Dict[str, any]:
         """統計情報を取得."""
-        current_time = time.time()
-        cutoff_time = current_time - self.window_seconds
-        
-        # 現在のウィンドウ内のリクエスト数
-        recent_requests = [t for t in self.request_times if t > cutoff_time]
-        
-        return {
+        stats = self.stats.copy()
+        stats.update({
             "service_name": self.service_name,
             "requests_per_minute": self.requests_per_minute,
-            "current_requests_in_window": len(recent_requests),
-            "remaining_requests": max(0, self.requests_per_minute - len(recent_requests)),
-            "last_request_time": self.request_times[-1] if self.request_times else None,
-        }
+            "lease_remaining": self._lease if time.monotonic() < self._lease_expires else 0.0,
+            "redis_available": time.monotonic() >= self._redis_down_until,
+        })
+        return stats
         
     def reset(self) -> None:
-        """レート制限をリセット."""
-        self.request_times.clear()
-        logger.debug(f"Rate limiter reset for {self.service_name}")
+        """ローカル状態をリセット（Redis上のバケットは保持）."""
+        self._lease = 0.0
+        self._lease_expires = 0.0
+        self._pending_refund = 0.0
+        self._redis_down_until = 0.0
+        self.fallback.reset()
+        logger.debug(f"Distributed rate limiter reset for {self.service_name}")
 
 
 class GlobalRateLimiter:
     """グローバルレート制限管理."""
     
     _limiters: Dict[str, RateLimiter] = {}
+    _model_limiters: Dict[Tuple[str, str], ModelRateLimiter] = {}
+    _distributed_limiters: Dict[Tuple[str, str], DistributedRateLimiter] = {}
+    _redis_clients: Dict[str, Any] = {}
     
     @classmethod
     def get_limiter(cls, service_name: str, requests_per_minute: int) -> RateLimiter:
@@ -105,14 +423,102 @@ class GlobalRateLimiter:
             cls._limiters[service_name] = RateLimiter(requests_per_minute, service_name)
         return cls._limiters[service_name]
         
+    @classmethod
+    def get_distributed_limiter(
+        cls,
+        redis_url: str,
+        service_name: str,
+        requests_per_minute: int,
+        **options
+    ) -> Union[DistributedRateLimiter, RateLimiter]:
+        """Redis共有のレート制限器を取得または作成.
+        
+        redis パッケージが利用できない場合はローカルの制限器を返す。
+        """
+        if not REDIS_AVAILABLE:
+            logger.warning("redis package not available, using local rate limiting")
+            return cls.get_limiter(service_name, requests_per_minute)
+            
+        key = (redis_url, service_name)
+        if key not in cls._distributed_limiters:
+            if redis_url not in cls._redis_clients:
+                # 接続は最初のコマンド実行時に確立される
+                cls._redis_clients[redis_url] = aioredis.from_url(redis_url)
+            cls._distributed_limiters[key] = DistributedRateLimiter(
+                cls._redis_clients[redis_url],
+                requests_per_minute,
+                service_name,
+                **options
+            )
+        return cls._distributed_limiters[key]
+    
+    @classmethod
+    def get_model_limiter(
+        cls,
+        service_name: str,
+        model: str,
+        requests_per_minute: int,
+        tokens_per_minute: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        token_lease_size: Optional[float] = None,
+        **options
+    ) -> ModelRateLimiter:
+        """モデル用のRPM/TPMレート制限器を取得または作成.
+        
+        redis_url を指定すると、サービス単位の共有RPMバケットと
+        モデル単位の共有TPMバケットを使う。options の lease_size は
+        リクエスト数単位のため、TPMバケットのリースには token_lease_size
+        （トークン数単位、未指定時は lease_size 件分の平均トークン数）を使う。
+        """
+        key = (service_name, model)
+        if key not in cls._model_limiters:
+            request_limiter = token_limiter = None
+            if redis_url and REDIS_AVAILABLE:
+                request_limiter = cls.get_distributed_limiter(
+                    redis_url, service_name, requests_per_minute, **options
+                )
+                if tokens_per_minute:
+                    token_options = dict(options)
+                    lease_size = token_options.pop("lease_size", 5)
+                    if token_lease_size is None:
+                        token_lease_size = lease_size * tokens_per_minute / max(1, requests_per_minute)
+                    token_limiter = cls.get_distributed_limiter(
+                        redis_url,
+                        f"{service_name}:{model}:tpm",
+                        tokens_per_minute,
+                        burst=tokens_per_minute,
+                        lease_size=min(token_lease_size, tokens_per_minute),
+                        **token_options
+                    )
+            cls._model_limiters[key] = ModelRateLimiter(
+                service_name,
+                model,
+                requests_per_minute,
+                tokens_per_minute,
+                request_limiter=request_limiter,
+                token_limiter=token_limiter
+            )
+        return cls._model_limiters[key]
+    
     @classmethod
     def get_all_stats(cls) -> Dict[str, Dict[str, any]]:
         """全サービスの統計情報を取得."""
-        return {name: limiter.get_stats() for name, limiter in cls._limiters.items()}
-        
+        stats = {name: limiter.get_stats() for name, limiter in cls._limiters.items()}
+        for (service_name, model), limiter in cls._model_limiters.items():
+            stats[f"{service_name}:{model}"] = limiter.get_stats()
+        for (_, service_name), limiter in cls._distributed_limiters.items():
+            stats[f"{service_name}:distributed"] = limiter.get_stats()
+        return stats
+    
     @classmethod
     def reset_all(cls) -> None:
         """全てのレート制限をリセット."""
         for limiter in cls._limiters.values():
             limiter.reset()
-        cls._limiters.clear() 
\ No newline at end of file
+        for limiter in cls._model_limiters.values():
+            limiter.reset()
+        for limiter in cls._distributed_limiters.values():
+            limiter.reset()
+        cls._limiters.clear()
+        cls._model_limiters.clear()
+        cls._distributed_limiters.clear()
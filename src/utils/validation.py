@@ -7,10 +7,20 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
 from ..config.constants import CODE_EXTENSIONS, IMAGE_EXTENSIONS, MARKDOWN_EXTENSIONS
+from .markdown_ast import LineKind, MarkdownDocument, parse_markdown
 
+# 単語数の集計で除外する Markdown の構文
+_MARKDOWN_SYNTAX_PATTERN = re.compile(r'[#*`\[\]()_-]')
+_LINK_PATTERN = re.compile(r'\[([^\]]*)\]\(([^)]*)\)')
+_IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)]*)\)')
 
-def validate_markdown_content(content: str) -> Dict[str, Any]:
-    """Markdownコンテンツのバリデーション."""
+
+def validate_markdown_content(content: str, document: Optional[MarkdownDocument] = None) -> Dict[str, Any]:
+    """Markdownコンテンツのバリデーション.
+    
+    document を省略した場合は parse_markdown で解析する（同じ内容の解析結果は共有される）。
+    コードブロック内の行は見出し・リンク・画像・単語数の対象にしない。
+    """
     errors = []
     warnings = []
     stats = {
@@ -32,51 +42,46 @@ def validate_markdown_content(content: str) -> Dict[str, Any]:
             "stats": stats
         }
     
-    lines = content.split('\n')
-    stats["total_lines"] = len(lines)
+    if document is None:
+        document = parse_markdown(content)
+    stats["total_lines"] = document.line_count
+    headings = {block.start_line: block for block in document.headings()}
     
     # 基本的な統計を収集
     word_count = 0
     in_code_block = False
-    code_block_lang = None
     
-    for i, line in enumerate(lines):
-        line_stripped = line.strip()
+    for i, kind in enumerate(document.kinds):
+        if kind == LineKind.BLANK or kind == LineKind.CODE or kind == LineKind.FRONT_MATTER:
+            continue
+        
+        # コードブロックのチェック
+        if kind == LineKind.FENCE:
+            in_code_block = not in_code_block
+            if not in_code_block:
+                continue
+            stats["code_block_count"] += 1
         
-        # 単語数カウント（コードブロック内は除外）
-        if not in_code_block and line_stripped:
-            # Markdownの構文を除外した単語数
-            clean_line = re.sub(r'[#*`\[\]()_-]', ' ', line_stripped)
-            words = clean_line.split()
-            word_count += len([w for w in words if w.strip()])
+        line = document.line(i)
+        
+        # 単語数カウント（Markdownの構文を除外した単語数）
+        word_count += len(_MARKDOWN_SYNTAX_PATTERN.sub(' ', line).split())
         
         # 見出しのチェック
-        if line_stripped.startswith('#'):
+        heading = headings.get(i)
+        if heading is not None:
             stats["heading_count"] += 1
             
             # 見出しレベルのチェック
-            heading_level = len(line_stripped) - len(line_stripped.lstrip('#'))
-            if heading_level > 6:
-                warnings.append(f"Line {i+1}: Heading level {heading_level} exceeds maximum (6)")
+            if heading.level > 6:
+                warnings.append(f"Line {i+1}: Heading level {heading.level} exceeds maximum (6)")
             
             # 見出しテキストのチェック
-            heading_text = line_stripped.lstrip('#').strip()
-            if not heading_text:
+            if not heading.title:
                 errors.append(f"Line {i+1}: Empty heading")
         
-        # コードブロックのチェック
-        if line_stripped.startswith('```'):
-            if not in_code_block:
-                in_code_block = True
-                stats["code_block_count"] += 1
-                code_block_lang = line_stripped[3:].strip()
-            else:
-                in_code_block = False
-                code_block_lang = None
-        
         # リンクのチェック
-        link_pattern = r'\[([^\]]*)\]\(([^)]*)\)'
-        links = re.findall(link_pattern, line)
+        links = _LINK_PATTERN.findall(line)
         stats["link_count"] += len(links)
         
         for link_text, link_url in links:
@@ -86,8 +91,7 @@ def validate_markdown_content(content: str) -> Dict[str, Any]:
                 errors.append(f"Line {i+1}: Empty link URL")
         
         # 画像のチェック
-        image_pattern = r'!\[([^\]]*)\]\(([^)]*)\)'
-        images = re.findall(image_pattern, line)
+        images = _IMAGE_PATTERN.findall(line)
         stats["image_count"] += len(images)
         
         for alt_text, image_url in images:
@@ -99,7 +103,7 @@ def validate_markdown_content(content: str) -> Dict[str, Any]:
     stats["word_count"] = word_count
     
     # 最終的なコードブロックのチェック
-    if in_code_block:
+    if document.unclosed_fence:
         errors.append("Unclosed code block detected")
     
     # 構造的な問題のチェック
@@ -10,6 +10,7 @@ import os
 from pathlib import Path
 
 from .base import BaseWorker, Event, EventType
+from ..clients.object_store import create_object_store
 from ..config import Config
 
 logger = logging.getLogger(__name__)
@@ -51,6 +52,7 @@ class AggregatorWorker(BaseWorker):
     def __init__(self, config: Config, worker_id: str = "aggregator_worker"):
         """初期化."""
         super().__init__(config, worker_id)
+        self.object_store = create_object_store(config)
         self.workflow_states: Dict[str, WorkflowState] = {}
         self.completion_thresholds = {
             'min_chapters': 1,
@@ -59,6 +61,11 @@ class AggregatorWorker(BaseWorker):
             'min_content_per_paragraph': 3  # article, script, tweet等
         }
         
+    async def stop(self):
+        """ワーカーの停止（ストレージの接続も閉じる）."""
+        await super().stop()
+        await self.object_store.close()
+        
     def get_subscriptions(self) -> Set[str]:
         """購読するイベントタイプを返す."""
         return {
@@ -440,11 +447,7 @@ class AggregatorWorker(BaseWorker):
         }
         
     async def _generate_final_outputs(self, workflow_state: WorkflowState, result: AggregationResult) -> None:
-        """最終出力を生成."""
-        # 出力ディレクトリを確保
-        output_dir = Path(self.config.storage.output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
+        """最終出力を生成（オブジェクトストレージに書き込む）."""
         # JSONレポートの生成
         report = {
             'workflow_id': workflow_state.workflow_id,
@@ -464,13 +467,16 @@ class AggregatorWorker(BaseWorker):
         }
         
         # レポートファイルを保存
-        report_file = output_dir / f"report_{workflow_state.workflow_id}.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+        report_url = await self.object_store.put_text(
+            f"report_{workflow_state.workflow_id}.json",
+            json.dumps(report, ensure_ascii=False, indent=2),
+            'application/json'
+        )
         
-        logger.info(f"Generated final report: {report_file}")
+        logger.info(f"Generated final report: {report_url}")
         
         # 各コンテンツタイプ別にファイルを保存
+        content_files = []
         for content_id, content_item in workflow_state.content_items.items():
             content = content_item['content']
             content_type = content.get('type', 'unknown')
@@ -480,13 +486,15 @@ class AggregatorWorker(BaseWorker):
             safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
             safe_title = safe_title.replace(' ', '_')[:50]
             
-            content_file = output_dir / f"{content_type}_{safe_title}_{content_id}.txt"
-            with open(content_file, 'w', encoding='utf-8') as f:
-                f.write(f"Title: {title}\n")
-                f.write(f"Type: {content_type}\n")
-                f.write(f"Generated at: {content_item['received_at']}\n")
-                f.write(f"\n{content.get('content', '')}\n")
-                
+            content_files.append(self.object_store.put_text(
+                f"{content_type}_{safe_title}_{content_id}.txt",
+                f"Title: {title}\n"
+                f"Type: {content_type}\n"
+                f"Generated at: {content_item['received_at']}\n"
+                f"\n{content.get('content', '')}\n"
+            ))
+            
+        await asyncio.gather(*content_files)
         logger.info(f"Generated {len(workflow_state.content_items)} content files")
         
         # レポート保存イベントを発行
@@ -497,7 +505,9 @@ class AggregatorWorker(BaseWorker):
                 data={
                     'report': report,
                     'format': 'json',
-                    'output_dir': str(output_dir),
+                    'output_dir': str(Path(self.config.storage.output_dir)),
+                    'report_url': report_url,
+                    'storage_backend': self.object_store.backend,
                     'files_generated': len(workflow_state.content_items) + 1
                 }
             )
@@ -574,7 +584,9 @@ class AggregatorWorker(BaseWorker):
         return f"section_{chapter_index}_{section_index}_{title.replace(' ', '_')[:20]}"
         
     def _generate_paragraph_id(self, paragraph: Dict[str, Any]) -> str:
-        """パラグラフIDを生成."""
+        """パラグラフIDを生成（パーサーが付けた安定 ID があればそれを使う）."""
+        if paragraph.get('paragraph_id'):
+            return f"paragraph_{paragraph['paragraph_id']}"
         chapter_index = paragraph.get('chapter_index', 0)
         section_index = paragraph.get('section_index', 0)
         paragraph_index = paragraph.get('paragraph_index', 0)
@@ -1,12 +1,18 @@
 """AIワーカー."""
 
+import copy
 import logging
 from typing import Set, Dict, Any, Optional
 import asyncio
 from dataclasses import dataclass
 
 from .base import BaseWorker, Event, EventType
+from ..clients.router import ProviderRouter
 from ..config import Config
+from ..core.derivation import DerivationGraph, extractive_summary
+from ..core.packing import PackBuffer, build_packed_prompt_parts, response_text, unpack_results
+from ..core.routing import ModelRoute, ModelRoutingPolicy
+from ..utils.dedup import DuplicateMatch, NearDuplicateIndex
 
 logger = logging.getLogger(__name__)
 
@@ -23,12 +29,72 @@ class GenerationRequest:
 class AIWorker(BaseWorker):
     """AI処理ワーカー."""
     
+    # パラグラフ毎に生成する出力フォーマット
+    GENERATION_FORMATS = ['article', 'script', 'script_json', 'tweet', 'description']
+    
+    # パック生成時の出力フォーマット毎の形式
+    PACKED_OUTPUT_FORMATS = {
+        'article': 'markdown',
+        'script': 'text',
+        'script_json': 'json',
+        'tweet': 'text',
+        'description': 'text',
+    }
+    
+    # 記事からローカルに導出する短文フォーマット（フォーマット → 依存元）
+    DERIVED_FORMATS = {
+        'tweet': ['article'],
+        'description': ['article'],
+    }
+    
+    # 導出時の最大文字数
+    DERIVED_MAX_CHARS = {
+        'tweet': 100,
+        'description': 150,
+    }
+    
     def __init__(self, config: Config, worker_id: str = "ai_worker"):
         """初期化."""
         super().__init__(config, worker_id)
         self.claude_client = None  # 後で実装
         self.openai_client = None  # 後で実装
         self.rate_limiter = None   # 後で実装
+        self.provider_router: Optional[ProviderRouter] = None
+        self.routing_policy = ModelRoutingPolicy(config)
+        max_wait = getattr(getattr(config, 'api', None), 'packing_max_wait', None)
+        self.pack_buffer = PackBuffer(
+            max_wait=max_wait if isinstance(max_wait, (int, float)) and not isinstance(max_wait, bool) else 5.0
+        )
+        self._pack_flush_tasks: Set[asyncio.Task] = set()
+        
+        # 近似重複パラグラフの生成結果を再利用するインデックス
+        api = getattr(config, 'api', None)
+        threshold = getattr(api, 'dedup_threshold', None)
+        self.dedup_index: Optional[NearDuplicateIndex] = None
+        if getattr(api, 'dedup_enabled', True) is not False:
+            self.dedup_index = NearDuplicateIndex(
+                threshold=threshold if isinstance(threshold, float) else 0.9
+            )
+        self.dedup_stats = {"reused_paragraphs": 0, "saved_calls": 0}
+        
+        # 出力フォーマットの依存関係（短文は記事の生成後に導出）
+        dependencies = {output_format: [] for output_format in self.GENERATION_FORMATS}
+        if getattr(api, 'derive_short_forms', True) is not False:
+            dependencies.update(self.DERIVED_FORMATS)
+        self.generation_graph = DerivationGraph(dependencies)
+        self.derivation_stats = {"derived_outputs": 0}
+        
+    def set_ai_clients(self, claude_client=None, openai_client=None) -> None:
+        """AIクライアントを設定し、ヘッジ・フェイルオーバー用のルーターを構築."""
+        self.claude_client = claude_client
+        self.openai_client = openai_client
+        
+        clients = {}
+        if claude_client:
+            clients["claude"] = claude_client
+        if openai_client:
+            clients["openai"] = openai_client
+        self.provider_router = ProviderRouter(clients, self.config) if clients else None
         
     def get_subscriptions(self) -> Set[EventType]:
         """購読するイベントタイプを返す."""
@@ -95,22 +161,338 @@ class AIWorker(BaseWorker):
         if not paragraph_data or not paragraph_data.get('content'):
             raise ValueError("No paragraph data provided")
             
+        # 小さなパラグラフはパック単位で揃えてからまとめて生成
+        pack = paragraph_data.get('pack') or {}
+        if self.provider_router and pack.get('size', 1) > 1:
+            key = f"{event.workflow_id}:{pack['id']}"
+            is_new_pack = key not in self.pack_buffer.pending_keys()
+            group = self.pack_buffer.add(key, paragraph_data)
+            if group is not None:
+                await self._handle_packed_paragraphs(event, group)
+            elif is_new_pack:
+                self._schedule_pack_flush(event, key)
+            return
+            
+        # 近似重複のパラグラフは過去の生成結果を再利用
+        if await self._reuse_duplicate(event, paragraph_data):
+            return
+            
         logger.info(f"Generating content for paragraph {paragraph_data.get('paragraph_index', 0)}")
         
-        # 並列でコンテンツ生成
-        generation_tasks = [
-            self._generate_article(paragraph_data, None),
-            self._generate_script(paragraph_data, None),
-            self._generate_script_json(paragraph_data, None),
-            self._generate_tweet(paragraph_data, None),
-            self._generate_description(paragraph_data, None)
+        # フォーマット毎のモデル・max_tokens を決定
+        routes = self._route_formats(paragraph_data, self.GENERATION_FORMATS)
+        
+        # 依存順にコンテンツ生成（依存のないフォーマットは並列）
+        outputs = await self.generation_graph.run({
+            output_format: self._paragraph_producer(event, output_format, paragraph_data, routes[output_format])
+            for output_format in self.GENERATION_FORMATS
+        })
+        results = [outputs[output_format] for output_format in self.GENERATION_FORMATS]
+        # 応答を解析できなかった場合はイベントごとリトライ（最終的にDLQ）に委ねる
+        unparsed = next((r for r in results if isinstance(r, ValueError)), None)
+        if unparsed is not None:
+            raise unparsed
+        await self._publish_generated(event, paragraph_data, results, routes)
+        self._remember_generated(event, paragraph_data, results)
+        
+    def _schedule_pack_flush(self, event: Event, key: str) -> None:
+        """パックが max_wait 秒以内に揃わない場合に揃った分だけで生成するタスクを登録."""
+        task = asyncio.create_task(self._flush_pack_after_wait(event, key))
+        self._pack_flush_tasks.add(task)
+        task.add_done_callback(self._pack_flush_tasks.discard)
+        
+    async def _flush_pack_after_wait(self, event: Event, key: str) -> None:
+        """max_wait 経過後に未完成のパックを取り出して生成."""
+        await asyncio.sleep(self.pack_buffer.max_wait)
+        if key not in self.pack_buffer.expired():
+            return
+        group = self.pack_buffer.pop(key)
+        if not group:
+            return
+        logger.warning(
+            f"Pack {key} incomplete after {self.pack_buffer.max_wait}s, "
+            f"generating {len(group)} of {group[0]['pack']['size']} paragraphs"
+        )
+        if self.metrics:
+            self.metrics.increment_counter("ai.pack_timeouts")
+        try:
+            await self._handle_packed_paragraphs(event, group)
+        except Exception as e:
+            logger.error(f"Packed generation for {key} failed: {e}")
+            
+    async def _handle_packed_paragraphs(self, event: Event, group: list[Dict[str, Any]]) -> None:
+        """パックされたパラグラフをフォーマット毎に1リクエストで生成し、パラグラフ毎に分配."""
+        group = [p for p in group if not await self._reuse_duplicate(event, p)]
+        if not group:
+            return
+            
+        logger.info(
+            f"Generating content for {len(group)} packed paragraphs "
+            f"{group[0].get('paragraph_index', 0)}-{group[-1].get('paragraph_index', 0)}"
+        )
+        
+        # パック全体の内容でルートを決定
+        packed_data = dict(group[0], content="\n\n".join(p.get('content', '') for p in group))
+        routes = self._route_formats(packed_data, self.GENERATION_FORMATS)
+        
+        outputs = await self.generation_graph.run({
+            output_format: self._packed_producer(event, output_format, group, routes[output_format])
+            for output_format in self.GENERATION_FORMATS
+        })
+        format_results = [outputs[output_format] for output_format in self.GENERATION_FORMATS]
+        
+        if self.metrics:
+            self.metrics.increment_counter("ai.packed_paragraphs", len(group))
+        
+        # フォーマット毎の結果をパラグラフ毎に並べ替える
+        for position, paragraph_data in enumerate(group):
+            results = [
+                result if isinstance(result, Exception) else result[position]
+                for result in format_results
+            ]
+            await self._publish_generated(event, paragraph_data, results, routes)
+            self._remember_generated(event, paragraph_data, results)
+            
+    async def _generate_packed(
+        self,
+        event: Event,
+        output_format: str,
+        group: list[Dict[str, Any]],
+        route: Optional[ModelRoute] = None
+    ) -> list[Optional[Dict[str, Any]]]:
+        """1フォーマット分をパック単位で生成（分配に失敗した場合はパラグラフ毎に生成）.
+        
+        route を指定した場合はプロバイダー毎のモデルと max_tokens をリクエストに反映する。
+        
+        Raises:
+            ValueError: 1パラグラフ分の応答も解析できない場合（リトライ・DLQに委ねる）
+        """
+        prompt_parts = build_packed_prompt_parts(output_format, [p.get('content', '') for p in group])
+        route_kwargs = {'models': route.models, 'max_tokens': route.max_tokens} if route else {}
+        response = await self.provider_router.generate_structured_content(
+            prompt_parts.suffix,
+            workflow_id=event.workflow_id,
+            content_type=output_format,
+            system_prompt=prompt_parts.system or None,
+            context=prompt_parts.prefix,
+            **route_kwargs
+        )
+        if self.metrics:
+            self.metrics.increment_counter("ai.packed_requests")
+        
+        try:
+            contents = unpack_results(response_text(response), len(group), output_format)
+        except ValueError as e:
+            if len(group) == 1:
+                raise
+            logger.warning(f"Falling back to per-paragraph {output_format} generation: {e}")
+            # 解析できなかったパラグラフだけを失敗として扱う
+            singles = await asyncio.gather(
+                *(self._generate_packed(event, output_format, [p], route) for p in group),
+                return_exceptions=True
+            )
+            return [
+                results if isinstance(results, BaseException) else results[0]
+                for results in singles
+            ]
+        
+        results = []
+        for paragraph_data, content in zip(group, contents):
+            title = paragraph_data.get('title', 'Unknown')
+            if output_format == 'script_json':
+                # パラグラフ毎の生成と同じ scenes 形式
+                result = {'type': output_format, 'title': f"構造化台本: {title}", **content}
+            else:
+                result = {'type': output_format, 'title': title, 'content': content}
+            result.update({
+                'format': self.PACKED_OUTPUT_FORMATS.get(output_format, 'text'),
+                'provider': response.get('provider'),
+                'packed': len(group) > 1
+            })
+            results.append(result)
+        return results
+        
+    def _paragraph_producer(
+        self,
+        event: Event,
+        output_format: str,
+        paragraph_data: Dict[str, Any],
+        route: ModelRoute
+    ):
+        """1パラグラフ・1フォーマット分の生成処理（依存元があれば導出）."""
+        async def produce(upstream: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            source = next(iter(upstream.values()), None)
+            if source:
+                return self._derive_short_form(output_format, paragraph_data, source)
+            # 依存元がない・失敗した場合は独立に生成
+            if self.provider_router:
+                results = await self._generate_packed(event, output_format, [paragraph_data], route)
+                return results[0]
+            generator = getattr(self, f"_generate_{output_format}")
+            return await generator(paragraph_data, None)
+        return produce
+        
+    def _packed_producer(
+        self,
+        event: Event,
+        output_format: str,
+        group: list[Dict[str, Any]],
+        route: ModelRoute
+    ):
+        """パック・1フォーマット分の生成処理（依存元があればパラグラフ毎に導出）."""
+        async def produce(upstream: Dict[str, Any]) -> list[Optional[Dict[str, Any]]]:
+            sources = next(iter(upstream.values()), None)
+            if sources is None:
+                return await self._generate_packed(event, output_format, group, route)
+                
+            results = []
+            for paragraph_data, source in zip(group, sources):
+                if source and not isinstance(source, BaseException):
+                    results.append(self._derive_short_form(output_format, paragraph_data, source))
+                else:
+                    # 依存元が失敗したパラグラフは単独で生成
+                    generated = await self._generate_packed(event, output_format, [paragraph_data], route)
+                    results.append(generated[0])
+            return results
+        return produce
+        
+    def _derive_short_form(
+        self,
+        output_format: str,
+        paragraph_data: Dict[str, Any],
+        source: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """生成済みの記事から短文（ツイート・説明文）を抽出的要約で導出."""
+        title = paragraph_data.get('title', 'Unknown')
+        summary = extractive_summary(
+            source.get('content', ''),
+            max_chars=self.DERIVED_MAX_CHARS.get(output_format, 150)
+        )
+        
+        if output_format == 'tweet':
+            content = f"🚀 {title}\n\n{summary}\n\n#プログラミング #技術解説"
+            result = {
+                'type': 'tweet',
+                'title': f"ツイート: {title}",
+                'content': content,
+                'character_count': len(content),
+                'hashtags': ['プログラミング', '技術解説'],
+                'format': 'text'
+            }
+        else:
+            result = {
+                'type': output_format,
+                'title': f"説明: {title}" if output_format == 'description' else title,
+                'content': summary,
+                'word_count': len(summary.split()),
+                'format': 'text'
+            }
+            
+        result['derived_from'] = source.get('type', 'article')
+        self.derivation_stats["derived_outputs"] += 1
+        if self.metrics:
+            self.metrics.increment_counter("ai.derived_outputs", labels={"format": output_format})
+        return result
+        
+    async def _reuse_duplicate(self, event: Event, paragraph_data: Dict[str, Any]) -> bool:
+        """近似重複のパラグラフがあれば生成結果を再利用して発行.
+        
+        Returns:
+            再利用したか
+        """
+        if self.dedup_index is None:
+            return False
+            
+        match = self.dedup_index.query(paragraph_data.get('content', ''))
+        if match is None:
+            return False
+            
+        results = [
+            self._adapt_result(result, match, paragraph_data)
+            for result in match.payload["results"]
         ]
+        self.dedup_stats["reused_paragraphs"] += 1
+        self.dedup_stats["saved_calls"] += len(results)
+        if self.metrics:
+            self.metrics.increment_counter("ai.dedup.saved_calls", len(results))
+            
+        logger.info(
+            f"Reusing content for paragraph {paragraph_data.get('paragraph_index', 0)} "
+            f"(similarity {match.similarity:.2f} to {match.key})"
+        )
+        await self._publish_generated(event, paragraph_data, results, {})
+        return True
+        
+    def _remember_generated(self, event: Event, paragraph_data: Dict[str, Any], results: list) -> None:
+        """生成結果を近似重複インデックスに登録."""
+        if self.dedup_index is None:
+            return
+            
+        succeeded = [copy.deepcopy(r) for r in results if r and not isinstance(r, Exception)]
+        if len(succeeded) < len(results):
+            # 一部失敗した結果は再利用しない
+            return
+            
+        key = (
+            f"{event.workflow_id}:{paragraph_data.get('chapter_index', 0)}-"
+            f"{paragraph_data.get('section_index', 0)}-{paragraph_data.get('paragraph_index', 0)}"
+        )
+        self.dedup_index.add(
+            key,
+            paragraph_data.get('content', ''),
+            {"content": paragraph_data.get('content', ''), "results": succeeded}
+        )
+        
+    def _adapt_result(
+        self,
+        result: Dict[str, Any],
+        match: DuplicateMatch,
+        paragraph_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """過去の生成結果を新しいパラグラフ向けに調整（元の本文の引用を差し替える）."""
+        original = match.payload["content"]
+        content = paragraph_data.get('content', '')
+        
+        def replace(value):
+            if isinstance(value, str):
+                return value.replace(original, content) if original else value
+            if isinstance(value, list):
+                return [replace(item) for item in value]
+            if isinstance(value, dict):
+                return {k: replace(v) for k, v in value.items()}
+            return value
+            
+        adapted = replace(copy.deepcopy(result))
+        adapted['reused_from'] = {"key": match.key, "similarity": round(match.similarity, 3)}
+        return adapted
         
-        results = await asyncio.gather(*generation_tasks, return_exceptions=True)
+    def get_dedup_report(self) -> Dict[str, Any]:
+        """近似重複による再利用のレポート（削減した生成呼び出し数など）."""
+        report = dict(self.dedup_stats)
+        if self.dedup_index is not None:
+            report.update(self.dedup_index.get_stats())
+        return report
         
-        # 成功した結果をイベントとして発行
+    def get_status(self) -> dict:
+        """ワーカーの状態を取得."""
+        status = super().get_status()
+        status["dedup"] = self.get_dedup_report()
+        status["derivation"] = dict(self.derivation_stats)
+        return status
+        
+    async def _publish_generated(
+        self,
+        event: Event,
+        paragraph_data: Dict[str, Any],
+        results: list,
+        routes: Dict[str, ModelRoute]
+    ) -> None:
+        """成功した生成結果をイベントとして発行."""
         for idx, result in enumerate(results):
             if not isinstance(result, Exception) and result:
+                route = routes.get(result.get('type'))
+                if route:
+                    result['model_route'] = route.to_dict()
                 content_event = Event(
                     type=EventType.CONTENT_GENERATED,
                     workflow_id=event.workflow_id,
@@ -168,6 +550,20 @@ class AIWorker(BaseWorker):
         # 必要に応じて追加の処理を実行
         # 例: 特定の構造パターンに基づく追加のコンテンツ生成
         
+    def _route_formats(self, paragraph_data: Dict[str, Any], formats: list[str]) -> Dict[str, ModelRoute]:
+        """出力フォーマット毎にモデルのティアと max_tokens を決定."""
+        content = paragraph_data.get('content', '')
+        complexity = self._assess_complexity(content)
+        content_type = self._classify_content_type(content)
+        
+        self.routing_policy.metrics = self.metrics
+        return {
+            output_format: self.routing_policy.route(
+                output_format, content, complexity=complexity, content_type=content_type
+            )
+            for output_format in formats
+        }
+        
     async def _analyze_section_structure(self, section_data: Dict[str, Any]) -> Dict[str, Any]:
         """セクションの構造を解析."""
         # TODO: 実際のAI APIを使用した構造解析
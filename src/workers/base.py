@@ -129,6 +129,18 @@ class BaseWorker(ABC):
                 
     async def _handle_error(self, event: Event, error: Exception):
         """エラーハンドリング."""
+        # サーキットオープンの場合はリトライせずイベントを保留
+        circuit_name = getattr(error, 'circuit_name', None)
+        if circuit_name and self.event_bus and hasattr(self.event_bus, 'park'):
+            await self._save_checkpoint(event, "parked")
+            await self.event_bus.park(
+                event,
+                circuit_name,
+                retry_after=getattr(error, 'retry_after', 0.0),
+                breaker=getattr(error, 'breaker', None)
+            )
+            return
+            
         logger.error(f"Worker {self.worker_id} failed to process event {event.type.value}: {error}")
         
         # エラーメトリクスの記録
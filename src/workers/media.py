@@ -5,15 +5,28 @@ from typing import Set, Dict, Any, Optional, List, Tuple
 import asyncio
 import base64
 import hashlib
+import re
 import time
 from dataclasses import dataclass
 from enum import Enum
 
 from .base import BaseWorker, Event, EventType
 from ..config import Config
+from ..clients.object_store import create_object_store
+from ..clients.upload_queue import UploadQueue
+from ..converters.base import get_render_cache
+from ..converters.drawio import DrawIOConverter
+from ..converters.mermaid import MermaidConverter
+from ..converters.optimizer import ImageOptimizer
+from ..converters.svg import SVGConverter
+from ..converters.thumbnail import ThumbnailRenderer
+from ..utils.asset_scanner import SpanKind, scan_assets, splice
 
 logger = logging.getLogger(__name__)
 
+# DrawIO図として扱う画像リンクの URL
+DRAWIO_URL_PATTERN = re.compile(r'\.drawio(?:\.png|\.svg)?$')
+
 
 class ImageType(Enum):
     """画像タイプ列挙型."""
@@ -52,8 +65,25 @@ class MediaWorker(BaseWorker):
     def __init__(self, config: Config, worker_id: str = "media_worker"):
         """初期化."""
         super().__init__(config, worker_id)
-        self.s3_client = None  # 後で実装
+        self.s3_client = None
+        self.object_store = create_object_store(config)
+        self.upload_queue = UploadQueue(
+            self.object_store,
+            concurrency=config.storage.upload_concurrency,
+            prefix=config.storage.media_prefix
+        )
         self.converter_pool = None  # 後で実装
+        self.svg_converter = SVGConverter(config)
+        self.mermaid_converter = MermaidConverter(config)
+        self.drawio_converter = DrawIOConverter(config)
+        self.render_stats = {'renders': 0, 'uploads': 0}
+        self.optimizer = ImageOptimizer.from_config(config)
+        self.thumbnail_renderer = ThumbnailRenderer.from_config(config)
+        
+    async def stop(self):
+        """ワーカーの停止（ストレージの接続も閉じる）."""
+        await super().stop()
+        await self.object_store.close()
         
     def get_subscriptions(self) -> Set[str]:
         """購読するイベントタイプを返す."""
@@ -156,71 +186,118 @@ class MediaWorker(BaseWorker):
             
         logger.info(f"Found {len(images)} images to process")
         
-        # 画像を並列処理
-        processing_tasks = []
+        # Mermaid図はまとめて1回で描画し、残りの画像と一緒に並列処理
+        rendered_mermaid = await self._render_mermaid_images(images)
+        processing_tasks = {}
         for idx, image_info in enumerate(images):
-            task = self._process_single_image(image_info, workflow_id, idx)
-            processing_tasks.append(task)
+            converted_data = None
+            if image_info['type'] == ImageType.MERMAID.value:
+                converted_data = rendered_mermaid.get(image_info['content'])
+                if converted_data is None:
+                    continue
+            processing_tasks[idx] = self._process_single_image(image_info, workflow_id, idx, converted_data)
             
-        processed_results = await asyncio.gather(*processing_tasks, return_exceptions=True)
+        processed_results = await asyncio.gather(*processing_tasks.values(), return_exceptions=True)
         
         # 成功した結果のみを収集
         processed_images = []
-        url_mapping = {}
+        replacements = []
         
-        for idx, result in enumerate(processed_results):
+        for idx, result in zip(processing_tasks, processed_results):
             if isinstance(result, Exception):
                 logger.error(f"Failed to process image {idx}: {result}")
                 continue
                 
             if result:
                 processed_images.append(result)
-                # 元の画像参照をS3 URLに置換するためのマッピング
-                original_ref = images[idx]['reference']
-                url_mapping[original_ref] = result.metadata.get('s3_url') if result.metadata else None
-                
-        # コンテンツ内の画像参照をS3 URLに置換
-        updated_content = content_data.copy()
-        if url_mapping:
-            updated_content_text = content_text
-            for original_ref, s3_url in url_mapping.items():
+                # 元の画像参照の位置をS3 URLに置換する
+                s3_url = result.metadata.get('s3_url') if result.metadata else None
                 if s3_url:
-                    updated_content_text = updated_content_text.replace(original_ref, s3_url)
-            updated_content['content'] = updated_content_text
+                    replacements.append((images[idx]['start'], images[idx]['end'], s3_url))
+                    
+        if not processed_images:
+            return None, processed_images
             
-        return updated_content if url_mapping else None, processed_images
-        
-    async def _process_single_image(self, image_info: Dict[str, Any], workflow_id: str, index: int) -> Optional[ProcessedImage]:
-        """単一画像の処理."""
+        # コンテンツ内の画像参照をS3 URLに置換（抽出時の位置を使って1回で組み立てる）
+        updated_content = content_data.copy()
+        updated_content['content'] = splice(content_text, replacements)
+        
+        return updated_content, processed_images
+        
+    async def _render_mermaid_images(self, images: List[Dict[str, Any]]) -> Dict[str, Optional[bytes]]:
+        """コンテンツ内の Mermaid 図をまとめて変換（ソース → PNG、失敗したものは None）.
+        
+        MermaidConverter.convert_many はレンダーキャッシュにない図だけを
+        1回のヘッドレスセッション（または CLI の起動）で描画する。
+        """
+        sources = list(dict.fromkeys(
+            image['content'] for image in images if image['type'] == ImageType.MERMAID.value
+        ))
+        if not sources:
+            return {}
+        return dict(zip(sources, await self.mermaid_converter.convert_many(sources)))
+        
+    async def _process_single_image(
+        self,
+        image_info: Dict[str, Any],
+        workflow_id: str,
+        index: int,
+        converted_data: Optional[bytes] = None
+    ) -> Optional[ProcessedImage]:
+        """単一画像の処理（converted_data を渡した場合は変換済みとして扱う）."""
         try:
             image_type = ImageType(image_info['type'])
             content = image_info['content']
             
             # 画像を変換
-            processed_data = await self._convert_image(image_type, content)
-            if not processed_data:
+            if converted_data is None:
+                converted_data = await self._convert_image(image_type, content)
+            if not converted_data:
                 return None
-                
-            # S3にアップロード
+            self.render_stats['renders'] += 1
+            
+            # 最適化（再圧縮・減色・追加形式・レスポンシブ幅）
+            optimized = await self.optimizer.optimize(converted_data)
+            processed_data, variants = optimized.data, optimized.variants
+            etag = hashlib.md5(processed_data).hexdigest()
+            
+            # S3にアップロード（同じ内容はアップロードキューが送信を省略する）
             s3_url = await self._upload_to_s3(
                 processed_data, 
                 workflow_id, 
                 f"image_{index}_{image_type.value}.png"
             )
+            self.render_stats['uploads'] += 1
+            
+            # 追加形式・縮小版のアップロード（同じ内容はアップロードキューが送信を省略する）
+            variant_urls = await asyncio.gather(*(
+                self.upload_queue.upload(variant.data, variant.format, f'image/{variant.format}') for variant in variants
+            ))
             
             # ProcessedImageオブジェクトを作成
             processed_image = ProcessedImage(
                 original_type=image_type,
                 processed_data=processed_data,
                 format="png",
-                width=self.config.image.width,
-                height=self.config.image.height,
+                width=optimized.width or self.config.image.width,
+                height=optimized.height or self.config.image.height,
                 file_size=len(processed_data),
                 metadata={
                     's3_url': s3_url,
                     'workflow_id': workflow_id,
                     'processed_at': time.time(),
-                    'original_type': image_type.value
+                    'original_type': image_type.value,
+                    'etag': etag,
+                    'variants': [
+                        {
+                            'format': variant.format,
+                            'width': variant.width,
+                            'height': variant.height,
+                            'file_size': len(variant.data),
+                            'url': url
+                        }
+                        for variant, url in zip(variants, variant_urls)
+                    ]
                 }
             )
             
@@ -232,16 +309,37 @@ class MediaWorker(BaseWorker):
             
     async def _generate_thumbnail_image(self, thumbnail_data: Dict[str, Any], workflow_id: str) -> Optional[ProcessedImage]:
         """サムネイル画像を生成."""
+        return (await self._generate_thumbnail_images([thumbnail_data], workflow_id))[0]
+        
+    async def _generate_thumbnail_images(self, thumbnails: List[Dict[str, Any]], workflow_id: str) -> List[Optional[ProcessedImage]]:
+        """複数のサムネイル画像（章毎など）をまとめて生成.
+        
+        テンプレートに基づいて描画し、Pillow が利用できない場合や描画に失敗した場合は
+        プレースホルダーを使う。
+        """
+        requests = [
+            dict(data, dimensions=data.get('dimensions') or {'width': 1200, 'height': 630})
+            for data in thumbnails
+        ]
+        if self.thumbnail_renderer is not None:
+            rendered = await self.thumbnail_renderer.render_batch(requests)
+        else:
+            rendered = [None] * len(requests)
+            
+        return list(await asyncio.gather(*(
+            self._store_thumbnail(request, content, workflow_id) for request, content in zip(requests, rendered)
+        )))
+        
+    async def _store_thumbnail(self, thumbnail_data: Dict[str, Any], content: Optional[bytes], workflow_id: str) -> Optional[ProcessedImage]:
+        """サムネイルをアップロードして ProcessedImage を作成."""
         try:
-            # サムネイル生成（シミュレーション）
             title = thumbnail_data.get('title', 'Untitled')
             style = thumbnail_data.get('style', 'modern')
             color_scheme = thumbnail_data.get('color_scheme', 'blue')
-            dimensions = thumbnail_data.get('dimensions', {'width': 1200, 'height': 630})
+            dimensions = thumbnail_data['dimensions']
             
-            # TODO: 実際の画像生成ライブラリを使用
-            # 現在はプレースホルダー画像データを生成
-            thumbnail_content = await self._create_thumbnail_placeholder(
+            renderer = 'template' if content else 'placeholder'
+            thumbnail_content = content or await self._create_thumbnail_placeholder(
                 title, style, color_scheme, dimensions
             )
             
@@ -265,7 +363,8 @@ class MediaWorker(BaseWorker):
                     'generated_at': time.time(),
                     'title': title,
                     'style': style,
-                    'color_scheme': color_scheme
+                    'color_scheme': color_scheme,
+                    'renderer': renderer
                 }
             )
             
@@ -276,87 +375,38 @@ class MediaWorker(BaseWorker):
             return None
             
     def _extract_images_from_content(self, content: str) -> List[Dict[str, Any]]:
-        """コンテンツから画像を抽出."""
+        """コンテンツから画像を抽出（SVG・Mermaid・DrawIO を1回の走査で出現順に抽出）."""
         images = []
-        
-        # SVG画像の抽出
-        svg_images = self._extract_svg_images(content)
-        images.extend(svg_images)
-        
-        # Mermaid図の抽出
-        mermaid_images = self._extract_mermaid_diagrams(content)
-        images.extend(mermaid_images)
-        
-        # DrawIO図の抽出
-        drawio_images = self._extract_drawio_diagrams(content)
-        images.extend(drawio_images)
-        
+        for span in scan_assets(content, {SpanKind.SVG, SpanKind.FENCED_CODE, SpanKind.IMAGE}):
+            if span.kind == SpanKind.SVG:
+                image_type, image_content = 'svg', span.text
+            elif span.kind == SpanKind.FENCED_CODE and span.language == 'mermaid':
+                image_type, image_content = 'mermaid', span.body.strip()
+            elif span.kind == SpanKind.IMAGE and DRAWIO_URL_PATTERN.search(span.url):
+                image_type, image_content = 'drawio', span.url
+            else:
+                continue
+            images.append({
+                'type': image_type,
+                'content': image_content,
+                'reference': span.text,  # 置換用の参照
+                'start': span.start,
+                'end': span.end
+            })
+            
         return images
         
     def _extract_svg_images(self, content: str) -> List[Dict[str, Any]]:
         """SVG画像を抽出."""
-        import re
-        
-        # SVGパターンを検索
-        svg_pattern = r'<svg[^>]*>.*?</svg>'
-        matches = re.finditer(svg_pattern, content, re.DOTALL)
-        
-        svg_images = []
-        for match in matches:
-            svg_content = match.group(0)
-            svg_images.append({
-                'type': 'svg',
-                'content': svg_content,
-                'reference': svg_content,  # 置換用の参照
-                'start': match.start(),
-                'end': match.end()
-            })
-            
-        return svg_images
+        return [image for image in self._extract_images_from_content(content) if image['type'] == 'svg']
         
     def _extract_mermaid_diagrams(self, content: str) -> List[Dict[str, Any]]:
         """Mermaid図を抽出."""
-        import re
-        
-        # Mermaidコードブロックパターン
-        mermaid_pattern = r'```mermaid\n(.*?)\n```'
-        matches = re.finditer(mermaid_pattern, content, re.DOTALL)
-        
-        mermaid_images = []
-        for match in matches:
-            mermaid_content = match.group(1).strip()
-            full_match = match.group(0)
-            mermaid_images.append({
-                'type': 'mermaid',
-                'content': mermaid_content,
-                'reference': full_match,  # 置換用の参照
-                'start': match.start(),
-                'end': match.end()
-            })
-            
-        return mermaid_images
+        return [image for image in self._extract_images_from_content(content) if image['type'] == 'mermaid']
         
     def _extract_drawio_diagrams(self, content: str) -> List[Dict[str, Any]]:
         """DrawIO図を抽出."""
-        import re
-        
-        # DrawIOリンクパターン
-        drawio_pattern = r'!\[.*?\]\((.*?\.drawio(?:\.png|\.svg)?)\)'
-        matches = re.finditer(drawio_pattern, content)
-        
-        drawio_images = []
-        for match in matches:
-            drawio_url = match.group(1)
-            full_match = match.group(0)
-            drawio_images.append({
-                'type': 'drawio',
-                'content': drawio_url,
-                'reference': full_match,  # 置換用の参照
-                'start': match.start(),
-                'end': match.end()
-            })
-            
-        return drawio_images
+        return [image for image in self._extract_images_from_content(content) if image['type'] == 'drawio']
         
     async def _convert_image(self, image_type: ImageType, content: str) -> Optional[bytes]:
         """画像を変換."""
@@ -376,47 +426,19 @@ class MediaWorker(BaseWorker):
             return None
             
     async def _convert_svg_to_png(self, svg_content: str) -> bytes:
-        """SVGをPNGに変換."""
-        # TODO: 実際のSVG変換ライブラリ（cairosvg等）を使用
-        # 現在はプレースホルダー
-        await asyncio.sleep(0.1)  # 変換時間のシミュレーション
-        
-        # プレースホルダー画像データ（1x1 PNG）
-        placeholder_png = base64.b64decode(
-            'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=='
-        )
-        return placeholder_png
+        """SVGをPNGに変換（ラスタライズはプロセスプールで実行）."""
+        return await self.svg_converter.convert(svg_content)
         
     async def _convert_mermaid_to_png(self, mermaid_content: str) -> bytes:
         """MermaidをPNGに変換."""
-        # TODO: 実際のMermaid変換（mermaid-cli等）を使用
-        # 現在はプレースホルダー
-        await asyncio.sleep(0.1)  # 変換時間のシミュレーション
-        
-        # プレースホルダー画像データ
-        placeholder_png = base64.b64decode(
-            'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=='
-        )
-        return placeholder_png
+        return await self.mermaid_converter.convert(mermaid_content)
         
     async def _convert_drawio_to_png(self, drawio_url: str) -> bytes:
         """DrawIOをPNGに変換."""
-        # TODO: 実際のDrawIO変換を実装
-        # 現在はプレースホルダー
-        await asyncio.sleep(0.1)  # 変換時間のシミュレーション
-        
-        # プレースホルダー画像データ
-        placeholder_png = base64.b64decode(
-            'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=='
-        )
-        return placeholder_png
+        return await self.drawio_converter.convert(drawio_url)
         
     async def _create_thumbnail_placeholder(self, title: str, style: str, color_scheme: str, dimensions: Dict[str, int]) -> bytes:
-        """サムネイルプレースホルダーを作成."""
-        # TODO: 実際の画像生成ライブラリを使用
-        # 現在はプレースホルダー
-        await asyncio.sleep(0.1)  # 生成時間のシミュレーション
-        
+        """サムネイルプレースホルダーを作成（テンプレートで描画できない場合に使用）."""
         # プレースホルダー画像データ
         placeholder_png = base64.b64decode(
             'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=='
@@ -424,18 +446,16 @@ class MediaWorker(BaseWorker):
         return placeholder_png
         
     async def _upload_to_s3(self, image_data: bytes, workflow_id: str, filename: str) -> str:
-        """S3に画像をアップロード."""
+        """S3に画像をアップロード.
+        
+        オブジェクトキーは内容のハッシュから作るため、ワークフローをまたいでも
+        同じ画像は1回だけアップロードされる。
+        """
         try:
-            # TODO: 実際のS3クライアントを実装
-            # 現在はシミュレーション
-            await asyncio.sleep(0.1)  # アップロード時間のシミュレーション
-            
-            # S3 URLをシミュレート
-            bucket = self.config.aws.s3_bucket or "default-bucket"
-            s3_key = f"workflows/{workflow_id}/images/{filename}"
-            s3_url = f"https://{bucket}.s3.amazonaws.com/{s3_key}"
+            extension = filename.rsplit('.', 1)[-1] if '.' in filename else 'png'
+            s3_url = await self.upload_queue.upload(image_data, extension)
             
-            logger.info(f"Simulated S3 upload: {filename} -> {s3_url}")
+            logger.info(f"Uploaded {filename} for workflow {workflow_id} -> {s3_url}")
             return s3_url
             
         except Exception as e:
@@ -453,5 +473,15 @@ class MediaWorker(BaseWorker):
             'images_processed': 0,
             'total_size_processed': 0,
             'average_processing_time': 0,
-            'supported_formats': [t.value for t in self.get_supported_image_types()]
-        } 
\ No newline at end of file
+            'supported_formats': [t.value for t in self.get_supported_image_types()],
+            'uploads': self.upload_queue.get_stats(),
+            'storage': self.object_store.get_stats(),
+            'optimization': self.optimizer.get_stats(),
+            'thumbnails': self.thumbnail_renderer.get_stats() if self.thumbnail_renderer is not None else {'enabled': False},
+            'render_cache': dict(self.render_stats, **self._render_cache_stats())
+        } 
+        
+    def _render_cache_stats(self) -> Dict[str, Any]:
+        """変換器が共有するレンダーキャッシュの統計."""
+        render_cache = get_render_cache(self.config)
+        return render_cache.get_stats() if render_cache is not None else {'enabled': False}
\ No newline at end of file
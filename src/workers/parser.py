@@ -2,11 +2,14 @@
 
 import asyncio
 import logging
-from typing import Set, List, Dict, Any
+from typing import Set, List, Dict, Any, Iterator, Optional, Tuple
 from pathlib import Path
 
 from .base import BaseWorker
 from ..core.events import Event, EventType
+from ..core.packing import ParagraphPacker
+from ..utils.markdown_stream import iter_chapters, iter_sections, iter_paragraphs, stream_chapters
+from ..utils.parse_cache import ParsedBook, ParseCacheWriter, get_parse_cache, paragraph_keys
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +17,12 @@ logger = logging.getLogger(__name__)
 class ParserWorker(BaseWorker):
     """コンテンツ解析ワーカー."""
     
+    def __init__(self, config, worker_id: str = "parser_worker"):
+        """初期化."""
+        super().__init__(config, worker_id)
+        self.packer = ParagraphPacker(config)
+        self.parse_cache = get_parse_cache(config)
+        
     def get_subscriptions(self) -> Set[EventType]:
         """購読するイベントタイプを返す."""
         return {
@@ -38,18 +47,18 @@ class ParserWorker(BaseWorker):
         """ドキュメントをチャプターに分割."""
         logger.info(f"Starting document parsing for workflow {event.workflow_id}")
         
-        # 入力ファイルの取得
+        # 入力ファイルはチャプターが確定する毎に発行（全体を読み込まない）
+        # 同じ内容のファイルを解析済みの場合はキャッシュから発行し、以降の分割も省く
         input_file = event.data.get("input_file")
+        book = None
         if not input_file:
             logger.warning("No input file specified, using default content")
-            content = self._get_default_content(event.data)
+            chapters = iter_chapters(self._get_default_content(event.data).split('\n'))
         else:
-            content = await self._read_file(input_file)
-        
-        # チャプターに分割
-        chapters = self._split_by_chapters(content)
+            book, writer = self._open_parse_cache(input_file)
+            chapters = book.iter_chapters() if book is not None else self._stream_chapters(input_file, writer)
         
-        # 各チャプターでイベントを発行
+        count = 0
         for idx, chapter in enumerate(chapters):
             chapter_data = {
                 "index": idx,
@@ -57,6 +66,11 @@ class ParserWorker(BaseWorker):
                 "content": chapter["content"],
                 "path": self._get_chapter_path(event.data, idx, chapter["title"])
             }
+            if book is not None:
+                chapter_data["source_hash"] = book.source_hash
+            elif "sections" in chapter:
+                # キャッシュの書き込み時に分割済みの結果
+                chapter_data["sections"] = chapter["sections"]
             
             await self.event_bus.publish(Event(
                 type=EventType.CHAPTER_PARSED,
@@ -64,8 +78,81 @@ class ParserWorker(BaseWorker):
                 data=chapter_data,
                 priority=idx  # 順序を保持
             ))
+            count += 1
+            # 残りを読み込む前に後続のワーカーに処理を渡す
+            await asyncio.sleep(0)
             
-        logger.info(f"Document parsed into {len(chapters)} chapters")
+        if book is not None:
+            logger.info(f"Document loaded from parse cache: {count} chapters")
+        else:
+            logger.info(f"Document parsed into {count} chapters")
+        
+    def _open_parse_cache(self, file_path: str) -> Tuple[Optional[ParsedBook], Optional[ParseCacheWriter]]:
+        """入力ファイルの解析結果をキャッシュから取得（ない場合は書き込みを開始）."""
+        if self.parse_cache is None:
+            return None, None
+        try:
+            source_hash, book = self.parse_cache.load(file_path)
+            if book is not None:
+                return book, None
+            return None, self.parse_cache.writer(source_hash, file_path)
+        except OSError as e:
+            # 読めないファイルはストリーミング側でエラーとして扱う
+            logger.debug(f"Parse cache unavailable for {file_path}: {e}")
+            return None, None
+        
+    def _cached_book(self, data: Dict[str, Any]) -> Optional[ParsedBook]:
+        """イベントの入力ファイルの解析結果（キャッシュから発行した場合のみ）."""
+        source_hash = data.get("source_hash") or (data.get("section") or {}).get("source_hash")
+        if self.parse_cache is None or not source_hash:
+            return None
+        return self.parse_cache.book(source_hash)
+        
+    def _stream_chapters(self, file_path: str, writer: Optional[ParseCacheWriter] = None) -> Iterator[Dict[str, Any]]:
+        """入力ファイルを読みながらチャプターを返す.
+        
+        最初のチャプターより前に読み込みに失敗した場合はデフォルトコンテンツを使う。
+        途中で失敗した場合は発行済みのチャプターまでで打ち切る。
+        writer を指定した場合はチャプター毎に分割結果を書き込み、最後まで読めたら登録する。
+        分割結果はチャプターの 'sections' としても返し、イベント処理で再分割しない。
+        キャッシュの書き込みに失敗した場合はキャッシュせずに読み進める。
+        """
+        emitted = False
+        try:
+            if not Path(file_path).exists():
+                raise FileNotFoundError(f"Input file not found: {file_path}")
+            for chapter in stream_chapters(file_path):
+                emitted = True
+                if writer is not None:
+                    try:
+                        sections = self._split_for_cache(chapter["content"])
+                        writer.add_chapter(chapter["title"], chapter["content"], sections)
+                    except Exception as e:
+                        logger.warning(f"Failed to write parse cache for {file_path}, continuing without it: {e}")
+                        writer.discard()
+                        writer = None
+                    else:
+                        chapter = dict(chapter, sections=sections)
+                yield chapter
+            if writer is not None:
+                try:
+                    writer.commit()
+                except Exception as e:
+                    logger.warning(f"Failed to commit parse cache for {file_path}: {e}")
+        except Exception as e:
+            logger.error(f"Failed to read file {file_path}: {e}")
+            if not emitted:
+                yield from iter_chapters(self._get_default_content({"title": "Error"}).split('\n'))
+        finally:
+            if writer is not None:
+                writer.discard()
+        
+    def _split_for_cache(self, content: str) -> List[Dict[str, Any]]:
+        """チャプターをキャッシュ用にセクションとパラグラフまで分割（イベント処理と同じ規則）."""
+        sections = self._split_by_sections(content)
+        for section in sections:
+            section["paragraphs"] = self._split_by_paragraphs(section["content"])
+        return sections
         
     async def _parse_sections(self, event: Event):
         """チャプターをセクションに分割."""
@@ -74,8 +161,14 @@ class ParserWorker(BaseWorker):
         
         logger.info(f"Parsing chapter {chapter_index} into sections")
         
-        # セクションに分割
-        sections = self._split_by_sections(chapter_content)
+        # セクションに分割（キャッシュから発行した・読み込み時に分割済みのチャプターはその結果を使う）
+        book = self._cached_book(event.data)
+        if book is not None:
+            sections = book.sections(chapter_index)
+        elif "sections" in event.data:
+            sections = event.data["sections"]
+        else:
+            sections = self._split_by_sections(chapter_content)
         
         # 各セクションでイベントを発行
         for idx, section in enumerate(sections):
@@ -86,6 +179,10 @@ class ParserWorker(BaseWorker):
                 "content": section["content"],
                 "level": section["level"]
             }
+            if book is not None:
+                section_data["source_hash"] = book.source_hash
+            elif "paragraphs" in section:
+                section_data["paragraphs"] = section["paragraphs"]
             
             await self.event_bus.publish(Event(
                 type=EventType.SECTION_PARSED,
@@ -111,8 +208,28 @@ class ParserWorker(BaseWorker):
         
         logger.debug(f"Parsing section {chapter_index}-{section_index} into paragraphs")
         
-        # パラグラフに分割
-        paragraphs = self._split_by_paragraphs(section_content)
+        # パラグラフに分割（ID は位置と内容ハッシュから決まり、再実行・再開しても変わらない）
+        book = self._cached_book(event.data)
+        if book is not None:
+            cached = book.paragraphs(chapter_index, section_index)
+            paragraphs = [paragraph["content"] for paragraph in cached]
+            keys = [(paragraph["paragraph_id"], paragraph["content_hash"]) for paragraph in cached]
+        else:
+            # 読み込み時に分割済みのセクションはその結果を使う
+            paragraphs = event.data.get("paragraphs", (event.data.get("section") or {}).get("paragraphs"))
+            if paragraphs is None:
+                paragraphs = self._split_by_paragraphs(section_content)
+            keys = paragraph_keys(chapter_index, section_index, paragraphs)
+        
+        # 隣接する小さなパラグラフを1回の生成リクエストにまとめる
+        packs = {}
+        for group in self.packer.pack(paragraphs):
+            for position, idx in enumerate(group):
+                packs[idx] = {
+                    "id": f"{chapter_index}-{section_index}-{group[0]}",
+                    "size": len(group),
+                    "position": position
+                }
         
         # 各パラグラフでイベントを発行
         for idx, paragraph in enumerate(paragraphs):
@@ -120,8 +237,11 @@ class ParserWorker(BaseWorker):
                 "chapter_index": chapter_index,
                 "section_index": section_index,
                 "paragraph_index": idx,
+                "paragraph_id": keys[idx][0],
+                "content_hash": keys[idx][1],
                 "content": paragraph,
-                "title": event.data.get("title", f"Paragraph {idx+1}")
+                "title": event.data.get("title", f"Paragraph {idx+1}"),
+                "pack": packs[idx]
             }
             
             await self.event_bus.publish(Event(
@@ -171,128 +291,15 @@ class ParserWorker(BaseWorker):
         
     def _split_by_chapters(self, content: str) -> List[Dict[str, Any]]:
         """コンテンツをチャプターに分割."""
-        chapters = []
-        lines = content.split('\n')
-        current_chapter = None
-        current_content = []
-        
-        for line in lines:
-            # H1見出し（チャプター）をチェック
-            if line.startswith('# '):
-                # 前のチャプターを保存
-                if current_chapter:
-                    chapters.append({
-                        "title": current_chapter,
-                        "content": '\n'.join(current_content).strip()
-                    })
-                
-                # 新しいチャプター開始
-                current_chapter = line[2:].strip()
-                current_content = []
-            else:
-                current_content.append(line)
-        
-        # 最後のチャプターを保存
-        if current_chapter:
-            chapters.append({
-                "title": current_chapter,
-                "content": '\n'.join(current_content).strip()
-            })
-        
-        # チャプターがない場合は全体を1つのチャプターとする
-        if not chapters:
-            chapters.append({
-                "title": "Main Content",
-                "content": content.strip()
-            })
-            
-        return chapters
+        return list(iter_chapters(content.split('\n')))
         
     def _split_by_sections(self, content: str) -> List[Dict[str, Any]]:
         """コンテンツをセクションに分割."""
-        sections = []
-        lines = content.split('\n')
-        current_section = None
-        current_content = []
-        current_level = 2  # H2レベルから開始
-        
-        for line in lines:
-            # 見出しレベルを判定
-            if line.startswith('## '):
-                level = 2
-                title = line[3:].strip()
-            elif line.startswith('### '):
-                level = 3
-                title = line[4:].strip()
-            elif line.startswith('#### '):
-                level = 4
-                title = line[5:].strip()
-            else:
-                current_content.append(line)
-                continue
-            
-            # 前のセクションを保存
-            if current_section:
-                sections.append({
-                    "title": current_section,
-                    "content": '\n'.join(current_content).strip(),
-                    "level": current_level
-                })
-            
-            # 新しいセクション開始
-            current_section = title
-            current_level = level
-            current_content = []
-        
-        # 最後のセクションを保存
-        if current_section:
-            sections.append({
-                "title": current_section,
-                "content": '\n'.join(current_content).strip(),
-                "level": current_level
-            })
-        
-        # セクションがない場合は全体を1つのセクションとする
-        if not sections:
-            sections.append({
-                "title": "Main Section",
-                "content": content.strip(),
-                "level": 2
-            })
-            
-        return sections
+        return list(iter_sections(content.split('\n')))
         
     def _split_by_paragraphs(self, content: str) -> List[str]:
         """コンテンツをパラグラフに分割."""
-        # 空行で分割してパラグラフを作成
-        paragraphs = []
-        current_paragraph = []
-        
-        for line in content.split('\n'):
-            line = line.strip()
-            
-            if not line:  # 空行
-                if current_paragraph:
-                    paragraph_text = '\n'.join(current_paragraph).strip()
-                    if paragraph_text:
-                        paragraphs.append(paragraph_text)
-                    current_paragraph = []
-            else:
-                current_paragraph.append(line)
-        
-        # 最後のパラグラフを追加
-        if current_paragraph:
-            paragraph_text = '\n'.join(current_paragraph).strip()
-            if paragraph_text:
-                paragraphs.append(paragraph_text)
-        
-        # パラグラフがない場合は全体を1つのパラグラフとする
-        if not paragraphs:
-            content_stripped = content.strip()
-            if content_stripped:
-                paragraphs.append(content_stripped)
-            
-        return paragraphs
+        return list(iter_paragraphs(content.split('\n')))
         
     def _get_chapter_path(self, data: Dict[str, Any], index: int, title: str) -> str:
         """チャプターファイルパスを生成."""
@@ -10,6 +10,9 @@ from .parser import ParserWorker
 from .ai import AIWorker
 from .media import MediaWorker
 from .aggregator import AggregatorWorker
+from ..clients.claude import ClaudeClient
+from ..clients.openai import OpenAIClient
+from ..converters.process_pool import ConversionProcessPool, get_process_pool
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +40,8 @@ class WorkerPool:
         }
         self.event_bus = None
         self.state_manager = None
+        # AIワーカー間で共有するプロバイダクライアント
+        self.ai_clients: Dict[str, object] = {}
         self._initialized = False
         
     async def initialize(self, event_bus, state_manager):
@@ -46,11 +51,17 @@ class WorkerPool:
             
         self.event_bus = event_bus
         self.state_manager = state_manager
+        self.ai_clients = self._create_ai_clients()
         
         # 各タイプのワーカーを作成
         for worker_type in WorkerType:
             await self._create_workers(worker_type)
             
+        # 画像変換用のプロセスを起動しておく
+        process_pool = get_process_pool(self.config)
+        if process_pool is not None:
+            await process_pool.start()
+            
         self._initialized = True
         logger.info("WorkerPool initialized")
         
@@ -63,11 +74,30 @@ class WorkerPool:
         for i in range(worker_count):
             worker_id = f"{worker_type.value}-{i+1}"
             worker = worker_class(self.config, worker_id)
+            self._configure_worker(worker)
             workers.append(worker)
             
         self.workers[worker_type] = workers
         logger.info(f"Created {worker_count} {worker_type.value} workers")
         
+    def _create_ai_clients(self) -> Dict[str, object]:
+        """AIプロバイダのクライアントを作成（APIキー未設定などで作成できないものは除外）."""
+        clients = {}
+        for name, client_class in (("claude", ClaudeClient), ("openai", OpenAIClient)):
+            try:
+                clients[name] = client_class(self.config)
+            except (AttributeError, ValueError) as e:
+                logger.info(f"{name} client not configured: {e}")
+        return clients
+        
+    def _configure_worker(self, worker: BaseWorker) -> None:
+        """ワーカーに共有リソースを設定."""
+        if isinstance(worker, AIWorker) and self.ai_clients:
+            worker.set_ai_clients(
+                claude_client=self.ai_clients.get("claude"),
+                openai_client=self.ai_clients.get("openai")
+            )
+        
     def _get_worker_count(self, worker_type: WorkerType) -> int:
         """ワーカータイプ別の初期ワーカー数を取得."""
         # 設定から取得、デフォルト値を設定
@@ -108,6 +138,10 @@ class WorkerPool:
         """ワーカープールのシャットダウン."""
         await self.stop()
         self.workers.clear()
+        for client in self.ai_clients.values():
+            await client.close()
+        self.ai_clients.clear()
+        await ConversionProcessPool.close_shared()
         self._initialized = False
         logger.info("WorkerPool shutdown completed")
         
@@ -152,6 +186,7 @@ class WorkerPool:
         for i in range(count):
             worker_id = f"{worker_type.value}-{current_count + i + 1}"
             worker = worker_class(self.config, worker_id)
+            self._configure_worker(worker)
             
             # ワーカーを開始
             if self.event_bus and self.state_manager:
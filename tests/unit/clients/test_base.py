@@ -8,13 +8,18 @@ import httpx
 import pytest
 
 from src.clients.base import (
+    AdaptiveConcurrencyLimiter,
     APIError,
     AuthenticationError,
     BaseClient,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
     ClientError,
     RateLimitError,
 )
 from src.config.settings import Config
+from src.core.events import Event, EventBus, EventType
 
 
 class MockClient(BaseClient):
@@ -215,4 +220,269 @@ class TestBaseClient:
                     await client._make_request("GET", "https://api.example.com/test")
                     
                     mock_acquire.assert_called_once()
-                    mock_release.assert_called_once() 
\ No newline at end of file
+                    mock_release.assert_called_once()
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """AdaptiveConcurrencyLimiterのテスト."""
+    
+    def test_additive_increase(self):
+        """成功時に上限が加算的に増えることのテスト."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+        
+        for _ in range(10):
+            limiter.on_success(0.1)
+            
+        assert limiter.limit == 4
+        
+    def test_multiplicative_decrease_on_throttle(self):
+        """429時に上限が乗算的に減ることのテスト."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1)
+        
+        limiter.on_throttle()
+        assert limiter.limit == 4
+        limiter.on_throttle()
+        assert limiter.limit == 2
+        assert limiter.get_stats()["throttled"] == 2
+        
+    def test_latency_spike_decreases_limit(self):
+        """レイテンシ急増で上限が減ることのテスト."""
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=8, max_limit=8, warmup_samples=3, latency_spike_factor=2.0
+        )
+        for _ in range(5):
+            limiter.on_success(0.01)
+            
+        limiter.on_success(1.0)
+        
+        assert limiter.limit == 4
+        assert limiter.get_stats()["latency_spikes"] == 1
+        
+    def test_observe_headers(self):
+        """レート制限ヘッダーの反映テスト."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        
+        retry_after = limiter.observe_headers({
+            "retry-after": "2",
+            "x-ratelimit-remaining-requests": "3",
+        })
+        
+        assert retry_after == 2.0
+        assert limiter.limit == 3
+        
+        limiter.observe_headers({
+            "anthropic-ratelimit-requests-remaining": "0",
+            "anthropic-ratelimit-requests-reset": "1m30s",
+        })
+        assert limiter.get_stats()["blocked_for"] > 80
+        
+    @pytest.mark.asyncio
+    async def test_acquire_respects_limit(self):
+        """上限を超える同時実行を待機させることのテスト."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        
+        assert not waiter.done()
+        assert limiter.get_stats()["waiting"] == 1
+        
+        limiter.release()
+        await asyncio.wait_for(waiter, timeout=1)
+        assert limiter.in_flight == 1
+        
+    @pytest.mark.asyncio
+    async def test_publishes_metrics(self):
+        """メトリクス公開のテスト."""
+        metrics = MagicMock()
+        limiter = AdaptiveConcurrencyLimiter(service_name="claude", metrics=metrics)
+        
+        limiter.on_throttle()
+        
+        metrics.set_gauge.assert_any_call(
+            "client.concurrency.limit", limiter.limit, {"service": "claude"}
+        )
+        
+    @pytest.mark.asyncio
+    async def test_client_throttle_feeds_limiter(self):
+        """クライアントの429がリミッターに反映されることのテスト."""
+        config = Config()
+        config.api_timeout = 30.0
+        client = MockClient(config, "test-service")
+        response = MagicMock(status_code=429, headers={"retry-after": "0.01"})
+        
+        with patch.object(client.client, 'request', new_callable=AsyncMock) as mock_request:
+            mock_request.return_value = response
+            with pytest.raises(RateLimitError) as exc_info:
+                await client._make_request("GET", "https://api.example.com/test")
+                
+        # Retry-After に従って短い間隔でリトライされる
+        assert exc_info.value.retry_after == 0.01
+        assert mock_request.call_count == 3
+                    
+        stats = client.get_stats()["concurrency"]
+        assert stats["throttled"] == 3
+        assert stats["in_flight"] == 0
+        
+    @pytest.mark.asyncio
+    async def test_rate_limit_error_releases_slot(self):
+        """レート制限の取得失敗で同時実行枠が返却されることのテスト."""
+        config = Config()
+        config.api_timeout = 30.0
+        client = MockClient(config, "test-service")
+        
+        with patch.object(client.rate_limiter, 'acquire', side_effect=RuntimeError("redis down")), \
+                patch.object(client.client, 'request', new_callable=AsyncMock) as mock_request, \
+                patch("asyncio.sleep", new_callable=AsyncMock):
+            with pytest.raises(RuntimeError):
+                await client._make_request("GET", "https://api.example.com/test")
+                
+        mock_request.assert_not_called()
+        assert client.concurrency_limiter.in_flight == 0
+
+
+
+class TestCircuitBreaker:
+    """CircuitBreakerのテスト."""
+    
+    def _breaker(self, **kwargs):
+        options = dict(window_size=4, minimum_calls=4, open_duration=0.05, half_open_max_calls=1)
+        options.update(kwargs)
+        return CircuitBreaker("test:/messages", **options)
+        
+    def test_opens_on_failure_rate(self):
+        """失敗率が閾値を超えるとOPENになることのテスト."""
+        breaker = self._breaker()
+        breaker.record_success(0.1)
+        breaker.record_success(0.1)
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+        
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.allow()
+        assert exc_info.value.circuit_name == "test:/messages"
+        assert exc_info.value.retry_after > 0
+        
+    def test_opens_on_slow_calls(self):
+        """スローコール率が閾値を超えるとOPENになることのテスト."""
+        breaker = self._breaker(slow_call_duration=1.0, slow_call_rate_threshold=0.75)
+        for _ in range(3):
+            breaker.record_success(2.0)
+        breaker.record_success(0.1)
+        
+        assert breaker.state == CircuitState.OPEN
+        
+    def test_half_open_probe(self):
+        """HALF_OPENで限定的に試行し、成功でCLOSEDに戻ることのテスト."""
+        breaker = self._breaker()
+        for _ in range(4):
+            breaker.record_failure()
+        time.sleep(0.06)
+        
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker.allow()
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()  # 試行数の上限
+            
+        breaker.record_success(0.1)
+        assert breaker.state == CircuitState.CLOSED
+        
+    def test_half_open_failure_reopens(self):
+        """HALF_OPENでの失敗で再度OPENになることのテスト."""
+        breaker = self._breaker()
+        for _ in range(4):
+            breaker.record_failure()
+        time.sleep(0.06)
+        breaker.allow()
+        
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitState.OPEN
+        
+    @pytest.mark.asyncio
+    async def test_client_fails_fast_when_open(self):
+        """OPEN中はリクエストを送らずリトライもしないことのテスト."""
+        config = Config()
+        config.api_timeout = 30.0
+        config.api.circuit_minimum_calls = 1
+        config.api.circuit_window_size = 1
+        client = MockClient(config, "test-service")
+        url = "https://api.example.com/messages"
+        
+        with patch.object(client.client, 'request', new_callable=AsyncMock) as mock_request:
+            mock_request.side_effect = httpx.ConnectError("connection refused")
+            with patch("asyncio.sleep", new_callable=AsyncMock):
+                with pytest.raises(CircuitOpenError):
+                    await client._make_request("POST", url)
+                    
+            # 1回目の失敗でOPENになり、以降のリトライは即時失敗
+            assert mock_request.call_count == 1
+            
+        assert client.is_available() is False
+        assert client.get_stats()["circuits"]["/messages"]["state"] == "open"
+        
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_releases_slot_without_retry(self):
+        """HALF_OPENの試行がキャンセルされた場合に枠を返却しリトライしないことのテスト."""
+        config = Config()
+        config.api_timeout = 30.0
+        client = MockClient(config, "test-service")
+        url = "https://api.example.com/messages"
+        breaker = client.get_circuit_breaker(url)
+        breaker._transition(CircuitState.HALF_OPEN)
+        started = asyncio.Event()
+        
+        async def hang(*args, **kwargs):
+            started.set()
+            await asyncio.Event().wait()
+            
+        with patch.object(client.client, 'request', side_effect=hang) as mock_request:
+            task = asyncio.create_task(client._make_request("POST", url))
+            await asyncio.wait_for(started.wait(), timeout=1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(task, timeout=1)
+                
+        assert mock_request.call_count == 1
+        assert breaker._half_open_in_flight == 0
+        breaker.allow()
+        
+    @pytest.mark.asyncio
+    async def test_event_bus_parks_and_releases(self):
+        """保留したイベントがサーキットのCLOSEDで再発行されることのテスト."""
+        event_bus = EventBus(Config())
+        breaker = self._breaker(open_duration=10.0)
+        for _ in range(4):
+            breaker.record_failure()
+        event = Event(type=EventType.PARAGRAPH_PARSED, workflow_id="wf", data={})
+        
+        try:
+            breaker.allow()
+        except CircuitOpenError as e:
+            await event_bus.park(event, e.circuit_name, e.retry_after, e.breaker)
+            
+        assert event_bus.get_parked_count() == 1
+        assert await event_bus.get_queue_size() == 0
+        
+        breaker._transition(CircuitState.CLOSED)
+        await asyncio.sleep(0.01)
+        
+        assert event_bus.get_parked_count() == 0
+        assert await event_bus.get_queue_size() == 1
+        
+    @pytest.mark.asyncio
+    async def test_event_bus_releases_probe_after_retry_after(self):
+        """retry_after経過後に1件だけ試行用に再発行されることのテスト."""
+        event_bus = EventBus(Config())
+        for index in range(3):
+            event = Event(type=EventType.PARAGRAPH_PARSED, workflow_id="wf", data={"i": index})
+            await event_bus.park(event, "claude:/messages", retry_after=0.1)
+            
+        await asyncio.sleep(0.15)
+        
+        assert event_bus.get_parked_count() == 2
+        assert await event_bus.get_queue_size() == 1
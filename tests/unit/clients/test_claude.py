@@ -2,6 +2,7 @@
 
 import base64
 import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -153,7 +154,8 @@ class TestClaudeClient:
             system_prompt="You are a helpful assistant.",
             model="claude-3-sonnet-20240229",
             max_tokens=1000,
-            temperature=0.7
+            temperature=0.7,
+            cache_prefix=False
         )
         
         assert len(request["messages"]) == 2
@@ -331,4 +333,79 @@ class TestClaudeClient:
             assert "cache_stats" in stats
             assert "service_name" in stats
             assert stats["cache_stats"] == mock_cache_stats
-            assert stats["service_name"] == "claude" 
\ No newline at end of file
+            assert stats["service_name"] == "claude" 
+
+class TestClaudePromptCaching:
+    """プロンプトキャッシュ関連のテスト."""
+    
+    @pytest.fixture
+    def client(self):
+        """テスト用クライアント."""
+        config = Config()
+        config.api_timeout = 30.0
+        config.claude = SimpleNamespace(
+            api_key="test-api-key",
+            base_url="https://api.anthropic.com/v1",
+            model="claude-3-sonnet-20240229",
+            max_tokens=1000,
+            temperature=0.7,
+            rate_limit=50
+        )
+        config.cache = SimpleNamespace(size=100, ttl=3600)
+        return ClaudeClient(config)
+        
+    def test_build_request_marks_cacheable_prefix(self, client):
+        """システムプロンプトとコンテキストにキャッシュマーカーが付与される."""
+        request = client._build_request(
+            prompt="paragraph",
+            system_prompt="system",
+            context="section context",
+            model="claude-3-sonnet-20240229",
+            max_tokens=1000,
+            temperature=0.7
+        )
+        
+        assert request["system"] == [
+            {"type": "text", "text": "system", "cache_control": {"type": "ephemeral"}}
+        ]
+        content = request["messages"][0]["content"]
+        assert content[0]["text"] == "section context"
+        assert content[0]["cache_control"] == {"type": "ephemeral"}
+        assert content[1] == {"type": "text", "text": "paragraph"}
+        
+    def test_build_request_prefix_is_stable_across_paragraphs(self, client):
+        """パラグラフが異なってもプレフィックス部分は同一."""
+        first = client._build_request(
+            prompt="first", system_prompt="system", context="ctx", model="m"
+        )
+        second = client._build_request(
+            prompt="second", system_prompt="system", context="ctx", model="m"
+        )
+        
+        assert first["system"] == second["system"]
+        assert first["messages"][0]["content"][0] == second["messages"][0]["content"][0]
+        
+    @pytest.mark.asyncio
+    async def test_generate_text_records_cache_usage(self, client):
+        """キャッシュ読み書きトークン数が統計に記録される."""
+        mock_response = {
+            "content": [{"text": "ok"}],
+            "usage": {
+                "input_tokens": 20,
+                "output_tokens": 5,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 180
+            }
+        }
+        
+        with patch.object(client, '_make_request', new_callable=AsyncMock) as mock_request:
+            mock_request.return_value = mock_response
+            await client.generate_text(
+                prompt="paragraph", system_prompt="system", context="ctx", use_cache=False
+            )
+            
+        stats = client.get_stats()
+        assert stats["input_tokens"] == 20
+        assert stats["output_tokens"] == 5
+        assert stats["cache_read_input_tokens"] == 180
+        assert stats["cache_hit_rate"] == pytest.approx(0.9)
@@ -0,0 +1,98 @@
+"""HTTPClientRegistryのテスト."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.clients.http_pool import HTTPClientRegistry, _origin
+
+
+@pytest_asyncio.fixture
+async def clean_registry():
+    await HTTPClientRegistry.close_all()
+    yield
+    await HTTPClientRegistry.close_all()
+
+
+def _config(**api):
+    return SimpleNamespace(api=SimpleNamespace(**api))
+
+
+def test_origin():
+    """ベースURLからオリジンを取り出すテスト."""
+    assert _origin("https://api.anthropic.com/v1") == "https://api.anthropic.com"
+    assert _origin("http://localhost:8080/api/") == "http://localhost:8080"
+    assert _origin("claude") == "claude"
+
+
+@pytest.mark.usefixtures("clean_registry")
+class TestHTTPClientRegistry:
+    """HTTPClientRegistryのテスト."""
+    
+    @pytest.mark.asyncio
+    async def test_shared_per_origin(self):
+        """同一オリジンのクライアントが共有されることのテスト."""
+        a = HTTPClientRegistry.acquire("https://api.anthropic.com/v1")
+        b = HTTPClientRegistry.acquire("https://api.anthropic.com/v1/messages")
+        c = HTTPClientRegistry.acquire("https://api.openai.com/v1")
+        
+        assert a is b
+        assert a is not c
+        assert HTTPClientRegistry.get_stats()["https://api.anthropic.com"]["ref_count"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_release_closes_when_unreferenced(self):
+        """参照がなくなったら閉じることのテスト."""
+        a = HTTPClientRegistry.acquire("https://example.com")
+        HTTPClientRegistry.acquire("https://example.com")
+        
+        await HTTPClientRegistry.release(a)
+        assert not a.is_closed
+        
+        await HTTPClientRegistry.release(a)
+        assert a.is_closed
+        assert "https://example.com" not in HTTPClientRegistry.get_stats()
+        
+        # 閉じた後は新しいクライアントを作成する
+        b = HTTPClientRegistry.acquire("https://example.com")
+        assert b is not a and not b.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_limits_from_config(self):
+        """設定からプール上限を適用することのテスト."""
+        config = _config(http_max_connections=7, http_max_keepalive_connections=3, http2_enabled=False)
+        client = HTTPClientRegistry.acquire("https://example.com", config=config)
+        
+        pool = client._transport._pool
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+        assert HTTPClientRegistry.get_stats()["https://example.com"]["http2"] is False
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_and_request_count(self):
+        """warm-up でリクエストが送られ、参照を保持しないことのテスト."""
+        client = HTTPClientRegistry.acquire("https://example.com")
+        seen = []
+        client._transport = httpx.MockTransport(lambda request: seen.append(request) or httpx.Response(404))
+        
+        results = await HTTPClientRegistry.warm_up(["https://example.com/v1", "https://example.com/v2"])
+        
+        assert results == {"https://example.com": True}
+        assert [request.method for request in seen] == ["HEAD"]
+        stats = HTTPClientRegistry.get_stats()["https://example.com"]
+        assert stats["requests"] == 1
+        assert stats["ref_count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_publish_metrics(self):
+        """プール統計をゲージとして公開することのテスト."""
+        HTTPClientRegistry.acquire("https://example.com")
+        metrics = MagicMock()
+        
+        HTTPClientRegistry.publish_metrics(metrics)
+        
+        names = {call.args[0] for call in metrics.set_gauge.call_args_list}
+        assert {"http.pool.connections", "http.pool.requests"} <= names
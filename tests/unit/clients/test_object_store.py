@@ -0,0 +1,195 @@
+"""オブジェクトストレージのテスト"""
+
+import asyncio
+import hashlib
+import os
+import socket
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.clients.object_store import (
+    LocalObjectStore,
+    MemoryObjectStore,
+    S3ObjectStore,
+    create_object_store,
+)
+from src.clients.s3 import ObjectNotFoundError, S3Error
+from src.config import Config
+
+
+@pytest.fixture(params=["local", "memory"])
+def store(request, tmp_path):
+    """ネットワークを使わないストレージ"""
+    if request.param == "local":
+        return LocalObjectStore(str(tmp_path))
+    return MemoryObjectStore()
+
+
+class TestObjectStore:
+    """全バックエンド共通のテスト"""
+    
+    @pytest.mark.asyncio
+    async def test_round_trip(self, store):
+        """書き込み・HEAD・取得・削除のテスト"""
+        await store.put("media/ab/image.png", b"png", metadata={"sha256": "x"})
+        
+        head = await store.head("media/ab/image.png")
+        assert head["etag"] == hashlib.md5(b"png").hexdigest()
+        assert head["content_type"] == "image/png"
+        assert head["metadata"] == {"sha256": "x"}
+        assert await store.get("media/ab/image.png") == b"png"
+        
+        await store.delete("media/ab/image.png")
+        assert await store.exists("media/ab/image.png") is False
+        with pytest.raises(ObjectNotFoundError):
+            await store.get("media/ab/image.png")
+    
+    @pytest.mark.asyncio
+    async def test_put_text(self, store):
+        """テキストの書き込みのテスト"""
+        await store.put_text("report.json", "{\"タイトル\": 1}")
+        
+        assert (await store.get("report.json")).decode("utf-8") == "{\"タイトル\": 1}"
+        assert (await store.head("report.json"))["content_type"] == "application/json"
+        assert store.get_stats()["puts"] == 1
+
+
+class TestLocalObjectStore:
+    """LocalObjectStoreのテスト"""
+    
+    @pytest.mark.asyncio
+    async def test_hardlink_dedup(self, tmp_path):
+        """同じ内容はハードリンクで共有することのテスト"""
+        store = LocalObjectStore(str(tmp_path), hardlink_dedup=True)
+        
+        await store.put("a/image.png", b"same")
+        await store.put("b/image.png", b"same")
+        
+        assert os.stat(tmp_path / "a/image.png").st_ino == os.stat(tmp_path / "b/image.png").st_ino
+        assert store.get_stats()["deduplicated"] == 1
+        
+        await store.put("a/image.png", b"changed")
+        assert await store.get("b/image.png") == b"same"
+        assert not [name for name in os.listdir(tmp_path / "a") if name.startswith(".tmp-")]
+    
+    @pytest.mark.asyncio
+    async def test_releases_unreferenced_blobs(self, tmp_path):
+        """どのキーからも参照されなくなった実体は上書き・削除時に消すことのテスト"""
+        store = LocalObjectStore(str(tmp_path), hardlink_dedup=True)
+        objects = tmp_path / LocalObjectStore.OBJECTS_DIR
+        
+        await store.put("a.png", b"first")
+        await store.put("a.png", b"second")
+        assert [path.name for path in objects.rglob("*") if path.is_file()] == [hashlib.sha256(b"second").hexdigest()]
+        
+        await store.delete("a.png")
+        assert not [path for path in objects.rglob("*") if path.is_file()]
+    
+    @pytest.mark.asyncio
+    async def test_metadata_sidecar_only_when_needed(self, tmp_path):
+        """独自のメタデータがない書き込みは .meta を作らないことのテスト"""
+        store = LocalObjectStore(str(tmp_path))
+        
+        await store.put_text("report.json", "{}")
+        await store.put("media/a.png", b"png", metadata={"sha256": "x"})
+        await store.put("media/a.png", b"png")
+        
+        assert not [path for path in (tmp_path / LocalObjectStore.META_DIR).rglob("*") if path.is_file()]
+        assert (await store.head("report.json"))["content_type"] == "application/json"
+        assert (await store.head("media/a.png"))["metadata"] == {}
+    
+    @pytest.mark.asyncio
+    async def test_without_hardlinks(self, tmp_path):
+        """ハードリンクを無効にすると個別に書き込むことのテスト"""
+        store = LocalObjectStore(str(tmp_path), hardlink_dedup=False)
+        
+        await store.put("a.png", b"same")
+        await store.put("b.png", b"same")
+        
+        assert os.stat(tmp_path / "a.png").st_ino != os.stat(tmp_path / "b.png").st_ino
+        assert not (tmp_path / LocalObjectStore.OBJECTS_DIR).exists()
+    
+    @pytest.mark.asyncio
+    async def test_rejects_keys_outside_root(self, tmp_path):
+        """保存先の外・内部ディレクトリを指すキーを拒否することのテスト"""
+        store = LocalObjectStore(str(tmp_path))
+        
+        for key in ("../escape.png", ".objects/ab/x", ".meta/x.json"):
+            with pytest.raises(S3Error):
+                await store.put(key, b"x")
+    
+    @pytest.mark.asyncio
+    async def test_head_for_external_file(self, tmp_path):
+        """ストレージを通さずに置かれたファイルも HEAD できることのテスト"""
+        (tmp_path / "external.txt").write_bytes(b"text")
+        
+        head = await LocalObjectStore(str(tmp_path)).head("external.txt")
+        
+        assert head["size"] == 4
+        assert head["etag"] == hashlib.md5(b"text").hexdigest()
+    
+    @pytest.mark.asyncio
+    async def test_sendfile(self, tmp_path):
+        """オブジェクトをソケットに送信することのテスト"""
+        store = LocalObjectStore(str(tmp_path))
+        await store.put("media/video.bin", b"x" * 100_000)
+        left, right = socket.socketpair()
+        left.setblocking(False)
+        
+        try:
+            reader = asyncio.create_task(asyncio.to_thread(self._read_all, right, 100_000))
+            sent = await store.sendfile("media/video.bin", left)
+            received = await reader
+        finally:
+            left.close()
+            right.close()
+        
+        assert sent == 100_000
+        assert received == b"x" * 100_000
+    
+    @staticmethod
+    def _read_all(sock, size):
+        chunks = []
+        while size > 0:
+            chunk = sock.recv(size)
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+
+class TestCreateObjectStore:
+    """create_object_storeのテスト"""
+    
+    def test_backend_selection(self, tmp_path):
+        """設定に応じたバックエンドを選択することのテスト"""
+        config = Config()
+        config.storage.output_dir = str(tmp_path)
+        
+        store = create_object_store(config)
+        assert isinstance(store, LocalObjectStore)
+        assert store.root_dir == tmp_path.resolve()
+        
+        config.storage.s3_bucket = "bucket"
+        assert isinstance(create_object_store(config), S3ObjectStore)
+        
+        config.storage.backend = "memory"
+        assert isinstance(create_object_store(config), MemoryObjectStore)
+        
+        config.storage.backend = "ftp"
+        with pytest.raises(ValueError):
+            create_object_store(config)
+    
+    @pytest.mark.asyncio
+    async def test_s3_store_delegates_to_client(self):
+        """S3 バックエンドがクライアントに委譲することのテスト"""
+        client = AsyncMock()
+        client.upload_bytes.return_value = "https://bucket/media/a.png"
+        store = S3ObjectStore(client)
+        
+        assert await store.put("media/a.png", b"png") == "https://bucket/media/a.png"
+        assert client.upload_bytes.await_args.kwargs["content_type"] == "image/png"
+        client.__aenter__.assert_awaited_once()
+        
+        await store.close()
+        client.__aexit__.assert_awaited_once()
@@ -0,0 +1,179 @@
+"""ProviderRouterのテスト."""
+
+import asyncio
+
+import pytest
+
+from src.clients.base import APIError
+from src.clients.router import HedgeBudget, ProviderRouter
+
+
+class FakeClient:
+    """テスト用のプロバイダークライアント."""
+    
+    def __init__(self, name, delay=0.0, error=None, available=True):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.available = available
+        self.calls = 0
+        self.cancelled = 0
+        self.kwargs = None
+    
+    def is_available(self):
+        return self.available
+    
+    async def generate_text(self, prompt, **kwargs):
+        self.calls += 1
+        self.kwargs = kwargs
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return {"text": f"{self.name}:{prompt}"}
+
+
+class TestProviderRouter:
+    """ProviderRouterのテスト."""
+    
+    @pytest.mark.asyncio
+    async def test_primary_used_when_fast(self):
+        """優先プロバイダーが速い場合はヘッジしないことのテスト."""
+        claude = FakeClient("claude", delay=0.01)
+        openai = FakeClient("openai")
+        router = ProviderRouter({"claude": claude, "openai": openai}, hedge_min_delay=0.5)
+        
+        result = await router.generate_text("hello", model="claude-3")
+        
+        assert result["provider"] == "claude"
+        assert openai.calls == 0
+        assert router.get_stats()["hedges"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_hedge_to_alternate_and_cancel_loser(self):
+        """遅延時に代替プロバイダーへヘッジし、敗者をキャンセルすることのテスト."""
+        claude = FakeClient("claude", delay=1.0)
+        openai = FakeClient("openai", delay=0.01)
+        router = ProviderRouter({"claude": claude, "openai": openai}, hedge_min_delay=0.05)
+        
+        result = await router.generate_text("hello", workflow_id="wf-1")
+        await asyncio.sleep(0)
+        
+        assert result["provider"] == "openai"
+        assert claude.cancelled == 1
+        stats = router.get_stats()
+        assert stats["hedges"] == 1
+        assert stats["hedge_wins"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_hedge_budget_caps_duplicates(self):
+        """ヘッジ予算を超えたらヘッジしないことのテスト."""
+        claude = FakeClient("claude", delay=0.1)
+        openai = FakeClient("openai", delay=0.0)
+        router = ProviderRouter(
+            {"claude": claude, "openai": openai}, hedge_min_delay=0.01, hedge_budget_ratio=0.0
+        )
+        
+        first = await router.generate_text("a", workflow_id="wf-1")
+        second = await router.generate_text("b", workflow_id="wf-1")
+        
+        assert first["provider"] == "openai"
+        assert second["provider"] == "claude"
+        assert router.budget.get_usage("wf-1") == {"requests": 2, "hedges": 1}
+        assert router.get_stats()["budget_exhausted"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_failover_on_error(self):
+        """エラー時に代替プロバイダーへフェイルオーバーすることのテスト."""
+        claude = FakeClient("claude", error=APIError("overloaded", status_code=529))
+        openai = FakeClient("openai")
+        router = ProviderRouter({"claude": claude, "openai": openai})
+        
+        result = await router.generate_text("hello")
+        
+        assert result["provider"] == "openai"
+        assert router.get_stats()["failovers"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_skips_unavailable_provider(self):
+        """利用不可（サーキットオープン）のプロバイダーを飛ばすことのテスト."""
+        claude = FakeClient("claude", available=False)
+        openai = FakeClient("openai")
+        router = ProviderRouter({"claude": claude, "openai": openai})
+        
+        result = await router.generate_text("hello")
+        
+        assert result["provider"] == "openai"
+        assert claude.calls == 0
+    
+    @pytest.mark.asyncio
+    async def test_all_providers_fail(self):
+        """全プロバイダー失敗時に例外を送出することのテスト."""
+        error = APIError("down", status_code=500)
+        router = ProviderRouter({
+            "claude": FakeClient("claude", error=error),
+            "openai": FakeClient("openai", error=error),
+        })
+        
+        with pytest.raises(APIError):
+            await router.generate_text("hello")
+    
+    @pytest.mark.asyncio
+    async def test_models_and_max_tokens_reach_each_provider(self):
+        """プロバイダー毎のモデルと max_tokens がクライアントに渡ることのテスト."""
+        claude = FakeClient("claude", error=APIError("overloaded", status_code=529))
+        openai = FakeClient("openai")
+        router = ProviderRouter({"claude": claude, "openai": openai})
+        
+        await router.generate_text(
+            "hello", models={"claude": "claude-haiku", "openai": "gpt-mini"}, max_tokens=300
+        )
+        
+        assert claude.kwargs == {"model": "claude-haiku", "max_tokens": 300}
+        assert openai.kwargs == {"model": "gpt-mini", "max_tokens": 300}
+    
+    @pytest.mark.asyncio
+    async def test_plain_model_applies_to_primary_only(self):
+        """models なしの model は最優先のプロバイダーにのみ適用することのテスト."""
+        claude = FakeClient("claude", error=APIError("overloaded", status_code=529))
+        openai = FakeClient("openai")
+        router = ProviderRouter({"claude": claude, "openai": openai})
+        
+        await router.generate_text("hello", model="claude-3")
+        
+        assert claude.kwargs == {"model": "claude-3"}
+        assert openai.kwargs == {}
+    
+    def test_hedge_delay_uses_percentile(self):
+        """ヘッジ閾値がレイテンシのパーセンタイルになることのテスト."""
+        router = ProviderRouter({"claude": FakeClient("claude")}, min_samples=10, hedge_percentile=0.9)
+        router._latencies["claude"].extend(i / 100 for i in range(1, 101))
+        
+        assert router.hedge_delay("claude") == pytest.approx(0.91)
+
+
+def test_hedge_budget_ratio():
+    """ヘッジ予算の割合計算テスト."""
+    budget = HedgeBudget(ratio=0.1, min_hedges=1)
+    for _ in range(20):
+        budget.record_request("wf")
+    
+    assert budget.try_spend("wf")
+    assert budget.try_spend("wf")
+    assert not budget.try_spend("wf")
+
+
+def test_hedge_budget_keeps_recent_workflows():
+    """ヘッジ予算が直近のワークフロー分だけ保持されることのテスト."""
+    budget = HedgeBudget(ratio=0.1, max_workflows=2)
+    budget.record_request("wf-1")
+    budget.record_request("wf-2")
+    budget.record_request("wf-1")
+    budget.record_request("wf-3")
+    
+    assert budget.get_usage("wf-1")["requests"] == 2
+    assert budget.get_usage("wf-2")["requests"] == 0
+    assert len(budget._usage) == 2
@@ -0,0 +1,134 @@
+"""アップロードキューのテスト"""
+
+import asyncio
+import hashlib
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.clients.object_store import LocalObjectStore
+from src.clients.s3 import S3Client, S3Error
+from src.clients.upload_queue import UploadQueue
+from src.config import Config
+
+
+class SlowLocalStore(LocalObjectStore):
+    """同時書き込み数を記録するストレージ"""
+    
+    def __init__(self, root_dir):
+        super().__init__(root_dir)
+        self.active = 0
+        self.max_active = 0
+        
+    async def put(self, key, data, content_type=None, metadata=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        try:
+            return await super().put(key, data, content_type, metadata)
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def local_store(tmp_path):
+    """ローカルディスクのストレージ"""
+    return SlowLocalStore(str(tmp_path))
+
+
+class TestUploadQueue:
+    """UploadQueueのテスト"""
+    
+    @pytest.mark.asyncio
+    async def test_identical_images_uploaded_once(self, local_store):
+        """同じ内容は同時に投入しても1回だけアップロードすることのテスト"""
+        queue = UploadQueue(local_store, concurrency=4)
+        
+        urls = await queue.upload_many([(b"same", "png")] * 5 + [(b"other", "png")])
+        
+        assert len(set(urls)) == 2
+        digest = hashlib.sha256(b"same").hexdigest()
+        assert urls[0].endswith(f"media/{digest[:2]}/{digest}.png")
+        assert local_store.stats["puts"] == 2
+        assert queue.get_stats()["deduplicated"] == 4
+        
+    @pytest.mark.asyncio
+    async def test_skips_existing_objects(self, local_store):
+        """既にストレージにある内容は HEAD で確認して送信しないことのテスト"""
+        await UploadQueue(local_store).upload(b"image")
+        queue = UploadQueue(local_store)
+        
+        await queue.upload(b"image")
+        
+        assert local_store.stats["puts"] == 1
+        assert queue.get_stats()["skipped_existing"] == 1
+        
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self, local_store):
+        """同時アップロード数が上限を超えないことのテスト"""
+        queue = UploadQueue(local_store, concurrency=3)
+        
+        await queue.upload_many((f"image-{i}".encode(), "png") for i in range(12))
+        
+        assert local_store.max_active == 3
+        assert queue.get_stats()["uploaded"] == 12
+        
+    @pytest.mark.asyncio
+    async def test_retries_after_failure(self, local_store):
+        """失敗したアップロードは次回の投入で再試行することのテスト"""
+        queue = UploadQueue(local_store)
+        original = local_store.put
+        local_store.put = AsyncMock(side_effect=S3Error("boom"))
+        
+        with pytest.raises(S3Error):
+            await queue.upload(b"image")
+        
+        local_store.put = original
+        assert (await queue.upload(b"image")).endswith(".png")
+        assert queue.get_stats()["failed"] == 1
+
+
+class TestS3Multipart:
+    """S3Clientのマルチパートアップロードのテスト"""
+    
+    @pytest.fixture
+    def s3_client(self):
+        """モックの S3 を使うクライアント"""
+        client = S3Client("key", "secret", bucket_name="bucket", multipart_threshold=10,
+                          endpoint_url="http://localhost:9000")
+        client.s3_client = AsyncMock()
+        client.s3_client.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+        client.s3_client.upload_part.side_effect = lambda **kwargs: {"ETag": f"etag-{kwargs['PartNumber']}"}
+        return client
+        
+    @pytest.mark.asyncio
+    async def test_large_assets_use_multipart(self, s3_client):
+        """閾値以上のデータをパートに分けて送信することのテスト"""
+        s3_client.multipart_chunk_size = 5 * 1024 * 1024
+        data = b"x" * (11 * 1024 * 1024)
+        
+        url = await s3_client.upload_bytes(data, "media/big.png")
+        
+        assert url == "http://localhost:9000/bucket/media/big.png"
+        assert s3_client.s3_client.upload_part.await_count == 3
+        parts = s3_client.s3_client.complete_multipart_upload.await_args.kwargs["MultipartUpload"]["Parts"]
+        assert [part["PartNumber"] for part in parts] == [1, 2, 3]
+        s3_client.s3_client.put_object.assert_not_awaited()
+        
+    @pytest.mark.asyncio
+    async def test_multipart_failure_aborts(self, s3_client):
+        """パートの送信に失敗したらアップロードを中断することのテスト"""
+        s3_client.s3_client.upload_part.side_effect = RuntimeError("network")
+        
+        with pytest.raises(RuntimeError):
+            await s3_client.upload_bytes(b"x" * 20, "media/big.png")
+        
+        s3_client.s3_client.abort_multipart_upload.assert_awaited_once()
+        
+    @pytest.mark.asyncio
+    async def test_small_assets_use_put_object(self, s3_client):
+        """閾値未満は1回の PUT で送信することのテスト"""
+        await s3_client.upload_bytes(b"small", "media/small.png")
+        
+        s3_client.s3_client.put_object.assert_awaited_once()
+        s3_client.s3_client.create_multipart_upload.assert_not_awaited()
@@ -11,7 +11,7 @@ from src.config import Config
 class TestConverter(BaseConverter):
     """テスト用コンバーター."""
     
-    async def convert(self, source: str, **kwargs) -> bytes:
+    async def _convert(self, source: str, **kwargs) -> bytes:
         """テスト用変換処理."""
         if not source:
             raise ValueError("Empty source")
@@ -23,9 +23,10 @@ class TestConverter(BaseConverter):
 
 
 @pytest.fixture
-def config():
+def config(tmp_path):
     """テスト用設定."""
     config = Config()
+    config.storage.cache_dir = str(tmp_path)
     config.workers.max_concurrent_tasks = 2
     config.image.width = 800
     config.image.height = 600
@@ -280,4 +280,98 @@ graph TD
         
         assert converter.validate_source(content_upper) is True
         assert converter.validate_source(content_lower) is True
-        assert converter.validate_source(content_mixed) is True 
\ No newline at end of file
+        assert converter.validate_source(content_mixed) is True 
+
+class TestMermaidBatchConversion:
+    """Batch conversion tests."""
+    
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Create config with the render cache in a temp dir and no render pool."""
+        config = Config()
+        config.storage.cache_dir = str(tmp_path)
+        config.image.render_pool_enabled = False
+        return config
+        
+    @pytest.fixture
+    def converter(self, config):
+        """Create MermaidConverter instance."""
+        return MermaidConverter(config)
+        
+    @staticmethod
+    def fake_cli(calls):
+        """Fake mmdc writing one PNG per mermaid block of the markdown input."""
+        async def run(input_path, output_path, **kwargs):
+            calls.append(kwargs)
+            with open(input_path) as f:
+                blocks = f.read().split("```mermaid\n")[1:]
+            base = output_path[:-len('.md')]
+            for i, block in enumerate(blocks, 1):
+                with open(f"{base}-{i}.png", 'wb') as out:
+                    out.write(block.split("\n```")[0].encode())
+            return True
+        return run
+        
+    @pytest.mark.asyncio
+    async def test_batch_renders_chapter_in_one_cli_call(self, converter):
+        """Test all diagrams of a chapter are rendered by a single CLI invocation."""
+        calls = []
+        sources = ['graph TD\nA-->B', 'not mermaid', 'graph LR\nC-->D', 'graph TD\nA-->B']
+        
+        with patch.object(converter, '_check_mermaid_cli', AsyncMock(return_value=True)):
+            with patch.object(converter, '_run_mermaid_cli', side_effect=self.fake_cli(calls)):
+                results = await converter.convert_many(sources)
+                
+        assert results == [b'graph TD\nA-->B', None, b'graph LR\nC-->D', b'graph TD\nA-->B']
+        assert len(calls) == 1
+        assert calls[0]['output_format'] == 'png'
+        assert calls[0]['timeout'] == converter.timeout * 2
+        
+    @pytest.mark.asyncio
+    async def test_batch_uses_render_cache(self, converter):
+        """Test cached diagrams are not rendered again."""
+        calls = []
+        with patch.object(converter, '_check_mermaid_cli', AsyncMock(return_value=True)):
+            with patch.object(converter, '_run_mermaid_cli', side_effect=self.fake_cli(calls)):
+                await converter.convert_many(['graph TD\nA-->B', 'graph LR\nC-->D'])
+                results = await converter.convert_many(['graph TD\nA-->B', 'graph LR\nC-->D'])
+                
+        assert results == [b'graph TD\nA-->B', b'graph LR\nC-->D']
+        assert len(calls) == 1
+        
+    @pytest.mark.asyncio
+    async def test_headless_batch_reports_per_diagram_errors(self, converter):
+        """Test the headless batch keeps going past a diagram that fails."""
+        async def run_batch(diagrams, workdir, **kwargs):
+            with open(os.path.join(workdir, 'diagram-0.png'), 'wb') as f:
+                f.write(b'png-0')
+            return {'1': 'Parse error'}
+            
+        with patch.object(converter, '_check_mermaid_cli', AsyncMock(return_value=False)):
+            with patch.object(converter, '_run_mermaid_headless_batch', side_effect=run_batch) as batch:
+                results = await converter.convert_many(['graph TD\nA-->B', 'graph TD\nbroken'])
+                
+        assert results == [b'png-0', None]
+        batch.assert_called_once()
+        
+    @pytest.mark.asyncio
+    async def test_batch_failure_falls_back_to_single_conversion(self, converter):
+        """Test a failed batch run converts the diagrams one by one."""
+        with patch.object(converter, '_render_batch_subprocess', AsyncMock(side_effect=RuntimeError("boom"))):
+            with patch.object(converter, '_convert_from_content', AsyncMock(side_effect=[b'a', RuntimeError("bad")])):
+                results = await converter.convert_many(['graph TD\nA-->B', 'graph TD\nC-->D'])
+                
+        assert results == [b'a', None]
+        
+    @pytest.mark.asyncio
+    async def test_cli_probe_is_cached(self, converter):
+        """Test the CLI availability check spawns a process only once."""
+        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+            mock_process = AsyncMock()
+            mock_process.returncode = 0
+            mock_subprocess.return_value = mock_process
+            
+            assert await converter._check_mermaid_cli() is True
+            assert await converter._check_mermaid_cli() is True
+            
+        mock_subprocess.assert_called_once()
@@ -0,0 +1,111 @@
+"""画像最適化ステージのテスト."""
+
+import io
+import struct
+from unittest.mock import patch
+
+import pytest
+
+from src.config.settings import Config
+from src.converters import optimizer as optimizer_module
+from src.converters.optimizer import PNG_SIGNATURE, ImageOptimizer, optimize_image, png_size
+
+
+def make_png(width=400, height=200):
+    """単色の図形を描いた PNG を作成."""
+    Image = pytest.importorskip("PIL.Image")
+    ImageDraw = pytest.importorskip("PIL.ImageDraw")
+    image = Image.new("RGBA", (width, height), (255, 255, 255, 255))
+    ImageDraw.Draw(image).rectangle((20, 20, width - 20, height - 20), fill=(30, 90, 200, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestOptimizeImage:
+    """optimize_image のテスト（Pillow が必要）."""
+    
+    def test_optimized_png_is_not_larger(self):
+        png = make_png()
+        
+        result = optimize_image(png, {"quantize": True, "colors": 64, "formats": [], "widths": []})
+        
+        assert len(result["data"]) <= len(png)
+        assert (result["width"], result["height"]) == (400, 200)
+        assert result["variants"] == []
+    
+    def test_responsive_widths_and_formats(self):
+        png = make_png()
+        
+        result = optimize_image(png, {"quantize": False, "formats": ["webp"], "widths": [200, 800], "quality": 70})
+        
+        variants = {(v["format"], v["width"]) for v in result["variants"]}
+        assert variants == {("webp", 400), ("png", 200), ("webp", 200)}
+        assert next(v for v in result["variants"] if v["width"] == 200)["height"] == 100
+
+
+class TestImageOptimizer:
+    """ImageOptimizer のテスト."""
+    
+    @pytest.mark.asyncio
+    async def test_disabled_returns_original(self):
+        optimizer = ImageOptimizer(enabled=False)
+        
+        result = await optimizer.optimize(b"png")
+        
+        assert result.data == b"png"
+        assert result.variants == []
+        assert (result.width, result.height) == (None, None)
+        assert optimizer.get_stats()["images"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_original_size_read_from_png_header(self):
+        optimizer = ImageOptimizer(enabled=False)
+        png = PNG_SIGNATURE + b"\x00\x00\x00\rIHDR" + struct.pack(">II", 320, 240) + b"\x08\x06\x00\x00\x00"
+        
+        result = await optimizer.optimize(png)
+        
+        assert (result.width, result.height) == (320, 240)
+        assert png_size(b"not a png") is None
+    
+    @pytest.mark.asyncio
+    async def test_failure_returns_original(self):
+        with patch.object(optimizer_module, "PIL_AVAILABLE", True):
+            optimizer = ImageOptimizer(enabled=True)
+        
+        with patch.object(optimizer_module, "optimize_image", side_effect=ValueError("not a png")):
+            result = await optimizer.optimize(b"broken")
+        
+        assert result.data == b"broken"
+        assert optimizer.get_stats()["failures"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_records_byte_savings(self):
+        with patch.object(optimizer_module, "PIL_AVAILABLE", True):
+            optimizer = ImageOptimizer(enabled=True, formats=["webp", "gif"], widths=[300, 0])
+        
+        result = {"data": b"small", "width": 10, "height": 10,
+                  "variants": [{"format": "webp", "width": 10, "height": 10, "data": b"w"}]}
+        with patch.object(optimizer_module, "optimize_image", return_value=result) as optimize:
+            optimized = await optimizer.optimize(b"much larger png")
+        
+        assert optimize.call_args[0][1]["formats"] == ["webp"]
+        assert optimize.call_args[0][1]["widths"] == [300]
+        assert optimized.bytes_saved == len(b"much larger png") - len(b"small")
+        assert (optimized.width, optimized.height) == (10, 10)
+        stats = optimizer.get_stats()
+        assert stats["bytes_saved"] == optimized.bytes_saved
+        assert (stats["variants"], stats["variant_bytes"]) == (1, 1)
+    
+    def test_from_config(self):
+        config = Config()
+        config.image.process_pool_enabled = False
+        config.image.optimize_formats = ["avif"]
+        config.image.responsive_widths = [640]
+        
+        optimizer = ImageOptimizer.from_config(config)
+        
+        assert optimizer.options["formats"] == ["avif"]
+        assert optimizer.options["widths"] == [640]
+        assert optimizer.options["quantize"] is False  # 減色は非可逆のため明示的に有効にする
+        assert optimizer.process_pool is None
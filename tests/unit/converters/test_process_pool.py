@@ -0,0 +1,104 @@
+"""Conversion process pool tests."""
+
+import asyncio
+import os
+import time
+
+import pytest
+import pytest_asyncio
+
+from src.config import Config
+from src.converters.process_pool import ConversionProcessPool, get_process_pool
+from src.converters.svg import SVGConverter
+
+
+def blocking_render(seconds: float) -> int:
+    """Simulate CPU-bound work that holds the worker process."""
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def crash() -> None:
+    """Kill the worker process."""
+    os._exit(1)
+
+
+@pytest_asyncio.fixture
+async def pool():
+    """Create a two-process pool."""
+    pool = ConversionProcessPool(max_workers=2)
+    yield pool
+    await pool.close()
+
+
+class TestConversionProcessPool:
+    """ConversionProcessPool tests."""
+    
+    @pytest.mark.asyncio
+    async def test_runs_in_worker_processes(self, pool):
+        """Test work runs outside the event loop process."""
+        await pool.start()
+        
+        pids = await asyncio.gather(*(pool.run(blocking_render, 0.1) for _ in range(4)))
+        
+        assert os.getpid() not in pids
+        assert pool.get_stats()["tasks"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, pool):
+        """Test the loop keeps ticking while a conversion blocks a worker."""
+        await pool.start()
+        lags = []
+        
+        async def ticker():
+            while True:
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - started - 0.01)
+        
+        task = asyncio.create_task(ticker())
+        await pool.run(blocking_render, 0.3)
+        task.cancel()
+        
+        assert len(lags) > 10
+        assert max(lags) < 0.05
+    
+    @pytest.mark.asyncio
+    async def test_restarts_broken_pool(self, pool):
+        """Test a crashed worker is replaced for later conversions."""
+        with pytest.raises(Exception):
+            await pool.run(crash)
+        
+        assert await pool.run(blocking_render, 0) != os.getpid()
+        assert pool.get_stats()["failures"] == 1
+        assert pool.get_stats()["restarts"] >= 1
+    
+    @pytest.mark.asyncio
+    async def test_shared_pool_from_config(self):
+        """Test converters share the configured pool and can opt out."""
+        await ConversionProcessPool.close_shared()
+        config = Config()
+        config.image.process_pool_workers = 3
+        
+        assert get_process_pool(config) is ConversionProcessPool.shared(config)
+        assert SVGConverter(config).process_pool.max_workers == 3
+        await ConversionProcessPool.close_shared()
+        
+        config.image.process_pool_enabled = False
+        assert get_process_pool(config) is None
+    
+    @pytest.mark.asyncio
+    async def test_svg_fallback_through_pool(self, tmp_path):
+        """Test missing cairosvg in the worker still falls back."""
+        config = Config()
+        config.storage.cache_dir = str(tmp_path)
+        converter = SVGConverter(config)
+        converter.process_pool = ConversionProcessPool(max_workers=1)
+        
+        try:
+            result = await converter.convert('<svg width="10" height="10"><rect/></svg>')
+        finally:
+            await converter.process_pool.close()
+        
+        assert result.startswith(b'\x89PNG')
+        assert converter.process_pool.get_stats()["tasks"] == 1
@@ -0,0 +1,190 @@
+"""Render pool tests."""
+
+import asyncio
+import base64
+import sys
+from unittest.mock import AsyncMock, MagicMock, mock_open, patch
+
+import pytest
+import pytest_asyncio
+
+from src.config import Config
+from src.converters.mermaid import MermaidConverter
+from src.converters.render_pool import HeadlessRenderPool, RenderError, RenderPoolUnavailable
+
+# Fake render server speaking the same JSON Lines protocol as the Node.js server
+FAKE_SERVER = r"""
+import base64, json, os, sys, time
+max_renders = int(os.environ["RENDER_POOL_MAX_RENDERS"])
+renders = 0
+print(json.dumps({"ready": True}), flush=True)
+for line in sys.stdin:
+    request = json.loads(line)
+    source = request["source"]
+    if source == "crash":
+        sys.exit(1)
+    if source == "slow":
+        time.sleep(1)
+    if source == "bad":
+        print(json.dumps({"id": request["id"], "ok": False, "error": "Parse error"}), flush=True)
+        continue
+    renders = renders % max_renders + 1
+    data = base64.b64encode((request["kind"] + ":" + source).encode()).decode()
+    print(json.dumps({"id": request["id"], "ok": True, "data": data, "page_renders": renders}), flush=True)
+"""
+
+
+class FakeRenderPool(HeadlessRenderPool):
+    """Render pool backed by the fake server."""
+    
+    def _server_command(self):
+        return [sys.executable, "-c", FAKE_SERVER]
+
+
+@pytest_asyncio.fixture
+async def pool():
+    """Create a fake render pool."""
+    pool = FakeRenderPool(max_renders_per_page=2, request_timeout=2.0)
+    yield pool
+    await pool.close()
+
+
+class TestHeadlessRenderPool:
+    """HeadlessRenderPool tests."""
+    
+    @pytest.mark.asyncio
+    async def test_renders_over_single_server(self, pool):
+        """Test many renders share one long-lived server process."""
+        results = await asyncio.gather(*(pool.render("mermaid", f"graph TD\nA-->B{i}") for i in range(5)))
+        
+        assert results[3] == b"mermaid:graph TD\nA-->B3"
+        stats = pool.get_stats()
+        assert stats["starts"] == 1
+        assert stats["renders"] == 5
+        assert stats["running"] is True
+    
+    @pytest.mark.asyncio
+    async def test_render_error_keeps_server(self, pool):
+        """Test diagram errors are raised without restarting the server."""
+        with pytest.raises(RenderError, match="Parse error"):
+            await pool.render("mermaid", "bad")
+        
+        assert await pool.render("drawio", "<mxfile/>") == b"drawio:<mxfile/>"
+        assert pool.get_stats()["starts"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_restarts_after_crash(self, pool):
+        """Test pending renders fail and the next render restarts the server."""
+        with pytest.raises(RenderPoolUnavailable):
+            await pool.render("mermaid", "crash")
+        
+        assert await pool.render("mermaid", "graph TD") == b"mermaid:graph TD"
+        assert pool.get_stats()["starts"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_request_timeout(self, pool):
+        """Test a render exceeding the request budget raises RenderError."""
+        pool.request_timeout = 0.2
+        
+        with pytest.raises(RenderError, match="timed out"):
+            await pool.render("mermaid", "slow")
+    
+    @pytest.mark.asyncio
+    async def test_start_failure_backs_off(self):
+        """Test a missing runtime is reported once and not retried immediately."""
+        pool = HeadlessRenderPool(node_path="/nonexistent/node")
+        
+        with patch("asyncio.create_subprocess_exec", wraps=asyncio.create_subprocess_exec) as spawn:
+            for _ in range(2):
+                with pytest.raises(RenderPoolUnavailable):
+                    await pool.render("mermaid", "graph TD")
+        
+        assert spawn.call_count == 1
+        assert pool.get_stats()["start_failures"] == 1
+    
+    def test_from_config(self):
+        """Test pool settings are read from image config."""
+        config = Config()
+        config.image.render_pool_pages = 2
+        config.image.render_pool_max_renders_per_page = 10
+        
+        pool = HeadlessRenderPool.from_config(config)
+        
+        assert (pool.pages, pool.max_renders_per_page) == (2, 10)
+        assert pool._server_env()["RENDER_POOL_MAX_RENDERS"] == "10"
+
+
+class TestConverterRenderPool:
+    """Converter integration tests."""
+    
+    @pytest.fixture
+    def converter(self):
+        """Create MermaidConverter with the render pool enabled."""
+        config = Config()
+        config.image.render_cache_enabled = False
+        converter = MermaidConverter(config)
+        converter.render_pool = MagicMock()
+        return converter
+    
+    @pytest.mark.asyncio
+    async def test_enabled_by_config(self):
+        """Test converters share the configured pool."""
+        config = Config()
+        
+        assert MermaidConverter(config).render_pool is HeadlessRenderPool._shared[config.image.render_pool_node_path]
+        await HeadlessRenderPool.close_shared()
+        
+        config.image.render_pool_enabled = False
+        assert MermaidConverter(config).render_pool is None
+    
+    @pytest.mark.asyncio
+    async def test_uses_render_pool(self, converter):
+        """Test conversion goes through the render pool."""
+        png = base64.b64decode("iVBORw0KGgo=")
+        converter.render_pool.render = AsyncMock(return_value=png)
+        
+        result = await converter.convert("graph TD\n    A --> B", theme="dark")
+        
+        assert result == png
+        options = converter.render_pool.render.await_args.kwargs
+        assert options["theme"] == "dark"
+        assert options["width"] == converter.config.image.width
+    
+    @pytest.mark.asyncio
+    async def test_falls_back_when_pool_unavailable(self, converter):
+        """Test conversion falls back to the CLI when the pool is unavailable."""
+        converter.render_pool.render = AsyncMock(side_effect=RenderPoolUnavailable("no node"))
+        
+        with patch.object(converter, '_check_mermaid_cli', return_value=True), \
+                patch.object(converter, '_run_mermaid_cli', return_value=True) as run_cli, \
+                patch('os.path.exists', return_value=True), \
+                patch('builtins.open', mock_open(read_data=b'cli_image')):
+            result = await converter.convert("graph TD\n    A --> B")
+        
+        assert result == b'cli_image'
+        run_cli.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_falls_back_when_pool_render_fails(self, converter):
+        """Test conversion falls back to the CLI when the pool fails to render."""
+        converter.render_pool.render = AsyncMock(side_effect=RenderError("page crashed"))
+        
+        with patch.object(converter, '_check_mermaid_cli', return_value=True), \
+                patch.object(converter, '_run_mermaid_cli', return_value=True) as run_cli, \
+                patch('os.path.exists', return_value=True), \
+                patch('builtins.open', mock_open(read_data=b'cli_image')):
+            result = await converter.convert("graph TD\n    A --> B")
+        
+        assert result == b'cli_image'
+        run_cli.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_batch_retries_only_failed_diagrams(self, converter):
+        """Test a chapter batch re-renders only the diagrams the pool failed on."""
+        converter.render_pool.render = AsyncMock(side_effect=[b'pool-0', RenderError("bad"), b'pool-2'])
+        
+        with patch.object(converter, '_render_batch_subprocess', AsyncMock(return_value=[b'cli-1'])) as batch:
+            results = await converter.convert_many(['graph TD\nA-->B', 'graph TD\nC-->D', 'graph TD\nE-->F'])
+        
+        assert results == [b'pool-0', b'cli-1', b'pool-2']
+        assert batch.await_args.args[0] == ['graph TD\nC-->D']
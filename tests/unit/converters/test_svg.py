@@ -11,9 +11,11 @@ from src.config import Config
 
 
 @pytest.fixture
-def config():
+def config(tmp_path):
     """テスト用設定."""
     config = Config()
+    config.storage.cache_dir = str(tmp_path)
+    config.image.process_pool_enabled = False  # モジュールのモックを子プロセスに渡せないためスレッドで実行
     config.workers.max_concurrent_tasks = 2
     config.image.width = 800
     config.image.height = 600
@@ -150,12 +152,16 @@ class TestSVGConverter:
             
         mock_rgb_image.save = mock_save
         
-        with patch.dict('sys.modules', {'cairosvg': mock_cairosvg, 'PIL.Image': mock_image}):
+        # encode_jpeg は run_cpu_bound（スレッド）で `from PIL import Image` するため PIL パッケージごと差し替える
+        mock_pil = MagicMock(Image=mock_image)
+        
+        with patch.dict('sys.modules', {'cairosvg': mock_cairosvg, 'PIL': mock_pil, 'PIL.Image': mock_image}):
             result = await converter.convert(sample_svg, format="jpg")
             
-            assert isinstance(result, bytes)
+            assert result == b'fake_jpg_data'
             mock_cairosvg.svg2png.assert_called_once()
             mock_image.open.assert_called_once()
+            mock_image.new.assert_called_once_with('RGB', (800, 600), (255, 255, 255))
             
     @pytest.mark.asyncio
     async def test_convert_to_jpg_fallback(self, converter, sample_svg):
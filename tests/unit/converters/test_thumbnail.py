@@ -0,0 +1,87 @@
+"""サムネイルレンダラーのテスト."""
+
+import io
+from unittest.mock import patch
+
+import pytest
+
+from src.config.settings import Config
+from src.converters import thumbnail as thumbnail_module
+from src.converters.thumbnail import (
+    ThumbnailRenderer,
+    ThumbnailTemplate,
+    find_font,
+    load_template,
+    render_thumbnail,
+)
+
+TEMPLATE_PATH = "templates/thumbnail_template.yaml"
+
+
+class TestThumbnailTemplate:
+    """テンプレートの読み込みのテスト."""
+    
+    def test_load_repository_template(self):
+        template = load_template(TEMPLATE_PATH)
+        
+        assert (template.width, template.height) == (1536, 1024)
+        assert template.safe_zone == {"top": 128, "bottom": 128, "left": 128, "right": 128}
+        assert template.headline.size == 64
+        assert template.headline.outline_color == "#000000"
+        assert template.headline.outline_size == 3
+        assert template.headline.glow_color == "#FFD600"
+        assert template.subheadline.color == "#000000"
+        assert template.badge_color == "#FFD600"
+        assert template.background == ("#7FD3F7", "#FFFFFF")
+        assert template.highlight is True
+        assert template.line_spacing == 15
+    
+    def test_defaults_for_missing_values(self):
+        template = ThumbnailTemplate.from_dict({"resolution": "1280x720"})
+        
+        assert (template.width, template.height) == (1280, 720)
+        assert template.headline.size == 64
+        assert template.badge_color is None
+    
+    def test_find_font_prefers_best_match(self):
+        fonts = (
+            "/fonts/DejaVuSans.ttf",
+            "/fonts/NotoSansCJKjp-Regular.otf",
+            "/fonts/NotoSansCJKjp-Bold.otf",
+        )
+        find_font.cache_clear()
+        try:
+            with patch.object(thumbnail_module, "_font_files", return_value=fonts):
+                assert find_font("Noto Sans JP Bold") == "/fonts/NotoSansCJKjp-Bold.otf"
+                assert find_font("Unknown Font") is None
+        finally:
+            find_font.cache_clear()
+
+
+class TestRenderThumbnail:
+    """描画のテスト（Pillow が必要）."""
+    
+    def test_render_scaled_thumbnail(self):
+        Image = pytest.importorskip("PIL.Image")
+        spec = load_template(TEMPLATE_PATH).to_spec()
+        
+        data = render_thumbnail(spec, "第1章 とても長いタイトルでも折り返して収まる", "入門編", 1200, 630)
+        
+        image = Image.open(io.BytesIO(data))
+        assert image.format == "PNG"
+        assert image.size == (1200, 630)
+    
+    @pytest.mark.asyncio
+    async def test_render_batch(self):
+        pytest.importorskip("PIL")
+        config = Config()
+        config.image.process_pool_enabled = False
+        renderer = ThumbnailRenderer.from_config(config)
+        
+        results = await renderer.render_batch([
+            {"title": f"第{i}章", "color_scheme": "green", "dimensions": {"width": 600, "height": 315}}
+            for i in range(3)
+        ])
+        
+        assert all(result and result.startswith(b"\x89PNG") for result in results)
+        assert renderer.get_stats()["rendered"] == 3
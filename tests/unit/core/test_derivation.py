@@ -0,0 +1,132 @@
+"""出力フォーマットの導出のテスト."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config.settings import Config
+from src.core.derivation import DerivationGraph, extractive_summary, split_sentences
+from src.core.events import Event, EventType
+from src.workers.ai import AIWorker
+
+ARTICLE = (
+    "# 非同期処理\n\n"
+    "【記事】Pythonのasyncioはイベントループで非同期処理を実現します。"
+    "イベントループはタスクを切り替えながら実行します。\n\n"
+    "余談ですが、筆者は紅茶が好きです。\n\n"
+    "I/O待ちの間に他のタスクを進められるため、イベントループによる非同期処理は高速です。"
+)
+
+
+class TestDerivationGraph:
+    """DerivationGraphのテスト."""
+    
+    def test_layers_follow_dependencies(self):
+        """依存元が先の層に来ることのテスト."""
+        graph = DerivationGraph({"article": [], "script": [], "tweet": ["article"]})
+        
+        assert graph.layers() == [["article", "script"], ["tweet"]]
+    
+    def test_rejects_cycle(self):
+        """循環や未定義の依存を拒否することのテスト."""
+        with pytest.raises(ValueError):
+            DerivationGraph({"a": ["b"], "b": ["a"]})
+        with pytest.raises(ValueError):
+            DerivationGraph({"a": ["missing"]})
+    
+    @pytest.mark.asyncio
+    async def test_run_passes_upstream_results(self):
+        """依存元の結果が依存先に渡され、失敗は除外されることのテスト."""
+        graph = DerivationGraph({"article": [], "broken": [], "tweet": ["article"], "desc": ["broken"]})
+        seen = {}
+        
+        async def article(upstream):
+            return "記事"
+        
+        async def broken(upstream):
+            raise RuntimeError("failed")
+        
+        async def tweet(upstream):
+            seen["tweet"] = upstream
+            return "ツイート"
+        
+        async def desc(upstream):
+            seen["desc"] = upstream
+            return "説明"
+        
+        results = await graph.run({"article": article, "broken": broken, "tweet": tweet, "desc": desc})
+        
+        assert seen == {"tweet": {"article": "記事"}, "desc": {}}
+        assert isinstance(results["broken"], RuntimeError)
+        assert results["tweet"] == "ツイート"
+
+
+class TestExtractiveSummary:
+    """抽出的要約のテスト."""
+    
+    def test_split_sentences_strips_markup(self):
+        """見出し記号・装飾を除いて文に分割することのテスト."""
+        sentences = split_sentences(ARTICLE)
+        
+        assert sentences[0] == "非同期処理"
+        assert sentences[1].startswith("Python")
+    
+    def test_selects_central_sentences_within_limit(self):
+        """主題に関する文を文字数内で選ぶことのテスト."""
+        summary = extractive_summary(ARTICLE, max_chars=80)
+        
+        assert len(summary) <= 80
+        assert "asyncio" in summary
+        assert "紅茶" not in summary
+
+
+class TestAIWorkerDerivation:
+    """AIWorkerの短文導出のテスト."""
+    
+    @staticmethod
+    def _event():
+        return Event(
+            type=EventType.PARAGRAPH_PARSED,
+            workflow_id="wf",
+            data={"paragraph_index": 0, "content": "Pythonのasyncioはイベントループで非同期処理を実現します。", "title": "非同期処理"}
+        )
+    
+    @pytest.mark.asyncio
+    async def test_short_forms_derived_from_article(self):
+        """ツイート・説明文を記事から導出し、個別に生成しないことのテスト."""
+        worker = AIWorker(Config())
+        worker.event_bus = MagicMock(publish=AsyncMock())
+        worker._generate_tweet = AsyncMock()
+        worker._generate_description = AsyncMock()
+        
+        await worker._handle_paragraph_parsed(self._event())
+        
+        worker._generate_tweet.assert_not_awaited()
+        worker._generate_description.assert_not_awaited()
+        published = {call.args[0].data["content"]["type"]: call.args[0].data["content"]
+                     for call in worker.event_bus.publish.await_args_list}
+        assert set(published) == set(AIWorker.GENERATION_FORMATS)
+        assert published["tweet"]["derived_from"] == "article"
+        assert "asyncio" in published["description"]["content"]
+        assert worker.get_status()["derivation"]["derived_outputs"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_falls_back_when_article_fails(self):
+        """記事の生成に失敗した場合は短文を独立に生成することのテスト."""
+        worker = AIWorker(Config())
+        worker.event_bus = MagicMock(publish=AsyncMock())
+        worker._generate_article = AsyncMock(return_value=None)
+        worker._generate_tweet = AsyncMock(return_value={"type": "tweet", "content": "独立生成"})
+        
+        await worker._handle_paragraph_parsed(self._event())
+        
+        worker._generate_tweet.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_disabled_by_config(self):
+        """設定で無効化すると全フォーマットを独立に生成することのテスト."""
+        config = Config()
+        config.api.derive_short_forms = False
+        worker = AIWorker(config)
+        
+        assert worker.generation_graph.layers() == [AIWorker.GENERATION_FORMATS]
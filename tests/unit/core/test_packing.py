@@ -0,0 +1,258 @@
+"""パラグラフパッキングのテスト."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config.settings import Config
+from src.core.events import Event, EventType
+from src.core.packing import (
+    PackBuffer,
+    ParagraphPacker,
+    build_packed_prompt,
+    response_text,
+    unpack_results,
+)
+from src.utils.prompt_loader import get_prompt_loader
+from src.workers.ai import AIWorker
+
+
+class TestParagraphPacker:
+    """ParagraphPackerのテスト."""
+    
+    def test_packs_adjacent_small_paragraphs(self):
+        """隣接する小さなパラグラフをまとめ、大きなものは単独にすることのテスト."""
+        packer = ParagraphPacker(small_paragraph_tokens=50, target_tokens=100)
+        paragraphs = ["短い。", "次へ。", "長い段落" * 100, "- 項目1", "- 項目2"]
+        
+        assert packer.pack(paragraphs) == [[0, 1], [2], [3, 4]]
+    
+    def test_respects_token_budget(self):
+        """目標トークン数を超えないように分割することのテスト."""
+        packer = ParagraphPacker(small_paragraph_tokens=50, target_tokens=60)
+        paragraphs = ["あ" * 90] * 4  # 各31トークン
+        
+        assert packer.pack(paragraphs) == [[0], [1], [2], [3]]
+        
+        packer = ParagraphPacker(small_paragraph_tokens=50, target_tokens=70)
+        assert packer.pack(paragraphs) == [[0, 1], [2, 3]]
+    
+    def test_disabled_by_config(self):
+        """設定で無効化できることのテスト."""
+        config = Config()
+        config.api.packing_enabled = False
+        
+        assert ParagraphPacker(config).pack(["a", "b"]) == [[0], [1]]
+
+
+class TestDemultiplex:
+    """パック結果の分配のテスト."""
+    
+    def test_unpack_results(self):
+        """番号付きJSONをパラグラフ順に分配することのテスト."""
+        text = '結果です:\n{"items": [{"index": 1, "content": "B"}, {"index": 0, "content": "A"}]}'
+        
+        assert unpack_results(text, 2) == ["A", "B"]
+    
+    def test_unpack_missing_paragraph(self):
+        """パラグラフが欠けている場合は例外を送出することのテスト."""
+        with pytest.raises(ValueError):
+            unpack_results('{"items": [{"index": 0, "content": "A"}]}', 2)
+        with pytest.raises(ValueError):
+            unpack_results("not json", 1)
+    
+    def test_unpack_script_json_matches_paragraph_schema(self):
+        """script_json の結果をパラグラフ毎の生成と同じ scenes 形式に揃えることのテスト."""
+        scenes = [{"type": "introduction", "narration": "導入", "visual_elements": ["title_slide"], "duration": 3}]
+        text = json.dumps({"items": [
+            {"index": 0, "content": {"scenes": scenes}},
+            {"index": 1, "content": "構造化されていない台本"},
+        ]}, ensure_ascii=False)
+        
+        first, second = unpack_results(text, 2, "script_json")
+        
+        assert first == {
+            "scenes": [{"scene_id": 1, **scenes[0]}],
+            "total_duration": 3,
+        }
+        assert second["scenes"][0]["type"] == "main_content"
+        assert second["scenes"][0]["narration"] == "構造化されていない台本"
+        assert second["total_duration"] == second["scenes"][0]["duration"]
+    
+    def test_response_text_formats(self):
+        """Claude / OpenAI 形式のレスポンスからテキストを取り出すテスト."""
+        assert response_text({"content": [{"type": "text", "text": "claude"}]}) == "claude"
+        assert response_text({"choices": [{"message": {"content": "openai"}}]}) == "openai"
+    
+    def test_pack_buffer(self):
+        """パックが揃うまで保持することのテスト."""
+        buffer = PackBuffer()
+        first = {"content": "a", "pack": {"id": "0-0-0", "size": 2, "position": 0}}
+        second = {"content": "b", "pack": {"id": "0-0-0", "size": 2, "position": 1}}
+        
+        assert buffer.add("wf:0-0-0", second) is None
+        assert buffer.add("wf:0-0-0", first) == [first, second]
+        assert buffer.pending_count() == 0
+    
+    def test_pack_buffer_expires_incomplete_pack(self):
+        """max_wait を過ぎた未完成のパックを取り出せることのテスト."""
+        buffer = PackBuffer(max_wait=1.0)
+        second = {"content": "b", "pack": {"id": "0-0-0", "size": 3, "position": 1}}
+        buffer.add("wf:0-0-0", second)
+        
+        assert buffer.expired() == []
+        assert buffer.expired(now=time.monotonic() + 1.0) == ["wf:0-0-0"]
+        assert buffer.pop("wf:0-0-0") == [second]
+        assert buffer.pending_count() == 0
+        assert buffer.pop("wf:0-0-0") is None
+
+
+class TestAIWorkerPacking:
+    """AIWorkerのパック生成のテスト."""
+    
+    @staticmethod
+    def _event(index, size):
+        return Event(
+            type=EventType.PARAGRAPH_PARSED,
+            workflow_id="wf",
+            data={
+                "chapter_index": 0,
+                "section_index": 0,
+                "paragraph_index": index,
+                "content": f"パラグラフ{index}",
+                "title": "セクション",
+                "pack": {"id": "0-0-0", "size": size, "position": index}
+            }
+        )
+    
+    @pytest.mark.asyncio
+    async def test_one_request_per_format_for_pack(self):
+        """パック毎にフォーマット1リクエストで生成し、パラグラフ毎に発行することのテスト."""
+        worker = AIWorker(Config())
+        worker.event_bus = MagicMock(publish=AsyncMock())
+        
+        async def generate(prompt, workflow_id, content_type, **kwargs):
+            # 指示はキャッシュ可能なプレフィックスとして渡す
+            assert content_type in kwargs["context"]
+            assert "<paragraph" not in kwargs["context"]
+            # ルートのモデルと max_tokens をリクエストに反映する
+            assert kwargs["models"] and kwargs["max_tokens"] > 0
+            items = [{"index": i, "content": f"{content_type}-{i}"} for i in range(3)]
+            return {"content": [{"type": "text", "text": json.dumps({"items": items})}]}
+        
+        worker.provider_router = MagicMock()
+        worker.provider_router.generate_structured_content = AsyncMock(side_effect=generate)
+        
+        for index in range(3):
+            await worker._handle_paragraph_parsed(self._event(index, 3))
+        
+        # ツイート・説明文は記事から導出されるため、リクエストは残りのフォーマット分のみ
+        requested = len(AIWorker.GENERATION_FORMATS) - len(AIWorker.DERIVED_FORMATS)
+        assert worker.provider_router.generate_structured_content.await_count == requested
+        published = [call.args[0].data for call in worker.event_bus.publish.await_args_list]
+        assert len(published) == 3 * len(AIWorker.GENERATION_FORMATS)
+        article_2 = next(
+            data for data in published
+            if data["paragraph"]["paragraph_index"] == 2 and data["content"]["type"] == "article"
+        )
+        assert article_2["content"]["content"] == "article-2"
+        assert article_2["content"]["model_route"]["output_format"] == "article"
+    
+    @pytest.mark.asyncio
+    async def test_incomplete_pack_flushed_after_max_wait(self):
+        """揃わないパックを max_wait 経過後に揃った分だけで生成することのテスト."""
+        config = Config()
+        config.api.packing_max_wait = 0.05
+        worker = AIWorker(config)
+        worker.event_bus = MagicMock(publish=AsyncMock())
+        
+        async def generate(prompt, workflow_id, content_type, **kwargs):
+            items = [{"index": i, "content": f"{content_type}-{i}"} for i in range(2)]
+            return {"content": [{"type": "text", "text": json.dumps({"items": items})}]}
+        
+        worker.provider_router = MagicMock()
+        worker.provider_router.generate_structured_content = AsyncMock(side_effect=generate)
+        
+        # 3件のパックのうち2件だけが届く
+        for index in range(2):
+            await worker._handle_paragraph_parsed(self._event(index, 3))
+        assert worker.event_bus.publish.await_count == 0
+        
+        await asyncio.wait_for(asyncio.gather(*worker._pack_flush_tasks), timeout=1)
+        
+        published = [call.args[0].data for call in worker.event_bus.publish.await_args_list]
+        assert worker.pack_buffer.pending_count() == 0
+        assert len(published) == 2 * len(AIWorker.GENERATION_FORMATS)
+        script_json = next(data["content"] for data in published if data["content"]["type"] == "script_json")
+        assert script_json["scenes"][0]["narration"] == "script_json-0"
+        assert script_json["format"] == "json"
+    
+    @pytest.mark.asyncio
+    async def test_falls_back_when_demultiplex_fails(self):
+        """分配に失敗した場合はパラグラフ毎にルーター経由で生成し直すことのテスト."""
+        worker = AIWorker(Config())
+        worker.event_bus = MagicMock(publish=AsyncMock())
+        
+        async def generate(prompt, workflow_id, content_type, **kwargs):
+            if "パラグラフ数: 1" not in prompt:
+                return {"text": "no json"}
+            items = [{"index": 0, "content": f"{content_type}-single"}]
+            return {"text": json.dumps({"items": items})}
+        
+        worker.provider_router = MagicMock()
+        worker.provider_router.generate_structured_content = AsyncMock(side_effect=generate)
+        
+        for index in range(2):
+            await worker._handle_paragraph_parsed(self._event(index, 2))
+        
+        published = [call.args[0].data for call in worker.event_bus.publish.await_args_list]
+        assert len(published) == 2 * len(AIWorker.GENERATION_FORMATS)
+        assert all(not data["content"].get("packed") for data in published)
+        article = next(data["content"] for data in published if data["content"]["type"] == "article")
+        assert article["content"] == "article-single"
+    
+    @pytest.mark.asyncio
+    async def test_unparsed_single_response_raises(self):
+        """1パラグラフ分の応答も解析できない場合はイベント処理を失敗させることのテスト."""
+        worker = AIWorker(Config())
+        worker.event_bus = MagicMock(publish=AsyncMock())
+        worker.provider_router = MagicMock()
+        worker.provider_router.generate_structured_content = AsyncMock(return_value={"text": "no json"})
+        
+        event = self._event(0, 1)
+        event.data.pop("pack")
+        with pytest.raises(ValueError):
+            await worker._handle_paragraph_parsed(event)
+        
+        worker.event_bus.publish.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_packed_request_sends_system_prompt(self):
+        """パック生成でもフォーマット別のシステムプロンプトを送ることのテスト."""
+        worker = AIWorker(Config())
+        worker.event_bus = MagicMock(publish=AsyncMock())
+        
+        async def generate(prompt, workflow_id, content_type, **kwargs):
+            assert kwargs["system_prompt"] == get_prompt_loader().load_system_prompt(content_type)
+            assert "JSON" in kwargs["context"]
+            items = [{"index": i, "content": content_type} for i in range(2)]
+            return {"text": json.dumps({"items": items})}
+        
+        worker.provider_router = MagicMock()
+        worker.provider_router.generate_structured_content = AsyncMock(side_effect=generate)
+        
+        for index in range(2):
+            await worker._handle_paragraph_parsed(self._event(index, 2))
+        
+        assert worker.event_bus.publish.await_count == 2 * len(AIWorker.GENERATION_FORMATS)
+
+
+def test_build_packed_prompt():
+    """パック用プロンプトに全パラグラフが番号付きで含まれることのテスト."""
+    prompt = build_packed_prompt("tweet", ["一つ目", "二つ目"])
+    
+    assert '<paragraph index="0">\n一つ目' in prompt
+    assert '<paragraph index="1">\n二つ目' in prompt
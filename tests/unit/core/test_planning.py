@@ -0,0 +1,120 @@
+"""ワークフロー見積もりのテスト."""
+
+import pytest
+
+from src.config.settings import Config
+from src.core.orchestrator import WorkflowOrchestrator
+from src.core.planning import WorkflowPlanner, count_tokens
+from src.workers.ai import AIWorker
+
+LICENSE = "このソフトウェアはMITライセンスの下で提供されています。詳細はLICENSEファイルを参照してください。"
+LICENSE_VARIANT = "このソフトウェアは ＭＩＴ ライセンスの下で提供されています。 詳細は、LICENSE ファイルを参照してください"
+LONG_PARAGRAPH = "イベントループはタスクを切り替えながら非同期処理を実行します。" * 20
+
+BOOK = f"""# 第1章 非同期処理
+
+## 概要
+
+{LONG_PARAGRAPH}
+
+短い段落です。
+
+もう一つの短い段落です。
+
+## ライセンス
+
+{LICENSE}
+
+# 第2章 付録
+
+## ライセンス
+
+{LICENSE_VARIANT}
+"""
+
+GENERATED_FORMATS = [f for f in AIWorker.GENERATION_FORMATS if f not in AIWorker.DERIVED_FORMATS]
+
+
+def test_count_tokens_by_script():
+    """ASCII は約4文字、非 ASCII は1文字を1トークンと数えることのテスト."""
+    assert count_tokens("") == 0
+    assert count_tokens("abcdefgh") == 2
+    assert count_tokens("非同期") == 3
+    assert count_tokens("asyncio処理") == 4
+
+
+class TestWorkflowPlanner:
+    """WorkflowPlannerのテスト."""
+    
+    def test_counts_requests_after_packing_dedup_and_derivation(self):
+        """パッキング・重複再利用・導出を反映したリクエスト数のテスト."""
+        plan = WorkflowPlanner(Config()).plan_content(BOOK, "ja", "非同期処理")
+        
+        assert (plan.chapters, plan.sections, plan.paragraphs) == (2, 3, 5)
+        assert plan.packed_paragraphs == 2
+        assert plan.reused_paragraphs == 1
+        # 長いパラグラフ・短い2パラグラフのパック・ライセンスの3単位
+        assert plan.requests == 3 * len(GENERATED_FORMATS)
+        assert set(plan.formats) == set(GENERATED_FORMATS)
+        assert plan.derived_outputs == 4 * len(AIWorker.DERIVED_FORMATS)
+        assert plan.input_tokens > count_tokens(LONG_PARAGRAPH) * len(GENERATED_FORMATS)
+        assert plan.cost_usd > 0
+        assert plan.unpriced_models == []
+    
+    def test_disabled_optimizations_increase_requests(self):
+        """最適化を無効化すると全パラグラフ・全フォーマットを数えることのテスト."""
+        config = Config()
+        config.api.packing_enabled = False
+        config.api.dedup_enabled = False
+        config.api.derive_short_forms = False
+        
+        plan = WorkflowPlanner(config).plan_content(BOOK, "ja", "非同期処理")
+        
+        assert plan.requests == 5 * len(AIWorker.GENERATION_FORMATS)
+        assert plan.derived_outputs == 0
+    
+    def test_wall_clock_limited_by_rate_limits(self):
+        """同時実行数・RPM・TPM のうち最も厳しい制約で所要時間を見積もることのテスト."""
+        config = Config()
+        config.api.claude_rate_limit = 1
+        plan = WorkflowPlanner(config, concurrency=100).plan_content(BOOK, "ja", "非同期処理")
+        
+        assert plan.bottleneck == "requests_per_minute"
+        assert plan.wall_clock_seconds == pytest.approx(plan.requests * 60, abs=0.1)
+        
+        config.api.claude_tokens_per_minute = 100
+        plan = WorkflowPlanner(config, concurrency=100).plan_content(BOOK, "ja", "非同期処理")
+        
+        assert plan.bottleneck == "tokens_per_minute"
+    
+    def test_configured_concurrency(self):
+        """同時実行数は適応的制御の初期値で頭打ちになることのテスト."""
+        config = Config()
+        config.api.concurrency_initial = 2
+        
+        assert WorkflowPlanner(config).concurrency == 2
+        
+        config.api.adaptive_concurrency_enabled = False
+        assert WorkflowPlanner(config).concurrency == config.workers.counts["ai"] * config.max_concurrent_tasks
+    
+    def test_reports_unpriced_models(self):
+        """料金表にないモデルを報告することのテスト."""
+        config = Config()
+        config.api.claude_model = "unknown-model"
+        
+        plan = WorkflowPlanner(config).plan_content(BOOK, "ja", "非同期処理")
+        
+        assert plan.unpriced_models == ["unknown-model"]
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_plan_reads_input_file(tmp_path):
+    """WorkflowOrchestrator.plan がファイルを解析して見積もることのテスト."""
+    input_file = tmp_path / "book.md"
+    input_file.write_text(BOOK, encoding="utf-8")
+    
+    plan = await WorkflowOrchestrator(Config()).plan("ja", "非同期処理", str(input_file), concurrency=3)
+    
+    assert plan.paragraphs == 5
+    assert plan.concurrency == 3
+    assert plan.to_dict()["total_tokens"] == plan.input_tokens + plan.output_tokens
@@ -0,0 +1,68 @@
+"""ModelRoutingPolicyのテスト."""
+
+from unittest.mock import MagicMock
+
+from src.config.settings import Config
+from src.core.routing import ModelRoutingPolicy, ModelTier
+
+
+class TestModelRoutingPolicy:
+    """ModelRoutingPolicyのテスト."""
+    
+    def test_short_formats_use_small_model(self):
+        """ツイート・説明文は小型モデルに振り分けることのテスト."""
+        config = Config()
+        policy = ModelRoutingPolicy(config)
+        
+        for output_format in ("tweet", "description"):
+            route = policy.route(output_format, "長い技術的な内容" * 100, "complex", "technical")
+            assert route.tier == ModelTier.SMALL
+            assert route.models["claude"] == config.api.claude_small_model
+            
+    def test_article_keeps_large_model(self):
+        """記事は品質優先で大型モデルを使うことのテスト."""
+        config = Config()
+        policy = ModelRoutingPolicy(config)
+        
+        route = policy.route("article", "短い", "simple", "general")
+        
+        assert route.tier == ModelTier.LARGE
+        assert route.models["claude"] == config.api.claude_model
+        
+    def test_script_routed_by_complexity(self):
+        """台本は複雑さ・種類で振り分けることのテスト."""
+        policy = ModelRoutingPolicy(Config())
+        
+        assert policy.route("script", "短い", "simple", "general").tier == ModelTier.SMALL
+        assert policy.route("script", "短い", "simple", "technical").tier == ModelTier.LARGE
+        assert policy.route("script", "短い", "complex", "general").tier == ModelTier.LARGE
+        
+    def test_max_tokens_scales_with_length(self):
+        """max_tokens が入力長に応じて上下限内で決まることのテスト."""
+        policy = ModelRoutingPolicy(Config())
+        
+        assert policy.route("article", "a" * 100).max_tokens == 2000
+        assert policy.route("article", "a" * 1000).max_tokens == 3000
+        assert policy.route("article", "a" * 10000).max_tokens == 4096
+        assert policy.route("tweet", "a" * 10000).max_tokens == 300
+        
+    def test_routing_disabled(self):
+        """ルーティング無効時は常に大型モデルを使うことのテスト."""
+        config = Config()
+        config.api.model_routing_enabled = False
+        policy = ModelRoutingPolicy(config)
+        
+        assert policy.route("tweet", "短い").tier == ModelTier.LARGE
+        
+    def test_routes_recorded_in_metrics(self):
+        """ルートがメトリクスに記録されることのテスト."""
+        metrics = MagicMock()
+        policy = ModelRoutingPolicy(Config(), metrics=metrics)
+        
+        policy.route("tweet", "短い")
+        policy.route("tweet", "短い")
+        
+        metrics.increment_counter.assert_called_with(
+            "ai.model_route", labels={"format": "tweet", "tier": "small"}
+        )
+        assert policy.get_stats() == {"tweet:small": 2}
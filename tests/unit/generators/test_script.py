@@ -300,4 +300,26 @@ class TestScriptGenerator:
         assert metadata["source_title"] == "test content"
         assert "word_count" in metadata
         assert "char_count" in metadata
-        assert "generated_at" in metadata
\ No newline at end of file
+        assert "generated_at" in metadata
+
+@pytest.mark.asyncio
+async def test_ai_client_receives_cacheable_prompt_parts():
+    """共通プレフィックスを context、可変部分を prompt としてクライアントに渡すことのテスト."""
+    generator = ScriptGenerator(Config())
+    ai_client = AsyncMock()
+    ai_client.generate.return_value = {"content": json.dumps({"title": "t", "sections": []})}
+    generator.set_ai_client(ai_client)
+    request = GenerationRequest(
+        title="節",
+        content="本文",
+        content_type="text",
+        lang="ja",
+        options={"ARTICLE_CONTENT": "記事の本文"}
+    )
+    
+    await generator.generate(request)
+    
+    kwargs = ai_client.generate.call_args.kwargs
+    assert "記事の本文" in kwargs["prompt"]
+    assert "記事の本文" not in kwargs["context"]
+    assert kwargs["system_prompt"]
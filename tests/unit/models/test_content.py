@@ -2,7 +2,16 @@
 
 import pytest
 
-from src.models.content import Chapter, Content, Paragraph, Section
+from src.models.content import (
+    Chapter,
+    Content,
+    Paragraph,
+    Section,
+    TextSpan,
+    iter_line_spans,
+    split_spans,
+    strip_span,
+)
 
 
 class TestContent:
@@ -330,4 +339,55 @@ class TestChapter:
         assert chapter.id == "chapter_1"
         assert chapter.index == 1
         assert len(chapter.sections) == 1
-        assert chapter.sections[0].id == "section_1" 
\ No newline at end of file
+        assert chapter.sections[0].id == "section_1"
+
+
+class TestTextSpan:
+    """ソースバッファ上の範囲として保持する本文のテスト."""
+    
+    def test_span_shares_source(self):
+        source = "# 第1章\n本文です。\n# 第2章"
+        chapter = Chapter(index=0, title="第1章", source=source, start=0, end=11)
+        
+        assert chapter.source is source
+        assert chapter.span == (0, 11)
+        assert chapter.content == "# 第1章\n本文です。"
+        assert chapter.char_count == 11
+        assert not hasattr(chapter, "__dict__")
+    
+    def test_owned_content(self):
+        content = Content(title="タイトル", content="本文")
+        
+        assert content.content is content.source
+        content.content = "置き換え"
+        assert content.content == "置き換え"
+        assert content.span == (0, 4)
+    
+    def test_counts_and_empty(self):
+        paragraph = Paragraph(index=0, source="xx one two  three xx", start=2, end=18)
+        
+        assert paragraph.word_count == 3
+        assert not paragraph.is_empty()
+        assert Paragraph(index=0, source="a   b", start=1, end=4).is_empty()
+    
+    def test_base_class_requires_to_dict(self):
+        class Untitled(TextSpan):
+            __slots__ = ()
+        
+        with pytest.raises(TypeError):
+            Untitled()
+    
+    def test_equality_compares_content(self):
+        source = "前置き 本文"
+        
+        assert Section(title="s", source=source, start=4, end=6) == Section(title="s", content="本文")
+        assert Section(title="s", content="本文") != Section(title="t", content="本文")
+    
+    def test_span_helpers_match_str_methods(self):
+        text = "  a\n\n b \n\n\n\nc  \n"
+        
+        assert [text[s:e] for s, e in iter_line_spans(text, 0, len(text))] == text.split("\n")
+        assert [text[s:e] for s, e in split_spans(text, 0, len(text), "\n\n")] == text.split("\n\n")
+        for s, e in split_spans(text, 0, len(text), "\n\n"):
+            start, end = strip_span(text, s, e)
+            assert text[start:end] == text[s:e].strip()
@@ -0,0 +1,114 @@
+"""ソースバッファを共有する分割処理のテスト."""
+
+import time
+import tracemalloc
+
+import pytest
+
+from src.config import Config
+from src.models import Chapter, Content, Section
+from src.processors.chapter import ChapterProcessor
+from src.processors.content import ContentProcessor
+from src.processors.section import SectionProcessor
+
+
+BOOK = """# 第1章 はじめに
+
+導入のパラグラフです。この文章は見出しと判定されないよう十分な長さを持っています。
+
+### 1.1 概要
+
+概要のパラグラフです。この文章は見出しと判定されないよう十分な長さを持っています。
+
+2番目のパラグラフです。この文章は見出しと判定されないよう十分な長さを持っています。
+
+# 第2章 応用
+
+応用です。"""
+
+
+def make_book(size: int) -> str:
+    """指定のバイト数程度の Markdown を作成."""
+    paragraph = "これは本文の段落です。This paragraph is long enough not to be treated as a heading. " * 3
+    parts = []
+    total = 0
+    chapter = 0
+    while total < size:
+        chapter += 1
+        parts.append(f"# 第{chapter}章\n\n")
+        for section in range(10):
+            parts.append(f"### {chapter}.{section} 節\n\n")
+            parts.extend(paragraph + "\n\n" for _ in range(20))
+        total += len("".join(parts[-211:]).encode("utf-8"))
+    return "".join(parts)
+
+
+class TestSpanSplitting:
+    """各処理器の分割結果がソースバッファを共有することのテスト."""
+    
+    @pytest.fixture
+    def processors(self):
+        config = Config()
+        return ContentProcessor(config), ChapterProcessor(config), SectionProcessor(config)
+    
+    def test_chain_shares_source(self, processors):
+        content_processor, chapter_processor, section_processor = processors
+        content = Content(title="本", content=BOOK)
+        
+        chapters = content_processor._split_by_headings(content)
+        sections = chapter_processor._split_by_headings(chapters[0])
+        paragraphs = section_processor._split_by_empty_lines(sections[0])
+        
+        assert [chapter.title for chapter in chapters] == ["第1章 はじめに", "第2章 応用"]
+        assert chapters[1].content == "# 第2章 応用\n\n応用です。"
+        assert sections[0].title == "1.1 概要"
+        assert sections[0].metadata["heading_level"] == 3
+        assert [paragraph.content[:5] for paragraph in paragraphs] == ["概要のパラ", "2番目のパ"]
+        assert paragraphs[0].metadata["char_count"] == len(paragraphs[0].content)
+        for model in chapters + sections + paragraphs:
+            assert model.source is BOOK
+    
+    def test_length_split_keeps_separators(self, processors):
+        content_processor, chapter_processor, _ = processors
+        content = Content(title="本", content="aaaa\n\nbbbb\n\ncc")
+        
+        chapters = content_processor._split_by_length(content, max_length=9)
+        sections = chapter_processor._split_by_length(Chapter(index=0, title="章", content="aaaa\n\nbbbb"), 4)
+        
+        assert [chapter.content for chapter in chapters] == ["aaaa\n\nbbbb", "cc"]
+        assert [section.content for section in sections] == ["aaaa", "bbbb"]
+    
+    def test_paragraph_sections_use_first_line_title(self, processors):
+        _, chapter_processor, _ = processors
+        chapter = Chapter(index=0, title="章", content="  ## 見出し\n本文\n\n\n\n普通の段落  ")
+        
+        sections = chapter_processor._split_by_paragraphs(chapter)
+        
+        assert [section.title for section in sections] == ["見出し", "普通の段落"]
+        assert sections[0].content == "## 見出し\n本文"
+        assert sections[1].content == "普通の段落"
+    
+    @pytest.mark.slow
+    def test_benchmark_5mb_book(self, processors):
+        """5MB の書籍の分割時間とピークメモリ（本文はコピーしない）."""
+        content_processor, chapter_processor, section_processor = processors
+        book = make_book(5 * 1024 * 1024)
+        content = Content(title="本", content=book)
+        
+        tracemalloc.start()
+        try:
+            started = time.perf_counter()
+            chapters = content_processor._split_by_headings(content)
+            chapter_peak = tracemalloc.get_traced_memory()[1]
+            sections = [s for chapter in chapters for s in chapter_processor._split_by_headings(chapter)]
+            section_peak = tracemalloc.get_traced_memory()[1]
+            paragraphs = [p for section in sections for p in section_processor._split_by_empty_lines(section)]
+            elapsed = time.perf_counter() - started
+        finally:
+            tracemalloc.stop()
+        
+        assert len(paragraphs) == len(sections) * 20
+        assert elapsed < 30.0
+        # 章・セクションへの分割では本文（数MB）を複製しない
+        assert chapter_peak < len(book) // 4
+        assert section_peak < len(book) // 4
@@ -0,0 +1,131 @@
+"""埋め込みアセット走査のテスト."""
+
+import pytest
+
+from src.config.settings import Config
+from src.models import Paragraph
+from src.processors.markdown import MarkdownProcessor
+from src.processors.paragraph import ParagraphProcessor
+from src.utils.asset_scanner import AssetSpan, SpanKind, scan_assets, splice
+
+
+DOCUMENT = """導入 `inline` と [リンク](https://example.com/page "タイトル") です。
+
+```mermaid
+graph TD
+    A --> B
+```
+
+```python
+print("![not an image](x.png)")
+```
+
+<svg width="10"><rect /></svg>
+
+![図](diagram.drawio.png) 詳細は https://example.com/raw を参照。"""
+
+
+class TestScanAssets:
+    """scan_assets のテスト."""
+    
+    def test_scan_assets_in_order(self):
+        spans = scan_assets(DOCUMENT)
+        
+        assert [span.kind for span in spans] == [
+            SpanKind.INLINE_CODE,
+            SpanKind.LINK,
+            SpanKind.FENCED_CODE,
+            SpanKind.FENCED_CODE,
+            SpanKind.SVG,
+            SpanKind.IMAGE,
+            SpanKind.URL,
+        ]
+        for span in spans:
+            assert DOCUMENT[span.start:span.end] == span.text
+    
+    def test_span_fields(self):
+        spans = scan_assets(DOCUMENT)
+        
+        assert spans[0].body == "inline"
+        assert spans[1].label == "リンク"
+        assert spans[1].url == "https://example.com/page"
+        assert spans[1].title == "タイトル"
+        assert spans[2].language == "mermaid"
+        assert spans[2].body == "graph TD\n    A --> B"
+        assert spans[5].label == "図"
+        assert spans[5].url == "diagram.drawio.png"
+        assert spans[6].url == "https://example.com/raw"
+    
+    def test_code_hides_nested_assets(self):
+        images = scan_assets(DOCUMENT, {SpanKind.IMAGE})
+        
+        assert [span.url for span in images] == ["diagram.drawio.png"]
+    
+    def test_no_assets(self):
+        assert scan_assets("ただのテキスト") == []
+
+
+class TestSplice:
+    """splice のテスト."""
+    
+    def test_splice_tuples(self):
+        assert splice("abcdef", [(4, 5, "E"), (0, 1, "A")]) == "AbcdEf"
+    
+    def test_splice_skips_overlaps(self):
+        assert splice("abcdef", [(0, 3, "X"), (2, 4, "Y")]) == "Xdef"
+    
+    def test_splice_spans_with_replace(self):
+        text = "a `b` [c](d)"
+        spans = scan_assets(text)
+        
+        result = splice(text, spans, lambda span: span.label if span.kind == SpanKind.LINK else None)
+        
+        assert result == "a `b` c"
+    
+    def test_splice_without_replacements(self):
+        text = "変更なし"
+        assert splice(text, []) is text
+        assert splice(text, [AssetSpan(SpanKind.URL, 0, 1, "変")]) is text
+
+
+class TestProcessorsUseScanner:
+    """パラグラフ・Markdown処理器での利用."""
+    
+    @pytest.mark.asyncio
+    async def test_paragraph_extracts_assets(self):
+        processor = ParagraphProcessor(Config())
+        paragraph = Paragraph(
+            content="見て ![図](a.svg) と `x = 1` と [文書](https://example.com/doc) と https://example.com/raw",
+            index=0,
+            section_index=0,
+            chapter_index=0
+        )
+        
+        result = await processor._optimize_paragraph(paragraph, {})
+        
+        assert result.content == "見て [画像] と [コード] と 文書 と [リンク]"
+        assert result.metadata["images"][0]["type"] == "svg"
+        assert result.metadata["code_blocks"][0]["code"] == "x = 1"
+        assert [link["url"] for link in result.metadata["links"]] == [
+            "https://example.com/doc", "https://example.com/raw"
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_paragraph_respects_disabled_kinds(self):
+        processor = ParagraphProcessor(Config())
+        paragraph = Paragraph(content="![図](a.png) [文書](b.md)", index=0, section_index=0, chapter_index=0)
+        
+        result = await processor._optimize_paragraph(paragraph, {"extract_images": False})
+        
+        assert result.content == "![図](a.png) 文書"
+        assert result.metadata["images"] == []
+    
+    def test_markdown_images_and_links(self):
+        processor = MarkdownProcessor(Config())
+        
+        processor._parse_images_and_links('![代替](img.png "画像") と [リンク](page.md) と `[コード](x)`', 1)
+        
+        assert [image.url for image in processor.images] == ["img.png"]
+        assert processor.images[0].title == "画像"
+        assert [link.url for link in processor.links] == ["page.md"]
+        assert [element.element_type for element in processor.elements] == ["image", "link"]
@@ -0,0 +1,137 @@
+"""近似重複検出のテスト."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config.settings import Config
+from src.core.events import Event, EventType
+from src.utils import dedup
+from src.utils.dedup import MinHasher, NearDuplicateIndex, normalize_text, shingles
+from src.workers.ai import AIWorker
+
+LICENSE = "このソフトウェアはMITライセンスの下で提供されています。詳細はLICENSEファイルを参照してください。"
+LICENSE_VARIANT = "このソフトウェアは ＭＩＴ ライセンスの下で提供されています。 詳細は、LICENSE ファイルを参照してください"
+NEXT_CHAPTER = "次の章では、非同期処理の基本的な考え方とイベントループの仕組みについて説明します。"
+OTHER_CHAPTER = "次の章では、同期処理の基本的な考え方とスレッドの仕組みについて説明します。"
+
+
+class TestNearDuplicateIndex:
+    """NearDuplicateIndexのテスト."""
+    
+    def test_normalize_text(self):
+        """全半角・空白・記号の揺れを吸収し、数字は区別することのテスト."""
+        assert normalize_text("第１章： Hello,  World 2024!") == normalize_text("第1章:hello world 2024")
+        assert normalize_text("タイムアウトは30秒です。") != normalize_text("タイムアウトは5秒です。")
+    
+    def test_ignores_number_only_difference(self):
+        """数値だけが異なる設定値の説明は近似重複とみなさないことのテスト."""
+        index = NearDuplicateIndex()
+        index.add("v1", "リトライ回数の上限は3回、待機時間は10秒、タイムアウトは30秒に設定します。")
+        
+        assert index.query("リトライ回数の上限は5回、待機時間は60秒、タイムアウトは90秒に設定します。") is None
+    
+    def test_finds_near_duplicate(self):
+        """表記揺れのある定型文を近似重複として検出することのテスト."""
+        index = NearDuplicateIndex()
+        index.add("license", LICENSE, "payload")
+        index.add("next", NEXT_CHAPTER)
+        
+        match = index.query(LICENSE_VARIANT)
+        
+        assert match is not None
+        assert match.key == "license"
+        assert match.payload == "payload"
+        assert match.similarity >= index.threshold
+    
+    def test_ignores_different_content(self):
+        """定型句を共有していても内容が異なるものは検出しないことのテスト."""
+        index = NearDuplicateIndex()
+        index.add("next", NEXT_CHAPTER)
+        
+        assert index.query(OTHER_CHAPTER) is None
+        assert index.query(LICENSE) is None
+    
+    def test_skips_short_text(self):
+        """短すぎるテキストは対象外とすることのテスト."""
+        index = NearDuplicateIndex()
+        
+        assert index.add("short", "次へ。") is False
+        assert index.query("次へ。") is None
+        assert index.get_stats()["skipped_short"] == 1
+    
+    def test_evicts_oldest_entries(self):
+        """上限を超えたら古いエントリから削除することのテスト."""
+        index = NearDuplicateIndex(max_entries=1)
+        index.add("license", LICENSE)
+        index.add("next", NEXT_CHAPTER)
+        
+        assert len(index) == 1
+        assert index.query(LICENSE) is None
+        assert index.query(NEXT_CHAPTER).key == "next"
+    
+    def test_pure_python_signature_matches_numpy(self, monkeypatch):
+        """NumPy の有無でシグネチャが一致することのテスト."""
+        pytest.importorskip("numpy")
+        hashes = shingles(normalize_text(LICENSE))
+        vectorized = MinHasher(64).signature(hashes)
+        
+        monkeypatch.setattr(dedup, "NUMPY_AVAILABLE", False)
+        
+        assert MinHasher(64).signature(hashes) == vectorized
+
+
+class TestAIWorkerDedup:
+    """AIWorkerの近似重複再利用のテスト."""
+    
+    @staticmethod
+    def _event(index, content):
+        return Event(
+            type=EventType.PARAGRAPH_PARSED,
+            workflow_id="wf",
+            data={
+                "chapter_index": index,
+                "section_index": 0,
+                "paragraph_index": 0,
+                "content": content,
+                "title": "ライセンス"
+            }
+        )
+    
+    @pytest.mark.asyncio
+    async def test_reuses_generated_content(self):
+        """近似重複のパラグラフは生成せずに結果を再利用することのテスト."""
+        worker = AIWorker(Config())
+        worker.event_bus = MagicMock(publish=AsyncMock())
+        worker._generate_article = AsyncMock(wraps=worker._generate_article)
+        
+        await worker._handle_paragraph_parsed(self._event(0, LICENSE))
+        await worker._handle_paragraph_parsed(self._event(1, LICENSE_VARIANT))
+        
+        assert worker._generate_article.await_count == 1
+        published = [call.args[0].data for call in worker.event_bus.publish.await_args_list]
+        assert len(published) == 2 * len(AIWorker.GENERATION_FORMATS)
+        
+        reused = [data["content"] for data in published if data["paragraph"]["chapter_index"] == 1]
+        article = next(content for content in reused if content["type"] == "article")
+        assert LICENSE_VARIANT in article["content"]
+        assert article["reused_from"]["key"] == "wf:0-0-0"
+        
+        report = worker.get_dedup_report()
+        assert report["saved_calls"] == len(AIWorker.GENERATION_FORMATS)
+        assert report["reused_paragraphs"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_disabled_by_config(self):
+        """設定で無効化できることのテスト."""
+        config = Config()
+        config.api.dedup_enabled = False
+        worker = AIWorker(config)
+        worker.event_bus = MagicMock(publish=AsyncMock())
+        worker._generate_article = AsyncMock(wraps=worker._generate_article)
+        
+        await worker._handle_paragraph_parsed(self._event(0, LICENSE))
+        await worker._handle_paragraph_parsed(self._event(1, LICENSE))
+        
+        assert worker._generate_article.await_count == 2
+        assert worker.get_dedup_report()["saved_calls"] == 0
@@ -0,0 +1,138 @@
+"""ディスクキャッシュとレンダーキャッシュのテスト."""
+
+import os
+
+import pytest
+
+from src.config.settings import Config
+from src.converters.base import BaseConverter, ImageType, get_render_cache
+from src.utils.disk_cache import DiskCache, content_key
+
+
+class CountingConverter(BaseConverter):
+    """変換回数を数えるテスト用コンバーター."""
+    
+    def __init__(self, config):
+        super().__init__(config)
+        self.calls = 0
+    
+    async def _convert(self, source, **kwargs):
+        self.calls += 1
+        return f"{source}:{kwargs.get('theme', 'default')}".encode()
+    
+    def get_supported_type(self):
+        return ImageType.MERMAID
+
+
+@pytest.fixture
+def config(tmp_path):
+    """キャッシュ先を一時ディレクトリにした設定."""
+    config = Config()
+    config.storage.cache_dir = str(tmp_path)
+    return config
+
+
+class TestDiskCache:
+    """DiskCacheのテスト."""
+    
+    def test_content_key_ignores_dict_order(self):
+        """辞書の順序に依存しないキーのテスト."""
+        assert content_key("a", {"w": 1, "h": 2}) == content_key("a", {"h": 2, "w": 1})
+        assert content_key("a", {"w": 1}) != content_key("b", {"w": 1})
+    
+    def test_put_and_get_sharded(self, tmp_path):
+        """シャーディングされたパスへの保存と取得のテスト."""
+        cache = DiskCache(str(tmp_path))
+        key = content_key("graph TD")
+        
+        cache.put(key, b"png", {"etag": "x"})
+        
+        assert cache.get(key) == b"png"
+        assert (tmp_path / key[:2] / key[2:4] / f"{key}.bin").read_bytes() == b"png"
+        assert cache.get_metadata(key) == {"etag": "x"}
+        assert not [name for name in os.listdir(tmp_path / key[:2] / key[2:4]) if name.startswith(".tmp-")]
+        assert cache.get("missing") is None
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+    
+    def test_put_file_and_get_path(self, tmp_path):
+        """書き込み済みのファイルを移動して登録し、パスで取得するテスト."""
+        cache = DiskCache(str(tmp_path), max_bytes=10)
+        key = content_key("parsed")
+        temp_path = cache.temp_file()
+        with open(temp_path, "wb") as f:
+            f.write(b"12345678")
+        
+        assert cache.put_file(key, temp_path) is True
+        
+        assert not os.path.exists(temp_path)
+        assert cache.get_path(key).read_bytes() == b"12345678"
+        assert cache.get_path("missing") is None
+        assert cache.get_stats()["bytes"] == 8
+    
+    def test_evicts_least_recently_used_by_bytes(self, tmp_path):
+        """合計バイト数の上限を超えると最終アクセスの古いものから削除することのテスト."""
+        cache = DiskCache(str(tmp_path), max_bytes=10)
+        cache.put("aaaa", b"1234")
+        cache.put("bbbb", b"1234")
+        cache.get("aaaa")
+        
+        cache.put("cccc", b"1234")
+        
+        assert "aaaa" in cache and "cccc" in cache
+        assert "bbbb" not in cache
+        assert not (tmp_path / "bb" / "bb" / "bbbb.bin").exists()
+        assert cache.get_stats()["evictions"] == 1
+    
+    def test_update_metadata(self, tmp_path):
+        """メタデータの更新のテスト."""
+        cache = DiskCache(str(tmp_path))
+        assert cache.update_metadata("aaaa", etag="x") is False
+        
+        cache.put("aaaa", b"data", {"converter": "Mermaid"})
+        assert cache.update_metadata("aaaa", etag="x") is True
+        
+        assert cache.get_metadata("aaaa") == {"converter": "Mermaid", "etag": "x"}
+    
+    def test_reloads_existing_entries(self, tmp_path):
+        """再起動後も既存のエントリを利用できることのテスト."""
+        DiskCache(str(tmp_path)).put("aaaa", b"data")
+        
+        cache = DiskCache(str(tmp_path))
+        
+        assert len(cache) == 1
+        assert cache.get("aaaa") == b"data"
+        assert cache.get_stats()["bytes"] == 4
+
+
+class TestRenderCache:
+    """BaseConverter のレンダーキャッシュのテスト."""
+    
+    @pytest.mark.asyncio
+    async def test_convert_reuses_cached_render(self, config):
+        """同じソース・パラメータの変換はキャッシュから返すことのテスト."""
+        first = CountingConverter(config)
+        second = CountingConverter(config)
+        
+        assert await first.convert("graph TD", theme="dark") == b"graph TD:dark"
+        assert await second.convert("graph TD", theme="dark") == b"graph TD:dark"
+        assert (first.calls, second.calls) == (1, 0)
+        
+        await second.convert("graph TD", theme="forest")
+        assert second.calls == 1
+    
+    def test_key_depends_on_output_parameters(self, config):
+        """幅・高さ・形式・変換器がキーに含まれることのテスト."""
+        converter = CountingConverter(config)
+        key = converter.render_cache_key("graph TD")
+        
+        config.image.width = 640
+        assert converter.render_cache_key("graph TD") != key
+        assert converter.render_cache_key("graph TD", width=1200) == key
+    
+    def test_disabled_by_config(self, config):
+        """無効化するとキャッシュを使わないことのテスト."""
+        config.image.render_cache_enabled = False
+        
+        assert get_render_cache(config) is None
+        assert CountingConverter(config).render_cache is None
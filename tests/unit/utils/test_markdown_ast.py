@@ -0,0 +1,189 @@
+"""Markdown のブロック構造解析のテスト."""
+
+from src.config.settings import Config
+from src.models import Chapter
+from src.processors.chapter import ChapterProcessor
+from src.processors.section import SectionProcessor
+from src.utils.markdown_ast import (
+    BlockType,
+    LineKind,
+    LineTokenizer,
+    MarkdownDocument,
+    content_hash,
+    parse_markdown,
+)
+from src.utils.markdown_stream import iter_chapters, iter_paragraphs
+from src.utils.validation import validate_markdown_content
+
+
+DOCUMENT = """---
+title: テスト
+# YAML のコメント
+---
+
+# 第1章
+#hashtag は本文
+
+```python
+# コメント（見出しではない）
+
+print("hello")
+```
+
+- 項目1
+
+- 項目2
+1. 番号付き
+![図](figure.png)
+
+| 名前 | 値 |
+|------|----|
+| A    | 1  |
+
+|パイプ|だけ|
+  ### 1.1 インデントされた見出し
+本文"""
+
+
+class TestMarkdownDocument:
+    """MarkdownDocument のテスト."""
+    
+    def test_blocks(self):
+        document = MarkdownDocument(DOCUMENT)
+        
+        assert [block.type for block in document.blocks] == [
+            BlockType.FRONT_MATTER,
+            BlockType.HEADING,
+            BlockType.PARAGRAPH,
+            BlockType.CODE,
+            BlockType.LIST,
+            BlockType.IMAGE,
+            BlockType.TABLE,
+            BlockType.PARAGRAPH,
+            BlockType.HEADING,
+            BlockType.PARAGRAPH,
+        ]
+        code = document.blocks[3]
+        assert code.language == "python"
+        assert code.closed is True
+        assert document.block_text(code).endswith('print("hello")\n```')
+        assert document.block_text(document.blocks[4]) == "- 項目1\n\n- 項目2\n1. 番号付き"
+    
+    def test_headings(self):
+        document = MarkdownDocument(DOCUMENT)
+        
+        headings = [(block.level, block.title) for block in document.headings()]
+        
+        # front matter とコードブロック内の # は見出しにしない
+        assert headings == [(1, "第1章"), (3, "1.1 インデントされた見出し")]
+        assert [block.title for block in document.headings(min_level=2)] == ["1.1 インデントされた見出し"]
+        chapter_start = document.text.index("# 第1章")
+        assert [block.title for block in document.headings(chapter_start + 1)] == ["1.1 インデントされた見出し"]
+    
+    def test_heading_edge_cases(self):
+        document = MarkdownDocument("#\n####### 七\n#  タイトル  \n#タグ")
+        
+        assert [(block.level, block.title) for block in document.headings()] == [(1, ""), (7, "七"), (1, "タイトル")]
+        assert document.kinds[3] == LineKind.TEXT
+    
+    def test_heading_indent_limit(self):
+        document = MarkdownDocument("   # 3文字\n    # インデントされたコード\n\t# タブ")
+        
+        assert [block.title for block in document.headings()] == ["3文字"]
+        assert list(document.kinds[1:]) == [LineKind.TEXT, LineKind.TEXT]
+    
+    def test_unclosed_code_block(self):
+        document = MarkdownDocument("# 見出し\n```\n# コード\n\n続き")
+        
+        assert document.unclosed_fence is True
+        code = document.blocks[-1]
+        assert code.type == BlockType.CODE
+        assert code.closed is False
+        assert code.end == len(document.text)
+    
+    def test_front_matter_can_be_disabled(self):
+        document = MarkdownDocument("---\na: 1\n---\n# 見出し", front_matter=False)
+        
+        assert document.body_start == 0
+        assert [block.type for block in document.blocks] == [BlockType.PARAGRAPH, BlockType.HEADING]
+    
+    def test_chunks_keep_code_blocks_together(self):
+        text = "段落1\n続き\n   \n```\na\n\nb\n```\n\n段落2"
+        document = MarkdownDocument(text)
+        
+        assert [text[start:end] for start, end in document.chunks()] == ["段落1\n続き", "```\na\n\nb\n```", "段落2"]
+        start = text.index("続き")
+        assert [text[s:e] for s, e in document.chunks(start, text.index("```") + 3)] == ["続き", "```"]
+    
+    def test_is_block_boundary(self):
+        text = "段落1\n続き\n\n段落2"
+        document = MarkdownDocument(text)
+        
+        assert document.is_block_boundary(0) is True
+        assert document.is_block_boundary(text.index("続き")) is False
+        assert document.is_block_boundary(text.index("段落2")) is True
+
+
+class TestParseMarkdown:
+    """parse_markdown のキャッシュのテスト."""
+    
+    def test_same_content_reuses_document(self):
+        text = "# 見出し\n\n本文"
+        document = parse_markdown(text)
+        
+        assert parse_markdown(text) is document
+        # 同じ内容の別の文字列もハッシュで同じ解析結果を返す
+        assert parse_markdown("".join(list(text))) is document
+        assert parse_markdown(text, front_matter=False) is not document
+    
+    def test_content_hash_matches_sha256(self):
+        import hashlib
+        
+        text = "あ" * 100000 + "\n# 見出し"
+        
+        assert content_hash(text) == hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TestSharedRules:
+    """バリデーション・ストリーミング分割・処理器が同じ規則で解析するテスト."""
+    
+    TEXT = "# 章\n\n```bash\n# コメント\n\nls\n```\n\n## 節\n本文"
+    
+    def test_line_tokenizer_tracks_fences(self):
+        tokenizer = LineTokenizer()
+        
+        kinds = [tokenizer.feed(line).kind for line in self.TEXT.split("\n")]
+        
+        assert kinds == list(MarkdownDocument(self.TEXT).kinds)
+    
+    def test_validation_ignores_code_block_headings(self):
+        result = validate_markdown_content(self.TEXT)
+        
+        assert result["stats"]["heading_count"] == 2
+        assert result["stats"]["code_block_count"] == 1
+    
+    def test_stream_split_ignores_code_block_headings(self):
+        chapters = list(iter_chapters(self.TEXT.split("\n")))
+        
+        assert [chapter["title"] for chapter in chapters] == ["章"]
+        assert list(iter_paragraphs(chapters[0]["content"].split("\n")))[0] == "```bash\n# コメント\n\nls\n```"
+    
+    def test_stream_split_ignores_indented_code_headings(self):
+        text = "# 章\n\n手順:\n\n    # install deps\n    pip install -e .\n\n本文"
+        
+        chapters = list(iter_chapters(text.split("\n")))
+        
+        assert [chapter["title"] for chapter in chapters] == ["章"]
+        assert "    # install deps" in chapters[0]["content"]
+    
+    def test_processors_ignore_code_block_headings(self):
+        config = Config()
+        code = "```python\nfirst = 'コードブロック内の空行では分割しない'\n\nsecond = first\n```"
+        text = f"# 章\n\n```\n### コメント\n```\n\n### 節\n\n本文です。\n\n{code}"
+        chapter = Chapter(index=0, title="章", content=text)
+        
+        sections = ChapterProcessor(config)._split_by_headings(chapter)
+        
+        assert [section.title for section in sections] == ["節"]
+        paragraphs = SectionProcessor(config)._split_by_empty_lines(sections[0])
+        assert [paragraph.content for paragraph in paragraphs] == ["本文です。", code]
@@ -0,0 +1,160 @@
+"""Markdown のストリーミング分割のテスト."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.config.settings import Config
+from src.core.events import EventType
+from src.utils.markdown_stream import (
+    iter_chapters,
+    iter_file_lines,
+    iter_paragraphs,
+    iter_sections,
+    stream_chapters,
+)
+from src.workers.parser import ParserWorker
+
+
+BOOK = """前書き（破棄される）
+
+# 第1章 はじめに
+
+導入です。
+
+## 1.1 概要
+
+最初のパラグラフ。
+続きの行。
+  
+  2番目のパラグラフ。  
+
+### 1.1.1 詳細
+
+詳細です。
+
+# 第2章 応用
+
+応用です。"""
+
+
+class TestIterFileLines:
+    """iter_file_lines のテスト."""
+    
+    def test_reads_lines_without_newlines(self, tmp_path):
+        path = tmp_path / "book.md"
+        path.write_bytes("一行目\r\n二行目\n\n最終行".encode("utf-8"))
+        
+        assert list(iter_file_lines(path)) == ["一行目", "二行目", "", "最終行"]
+    
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.md"
+        path.write_bytes(b"")
+        
+        assert list(iter_file_lines(path)) == []
+        assert list(stream_chapters(path)) == [{"title": "Main Content", "content": ""}]
+    
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            list(iter_file_lines(tmp_path / "missing.md"))
+
+
+class TestSplitting:
+    """チャプター・セクション・パラグラフの分割のテスト."""
+    
+    def test_chapters(self, tmp_path):
+        path = tmp_path / "book.md"
+        path.write_text(BOOK, encoding="utf-8")
+        
+        chapters = list(stream_chapters(path))
+        
+        assert [chapter["title"] for chapter in chapters] == ["第1章 はじめに", "第2章 応用"]
+        assert chapters[0]["content"].startswith("導入です。")
+        assert chapters[1]["content"] == "応用です。"
+    
+    def test_chapters_are_yielded_before_input_ends(self):
+        def lines():
+            yield "# 第1章"
+            yield "本文"
+            yield "# 第2章"
+            raise AssertionError("第1章を返す前に読み進めてはいけない")
+        
+        assert next(iter_chapters(lines())) == {"title": "第1章", "content": "本文"}
+    
+    def test_whole_content_released_after_first_chapter_heading(self):
+        def lines():
+            yield "前置き"
+            yield "# 第1章"
+            yield "本文"
+            yield "本文"
+            # 2つ目の H1 より前に全体の保持をやめている
+            assert chapters.gi_frame.f_locals["everything"] is None
+            yield "# 第2章"
+        
+        chapters = iter_chapters(lines())
+        
+        assert [chapter["title"] for chapter in chapters] == ["第1章", "第2章"]
+    
+    def test_without_headings_uses_whole_content(self):
+        assert list(iter_chapters(["# ", "本文"])) == [{"title": "Main Content", "content": "# \n本文"}]
+        assert list(iter_sections(["本文"])) == [{"title": "Main Section", "content": "本文", "level": 2}]
+    
+    def test_sections(self):
+        chapter = list(iter_chapters(BOOK.split("\n")))[0]
+        
+        sections = list(iter_sections(chapter["content"].split("\n")))
+        
+        assert [(section["title"], section["level"]) for section in sections] == [
+            ("1.1 概要", 2), ("1.1.1 詳細", 3)
+        ]
+    
+    def test_paragraphs(self):
+        paragraphs = list(iter_paragraphs(["最初のパラグラフ。", "続きの行。", "", "  2番目。  ", "", ""]))
+        
+        assert paragraphs == ["最初のパラグラフ。\n続きの行。", "2番目。"]
+
+
+class TestParserWorkerStreaming:
+    """ParserWorker のストリーミング読み込みのテスト."""
+    
+    @pytest.fixture
+    def worker(self, tmp_path):
+        config = Config()
+        config.storage.cache_dir = str(tmp_path / "cache")
+        worker = ParserWorker(config, "parser-stream-test")
+        worker.event_bus = Mock()
+        worker.event_bus.publish = AsyncMock()
+        return worker
+    
+    @pytest.mark.asyncio
+    async def test_publishes_chapters_from_file(self, worker, tmp_path):
+        path = tmp_path / "book.md"
+        path.write_text(BOOK, encoding="utf-8")
+        event = Mock(workflow_id="wf-1", data={"input_file": str(path), "title": "本"})
+        
+        await worker._parse_document(event)
+        
+        events = [call[0][0] for call in worker.event_bus.publish.call_args_list]
+        assert [e.type for e in events] == [EventType.CHAPTER_PARSED] * 2
+        assert [e.data["index"] for e in events] == [0, 1]
+        assert events[1].data["path"] == "chapter_01_第2章_応用.md"
+    
+    @pytest.mark.asyncio
+    async def test_missing_file_uses_default_content(self, worker, tmp_path):
+        event = Mock(workflow_id="wf-1", data={"input_file": str(tmp_path / "missing.md")})
+        
+        await worker._parse_document(event)
+        
+        events = [call[0][0] for call in worker.event_bus.publish.call_args_list]
+        assert [e.data["title"] for e in events] == ["Error"]
+    
+    @pytest.mark.asyncio
+    async def test_decode_error_keeps_published_chapters(self, worker, tmp_path):
+        path = tmp_path / "book.md"
+        path.write_bytes("# 第1章\n本文\n# 第2章\n".encode("utf-8") + b"\xff\xfe\n")
+        event = Mock(workflow_id="wf-1", data={"input_file": str(path)})
+        
+        await worker._parse_document(event)
+        
+        events = [call[0][0] for call in worker.event_bus.publish.call_args_list]
+        assert [e.data["title"] for e in events] == ["第1章"]
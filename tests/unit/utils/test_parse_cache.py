@@ -0,0 +1,244 @@
+"""解析結果のディスクキャッシュのテスト."""
+
+import os
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.config import Config
+from src.core.events import EventType
+from src.utils.parse_cache import ParseCache, file_sha256, get_parse_cache, paragraph_keys
+from src.workers.parser import ParserWorker
+
+
+BOOK = """# 第1章 基礎
+
+## 1.1 概要
+
+最初のパラグラフ。
+  インデントされた続きの行。
+
+同じ内容。
+
+同じ内容。
+
+```python
+x = 1
+
+y = 2
+```
+
+# 第2章 応用
+
+本文のみ。
+"""
+
+
+def _split(worker, content):
+    """ParserWorker と同じ規則でセクションとパラグラフに分割."""
+    return worker._split_for_cache(content)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """テスト用キャッシュ."""
+    cache = ParseCache(str(tmp_path / "parsed"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def book_file(tmp_path):
+    """テスト用入力ファイル."""
+    path = tmp_path / "book.md"
+    path.write_text(BOOK, encoding="utf-8")
+    return path
+
+
+def _write(cache, path):
+    """入力ファイルを分割してキャッシュに書き込む."""
+    worker = ParserWorker(Config(), "parse-cache-test")
+    source_hash, book = cache.load(path)
+    assert book is None
+    writer = cache.writer(source_hash, path)
+    expected = []
+    for chapter in worker._split_by_chapters(path.read_text(encoding="utf-8")):
+        sections = _split(worker, chapter["content"])
+        writer.add_chapter(chapter["title"], chapter["content"], sections)
+        expected.append((chapter, sections))
+    return writer.commit(), expected
+
+
+class TestParseCache:
+    """ParseCache のテスト."""
+    
+    def test_round_trip(self, cache, book_file):
+        book, expected = _write(cache, book_file)
+        
+        assert book.chapter_count == 2
+        assert [chapter["title"] for chapter in book.iter_chapters()] == ["第1章 基礎", "第2章 応用"]
+        for chapter_index, (chapter, sections) in enumerate(expected):
+            assert book.sections(chapter_index) == [
+                {"title": s["title"], "content": s["content"], "level": s["level"]} for s in sections
+            ]
+            for section_index, section in enumerate(sections):
+                cached = book.paragraphs(chapter_index, section_index)
+                assert [p["content"] for p in cached] == section["paragraphs"]
+                assert [(p["paragraph_id"], p["content_hash"]) for p in cached] == paragraph_keys(
+                    chapter_index, section_index, section["paragraphs"]
+                )
+    
+    def test_duplicate_paragraphs_get_distinct_ids(self, cache, book_file):
+        book, _ = _write(cache, book_file)
+        
+        ids = [p["paragraph_id"] for p in book.paragraphs(0, 0)]
+        
+        assert len(set(ids)) == len(ids)
+        assert ids[2] == ids[1] + "-1"
+    
+    def test_warm_lookup_skips_hashing(self, cache, book_file):
+        _write(cache, book_file)
+        reopened = ParseCache(str(cache.disk_cache.directory))
+        
+        with patch("src.utils.parse_cache.file_sha256") as sha:
+            source_hash, book = reopened.load(book_file)
+        
+        sha.assert_not_called()
+        assert source_hash == file_sha256(book_file)
+        assert book is not None and book.chapter_count == 2
+        reopened.close()
+    
+    def test_touched_file_hits_by_content(self, cache, book_file):
+        _write(cache, book_file)
+        stat = book_file.stat()
+        os.utime(book_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        
+        _, book = cache.load(book_file)
+        
+        assert book is not None
+    
+    def test_modified_file_misses(self, cache, book_file):
+        _write(cache, book_file)
+        book_file.write_text(BOOK + "\n追記。\n", encoding="utf-8")
+        
+        _, book = cache.load(book_file)
+        
+        assert book is None
+    
+    def test_corrupted_entry_is_discarded(self, cache, book_file):
+        book, _ = _write(cache, book_file)
+        source_hash = book.source_hash
+        cache.close()
+        path = cache.disk_cache.get_path(cache._result_key(source_hash))
+        path.write_bytes(b"broken")
+        
+        assert cache.book(source_hash) is None
+        assert cache._result_key(source_hash) not in cache.disk_cache
+    
+    def test_discard_removes_temp_file(self, cache, book_file):
+        writer = cache.writer(file_sha256(book_file), book_file)
+        writer.add_chapter("章", "本文", [])
+        
+        writer.discard()
+        
+        assert [p.name for p in cache.disk_cache.directory.iterdir()] == []
+    
+    def test_disabled_by_config(self):
+        config = Config()
+        config.storage.parse_cache_enabled = False
+        
+        assert get_parse_cache(config) is None
+
+
+class TestParserWorkerParseCache:
+    """ParserWorker の解析結果キャッシュの利用のテスト."""
+    
+    @pytest.fixture
+    def config(self, tmp_path):
+        config = Config()
+        config.storage.cache_dir = str(tmp_path / "cache")
+        return config
+    
+    def _worker(self, config):
+        worker = ParserWorker(config, "parser-cache-test")
+        worker.event_bus = Mock()
+        worker.event_bus.publish = AsyncMock()
+        return worker
+    
+    async def _run(self, worker, input_file):
+        """チャプター・セクション・パラグラフの分割を順に実行して発行されたイベントを返す."""
+        await worker._parse_document(Mock(workflow_id="wf-1", data={"input_file": str(input_file)}))
+        chapters = [call[0][0] for call in worker.event_bus.publish.call_args_list]
+        worker.event_bus.publish.reset_mock()
+        
+        for chapter in chapters:
+            await worker._parse_sections(chapter)
+        sections = [call[0][0] for call in worker.event_bus.publish.call_args_list]
+        worker.event_bus.publish.reset_mock()
+        
+        for section in sections:
+            # AI ワーカーの STRUCTURE_ANALYZED と同じ形
+            await worker._parse_paragraphs(Mock(workflow_id="wf-1", data={"section": section.data, **section.data}))
+        paragraphs = [call[0][0] for call in worker.event_bus.publish.call_args_list]
+        return chapters, sections, paragraphs
+    
+    @pytest.mark.asyncio
+    async def test_warm_run_skips_parsing_with_same_ids(self, config, book_file):
+        _, cold_sections, cold = await self._run(self._worker(config), book_file)
+        
+        worker = self._worker(config)
+        with patch("src.workers.parser.stream_chapters") as stream, \
+                patch.object(worker, "_split_by_sections") as split_sections, \
+                patch.object(worker, "_split_by_paragraphs") as split_paragraphs:
+            chapters, sections, warm = await self._run(worker, book_file)
+        
+        stream.assert_not_called()
+        split_sections.assert_not_called()
+        split_paragraphs.assert_not_called()
+        assert all(event.data["source_hash"] == file_sha256(book_file) for event in chapters)
+        assert [e.data["content"] for e in sections] == [e.data["content"] for e in cold_sections]
+        assert [e.type for e in warm] == [EventType.PARAGRAPH_PARSED] * len(cold)
+        assert [
+            (e.data["paragraph_id"], e.data["content"], e.data["pack"]) for e in warm
+        ] == [(e.data["paragraph_id"], e.data["content"], e.data["pack"]) for e in cold]
+    
+    @pytest.mark.asyncio
+    async def test_cold_run_splits_once(self, config, book_file):
+        worker = self._worker(config)
+        split_sections = Mock(wraps=worker._split_by_sections)
+        split_paragraphs = Mock(wraps=worker._split_by_paragraphs)
+        
+        with patch.object(worker, "_split_by_sections", split_sections), \
+                patch.object(worker, "_split_by_paragraphs", split_paragraphs):
+            chapters, sections, paragraphs = await self._run(worker, book_file)
+        
+        assert split_sections.call_count == len(chapters)
+        assert split_paragraphs.call_count == len(sections)
+        assert [e.data["content"] for e in paragraphs] == [
+            p for section in sections for p in worker._split_by_paragraphs(section.data["content"])
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_cache_write_error_keeps_streaming(self, config, book_file):
+        worker = self._worker(config)
+        
+        with patch("src.utils.parse_cache.ParseCacheWriter.add_chapter", side_effect=OSError("disk full")):
+            await worker._parse_document(Mock(workflow_id="wf-1", data={"input_file": str(book_file)}))
+        
+        chapters = [call[0][0].data for call in worker.event_bus.publish.call_args_list]
+        assert [chapter["title"] for chapter in chapters] == ["第1章 基礎", "第2章 応用"]
+        assert all("sections" not in chapter for chapter in chapters)
+        _, book = worker.parse_cache.load(book_file)
+        assert book is None
+        assert list(worker.parse_cache.disk_cache.directory.glob(".tmp-*")) == []
+    
+    @pytest.mark.asyncio
+    async def test_failed_read_is_not_cached(self, config, tmp_path):
+        path = tmp_path / "broken.md"
+        path.write_bytes("# 第1章\n本文\n# 第2章\n".encode("utf-8") + b"\xff\xfe\n")
+        worker = self._worker(config)
+        
+        await worker._parse_document(Mock(workflow_id="wf-1", data={"input_file": str(path)}))
+        
+        _, book = worker.parse_cache.load(path)
+        assert book is None
@@ -0,0 +1,70 @@
+"""プロンプトローダーのテスト."""
+
+import pytest
+
+from src.utils.prompt_loader import PromptLoader, PromptParts
+
+
+@pytest.fixture
+def loader(tmp_path):
+    """テスト用プロンプトローダー."""
+    (tmp_path / "prompts" / "system").mkdir(parents=True)
+    (tmp_path / "prompts" / "message").mkdir(parents=True)
+    (tmp_path / "prompts" / "system" / "article.md").write_text("あなたは編集者です。", encoding="utf-8")
+    (tmp_path / "prompts" / "message" / "article.md").write_text(
+        "章: {{CHAPTER_TITLE}}\n本文:\n{{SECTION_CONTENT}}\n\n以下の指示に従ってください。",
+        encoding="utf-8"
+    )
+    return PromptLoader(base_path=tmp_path)
+
+
+class TestPromptParts:
+    """プロンプト分割のテスト."""
+    
+    def test_variable_content_moves_to_suffix(self, loader):
+        """可変変数はサフィックスに移動する."""
+        parts = loader.get_prompt_parts(
+            "article", CHAPTER_TITLE="第1章", SECTION_CONTENT="パラグラフA"
+        )
+        
+        assert parts.system == "あなたは編集者です。"
+        assert "第1章" in parts.prefix
+        assert "パラグラフA" not in parts.prefix
+        assert "SECTION_CONTENT" in parts.prefix
+        assert parts.suffix == "## SECTION_CONTENT\nパラグラフA"
+        
+    def test_prefix_is_stable_across_paragraphs(self, loader):
+        """同一章内ではプレフィックスが一致する."""
+        first = loader.get_prompt_parts("article", CHAPTER_TITLE="第1章", SECTION_CONTENT="A")
+        second = loader.get_prompt_parts("article", CHAPTER_TITLE="第1章", SECTION_CONTENT="B")
+        
+        assert first.system == second.system
+        assert first.prefix == second.prefix
+        assert first.suffix != second.suffix
+        
+    def test_unused_variable_is_ignored(self, loader):
+        """テンプレートに存在しない可変変数はサフィックスに含めない."""
+        parts = loader.get_prompt_parts(
+            "article", CHAPTER_TITLE="第1章", SECTION_CONTENT="A", content="A"
+        )
+        
+        assert parts.suffix.count("\n") == 1
+        
+    def test_request_kwargs(self, loader):
+        """プレフィックスは context、可変部分は prompt としてクライアントに渡す."""
+        parts = loader.get_prompt_parts("article", CHAPTER_TITLE="第1章", SECTION_CONTENT="A")
+        
+        assert parts.request_kwargs() == {
+            "prompt": parts.suffix,
+            "system_prompt": "あなたは編集者です。",
+            "context": parts.prefix
+        }
+        assert PromptParts(system="", prefix="P", suffix="").request_kwargs() == {
+            "prompt": "P", "system_prompt": None, "context": None
+        }
+        
+    def test_combined(self):
+        """結合時は空の部分を除外する."""
+        parts = PromptParts(system="S", prefix="", suffix="X")
+        
+        assert parts.combined() == "S\n\nX"
@@ -0,0 +1,291 @@
+"""RateLimiterのテスト."""
+
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.utils.rate_limiter import (
+    DistributedRateLimiter,
+    GlobalRateLimiter,
+    ModelRateLimiter,
+    RateLimiter,
+)
+
+
+class TestRateLimiter:
+    """RateLimiter（GCRA）のテスト."""
+    
+    def test_reserve_enforces_interval(self):
+        """最小間隔の予約テスト."""
+        limiter = RateLimiter(requests_per_minute=60, service_name="test")
+        
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == pytest.approx(1.0, abs=0.05)
+        assert limiter.reserve() == pytest.approx(2.0, abs=0.05)
+    
+    def test_burst_allows_immediate_requests(self):
+        """バースト量までは待機なしで通過することのテスト."""
+        limiter = RateLimiter(requests_per_minute=60, service_name="test", burst=3)
+        
+        waits = [limiter.reserve() for _ in range(4)]
+        
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == pytest.approx(1.0, abs=0.05)
+    
+    def test_weighted_reserve(self):
+        """重み付き消費のテスト."""
+        limiter = RateLimiter(requests_per_minute=6000, service_name="tpm", burst=1000)
+        
+        assert limiter.reserve(1000) == 0.0
+        # 500トークン分の回復待ち（6000/分 → 100/秒）
+        assert limiter.reserve(500) == pytest.approx(5.0, abs=0.05)
+    
+    def test_refund(self):
+        """予約返却のテスト."""
+        limiter = RateLimiter(requests_per_minute=60, service_name="test")
+        limiter.reserve()
+        limiter.reserve()
+        
+        limiter.refund()
+        
+        assert limiter.reserve() == pytest.approx(1.0, abs=0.05)
+    
+    @pytest.mark.asyncio
+    async def test_acquire_is_fifo(self):
+        """待機者が呼び出し順に解放されることのテスト."""
+        limiter = RateLimiter(requests_per_minute=6000, service_name="test")
+        order = []
+        
+        async def worker(index):
+            await limiter.acquire()
+            order.append(index)
+        
+        await asyncio.gather(*(worker(i) for i in range(10)))
+        
+        assert order == list(range(10))
+        assert limiter.get_stats()["acquired"] == 10
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_refunds(self):
+        """キャンセルされた待機者の予約が返却されることのテスト."""
+        limiter = RateLimiter(requests_per_minute=60, service_name="test")
+        await limiter.acquire()
+        
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        
+        assert limiter.reserve() == pytest.approx(1.0, abs=0.05)
+    
+    @pytest.mark.asyncio
+    async def test_acquire_throughput_with_many_waiters(self):
+        """1,000並行待機者でのacquireスループット（マイクロベンチマーク）."""
+        waiters = 1000
+        limiter = RateLimiter(requests_per_minute=600000, service_name="bench")
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire() for _ in range(waiters)))
+        elapsed = time.perf_counter() - start
+        
+        # 理論上は 1000 / 10000req/s = 0.1秒。ロック直列化がないことを確認
+        assert limiter.get_stats()["acquired"] == waiters
+        assert elapsed < 1.0
+
+
+class TestModelRateLimiter:
+    """ModelRateLimiterのテスト."""
+    
+    def teardown_method(self):
+        GlobalRateLimiter.reset_all()
+    
+    @pytest.mark.asyncio
+    async def test_acquire_consumes_both_buckets(self):
+        """RPM・TPMの両バケットを消費することのテスト."""
+        limiter = ModelRateLimiter("claude", "sonnet", requests_per_minute=600, tokens_per_minute=10000)
+        
+        await limiter.acquire(tokens=4000)
+        stats = limiter.get_stats()
+        
+        assert stats["requests"]["acquired"] == 1
+        assert stats["tokens"]["units_acquired"] == 4000
+        assert limiter.token_limiter.available() == pytest.approx(6000, abs=10)
+    
+    def test_global_registry_per_model(self):
+        """GlobalRateLimiterがモデル単位で制限器を保持することのテスト."""
+        a = GlobalRateLimiter.get_model_limiter("claude", "sonnet", 60, 40000)
+        b = GlobalRateLimiter.get_model_limiter("claude", "sonnet", 60, 40000)
+        c = GlobalRateLimiter.get_model_limiter("claude", "haiku", 60, 40000)
+        
+        assert a is b
+        assert a is not c
+        assert "claude:haiku" in GlobalRateLimiter.get_all_stats()
+
+
+class TestDistributedRateLimiter:
+    """DistributedRateLimiterのテスト."""
+    
+    @staticmethod
+    def _fake_redis(script):
+        redis = MagicMock()
+        redis.register_script.return_value = script
+        return redis
+        
+    @pytest.mark.asyncio
+    async def test_lease_avoids_round_trip_per_request(self):
+        """リース分はRedisを呼ばずに消費することのテスト."""
+        script = AsyncMock(return_value=["5", "0"])
+        limiter = DistributedRateLimiter(
+            self._fake_redis(script), requests_per_minute=600, service_name="claude", lease_size=5
+        )
+        
+        for _ in range(10):
+            await limiter.acquire()
+            
+        assert script.await_count == 2
+        assert limiter.get_stats()["acquired"] == 10
+        
+    @pytest.mark.asyncio
+    async def test_waits_when_bucket_empty(self):
+        """バケットが空の場合は指定時間待機することのテスト."""
+        script = AsyncMock(side_effect=[["0", "0.01"], ["5", "0"]])
+        limiter = DistributedRateLimiter(
+            self._fake_redis(script), requests_per_minute=600, service_name="claude"
+        )
+        
+        await limiter.acquire()
+        
+        assert limiter.get_stats()["waited"] == 1
+        
+    @pytest.mark.asyncio
+    async def test_wait_does_not_hold_lock(self):
+        """補充待ちの間も他の待機者がリースを取得できることのテスト."""
+        script = AsyncMock(side_effect=[["0", "0.2"], ["5", "0"]])
+        limiter = DistributedRateLimiter(
+            self._fake_redis(script), requests_per_minute=600, service_name="claude"
+        )
+        
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(limiter.acquire(), timeout=0.1)
+        
+        assert not waiting.done()
+        await asyncio.wait_for(waiting, timeout=1)
+        # 2件目が取得したリースを1件目が消費する
+        assert script.await_count == 2
+        assert limiter.get_stats()["acquired"] == 2
+        
+    @pytest.mark.asyncio
+    async def test_model_limiter_shares_token_bucket(self):
+        """モデル単位のTPMバケットをRedisで共有することのテスト."""
+        request_script = AsyncMock(return_value=["5", "0"])
+        token_script = AsyncMock(return_value=["300", "0"])
+        limiter = ModelRateLimiter(
+            "claude", "sonnet", requests_per_minute=600, tokens_per_minute=10000,
+            request_limiter=DistributedRateLimiter(
+                self._fake_redis(request_script), requests_per_minute=600, service_name="claude"
+            ),
+            token_limiter=DistributedRateLimiter(
+                self._fake_redis(token_script), requests_per_minute=10000,
+                service_name="claude:sonnet:tpm", burst=10000
+            ),
+        )
+        
+        await limiter.acquire(tokens=300)
+        
+        request_script.assert_awaited_once()
+        args = token_script.await_args.kwargs["args"]
+        assert args[1] == 10000
+        assert args[3] == 300
+        assert limiter.get_stats()["tokens"]["acquired"] == 1
+        
+    @pytest.mark.asyncio
+    async def test_returns_expired_lease_to_redis(self):
+        """期限切れで未使用のリースを次回のRedis呼び出しで返却することのテスト."""
+        script = AsyncMock(return_value=["5", "0"])
+        limiter = DistributedRateLimiter(
+            self._fake_redis(script), requests_per_minute=600, service_name="claude",
+            lease_size=5, lease_ttl=0.01
+        )
+        
+        await limiter.acquire()
+        await asyncio.sleep(0.02)
+        await limiter.acquire()
+        
+        assert script.await_args_list[0].kwargs["args"][4] == 0
+        assert script.await_args_list[1].kwargs["args"][4] == 4
+        assert limiter.get_stats()["lease_remaining"] == 4
+        
+    def test_token_bucket_leases_in_tokens(self):
+        """TPMバケットのリースがトークン数単位になることのテスト."""
+        with patch("src.utils.rate_limiter.REDIS_AVAILABLE", True), \
+                patch("src.utils.rate_limiter.aioredis") as aioredis:
+            aioredis.from_url.return_value = self._fake_redis(AsyncMock())
+            limiter = GlobalRateLimiter.get_model_limiter(
+                "claude", "sonnet", 60, 40000,
+                redis_url="redis://localhost", token_lease_size=5 * 4096, lease_size=5
+            )
+            default = GlobalRateLimiter.get_model_limiter(
+                "claude", "haiku", 60, 40000, redis_url="redis://localhost", lease_size=5
+            )
+        try:
+            assert limiter.request_limiter.lease_size == 5
+            assert limiter.token_limiter.lease_size == 5 * 4096
+            # 未指定時は lease_size 件分の平均トークン数
+            assert default.token_limiter.lease_size == pytest.approx(5 * 40000 / 60)
+        finally:
+            GlobalRateLimiter.reset_all()
+            GlobalRateLimiter._redis_clients.clear()
+            
+    @pytest.mark.asyncio
+    async def test_falls_back_when_redis_down(self):
+        """Redis停止時にローカル制限へフォールバックすることのテスト."""
+        script = AsyncMock(side_effect=ConnectionError("redis down"))
+        limiter = DistributedRateLimiter(
+            self._fake_redis(script), requests_per_minute=6000, service_name="claude"
+        )
+        
+        await limiter.acquire()
+        await limiter.acquire()
+        stats = limiter.get_stats()
+        
+        assert stats["fallback_acquired"] == 2
+        assert stats["redis_available"] is False
+        # 再試行間隔中はRedisを呼ばない
+        assert script.await_count == 1
+        
+    @pytest.mark.asyncio
+    async def test_shared_quota_with_local_redis(self):
+        """ローカルredis-serverでプロセス間共有クォータを検証."""
+        redis_asyncio = pytest.importorskip("redis.asyncio")
+        client = redis_asyncio.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/15"))
+        try:
+            await client.ping()
+        except Exception:
+            pytest.skip("redis-server is not available")
+            
+        key_prefix = f"test-ratelimit-{os.getpid()}"
+        try:
+            # 2プロセス相当の制限器が同じバケット（容量5）を共有する
+            limiters = [
+                DistributedRateLimiter(
+                    client, requests_per_minute=60, service_name="shared",
+                    lease_size=1, burst=5, key_prefix=key_prefix
+                )
+                for _ in range(2)
+            ]
+            start = time.monotonic()
+            for i in range(6):
+                await limiters[i % 2].acquire()
+            elapsed = time.monotonic() - start
+            
+            # 6件目は1秒（60req/分）の補充待ちになる
+            assert elapsed >= 0.9
+            assert sum(l.get_stats()["redis_calls"] for l in limiters) >= 6
+        finally:
+            await client.delete(f"{key_prefix}:shared")
+            await client.aclose()
@@ -12,9 +12,10 @@ from src.config import Config
 
 
 @pytest.fixture
-def config():
+def config(tmp_path):
     """テスト用設定."""
     config = Config()
+    config.storage.output_dir = str(tmp_path)
     config.workers.max_concurrent_tasks = 2
     config.max_retries = 3
     return config
@@ -662,4 +663,32 @@ class TestAggregatorWorker:
         assert isinstance(state.processed_images, dict)
         assert isinstance(state.metadata, dict)
         assert isinstance(state.created_at, datetime)
-        assert isinstance(state.updated_at, datetime) 
\ No newline at end of file
+        assert isinstance(state.updated_at, datetime) 
+
+
+class TestAggregatorObjectStore:
+    """AggregatorWorker のオブジェクトストレージ出力のテスト."""
+    
+    @pytest.mark.asyncio
+    async def test_writes_through_store(self):
+        """集約ワーカーがオブジェクトストレージに出力することのテスト"""
+        config = Config()
+        config.storage.backend = "memory"
+        worker = AggregatorWorker(config, "aggregator-store-test")
+        state = WorkflowState(workflow_id="wf-1")
+        state.content_items["c1"] = {
+            'content': {'type': 'article', 'title': 'Async IO', 'content': '本文'},
+            'paragraph': None,
+            'section': None,
+            'status': 'received',
+            'received_at': state.created_at
+        }
+        result = AggregationResult(
+            workflow_id="wf-1", status="completed", total_content_items=1, processed_images=0,
+            generated_thumbnails=0, metadata_entries=0, aggregated_at=state.created_at
+        )
+        
+        await worker._generate_final_outputs(state, result)
+        
+        assert set(worker.object_store.objects) == {"report_wf-1.json", "article_Async_IO_c1.txt"}
+        assert "本文" in (await worker.object_store.get("article_Async_IO_c1.txt")).decode("utf-8")
@@ -5,6 +5,9 @@ import asyncio
 from unittest.mock import Mock, AsyncMock, patch
 import base64
 
+from src.converters.optimizer import ImageVariant, OptimizedImage
+from src.converters.process_pool import ConversionProcessPool, rasterize_svg
+from src.converters.thumbnail import ThumbnailRenderer, ThumbnailTemplate
 from src.workers.media import MediaWorker, ImageType, ProcessedImage, ImageProcessingRequest
 from src.workers.base import Event, EventType
 from src.config import Config
@@ -599,4 +602,194 @@ graph TD
         assert processed.width == 800
         assert processed.height == 600
         assert processed.file_size == 1024
-        assert processed.metadata["s3_url"] == "https://example.com/image.png" 
\ No newline at end of file
+        assert processed.metadata["s3_url"] == "https://example.com/image.png" 
+
+class TestMediaRenderCache:
+    """MediaWorker のレンダーキャッシュ・アップロードの重複排除のテスト."""
+    
+    @pytest.fixture
+    def cached_worker(self, tmp_path):
+        """キャッシュ先・出力先を一時ディレクトリにしたメディアワーカー."""
+        config = Config()
+        config.storage.cache_dir = str(tmp_path / "cache")
+        config.storage.output_dir = str(tmp_path / "output")
+        return MediaWorker(config, "media-cache-test")
+        
+    @pytest.mark.asyncio
+    async def test_skips_upload_for_same_image(self, cached_worker, tmp_path):
+        """同じ画像はアップロードキューが再アップロードしないことのテスト."""
+        image_info = {'type': 'mermaid', 'content': 'graph TD\n    A --> B'}
+        
+        with patch.object(cached_worker, '_convert_image', AsyncMock(return_value=b'png')):
+            first = await cached_worker._process_single_image(image_info, "wf-1", 0)
+            second = await cached_worker._process_single_image(image_info, "wf-1", 0)
+            
+        assert second.processed_data == first.processed_data == b'png'
+        assert second.metadata['s3_url'] == first.metadata['s3_url']
+        assert cached_worker.get_processing_stats()['uploads']['uploaded'] == 1
+        # 変換結果のキャッシュは変換器の1層だけで、MediaWorker は書き込まない
+        assert not (tmp_path / "cache" / "renders").exists() or not any((tmp_path / "cache" / "renders").rglob("*.bin"))
+
+
+class TestMediaMermaidBatch:
+    """MediaWorker の Mermaid 図のまとめ変換のテスト."""
+    
+    @pytest.fixture
+    def worker(self, tmp_path):
+        """出力先をメモリにしたメディアワーカー."""
+        config = Config()
+        config.storage.cache_dir = str(tmp_path)
+        config.storage.backend = "memory"
+        return MediaWorker(config, "media-mermaid-test")
+        
+    @pytest.mark.asyncio
+    async def test_renders_mermaid_spans_in_one_batch(self, worker):
+        """コンテンツ内の Mermaid 図を1回の convert_many で変換することのテスト."""
+        content = (
+            "```mermaid\ngraph TD\n    A --> B\n```\n\n"
+            "<svg width=\"10\" height=\"10\"></svg>\n\n"
+            "```mermaid\ngraph LR\n    C --> D\n```\n\n"
+            "```mermaid\ngraph TD\n    A --> B\n```\n"
+        )
+        convert_many = AsyncMock(return_value=[b'png-ab', None])
+        
+        with patch.object(worker.mermaid_converter, 'convert_many', convert_many), \
+                patch.object(worker, '_convert_image', AsyncMock(return_value=b'png-svg')) as convert_image:
+            updated, processed = await worker._process_content_images({'content': content}, "wf-1")
+            
+        convert_many.assert_awaited_once_with(['graph TD\n    A --> B', 'graph LR\n    C --> D'])
+        convert_image.assert_awaited_once_with(ImageType.SVG, '<svg width="10" height="10"></svg>')
+        assert [image.original_type for image in processed] == [ImageType.MERMAID, ImageType.SVG, ImageType.MERMAID]
+        # 変換に失敗した図は元の参照のまま残す
+        assert "graph LR" in updated['content']
+        assert "graph TD" not in updated['content']
+
+
+class TestMediaSVGConversion:
+    """MediaWorker の SVG・draw.io 変換のテスト."""
+    
+    @pytest.fixture
+    def worker(self, tmp_path):
+        """出力先をメモリにしたメディアワーカー."""
+        config = Config()
+        config.storage.cache_dir = str(tmp_path)
+        config.storage.backend = "memory"
+        return MediaWorker(config, "media-svg-test")
+        
+    @pytest.mark.asyncio
+    async def test_inline_svg_rasterized_in_process_pool(self, worker):
+        """インライン SVG を SVGConverter 経由でプロセスプールでラスタライズすることのテスト."""
+        content = "<svg width=\"10\" height=\"10\"><rect width=\"10\" height=\"10\"/></svg>\n"
+        run = AsyncMock(return_value=b'png-svg')
+        
+        with patch.object(ConversionProcessPool, 'run', run):
+            updated, processed = await worker._process_content_images({'content': content}, "wf-1")
+            
+        run.assert_awaited_once()
+        assert run.await_args.args[0] is rasterize_svg
+        assert [image.original_type for image in processed] == [ImageType.SVG]
+        assert processed[0].processed_data == b'png-svg'
+        assert "<svg" not in updated['content']
+        
+    @pytest.mark.asyncio
+    async def test_drawio_converted_with_drawio_converter(self, worker):
+        """draw.io 図を DrawIOConverter で変換することのテスト."""
+        convert = AsyncMock(return_value=b'png-drawio')
+        
+        with patch.object(worker.drawio_converter, 'convert', convert):
+            result = await worker._convert_image(ImageType.DRAWIO, "diagram.drawio")
+            
+        convert.assert_awaited_once_with("diagram.drawio")
+        assert result == b'png-drawio'
+
+
+class TestMediaWorkerUploads:
+    """MediaWorker のアップロード先のテスト."""
+    
+    @pytest.mark.asyncio
+    async def test_uploads_to_local_store(self, tmp_path):
+        """バケット未設定時は output_dir にアップロードすることのテスト"""
+        config = Config()
+        config.storage.output_dir = str(tmp_path)
+        config.image.render_cache_enabled = False
+        worker = MediaWorker(config, "media-upload-test")
+        
+        first = await worker._upload_to_s3(b"png", "wf-1", "image_0_svg.png")
+        second = await worker._upload_to_s3(b"png", "wf-2", "image_3_svg.png")
+        
+        assert first == second
+        assert first.startswith((tmp_path / "media").as_uri())
+        assert worker.get_processing_stats()["storage"]["backend"] == "local"
+        assert worker.get_processing_stats()["uploads"]["uploaded"] == 1
+
+
+class TestMediaWorkerOptimization:
+    """MediaWorker の最適化ステージのテスト."""
+    
+    @pytest.fixture
+    def worker(self, tmp_path):
+        config = Config()
+        config.storage.cache_dir = str(tmp_path)
+        config.storage.backend = "memory"
+        worker = MediaWorker(config, "media-optimize-test")
+        worker.optimizer.optimize = AsyncMock(return_value=OptimizedImage(
+            data=b"optimized",
+            original_size=len(b"converted png"),
+            variants=[ImageVariant("webp", 400, 200, b"webp-400")],
+            width=1600,
+            height=800
+        ))
+        return worker
+    
+    @pytest.mark.asyncio
+    async def test_uploads_optimized_image_and_variants(self, worker):
+        image_info = {'type': 'svg', 'content': '<svg></svg>'}
+        
+        with patch.object(worker, '_convert_image', AsyncMock(return_value=b"converted png")):
+            first = await worker._process_single_image(image_info, "wf-1", 0)
+            second = await worker._process_single_image(image_info, "wf-1", 0)
+        
+        assert first.processed_data == second.processed_data == b"optimized"
+        assert (first.width, first.height) == (1600, 800)
+        assert first.metadata['variants'][0]['format'] == "webp"
+        assert first.metadata['variants'][0]['url'].endswith(".webp")
+        assert second.metadata['variants'] == first.metadata['variants']
+        assert len(worker.object_store.objects) == 2
+
+
+class TestMediaWorkerThumbnails:
+    """MediaWorker のサムネイル生成のテスト."""
+    
+    @pytest.fixture
+    def worker(self, tmp_path):
+        config = Config()
+        config.storage.cache_dir = str(tmp_path)
+        config.storage.backend = "memory"
+        return MediaWorker(config, "media-thumbnail-test")
+    
+    @pytest.mark.asyncio
+    async def test_batch_uses_renderer_and_falls_back_to_placeholder(self, worker):
+        renderer = ThumbnailRenderer(ThumbnailTemplate())
+        renderer.render_batch = AsyncMock(return_value=[b"rendered", None])
+        worker.thumbnail_renderer = renderer
+        
+        results = await worker._generate_thumbnail_images(
+            [{"title": "第1章"}, {"title": "第2章", "dimensions": {"width": 800, "height": 600}}],
+            "wf-1"
+        )
+        
+        requests = renderer.render_batch.call_args[0][0]
+        assert requests[0]["dimensions"] == {"width": 1200, "height": 630}
+        assert results[0].processed_data == b"rendered"
+        assert results[0].metadata["renderer"] == "template"
+        assert results[1].metadata["renderer"] == "placeholder"
+        assert (results[1].width, results[1].height) == (800, 600)
+    
+    @pytest.mark.asyncio
+    async def test_placeholder_without_renderer(self, worker):
+        worker.thumbnail_renderer = None
+        
+        result = await worker._generate_thumbnail_image({"title": "第1章"}, "wf-1")
+        
+        assert result.metadata["renderer"] == "placeholder"
+        assert result.metadata["s3_url"].startswith("memory://")
@@ -0,0 +1,51 @@
+"""WorkerPool のテスト."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from src.clients.router import ProviderRouter
+from src.config import Config
+from src.workers.pool import WorkerPool, WorkerType
+
+
+@pytest.fixture
+def config():
+    """テスト用設定."""
+    return Config()
+
+
+class TestWorkerPoolAIClients:
+    """AIワーカーへのクライアント設定のテスト."""
+    
+    @pytest.mark.asyncio
+    async def test_ai_workers_share_router_clients(self, config):
+        claude = Mock(close=AsyncMock())
+        with patch("src.workers.pool.ClaudeClient", return_value=claude), \
+                patch("src.workers.pool.OpenAIClient", side_effect=ValueError("OpenAI API key is required")):
+            pool = WorkerPool(config)
+            pool.ai_clients = pool._create_ai_clients()
+        
+        await pool._create_workers(WorkerType.AI)
+        await pool._add_workers(WorkerType.AI, 1)
+        
+        workers = pool.get_workers(WorkerType.AI)
+        assert len(workers) == pool._get_worker_count(WorkerType.AI) + 1
+        for worker in workers:
+            assert worker.claude_client is claude
+            assert worker.openai_client is None
+            assert isinstance(worker.provider_router, ProviderRouter)
+        
+        await pool.shutdown()
+        claude.close.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_no_router_without_clients(self, config):
+        with patch("src.workers.pool.ClaudeClient", side_effect=AttributeError("claude")), \
+                patch("src.workers.pool.OpenAIClient", side_effect=ValueError("OpenAI API key is required")):
+            pool = WorkerPool(config)
+            pool.ai_clients = pool._create_ai_clients()
+        
+        await pool._create_workers(WorkerType.AI)
+        
+        assert pool.ai_clients == {}
+        assert all(worker.provider_router is None for worker in pool.get_workers(WorkerType.AI))